@@ -2,4 +2,9 @@ from django.apps import AppConfig
 
 class Gene2PhenotypeAppConfig(AppConfig):
     default_auto_field = 'django.db.models.AutoField'
-    name = 'gene2phenotype_app'
\ No newline at end of file
+    name = 'gene2phenotype_app'
+
+    def ready(self):
+        from .signals import connect_signals
+
+        connect_signals()
@@ -0,0 +1,331 @@
+import logging
+import threading
+
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+"""
+Dependency graph of the records and invalidation bus of the data derived from
+the records (cached responses, panel stats and panel download snapshots).
+
+An update to the records data is mapped to the records (LGD), genes (locus),
+diseases and panels it affects (see get_instance_dependencies). After the
+transaction is committed the dependencies are resolved into tags, one for each
+name used in the URLs of the public endpoints:
+    - record:<stable id>
+    - locus:<gene symbol or synonym>
+    - disease:<disease name, synonym or ontology accession>
+    - panel:<panel name>
+    - records: included in every update (ex: panel list, search)
+    - all: the affected data is unknown, all derived data is invalidated
+
+The tags are sent to the functions in INVALIDATION_HANDLERS, each derived cache
+only drops the entries that use one of the tags.
+
+The updates of the same transaction are merged and the tags are resolved once,
+when the first callback of the transaction runs.
+The tags are lowercase, the names are case insensitive in the database.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Functions called with the set of invalidated tags after the transaction is committed
+INVALIDATION_HANDLERS = (
+    "gene2phenotype_app.views.response_cache.invalidate_responses",
+    "gene2phenotype_app.views.panel.increment_panel_versions",
+    "gene2phenotype_app.views.panel.invalidate_panel_stats",
+    "gene2phenotype_app.views.panel.invalidate_panel_snapshots",
+)
+
+RECORDS_TAG = "records"
+ALL_TAG = "all"
+
+
+def get_tag(kind: str, name: str) -> str:
+    """
+    Returns the tag of the data (kind: record, locus, disease or panel).
+    """
+    return f"{kind}:{str(name).lower()}"
+
+
+def get_tag_names(tags, kind: str) -> set[str]:
+    """
+    Returns the names of the tags of one kind.
+    """
+    prefix = f"{kind}:"
+    return {tag[len(prefix) :] for tag in tags if tag.startswith(prefix)}
+
+
+class Dependencies:
+    """
+    Data affected by an update, the ids are resolved into tags by resolve().
+    The stable ids, loci, diseases and panels of the records are included
+    when the tags are resolved.
+    """
+
+    FIELDS = ("lgd_ids", "stable_ids", "locus_ids", "disease_ids", "panel_ids", "tags")
+
+    def __init__(self, **kwargs):
+        for field in self.FIELDS:
+            setattr(self, field, set(kwargs.get(field, ())))
+
+    def __bool__(self):
+        return any(getattr(self, field) for field in self.FIELDS)
+
+    def update(self, other: "Dependencies"):
+        for field in self.FIELDS:
+            getattr(self, field).update(getattr(other, field))
+
+    def resolve(self) -> set[str]:
+        """
+        Returns the tags of the affected data (at most 9 queries).
+        """
+        # Import here, the module is loaded before the models
+        from .models import (
+            Disease,
+            DiseaseOntologyTerm,
+            DiseaseSynonym,
+            G2PStableID,
+            LGDPanel,
+            Locus,
+            LocusAttrib,
+            LocusGenotypeDisease,
+            Panel,
+        )
+
+        tags = set(self.tags)
+        tags.add(RECORDS_TAG)
+
+        stable_ids = set(self.stable_ids)
+        locus_ids = set(self.locus_ids)
+        disease_ids = set(self.disease_ids)
+        panel_ids = set(self.panel_ids)
+
+        if self.lgd_ids:
+            for stable_id, locus_id, disease_id in LocusGenotypeDisease.objects.filter(
+                id__in=self.lgd_ids
+            ).values_list("stable_id_id", "locus_id", "disease_id"):
+                stable_ids.add(stable_id)
+                locus_ids.add(locus_id)
+                disease_ids.add(disease_id)
+            # Deleted panels are included, the record was just removed from the panel
+            panel_ids.update(
+                LGDPanel.objects.filter(lgd_id__in=self.lgd_ids).values_list(
+                    "panel_id", flat=True
+                )
+            )
+
+        names = {
+            "record": [
+                G2PStableID.objects.filter(id__in=stable_ids).values_list(
+                    "stable_id", flat=True
+                )
+            ],
+            "panel": [
+                Panel.objects.filter(id__in=panel_ids).values_list("name", flat=True)
+            ],
+            "locus": [
+                Locus.objects.filter(id__in=locus_ids).values_list("name", flat=True),
+                LocusAttrib.objects.filter(locus_id__in=locus_ids).values_list(
+                    "value", flat=True
+                ),
+            ],
+            "disease": [
+                Disease.objects.filter(id__in=disease_ids).values_list(
+                    "name", flat=True
+                ),
+                DiseaseSynonym.objects.filter(disease_id__in=disease_ids).values_list(
+                    "synonym", flat=True
+                ),
+                DiseaseOntologyTerm.objects.filter(
+                    disease_id__in=disease_ids
+                ).values_list("ontology_term__accession", flat=True),
+            ],
+        }
+        ids = {
+            "record": stable_ids,
+            "panel": panel_ids,
+            "locus": locus_ids,
+            "disease": disease_ids,
+        }
+
+        for kind, querysets in names.items():
+            if not ids[kind]:
+                continue
+            for queryset in querysets:
+                tags.update(get_tag(kind, name) for name in queryset if name)
+
+        return tags
+
+
+def get_lgd_ids(queryset) -> set[int]:
+    return set(queryset.values_list("id", flat=True))
+
+
+def get_instance_dependencies(instance) -> Dependencies:
+    """
+    Returns the data affected by the update of the instance.
+    Only the instances of loci, diseases, panels and publications query the
+    database (to find their records), the other instances are linked to one record.
+    """
+    from .models import (
+        Disease,
+        DiseaseOntologyTerm,
+        DiseaseSynonym,
+        G2PStableID,
+        LGDPanel,
+        LGDPublication,
+        LGDPublicationComment,
+        LGDReviewItem,
+        LGDVariantTypeComment,
+        LGDVariantTypePublication,
+        Locus,
+        LocusAttrib,
+        LocusGenotypeDisease,
+        LocusIdentifier,
+        Panel,
+        Publication,
+    )
+
+    if isinstance(instance, LocusGenotypeDisease):
+        return Dependencies(
+            lgd_ids=[instance.id],
+            stable_ids=[instance.stable_id_id],
+            locus_ids=[instance.locus_id],
+            disease_ids=[instance.disease_id],
+        )
+    if isinstance(instance, LGDPanel):
+        return Dependencies(lgd_ids=[instance.lgd_id], panel_ids=[instance.panel_id])
+    if isinstance(instance, G2PStableID):
+        return Dependencies(stable_ids=[instance.id])
+    if isinstance(instance, Panel):
+        return Dependencies(
+            panel_ids=[instance.id],
+            lgd_ids=LGDPanel.objects.filter(panel_id=instance.id).values_list(
+                "lgd_id", flat=True
+            ),
+        )
+    if isinstance(instance, (Locus, LocusIdentifier, LocusAttrib)):
+        if isinstance(instance, Locus):
+            locus_id = instance.id
+        else:
+            locus_id = instance.locus_id
+        return Dependencies(
+            locus_ids=[locus_id],
+            lgd_ids=get_lgd_ids(LocusGenotypeDisease.objects.filter(locus_id=locus_id)),
+        )
+    if isinstance(instance, (Disease, DiseaseSynonym, DiseaseOntologyTerm)):
+        if isinstance(instance, Disease):
+            disease_id = instance.id
+        else:
+            disease_id = instance.disease_id
+        return Dependencies(
+            disease_ids=[disease_id],
+            lgd_ids=get_lgd_ids(
+                LocusGenotypeDisease.objects.filter(disease_id=disease_id)
+            ),
+        )
+    if isinstance(instance, Publication):
+        return Dependencies(
+            lgd_ids=LGDPublication.objects.filter(
+                publication_id=instance.id
+            ).values_list("lgd_id", flat=True)
+        )
+    if isinstance(instance, (LGDVariantTypePublication, LGDVariantTypeComment)):
+        return Dependencies(lgd_ids=[instance.lgd_variant_type.lgd_id])
+    if isinstance(instance, LGDPublicationComment):
+        return Dependencies(lgd_ids=[instance.lgd_publication.lgd_id])
+    if isinstance(instance, LGDReviewItem):
+        return Dependencies(lgd_ids=[instance.review_case.lgd_id])
+    if hasattr(instance, "lgd_id"):
+        return Dependencies(lgd_ids=[instance.lgd_id])
+
+    return Dependencies(tags=[ALL_TAG])
+
+
+def get_previous_dependencies(instance) -> Dependencies:
+    """
+    Returns the data that used the stored version of the instance, before it
+    is updated: the previous locus and disease of a record, the previous name
+    of a gene, disease or panel.
+    New instances do not have previous dependencies.
+    """
+    from .models import Disease, Locus, LocusGenotypeDisease, Panel
+
+    if instance._state.adding or instance.pk is None:
+        return Dependencies()
+
+    if isinstance(instance, LocusGenotypeDisease):
+        row = (
+            LocusGenotypeDisease.objects.filter(id=instance.id)
+            .values("locus_id", "disease_id")
+            .first()
+        )
+        if row is None:
+            return Dependencies()
+        return Dependencies(
+            locus_ids=[row["locus_id"]], disease_ids=[row["disease_id"]]
+        )
+
+    for model, kind in ((Locus, "locus"), (Disease, "disease"), (Panel, "panel")):
+        if isinstance(instance, model):
+            name = model.objects.filter(id=instance.id).values_list(
+                "name", flat=True
+            ).first()
+            if name:
+                return Dependencies(tags=[get_tag(kind, name)])
+
+    return Dependencies()
+
+
+class InvalidationBus:
+    def __init__(self):
+        self.local = threading.local()
+        self.handlers = None
+
+    def get_pending(self) -> Dependencies:
+        """
+        Returns the dependencies waiting for the transaction to be committed
+        (one set for each thread, the transactions are bound to the thread).
+        """
+        if not hasattr(self.local, "pending"):
+            self.local.pending = Dependencies()
+        return self.local.pending
+
+    def get_handlers(self):
+        if self.handlers is None:
+            self.handlers = [import_string(path) for path in INVALIDATION_HANDLERS]
+        return self.handlers
+
+    def publish(self, dependencies: Dependencies):
+        """
+        Invalidates the derived data of the dependencies after the transaction
+        is committed (or immediately if there is no transaction).
+        """
+        if not dependencies:
+            return
+
+        self.get_pending().update(dependencies)
+        transaction.on_commit(self.dispatch, robust=True)
+
+    def dispatch(self):
+        """
+        Resolves the pending dependencies and sends the tags to the handlers.
+        Dependencies of rolled back transactions are sent with the next commit,
+        invalidating data that did not change is harmless.
+        """
+        dependencies = self.get_pending()
+        if not dependencies:
+            return
+        self.local.pending = Dependencies()
+
+        tags = dependencies.resolve()
+        for handler in self.get_handlers():
+            try:
+                handler(tags)
+            except Exception:
+                logger.exception(f"Invalidation handler {handler.__name__} failed")
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,131 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from gene2phenotype_app.models import ActivityLog
+from gene2phenotype_app.views.meta import (
+    ACTIVITY_LOG_SOURCES,
+    build_activity_logs,
+    get_activity_log_rows,
+)
+
+
+"""
+Command to populate the activity logs table (activity_log) from the history tables.
+The activity logs endpoint only reads this table.
+
+The new history rows are added to the table automatically (see signals.py).
+This command has to be run once to populate the table with the existing history.
+The history rows that are already in the table are skipped, the command can be
+run more than once.
+
+How to run the command:
+python manage.py backfill_activity_logs [--data_type <data type>] [--clear]
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--data_type",
+            required=False,
+            action="append",
+            type=str,
+            help="Type of data (ex: panel, record). Can be used more than once. Default: all types",
+        )
+        parser.add_argument(
+            "--clear",
+            required=False,
+            action="store_true",
+            help="Delete the existing logs of the types of data before populating the table",
+        )
+        parser.add_argument(
+            "--batch_size",
+            required=False,
+            type=int,
+            default=1000,
+            help="Number of logs inserted at once. Default: 1000",
+        )
+
+    def handle(self, *args, **options):
+        data_types = options["data_type"]
+        batch_size = options["batch_size"]
+
+        valid_types = [source["data_type"] for source in ACTIVITY_LOG_SOURCES]
+        if data_types:
+            invalid_types = [
+                data_type for data_type in data_types if data_type not in valid_types
+            ]
+            if invalid_types:
+                raise CommandError(f"Invalid data type: {', '.join(invalid_types)}")
+        else:
+            data_types = valid_types
+
+        if batch_size < 1:
+            raise CommandError("--batch_size has to be a positive number")
+
+        total = 0
+        for source in ACTIVITY_LOG_SOURCES:
+            if source["data_type"] not in data_types:
+                continue
+
+            with transaction.atomic():
+                if options["clear"]:
+                    ActivityLog.objects.filter(data_type=source["data_type"]).delete()
+
+                count = self.backfill_source(source, batch_size)
+
+            logger.info(f"Added {count} activity logs of type {source['data_type']}")
+            total += count
+
+        print(f"Added {total} activity logs")
+
+    def backfill_source(self, source, batch_size):
+        """
+        Creates the activity logs of the history rows of one source.
+        The rows are sorted by object id and date to find the duplicated record rows.
+
+        Returns the number of logs created.
+        """
+        rows = (
+            get_activity_log_rows(source)
+            .order_by("id", "history_date", "history_id")
+            .iterator(chunk_size=batch_size)
+        )
+
+        existing_logs = ActivityLog.objects.filter(data_type=source["data_type"])
+        count = 0
+        batch = []
+        previous = None
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) < batch_size:
+                continue
+
+            count += self.save_logs(source, batch, previous, existing_logs)
+            previous = batch[-1]
+            batch = []
+
+        if batch:
+            count += self.save_logs(source, batch, previous, existing_logs)
+
+        return count
+
+    def save_logs(self, source, rows, previous, existing_logs):
+        """
+        Saves the logs of the history rows that are not in the table yet.
+        """
+        logs = build_activity_logs(source, rows, previous)
+        saved_ids = set(
+            existing_logs.filter(
+                history_id__in=[log.history_id for log in logs]
+            ).values_list("history_id", flat=True)
+        )
+        new_logs = [log for log in logs if log.history_id not in saved_ids]
+        ActivityLog.objects.bulk_create(new_logs)
+
+        return len(new_logs)
@@ -0,0 +1,71 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gene2phenotype_app.models import CurationData
+from gene2phenotype_app.utils import get_curation_data_hash
+
+
+"""
+Command to populate the JSON hash of the curation drafts (column curation_data.json_hash).
+The hash is used to find duplicated drafts when a draft is saved.
+
+The hash is updated automatically every time a draft is saved.
+This command has to be run once to populate the hash of the existing drafts;
+until then the drafts without hash are compared one by one.
+The history table is not updated.
+
+How to run the command:
+python manage.py backfill_curation_hashes [--all]
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            required=False,
+            action="store_true",
+            help="Calculate the hash of all drafts. Default: only the drafts without hash",
+        )
+        parser.add_argument(
+            "--batch_size",
+            required=False,
+            type=int,
+            default=500,
+            help="Number of drafts updated at once. Default: 500",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if batch_size < 1:
+            raise CommandError("--batch_size has to be a positive number")
+
+        queryset = CurationData.objects.only("id", "json_data", "json_hash")
+        if not options["all"]:
+            queryset = queryset.filter(json_hash__isnull=True)
+
+        count = 0
+        batch = []
+        for curation_data in queryset.order_by("id").iterator(chunk_size=batch_size):
+            json_hash = get_curation_data_hash(curation_data.json_data)
+            if json_hash == curation_data.json_hash:
+                continue
+
+            curation_data.json_hash = json_hash
+            batch.append(curation_data)
+            if len(batch) >= batch_size:
+                # bulk_update does not call save() and does not create history rows
+                CurationData.objects.bulk_update(batch, ["json_hash"])
+                count += len(batch)
+                batch = []
+
+        if batch:
+            CurationData.objects.bulk_update(batch, ["json_hash"])
+            count += len(batch)
+
+        logger.info(f"Updated the hash of {count} curation drafts")
+        print(f"Updated the hash of {count} curation drafts")
@@ -0,0 +1,70 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gene2phenotype_app.models import Panel
+from gene2phenotype_app.views.panel import write_panel_snapshots
+
+
+"""
+Command to generate the panel download files (snapshots).
+There is one compressed csv file for each panel and one for all panels, for
+non authenticated and authenticated users.
+The files are saved in the directory defined in PANEL_DOWNLOAD_SNAPSHOT_DIR and are
+served by the panel download endpoint while the records are not updated.
+
+By default, only the files that are missing or out of date are generated.
+
+How to run the command:
+python manage.py generate_panel_snapshots [--panel <panel name>] [--force]
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--panel",
+            required=False,
+            action="append",
+            type=str,
+            help="Panel name (use 'all' for the file with all panels). Can be used more than once. Default: all files",
+        )
+        parser.add_argument(
+            "--force",
+            required=False,
+            action="store_true",
+            help="Generate the files even if they are up to date",
+        )
+
+    def handle(self, *args, **options):
+        panel_names = options["panel"]
+        force = options["force"]
+
+        if not settings.PANEL_DOWNLOAD_SNAPSHOT_DIR:
+            raise CommandError(
+                "PANEL_DOWNLOAD_SNAPSHOT_DIR is not defined in the config file"
+            )
+
+        if panel_names:
+            valid_names = set(
+                Panel.objects.filter(name__in=panel_names).values_list(
+                    "name", flat=True
+                )
+            )
+            invalid_names = [
+                name for name in panel_names if name != "all" and name not in valid_names
+            ]
+            if invalid_names:
+                raise CommandError(f"Invalid panel: {', '.join(invalid_names)}")
+
+        created = write_panel_snapshots(panel_names, force)
+
+        for snapshot in created:
+            logger.info(f"Generated panel download file: {snapshot}")
+
+        print(
+            f"Generated {len(created)} panel download files in {settings.PANEL_DOWNLOAD_SNAPSHOT_DIR}"
+        )
@@ -0,0 +1,295 @@
+import csv
+import logging
+import os.path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...invalidation import Dependencies, invalidation_bus
+from ...utils import gene_reference, get_upsert_options
+
+from gene2phenotype_app.models import (
+    AttribType,
+    DataVersion,
+    HGNCGene,
+    Locus,
+    LocusAttrib,
+    LocusGenotypeDisease,
+    LocusIdentifier,
+    Source,
+)
+
+
+"""
+Command to load the HGNC gene data into the G2P database.
+The data is used to validate the genes without querying the Ensembl REST API
+(see utils/locus_utils.py).
+
+Supported input file: HGNC complete set (tsv)
+Download from: https://www.genenames.org/download/archive/ (hgnc_complete_set.txt)
+
+All the approved genes are saved in hgnc_gene (the genes not in the file are
+deleted), the genes not stored in G2P are also validated.
+
+The approved genes already stored in G2P are updated, they are found by
+HGNC ID or by symbol:
+    - the HGNC ID and the gene name are saved in locus_identifier (source HGNC)
+    - the Ensembl ID is saved in locus_identifier (source Ensembl)
+    - the previous symbols are added as gene synonyms (locus_attrib), except the
+      symbols already used by another gene. The synonyms stored in G2P are not
+      deleted. The aliases are only kept in hgnc_gene, the same alias can be
+      used by several genes.
+
+How to run the command:
+python manage.py load_gene_reference --data_file <hgnc_complete_set.txt>
+"""
+
+logger = logging.getLogger(__name__)
+
+MANDATORY_HEADERS = [
+    "hgnc_id",
+    "symbol",
+    "name",
+    "status",
+    "alias_symbol",
+    "prev_symbol",
+    "ensembl_gene_id",
+]
+
+BATCH_SIZE = 1000
+
+
+def split_values(value: str) -> list[str]:
+    """
+    Returns the values of a multi-valued HGNC column (ex: 'BBS14|CT87')
+    """
+    return [item.strip() for item in value.strip('"').split("|") if item.strip()]
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--data_file",
+            required=True,
+            type=str,
+            help="HGNC complete set (supported format: tsv)",
+        )
+
+    def handle(self, *args, **options):
+        data_file = options["data_file"]
+
+        if not os.path.isfile(data_file):
+            raise CommandError(f"Invalid file {data_file}")
+
+        if not data_file.endswith((".txt", ".tsv")):
+            raise CommandError(f"Unsupported file format {data_file}")
+
+        try:
+            hgnc_source = Source.objects.get(name="HGNC")
+            ensembl_source = Source.objects.get(name="Ensembl")
+        except Source.DoesNotExist:
+            raise CommandError(
+                "Sources 'HGNC' and 'Ensembl' are missing from source table"
+            )
+
+        try:
+            synonym_type = AttribType.objects.get(code="gene_synonym")
+        except AttribType.DoesNotExist:
+            raise CommandError(
+                "Attrib type 'gene_synonym' is missing from attrib_type table"
+            )
+
+        locus_by_symbol = {
+            name.upper(): locus_id
+            for locus_id, name in Locus.objects.values_list("id", "name")
+        }
+        identifiers = {}
+        locus_by_identifier = {}
+        for locus_identifier in LocusIdentifier.objects.filter(
+            source__in=[hgnc_source, ensembl_source]
+        ):
+            identifiers[(locus_identifier.locus_id, locus_identifier.source_id)] = (
+                locus_identifier
+            )
+            locus_by_identifier[locus_identifier.identifier.upper()] = (
+                locus_identifier.locus_id
+            )
+        synonyms = set()
+        loci_by_synonym = {}
+        for locus_id, value in LocusAttrib.objects.filter(
+            attrib_type=synonym_type
+        ).values_list("locus_id", "value"):
+            synonyms.add((locus_id, value.upper()))
+            loci_by_synonym.setdefault(value.upper(), set()).add(locus_id)
+
+        hgnc_genes = []
+        new_identifiers = []
+        updated_identifiers = []
+        new_synonyms = []
+        updated_locus_ids = set()
+        not_found = 0
+
+        with open(data_file, newline="", encoding="utf-8") as fh_file:
+            data_reader = csv.DictReader(fh_file, delimiter="\t")
+
+            # Check headers
+            if not data_reader.fieldnames or not all(
+                column in data_reader.fieldnames for column in MANDATORY_HEADERS
+            ):
+                raise CommandError(
+                    f"Missing data. Mandatory fields are: {MANDATORY_HEADERS}"
+                )
+
+            for row in data_reader:
+                if row["status"].strip().lower() != "approved":
+                    continue
+
+                hgnc_id = row["hgnc_id"].strip()
+                symbol = row["symbol"].strip()
+                prev_symbols = split_values(row["prev_symbol"])
+                hgnc_genes.append(
+                    HGNCGene(
+                        hgnc_id=hgnc_id,
+                        symbol=symbol,
+                        name=row["name"].strip() or None,
+                        ensembl_id=row["ensembl_gene_id"].strip() or None,
+                        prev_symbols=prev_symbols,
+                        alias_symbols=split_values(row["alias_symbol"]),
+                    )
+                )
+
+                locus_id = locus_by_identifier.get(hgnc_id.upper())
+                if locus_id is None:
+                    locus_id = locus_by_symbol.get(symbol.upper())
+                if locus_id is None:
+                    not_found += 1
+                    continue
+
+                locus_identifiers = [
+                    (hgnc_source, hgnc_id, row["name"].strip() or None),
+                    (ensembl_source, row["ensembl_gene_id"].strip(), None),
+                ]
+                for source, identifier, description in locus_identifiers:
+                    if not identifier:
+                        continue
+
+                    # The identifier is unique, it can be linked to another gene
+                    owner_id = locus_by_identifier.get(identifier.upper())
+                    if owner_id is not None and owner_id != locus_id:
+                        logger.warning(
+                            f"{source.name} ID {identifier} of {symbol} is linked to another gene"
+                        )
+                        continue
+
+                    locus_identifier = identifiers.get((locus_id, source.id))
+                    if locus_identifier is None:
+                        locus_identifier = LocusIdentifier(
+                            locus_id=locus_id,
+                            identifier=identifier,
+                            description=description,
+                            source=source,
+                        )
+                        identifiers[(locus_id, source.id)] = locus_identifier
+                        new_identifiers.append(locus_identifier)
+                    elif (
+                        locus_identifier.identifier != identifier
+                        or locus_identifier.description != description
+                    ):
+                        locus_identifier.identifier = identifier
+                        locus_identifier.description = description
+                        updated_identifiers.append(locus_identifier)
+                    else:
+                        continue
+
+                    locus_by_identifier[identifier.upper()] = locus_id
+                    updated_locus_ids.add(locus_id)
+
+                for synonym in prev_symbols:
+                    # Deleted synonyms are not added again
+                    key = (locus_id, synonym.upper())
+                    if synonym.upper() == symbol.upper() or key in synonyms:
+                        continue
+
+                    # The synonym must identify a single gene
+                    owner_ids = loci_by_synonym.get(synonym.upper(), set()) | {
+                        locus_by_symbol.get(synonym.upper(), locus_id)
+                    }
+                    if owner_ids != {locus_id}:
+                        logger.warning(
+                            f"Previous symbol {synonym} of {symbol} is used by another gene"
+                        )
+                        continue
+
+                    synonyms.add(key)
+                    loci_by_synonym.setdefault(synonym.upper(), set()).add(locus_id)
+                    new_synonyms.append(
+                        LocusAttrib(
+                            locus_id=locus_id,
+                            attrib_type=synonym_type,
+                            value=synonym,
+                            source=hgnc_source,
+                            is_deleted=0,
+                        )
+                    )
+                    updated_locus_ids.add(locus_id)
+
+        if not hgnc_genes:
+            raise CommandError(f"No approved HGNC genes found in {data_file}")
+
+        with transaction.atomic():
+            HGNCGene.objects.bulk_create(
+                hgnc_genes,
+                batch_size=BATCH_SIZE,
+                **get_upsert_options(
+                    ["hgnc_id"],
+                    ["symbol", "name", "ensembl_id", "prev_symbols", "alias_symbols"],
+                ),
+            )
+
+            # Delete the genes that are not in the file
+            hgnc_ids = {hgnc_gene.hgnc_id for hgnc_gene in hgnc_genes}
+            deleted_hgnc_ids = [
+                hgnc_id
+                for hgnc_id in HGNCGene.objects.values_list("hgnc_id", flat=True)
+                if hgnc_id not in hgnc_ids
+            ]
+            for i in range(0, len(deleted_hgnc_ids), BATCH_SIZE):
+                HGNCGene.objects.filter(
+                    hgnc_id__in=deleted_hgnc_ids[i : i + BATCH_SIZE]
+                ).delete()
+
+            LocusIdentifier.objects.bulk_create(new_identifiers, batch_size=BATCH_SIZE)
+            LocusIdentifier.objects.bulk_update(
+                updated_identifiers,
+                ["identifier", "description"],
+                batch_size=BATCH_SIZE,
+            )
+            LocusAttrib.objects.bulk_create(new_synonyms, batch_size=BATCH_SIZE)
+
+            # The bulk updates do not send signals
+            DataVersion.increment(DataVersion.GENE_REFERENCE)
+            transaction.on_commit(gene_reference.clear)
+            if new_synonyms:
+                # The gene synonyms are suggested by the autocomplete
+                DataVersion.increment(DataVersion.AUTOCOMPLETE)
+            if updated_locus_ids:
+                invalidation_bus.publish(
+                    Dependencies(
+                        locus_ids=updated_locus_ids,
+                        lgd_ids=LocusGenotypeDisease.objects.filter(
+                            locus_id__in=updated_locus_ids
+                        ).values_list("id", flat=True),
+                    )
+                )
+
+        message = (
+            f"Loaded {len(hgnc_genes)} HGNC genes, "
+            f"deleted {len(deleted_hgnc_ids)} genes. "
+            f"Updated {len(updated_locus_ids)} genes: "
+            f"{len(new_identifiers)} identifiers added, "
+            f"{len(updated_identifiers)} identifiers updated, "
+            f"{len(new_synonyms)} synonyms added. "
+            f"{not_found} HGNC genes not found in G2P"
+        )
+        logger.info(message)
+        print(message)
@@ -0,0 +1,225 @@
+import json
+import logging
+import os.path
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...utils import get_upsert_options, hpo_terms
+
+from gene2phenotype_app.models import DataVersion, HPOTerm
+
+
+"""
+Command to load a HPO release into the G2P database (table hpo_term).
+The phenotypes are validated against these terms (see utils/phenotype_utils.py).
+
+Supported input files: hp.obo or hp.json (OBO Graphs)
+Download from: https://hpo.jax.org/data/ontology
+
+The terms of the file are inserted or updated, the terms that are not in the
+file are deleted. The HPO data version is incremented, the running processes
+load the new terms within REFERENCE_DATA_CACHE_REFRESH_INTERVAL seconds.
+
+How to run the command:
+python manage.py load_hpo_terms --data_file <hp.obo or hp.json>
+"""
+
+logger = logging.getLogger(__name__)
+
+# Quoted text of the OBO tags 'def' and 'synonym'
+OBO_QUOTED_TEXT = re.compile(r'^"((?:[^"\\]|\\.)*)"')
+OBO_PURL = "http://purl.obolibrary.org/obo/"
+# OBO Graphs property of the obsolete terms
+REPLACED_BY_PROPERTY = "http://purl.obolibrary.org/obo/IAO_0100001"
+
+BATCH_SIZE = 1000
+
+
+def get_obo_quoted_text(value: str) -> str:
+    match = OBO_QUOTED_TEXT.match(value)
+    if not match:
+        return value
+    return match.group(1).replace('\\"', '"')
+
+
+def get_obo_id(value: str) -> str:
+    """
+    Returns the accession of an OBO value, without the comment
+    (ex: 'HP:0000118 ! Phenotypic abnormality' returns 'HP:0000118')
+    """
+    return value.split("!")[0].split()[0]
+
+
+def get_accession(uri: str) -> str:
+    """
+    Returns the accession of an OBO Graphs ID
+    (ex: 'http://purl.obolibrary.org/obo/HP_0000118' returns 'HP:0000118')
+    """
+    if uri.startswith(OBO_PURL):
+        return uri[len(OBO_PURL) :].replace("_", ":", 1)
+    return uri
+
+
+def new_term(accession: str) -> dict:
+    return {
+        "accession": accession,
+        "name": None,
+        "definition": None,
+        "synonyms": [],
+        "is_obsolete": 0,
+        "replaced_by": None,
+        "parents": [],
+    }
+
+
+def parse_obo(fh) -> list[dict]:
+    """
+    Returns the HPO terms of the stanzas [Term] of an OBO file.
+    """
+    terms = []
+    term = None
+    in_term = False
+
+    for line in fh:
+        line = line.strip()
+
+        if line.startswith("["):
+            in_term = line == "[Term]"
+            term = None
+            continue
+        if not in_term or ": " not in line:
+            continue
+
+        tag, value = line.split(": ", 1)
+
+        if tag == "id":
+            term = new_term(value)
+            terms.append(term)
+        elif term is None:
+            continue
+        elif tag == "name":
+            term["name"] = value
+        elif tag == "def":
+            term["definition"] = get_obo_quoted_text(value)
+        elif tag == "synonym":
+            term["synonyms"].append(get_obo_quoted_text(value))
+        elif tag == "is_obsolete":
+            term["is_obsolete"] = int(value == "true")
+        elif tag == "replaced_by":
+            term["replaced_by"] = get_obo_id(value)
+        elif tag == "is_a":
+            term["parents"].append(get_obo_id(value))
+
+    return terms
+
+
+def parse_obographs(fh) -> list[dict]:
+    """
+    Returns the HPO terms (classes) of an OBO Graphs JSON file.
+    """
+    data = json.load(fh)
+    terms = {}
+
+    for graph in data.get("graphs", []):
+        for node in graph.get("nodes", []):
+            if node.get("type") != "CLASS" or "lbl" not in node:
+                continue
+
+            term = new_term(get_accession(node["id"]))
+            term["name"] = node["lbl"]
+
+            meta = node.get("meta", {})
+            if "definition" in meta:
+                term["definition"] = meta["definition"].get("val")
+            term["synonyms"] = [synonym["val"] for synonym in meta.get("synonyms", [])]
+            term["is_obsolete"] = int(meta.get("deprecated", False))
+            for property_value in meta.get("basicPropertyValues", []):
+                if property_value["pred"] == REPLACED_BY_PROPERTY:
+                    term["replaced_by"] = get_accession(property_value["val"])
+
+            terms[term["accession"]] = term
+
+        for edge in graph.get("edges", []):
+            if edge["pred"] != "is_a":
+                continue
+            term = terms.get(get_accession(edge["sub"]))
+            if term is not None:
+                term["parents"].append(get_accession(edge["obj"]))
+
+    return list(terms.values())
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--data_file",
+            required=True,
+            type=str,
+            help="HPO release file (supported formats: obo, json)",
+        )
+
+    def handle(self, *args, **options):
+        data_file = options["data_file"]
+
+        if not os.path.isfile(data_file):
+            raise CommandError(f"Invalid file {data_file}")
+
+        with open(data_file, encoding="utf-8") as fh_file:
+            if data_file.endswith(".obo"):
+                terms = parse_obo(fh_file)
+            elif data_file.endswith(".json"):
+                try:
+                    terms = parse_obographs(fh_file)
+                except (ValueError, KeyError) as exc:
+                    raise CommandError(f"Invalid JSON file {data_file}: {exc}")
+            else:
+                raise CommandError(f"Unsupported file format {data_file}")
+
+        # Only the HPO terms are loaded, the file can include terms from other ontologies
+        terms = [
+            term
+            for term in terms
+            if term["accession"].startswith("HP:") and term["name"] is not None
+        ]
+        if not terms:
+            raise CommandError(f"No HPO terms found in {data_file}")
+
+        with transaction.atomic():
+            HPOTerm.objects.bulk_create(
+                [HPOTerm(**term) for term in terms],
+                batch_size=BATCH_SIZE,
+                **get_upsert_options(
+                    ["accession"],
+                    [
+                        "name",
+                        "definition",
+                        "synonyms",
+                        "is_obsolete",
+                        "replaced_by",
+                        "parents",
+                    ],
+                ),
+            )
+
+            # Delete the terms that are not in the release
+            accessions = {term["accession"] for term in terms}
+            deleted_accessions = [
+                accession
+                for accession in HPOTerm.objects.values_list("accession", flat=True)
+                if accession not in accessions
+            ]
+            for i in range(0, len(deleted_accessions), BATCH_SIZE):
+                HPOTerm.objects.filter(
+                    accession__in=deleted_accessions[i : i + BATCH_SIZE]
+                ).delete()
+
+            DataVersion.increment(DataVersion.HPO)
+            transaction.on_commit(hpo_terms.clear)
+
+        message = (
+            f"Loaded {len(terms)} HPO terms, deleted {len(deleted_accessions)} terms"
+        )
+        logger.info(message)
+        print(message)
@@ -8,7 +8,7 @@ import os.path
 from django.db.models import Count, F
 from django.core.management.base import BaseCommand, CommandError
 
-from ...utils import get_publication, clean_title, get_date_now
+from ...utils import get_publication, clean_title, get_date_now, ExternalLookupError
 
 from gene2phenotype_app.models import (
     MinedPublication,
@@ -177,7 +177,10 @@ class Command(BaseCommand):
                 try:
                     mined_publication_obj = MinedPublication.objects.get(pmid=int(pmid))
                 except MinedPublication.DoesNotExist:
-                    response = get_publication(int(pmid))
+                    try:
+                        response = get_publication(int(pmid))
+                    except ExternalLookupError as error:
+                        raise CommandError(str(error))
                     if response["hitCount"] == 0:
                         logger.warning(f"Invalid PMID '{pmid}'. Skipping import.")
                         continue
@@ -0,0 +1,50 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gene2phenotype_app.models import LocusGenotypeDisease
+from gene2phenotype_app.serializers import save_lgd_summaries
+
+
+"""
+Command to generate the summary of the records and save it in the table lgd_record_summary.
+The stored summaries are used by the record endpoint and the panel download.
+
+The summaries are refreshed automatically when the record data is updated (see signals.py).
+This command can be used to populate the table or to fix summaries updated by bulk operations.
+
+How to run the command:
+python manage.py rebuild_record_summaries [--stable_id <G2P ID>]
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stable_id",
+            required=False,
+            action="append",
+            type=str,
+            help="G2P ID of the record to process. Can be used more than once. Default: all records",
+        )
+
+    def handle(self, *args, **options):
+        stable_ids = options["stable_id"]
+
+        queryset = LocusGenotypeDisease.objects.filter(is_deleted=0)
+
+        if stable_ids:
+            queryset = queryset.filter(stable_id__stable_id__in=stable_ids)
+            valid_ids = set(queryset.values_list("stable_id__stable_id", flat=True))
+            invalid_ids = [
+                stable_id for stable_id in stable_ids if stable_id not in valid_ids
+            ]
+            if invalid_ids:
+                raise CommandError(f"Invalid G2P ID: {', '.join(invalid_ids)}")
+
+        count = save_lgd_summaries(queryset)
+
+        logger.info(f"Generated {count} record summaries")
+        print(f"Generated {count} record summaries")
@@ -0,0 +1,29 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from gene2phenotype_app.views.search import update_search_index
+
+
+"""
+Command to generate the search index of the records (table lgd_search_token).
+The index is used by the search endpoint to find records by disease and phenotype.
+
+The index is updated automatically when the data is updated (see signals.py).
+This command has to be run once to populate the table; until the index is
+generated the search does not use it.
+It can also be used to fix the index after bulk updates.
+
+How to run the command:
+python manage.py rebuild_search_index
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **options):
+        count = update_search_index()
+
+        logger.info(f"Generated search index with {count} tokens")
+        print(f"Generated search index with {count} tokens")
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.15 on 2026-10-16 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gene2phenotype_app', '0023_remove_lgdvarianttype_publication'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('date_update', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'data_version',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.15 on 2026-10-16 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gene2phenotype_app', '0024_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LGDRecordSummary',
+            fields=[
+                ('lgd', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='record_summary', serialize=False, to='gene2phenotype_app.locusgenotypedisease')),
+                ('summary', models.TextField(null=True)),
+                ('is_stale', models.BooleanField(default=False)),
+                ('date_update', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'lgd_record_summary',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.15 on 2026-10-16 19:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gene2phenotype_app', '0025_lgd_record_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PanelStats',
+            fields=[
+                ('panel', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='gene2phenotype_app.panel')),
+                ('data_version', models.PositiveBigIntegerField(default=0)),
+                ('total_records', models.PositiveIntegerField(default=0)),
+                ('total_genes', models.PositiveIntegerField(default=0)),
+                ('by_confidence', models.JSONField(default=dict)),
+                ('last_updated', models.DateField(null=True)),
+                ('date_update', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'panel_stats',
+            },
+        ),
+    ]
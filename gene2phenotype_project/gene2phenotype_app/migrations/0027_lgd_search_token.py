@@ -0,0 +1,28 @@
+# Generated by Django 5.2.15 on 2026-10-16 19:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gene2phenotype_app', '0026_panel_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LGDSearchToken',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('field', models.CharField(max_length=20)),
+                ('token', models.CharField(max_length=100)),
+                ('lgd', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='gene2phenotype_app.locusgenotypedisease')),
+            ],
+            options={
+                'db_table': 'lgd_search_token',
+                'indexes': [models.Index(fields=['token', 'field'], name='lgd_search__token_9ab759_idx')],
+                'unique_together': {('lgd', 'field', 'token')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.15 on 2026-10-16 19:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gene2phenotype_app', '0027_lgd_search_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('date', models.DateTimeField()),
+                ('change_type', models.CharField(max_length=10)),
+                ('data_type', models.CharField(max_length=50)),
+                ('stable_id', models.CharField(max_length=100, null=True)),
+                ('object_id', models.PositiveIntegerField()),
+                ('history_id', models.PositiveIntegerField()),
+                ('value', models.JSONField(default=dict)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'activity_log',
+                'indexes': [models.Index(fields=['stable_id', 'date'], name='activity_lo_stable__02cafc_idx'), models.Index(fields=['date'], name='activity_lo_date_3589c9_idx'), models.Index(fields=['data_type', 'object_id'], name='activity_lo_data_ty_6377e9_idx')],
+                'unique_together': {('data_type', 'history_id')},
+            },
+        ),
+    ]
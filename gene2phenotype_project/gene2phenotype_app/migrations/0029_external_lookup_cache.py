@@ -0,0 +1,27 @@
+# Generated by Django 5.2.15 on 2026-10-16 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gene2phenotype_app", "0028_activity_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExternalLookupCache",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("source", models.CharField(max_length=20)),
+                ("key", models.CharField(max_length=100)),
+                ("data", models.JSONField(null=True)),
+                ("date_update", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "external_lookup_cache",
+                "unique_together": {("source", "key")},
+            },
+        ),
+    ]
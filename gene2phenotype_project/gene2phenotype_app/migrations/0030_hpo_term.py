@@ -0,0 +1,29 @@
+# Generated by Django 5.2.15 on 2026-10-16 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gene2phenotype_app", "0029_external_lookup_cache"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HPOTerm",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("accession", models.CharField(max_length=20, unique=True)),
+                ("name", models.CharField(max_length=255)),
+                ("definition", models.TextField(null=True)),
+                ("synonyms", models.JSONField(default=list)),
+                ("is_obsolete", models.SmallIntegerField(default=False)),
+                ("replaced_by", models.CharField(default=None, max_length=20, null=True)),
+                ("parents", models.JSONField(default=list)),
+            ],
+            options={
+                "db_table": "hpo_term",
+            },
+        ),
+    ]
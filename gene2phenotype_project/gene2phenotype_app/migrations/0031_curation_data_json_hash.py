@@ -0,0 +1,29 @@
+# Generated by Django 5.2.15 on 2026-10-16 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gene2phenotype_app", "0030_hpo_term"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="curationdata",
+            name="json_hash",
+            field=models.CharField(default=None, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="historicalcurationdata",
+            name="json_hash",
+            field=models.CharField(default=None, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="curationdata",
+            index=models.Index(
+                fields=["user", "json_hash"], name="curation_da_user_id_e0491b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,185 @@
+# Generated by Django 5.2.15 on 2026-10-16 20:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def get_curation_data_fields(json_data):
+    """
+    Returns the fields of the draft saved in the new curation_data columns.
+    Same as utils.get_curation_data_fields() when the migration was written, the
+    migration does not depend on the app code.
+    """
+    disease = json_data.get("disease") or {}
+    mechanism = json_data.get("molecular_mechanism") or {}
+
+    return {
+        "locus": json_data.get("locus"),
+        "disease_name": disease.get("disease_name"),
+        "genotype": json_data.get("allelic_requirement"),
+        "mechanism": mechanism.get("name"),
+        "confidence": json_data.get("confidence"),
+    }
+
+
+def populate_curation_data_fields(apps, schema_editor):
+    """
+    Copy the fields displayed in the list of drafts from the JSON data to the
+    new curation_data columns, and the panels of the drafts to curation_data_panel.
+    The panels not found in G2P are ignored.
+    """
+    CurationData = apps.get_model("gene2phenotype_app", "CurationData")
+    CurationDataPanel = apps.get_model("gene2phenotype_app", "CurationDataPanel")
+    Panel = apps.get_model("gene2phenotype_app", "Panel")
+
+    panels = dict(Panel.objects.values_list("description", "id"))
+    fields = ["locus", "disease_name", "genotype", "mechanism", "confidence"]
+
+    curation_panels = []
+    for curation_data in CurationData.objects.all().iterator():
+        for field, value in get_curation_data_fields(curation_data.json_data).items():
+            max_length = CurationData._meta.get_field(field).max_length
+            setattr(curation_data, field, value[:max_length] if value else value)
+        curation_data.save(update_fields=fields)
+
+        panel_ids = []
+        for panel in curation_data.json_data.get("panels") or []:
+            if panel in panels and panels[panel] not in panel_ids:
+                panel_ids.append(panels[panel])
+        curation_panels.extend(
+            CurationDataPanel(curation_data_id=curation_data.id, panel_id=panel_id)
+            for panel_id in panel_ids
+        )
+
+    CurationDataPanel.objects.bulk_create(curation_panels, batch_size=1000)
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gene2phenotype_app", "0031_curation_data_json_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CurationDataPanel",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+            ],
+            options={
+                "db_table": "curation_data_panel",
+            },
+        ),
+        migrations.AddField(
+            model_name="curationdata",
+            name="locus",
+            field=models.CharField(default=None, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="historicalcurationdata",
+            name="locus",
+            field=models.CharField(default=None, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="curationdata",
+            name="confidence",
+            field=models.CharField(default=None, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name="curationdata",
+            name="disease_name",
+            field=models.CharField(default=None, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="curationdata",
+            name="genotype",
+            field=models.CharField(default=None, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="curationdata",
+            name="mechanism",
+            field=models.CharField(default=None, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="historicalcurationdata",
+            name="confidence",
+            field=models.CharField(default=None, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name="historicalcurationdata",
+            name="disease_name",
+            field=models.CharField(default=None, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name="historicalcurationdata",
+            name="genotype",
+            field=models.CharField(default=None, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="historicalcurationdata",
+            name="mechanism",
+            field=models.CharField(default=None, max_length=100, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="curationdata",
+            index=models.Index(
+                fields=["status", "date_created"], name="curation_da_status_7eb710_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="curationdata",
+            index=models.Index(
+                fields=["disease_name"], name="curation_da_disease_d425c7_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="curationdata",
+            index=models.Index(
+                fields=["genotype"], name="curation_da_genotyp_eed7f6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="curationdata",
+            index=models.Index(
+                fields=["mechanism"], name="curation_da_mechani_be2223_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="curationdata",
+            index=models.Index(
+                fields=["confidence"], name="curation_da_confide_ea5d9c_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="curationdatapanel",
+            name="curation_data",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="curation_panels",
+                to="gene2phenotype_app.curationdata",
+            ),
+        ),
+        migrations.AddField(
+            model_name="curationdatapanel",
+            name="panel",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                to="gene2phenotype_app.panel",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="curationdatapanel",
+            index=models.Index(
+                fields=["panel"], name="curation_da_panel_i_bc63b5_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="curationdatapanel",
+            unique_together={("curation_data", "panel")},
+        ),
+        migrations.RunPython(populate_curation_data_fields, noop_reverse),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.15 on 2026-10-16 20:07
+
+from django.db import migrations, models
+
+
+def create_stable_id_sequence(apps, schema_editor):
+    """
+    Create the counter of the G2P stable IDs, it starts from the highest number
+    already used.
+    The row is created here because MySQL (REPEATABLE READ) does not see a row
+    created by a concurrent transaction in a non-locking read.
+    """
+    G2PStableID = apps.get_model("gene2phenotype_app", "G2PStableID")
+    G2PStableIDSequence = apps.get_model("gene2phenotype_app", "G2PStableIDSequence")
+
+    numbers = [
+        int(stable_id[3:])
+        for stable_id in G2PStableID.objects.filter(
+            stable_id__startswith="G2P"
+        ).values_list("stable_id", flat=True)
+        if stable_id[3:].isdigit()
+    ]
+    G2PStableIDSequence.objects.create(key="G2P", last_value=max(numbers, default=0))
+
+
+def noop_reverse(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gene2phenotype_app", "0032_curation_data_list_columns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="G2PStableIDSequence",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("key", models.CharField(max_length=10, unique=True)),
+                ("last_value", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "g2p_stableid_sequence",
+            },
+        ),
+        migrations.RunPython(create_stable_id_sequence, noop_reverse),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.15 on 2026-10-16 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gene2phenotype_app", "0033_g2p_stableid_sequence"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HGNCGene",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("hgnc_id", models.CharField(max_length=100, unique=True)),
+                ("symbol", models.CharField(max_length=255)),
+                ("name", models.CharField(default=None, max_length=255, null=True)),
+                (
+                    "ensembl_id",
+                    models.CharField(default=None, max_length=100, null=True),
+                ),
+                ("prev_symbols", models.JSONField(default=list)),
+                ("alias_symbols", models.JSONField(default=list)),
+            ],
+            options={
+                "db_table": "hgnc_gene",
+            },
+        ),
+    ]
@@ -1,9 +1,11 @@
-from django.db import models
+import threading
+
+from django.db import IntegrityError, models, transaction
 from django.db.models import Q
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from simple_history.models import HistoricalRecords
 from rest_framework_simplejwt.tokens import RefreshToken
-from .utils import get_date_now
+from .utils import get_date_now, get_curation_data_hash, get_curation_data_fields
 
 
 class G2PStableID(models.Model):
@@ -22,9 +24,89 @@ class G2PStableID(models.Model):
         indexes = [models.Index(fields=["stable_id"])]
 
 
+class G2PStableIDSequence(models.Model):
+    """
+    Keeps the last number used to create the G2P stable IDs (ex: G2P00017).
+    The numbers are reserved with a locking read of the counter: the row is
+    locked until the end of the transaction, concurrent requests wait and get
+    different numbers. If the transaction fails, the numbers are not used.
+
+    The row is created by the migration with the highest number already used,
+    a counter equal to 0 was not used yet and starts from the highest number.
+    """
+
+    G2P = "G2P"
+
+    id = models.AutoField(primary_key=True)
+    key = models.CharField(max_length=10, unique=True, null=False)
+    last_value = models.PositiveBigIntegerField(null=False, default=0)
+
+    @classmethod
+    def get_last_stable_id_number(cls):
+        """
+        Returns the highest number of the G2P stable IDs stored in the database.
+        It is used to start the counter.
+        """
+        numbers = [
+            int(stable_id[len(cls.G2P) :])
+            for stable_id in G2PStableID.objects.filter(
+                stable_id__startswith=cls.G2P
+            ).values_list("stable_id", flat=True)
+            if stable_id[len(cls.G2P) :].isdigit()
+        ]
+        return max(numbers, default=0)
+
+    @classmethod
+    def reserve(cls, count=1):
+        """
+        Reserves a block of consecutive numbers for the G2P stable IDs.
+        The counter row is locked until the end of the transaction, call it
+        outside of long transactions.
+
+        Returns:
+            range: the reserved numbers
+        """
+        if count < 1:
+            raise ValueError("The number of stable IDs to reserve must be positive")
+
+        with transaction.atomic():
+            try:
+                sequence = cls.objects.select_for_update().get(key=cls.G2P)
+            except cls.DoesNotExist:
+                # The row is created by the migration, it is only missing if the
+                # table was emptied. A concurrent request can create it first,
+                # the locking read sees the committed row.
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(key=cls.G2P)
+                except IntegrityError:
+                    pass
+                sequence = cls.objects.select_for_update().get(key=cls.G2P)
+
+            if not sequence.last_value:
+                sequence.last_value = cls.get_last_stable_id_number()
+            sequence.last_value += count
+            sequence.save(update_fields=["last_value"])
+
+        return range(sequence.last_value - count + 1, sequence.last_value + 1)
+
+    class Meta:
+        db_table = "g2p_stableid_sequence"
+
+
 class CurationData(models.Model):
     """
     Represents G2P data in the process of being curated.
+
+    json_hash: fingerprint of the JSON data (without the session name), used to
+    find duplicated drafts. It is updated every time the draft is saved, the
+    drafts saved before the column was added are updated by the command
+    backfill_curation_hashes.
+
+    locus, disease_name, genotype, mechanism, confidence: copy of the JSON data
+    displayed in the list of drafts and in the search results, updated every time
+    the draft is saved. The locus is the gene as entered in the draft (gene_symbol
+    is the G2P gene). The panels of the draft are saved in curation_data_panel.
     """
 
     id = models.AutoField(primary_key=True)
@@ -38,8 +120,32 @@ class CurationData(models.Model):
     json_data = models.JSONField(null=False)
     gene_symbol = models.CharField(max_length=50, null=False, default=None)
     status = models.CharField(max_length=50, default="manual") # manual or automatic
+    json_hash = models.CharField(max_length=64, null=True, default=None)
+    locus = models.CharField(max_length=255, null=True, default=None)
+    disease_name = models.CharField(max_length=255, null=True, default=None)
+    genotype = models.CharField(max_length=100, null=True, default=None)
+    mechanism = models.CharField(max_length=100, null=True, default=None)
+    confidence = models.CharField(max_length=50, null=True, default=None)
     history = HistoricalRecords()
 
+    def save(self, *args, **kwargs):
+        self.json_hash = get_curation_data_hash(self.json_data)
+        for field, value in get_curation_data_fields(self.json_data).items():
+            max_length = self._meta.get_field(field).max_length
+            setattr(self, field, value[:max_length] if value else value)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "json_data" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "json_hash",
+                "locus",
+                "disease_name",
+                "genotype",
+                "mechanism",
+                "confidence",
+            }
+        super().save(*args, **kwargs)
+
     class Meta:
         db_table = "curation_data"
         indexes = [
@@ -47,6 +153,33 @@ class CurationData(models.Model):
             models.Index(fields=["stable_id"]),
             models.Index(fields=["session_name"]),
             models.Index(fields=["gene_symbol"]),
+            models.Index(fields=["user", "json_hash"]),
+            models.Index(fields=["status", "date_created"]),
+            models.Index(fields=["disease_name"]),
+            models.Index(fields=["genotype"]),
+            models.Index(fields=["mechanism"]),
+            models.Index(fields=["confidence"]),
+        ]
+
+
+class CurationDataPanel(models.Model):
+    """
+    Panels of a curation draft (JSON data 'panels'), used to filter the drafts by
+    panel without reading the JSON data.
+    The panels are saved by CurationDataSerializer every time the draft is saved.
+    """
+
+    id = models.AutoField(primary_key=True)
+    curation_data = models.ForeignKey(
+        "CurationData", on_delete=models.CASCADE, related_name="curation_panels"
+    )
+    panel = models.ForeignKey("Panel", on_delete=models.PROTECT)
+
+    class Meta:
+        db_table = "curation_data_panel"
+        unique_together = ["curation_data", "panel"]
+        indexes = [
+            models.Index(fields=["panel"]),
         ]
 
 
@@ -350,6 +483,54 @@ class LGDComment(models.Model):
         db_table = "lgd_comment"
 
 
+class LGDRecordSummary(models.Model):
+    """
+    Summary of the LGD record generated from the record data (see build_lgd_summary).
+    The summary is stored to avoid generating it on every request.
+    It is flagged as stale when the data used in the summary is updated
+    and it is generated again after the transaction is committed (see signals.py).
+    """
+
+    lgd = models.OneToOneField(
+        "LocusGenotypeDisease",
+        primary_key=True,
+        related_name="record_summary",
+        on_delete=models.CASCADE,
+    )
+    summary = models.TextField(null=True)
+    is_stale = models.BooleanField(null=False, default=False)
+    date_update = models.DateTimeField(null=False)
+
+    class Meta:
+        db_table = "lgd_record_summary"
+
+
+class LGDSearchToken(models.Model):
+    """
+    Search index of the records.
+    Stores the words (tokens) of the disease name, disease synonyms and phenotype terms
+    of each record. The tokens are lowercase.
+
+    The index is updated when the data is updated (see signals.py) and it
+    can be generated with the command rebuild_search_index.
+    """
+
+    DISEASE = "disease"
+    PHENOTYPE = "phenotype"
+
+    id = models.AutoField(primary_key=True)
+    lgd = models.ForeignKey(
+        "LocusGenotypeDisease", on_delete=models.CASCADE, related_name="search_tokens"
+    )
+    field = models.CharField(max_length=20, null=False)
+    token = models.CharField(max_length=100, null=False)
+
+    class Meta:
+        db_table = "lgd_search_token"
+        unique_together = ["lgd", "field", "token"]
+        indexes = [models.Index(fields=["token", "field"])]
+
+
 class LGDPublication(models.Model):
     lgd = models.ForeignKey("LocusGenotypeDisease", on_delete=models.PROTECT)
     publication = models.ForeignKey("Publication", on_delete=models.PROTECT)
@@ -404,6 +585,172 @@ class Meta(models.Model):
         db_table = "meta"
 
 
+# Keys of the data versions waiting for the transaction to be committed
+# (see DataVersion.increment_on_commit), one set for each thread
+_pending_versions = threading.local()
+
+
+class DataVersion(models.Model):
+    """
+    Keeps track of the version of the data.
+    The version is incremented every time the data is updated (see signals.py).
+    It is used to check if precomputed data (ex: panel download files) is up to date.
+    """
+
+    RECORDS = "records"
+    SEARCH_INDEX = "search_index"
+    REFERENCE_DATA = "reference_data"
+    HPO = "hpo"
+    GENE_REFERENCE = "gene_reference"
+    AUTOCOMPLETE = "autocomplete"
+    # Prefix of the version of the records of each panel (see get_panel_key)
+    PANEL = "panel"
+
+    id = models.AutoField(primary_key=True)
+    key = models.CharField(max_length=100, unique=True, null=False)
+    version = models.PositiveBigIntegerField(null=False, default=0)
+    date_update = models.DateTimeField(null=False)
+
+    @classmethod
+    def get_version(cls, key):
+        """
+        Returns the current version of the data for the key.
+        If the key is not stored yet, the version is 0.
+        """
+        version = cls.objects.filter(key=key).values_list("version", flat=True).first()
+        return version or 0
+
+    @classmethod
+    def get_versions(cls, keys: list[str]) -> dict[str, int]:
+        """
+        Returns the current version of the data for each key, with one query.
+        If a key is not stored yet, its version is 0.
+        """
+        versions = dict(cls.objects.filter(key__in=keys).values_list("key", "version"))
+        return {key: versions.get(key, 0) for key in keys}
+
+    @classmethod
+    def get_panel_key(cls, panel_id: int) -> str:
+        """
+        Returns the key of the version of the records of the panel.
+        The version is incremented after the records of the panel are updated
+        (see increment_panel_versions in views/panel.py).
+        """
+        return f"{cls.PANEL}:{panel_id}"
+
+    @classmethod
+    def increment(cls, key):
+        """
+        Increments the version of the data for the key.
+        The update is done in the database to avoid lost updates.
+        The row is locked until the end of the transaction, use increment_on_commit()
+        for the updates done by the curators.
+        """
+        updated = cls.objects.filter(key=key).update(
+            version=models.F("version") + 1, date_update=get_date_now()
+        )
+        if not updated:
+            obj, created = cls.objects.get_or_create(
+                key=key, defaults={"version": 1, "date_update": get_date_now()}
+            )
+            if not created:
+                cls.objects.filter(key=key).update(
+                    version=models.F("version") + 1, date_update=get_date_now()
+                )
+
+    @classmethod
+    def increment_on_commit(cls, key):
+        """
+        Increments the version of the data for the key once, after the transaction
+        is committed (or immediately if there is no transaction).
+        The row of the key is not locked while the transaction is running, the
+        transactions that update the same data are not serialised.
+        Keys of rolled back transactions are incremented with the next commit,
+        incrementing a version when the data did not change is harmless.
+        """
+        if not hasattr(_pending_versions, "keys"):
+            _pending_versions.keys = set()
+        _pending_versions.keys.add(key)
+        transaction.on_commit(lambda: cls.increment_pending(key), robust=True)
+
+    @classmethod
+    def increment_pending(cls, key):
+        """
+        Increments the version of the key if it was not incremented yet
+        by another callback of the same transaction.
+        Called by: increment_on_commit()
+        """
+        keys = getattr(_pending_versions, "keys", set())
+        if key not in keys:
+            return
+        keys.discard(key)
+        cls.increment(key)
+
+    class Meta:
+        db_table = "data_version"
+
+
+class ActivityLog(models.Model):
+    """
+    Log of the changes to the records data, used by the activity logs endpoint.
+    There is one row for each history row of the tables in ACTIVITY_LOG_SOURCES
+    (see views/meta.py). The rows are created when the history row is created
+    (see signals.py) and they can be created from the existing history
+    with the command backfill_activity_logs.
+
+    value: fields of the history row returned by the endpoint (ex: panel_name)
+    object_id: id of the updated row (ex: disease id)
+    history_id: id of the history row
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    date = models.DateTimeField(null=False)
+    user = models.ForeignKey("User", on_delete=models.SET_NULL, null=True)
+    change_type = models.CharField(max_length=10, null=False)
+    data_type = models.CharField(max_length=50, null=False)
+    stable_id = models.CharField(max_length=100, null=True)
+    object_id = models.PositiveIntegerField(null=False)
+    history_id = models.PositiveIntegerField(null=False)
+    value = models.JSONField(null=False, default=dict)
+
+    class Meta:
+        db_table = "activity_log"
+        unique_together = ["data_type", "history_id"]
+        indexes = [
+            models.Index(fields=["stable_id", "date"]),
+            models.Index(fields=["date"]),
+            models.Index(fields=["data_type", "object_id"]),
+        ]
+
+
+class ExternalLookupCache(models.Model):
+    """
+    Stores the responses of the external APIs used to validate the publications
+    (EuropePMC), the phenotypes (HPO API) and the genes (Ensembl REST API), the
+    same ID is not fetched again until the response is older than
+    EXTERNAL_LOOKUP_CACHE_TTL seconds, or EXTERNAL_LOOKUP_NOT_FOUND_CACHE_TTL
+    seconds if the ID does not exist (see utils/external_utils.py).
+
+    source: API of the response (europepmc, hpo or ensembl)
+    key: ID sent to the API (ex: PMID)
+    data: JSON response, null if the ID does not exist
+    """
+
+    SOURCE_EUROPEPMC = "europepmc"
+    SOURCE_HPO = "hpo"
+    SOURCE_ENSEMBL = "ensembl"
+
+    id = models.BigAutoField(primary_key=True)
+    source = models.CharField(max_length=20, null=False)
+    key = models.CharField(max_length=100, null=False)
+    data = models.JSONField(null=True)
+    date_update = models.DateTimeField(null=False)
+
+    class Meta:
+        db_table = "external_lookup_cache"
+        unique_together = ["source", "key"]
+
+
 class Sequence(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=100, null=False)
@@ -509,6 +856,54 @@ class OntologyTerm(models.Model):
         ]
 
 
+class HPOTerm(models.Model):
+    """
+    Local mirror of the HPO release (hp.obo or hp.json), loaded by the command
+    load_hpo_terms. The phenotypes are validated against these terms instead of
+    querying the HPO API (see utils/phenotype_utils.py).
+
+    synonyms: list of the synonyms of the term
+    replaced_by: accession of the term that replaces the obsolete term
+    parents: list of the accessions of the parent terms (is_a)
+    """
+
+    id = models.AutoField(primary_key=True)
+    accession = models.CharField(max_length=20, unique=True, null=False)
+    name = models.CharField(max_length=255, null=False)
+    definition = models.TextField(null=True)
+    synonyms = models.JSONField(null=False, default=list)
+    is_obsolete = models.SmallIntegerField(null=False, default=False)
+    replaced_by = models.CharField(max_length=20, null=True, default=None)
+    parents = models.JSONField(null=False, default=list)
+
+    class Meta:
+        db_table = "hpo_term"
+
+
+class HGNCGene(models.Model):
+    """
+    Local copy of the approved HGNC genes (hgnc_complete_set.txt), loaded by the
+    command load_gene_reference. The genes are validated against these genes and
+    the genes stored in G2P instead of querying the Ensembl REST API
+    (see utils/locus_utils.py).
+
+    prev_symbols: list of the previous symbols of the gene
+    alias_symbols: list of the aliases of the gene, the same alias can be used
+    by several genes
+    """
+
+    id = models.AutoField(primary_key=True)
+    hgnc_id = models.CharField(max_length=100, unique=True, null=False)
+    symbol = models.CharField(max_length=255, null=False)
+    name = models.CharField(max_length=255, null=True, default=None)
+    ensembl_id = models.CharField(max_length=100, null=True, default=None)
+    prev_symbols = models.JSONField(null=False, default=list)
+    alias_symbols = models.JSONField(null=False, default=list)
+
+    class Meta:
+        db_table = "hgnc_gene"
+
+
 class Disease(models.Model):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=255, unique=True, null=False)
@@ -651,6 +1046,33 @@ class Panel(models.Model):
         indexes = [models.Index(fields=["name"])]
 
 
+class PanelStats(models.Model):
+    """
+    Stores the stats of the panel (number of records, genes, etc.).
+    The stats are deleted after the records of the panel are updated (see invalidation.py)
+    and calculated again in the next request.
+    data_version is the version of the records of the panel when the stats were
+    calculated (see DataVersion.get_panel_key), stats of a previous version are
+    calculated again.
+    """
+
+    panel = models.OneToOneField(
+        "Panel",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    data_version = models.PositiveBigIntegerField(null=False, default=0)
+    total_records = models.PositiveIntegerField(null=False, default=0)
+    total_genes = models.PositiveIntegerField(null=False, default=0)
+    by_confidence = models.JSONField(null=False, default=dict)
+    last_updated = models.DateField(null=True)
+    date_update = models.DateTimeField(null=False)
+
+    class Meta:
+        db_table = "panel_stats"
+
+
 class UserManager(BaseUserManager):
     def create_user(
         self,
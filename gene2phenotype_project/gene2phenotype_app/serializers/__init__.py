@@ -54,6 +54,9 @@ from .locus_genotype_disease import (
     LGDCommentListSerializer,
     LGDReviewSerializer,
     build_lgd_summary,
+    get_lgd_summary,
+    save_lgd_summaries,
+    refresh_lgd_summaries,
 )
 
 from .stable_id import G2PStableIDSerializer
@@ -1,11 +1,15 @@
 from rest_framework import serializers
 from deepdiff import DeepDiff
 from django.db import transaction
+from django.db.models import Q
 from collections import OrderedDict
 import copy
 
 from ..models import (
     CurationData,
+    CurationDataPanel,
+    G2PStableIDSequence,
+    Panel,
     Disease,
     User,
     LocusGenotypeDisease,
@@ -35,7 +39,14 @@ from .user import UserSerializer
 from .stable_id import G2PStableIDSerializer
 from .publication import PublicationSerializer
 
-from ..utils import get_date_now, validate_confidence_publications
+from ..utils import (
+    fetch_external_data,
+    get_curation_data_hash,
+    get_date_now,
+    validate_confidence_publications,
+    vocabulary,
+    ExternalLookupError,
+)
 
 
 class CurationDataSerializer(serializers.ModelSerializer):
@@ -283,7 +294,10 @@ class CurationDataSerializer(serializers.ModelSerializer):
         """
         Function to compare provided JSON data against JSON data stored in CurationData instances
         associated with a specific user.
-        Only compares the first layer of JSON objects.
+
+        Only the drafts with the same JSON hash (see get_curation_data_hash) are
+        compared, the hash is indexed. The drafts without hash (not backfilled yet)
+        are also compared.
 
         Args:
             input_json_data: JSON data to compare against.
@@ -293,54 +307,76 @@ class CurationDataSerializer(serializers.ModelSerializer):
             If a match is found, returns the corresponding CurationData instance.
             If no match is found, returns None.
         """
+        # remove session_name field from input json and compare input json with existing curation json
+        input_json_data["json_data"].pop("session_name", None)
+        json_hash = get_curation_data_hash(input_json_data["json_data"])
 
-        user_sessions_queryset = CurationData.objects.filter(user=user_obj)
+        user_sessions_queryset = CurationData.objects.filter(user=user_obj).filter(
+            Q(json_hash=json_hash) | Q(json_hash__isnull=True)
+        )
         for curation_data in user_sessions_queryset:
             data_json = curation_data.json_data
-            # remove session_name field from input json and compare input json with existing curation json
-            input_json_data["json_data"].pop("session_name", None)
             data_json.pop("session_name", None)
 
+            # Confirm the match with the full comparison
             result = DeepDiff(input_json_data["json_data"], data_json)
 
             if not result:
                 return curation_data
 
-    def get_entry_info_from_json_data(self, json_data):
+    def save_panels(self, curation_data):
+        """
+        Saves the panels of the draft in the table curation_data_panel.
+        The table is used to filter the drafts by panel (see ListCurationEntries).
+        The panels are saved in the same order as in the JSON data, the panels
+        not found in G2P are ignored.
+
+        Args:
+            curation_data: CurationData object
         """
-        Extracts specific information from a given JSON data structure.
-        This method is used by the search functionality to extract relevant fields for display.
+        panel_descriptions = curation_data.json_data.get("panels") or []
+        panels = {
+            panel.description: panel
+            for panel in Panel.objects.filter(description__in=panel_descriptions)
+        }
 
-        This method parses the provided `json_data` dictionary to extract the following fields:
-        - "genotype": Retrieved from the "allelic_requirement" key.
-        - "disease": Retrieved from the nested "disease_name" key inside the "disease" dictionary.
-        - "panel": Retrieved from the "panels" key.
-        - "confidence"
+        CurationDataPanel.objects.filter(curation_data=curation_data).delete()
+        CurationDataPanel.objects.bulk_create(
+            [
+                CurationDataPanel(curation_data=curation_data, panel=panel)
+                for panel in dict.fromkeys(
+                    panels[description]
+                    for description in panel_descriptions
+                    if description in panels
+                )
+            ]
+        )
+
+    def create(self, validated_data):
+        """
+        Create a new CurationData object.
+        The number of the stable ID is reserved in its own transaction, the stable
+        ID counter is not locked while the draft is saved. If the draft is not
+        saved the number is not used (gap in the stable IDs).
 
         Args:
-            json_data (dict): A dictionary containing the JSON data to extract information from.
+            (dict) validated_data: Validated data containing the JSON data to be stored.
 
         Returns:
-            dict: A dictionary containing the extracted fields with the following keys:
-                - "genotype" (str): The allelic requirement (genotype) value, or empty string if not present.
-                - "disease" (str): The disease name, or empty string if not present.
-                - "panel" (list): The list of panels, or empty list if not present.
-                - "confidence" (str): The confidence level, or empty string if not present.
+            CurationData: The newly created CurationData instance.
         """
-        return {
-            "genotype": json_data.get("allelic_requirement"),
-            "disease": json_data.get("disease", {}).get("disease_name"),
-            "panel": json_data.get("panels"),
-            "confidence": json_data.get("confidence", None),
-        }
+        stable_id_number = G2PStableIDSequence.reserve()[0]
+
+        return self.create_curation_data(validated_data, stable_id_number)
 
     @transaction.atomic
-    def create(self, validated_data):
+    def create_curation_data(self, validated_data, stable_id_number):
         """
-        Create a new CurationData object.
+        Saves the new CurationData object and its stable ID (see create()).
 
         Args:
             (dict) validated_data: Validated data containing the JSON data to be stored.
+            (int) stable_id_number: reserved number of the stable ID
 
         Returns:
             CurationData: The newly created CurationData instance.
@@ -352,7 +388,7 @@ class CurationDataSerializer(serializers.ModelSerializer):
         date_created = get_date_now()
         date_reviewed = date_created
         session_name = json_data["session_name"]
-        stable_id = G2PStableIDSerializer.create_stable_id()
+        stable_id = G2PStableIDSerializer.create_stable_id(stable_id_number)
         gene_symbol = json_data["locus"]
 
         if session_name is None or session_name == "":
@@ -408,6 +444,8 @@ class CurationDataSerializer(serializers.ModelSerializer):
                 }
             )
 
+        self.save_panels(new_curation_data)
+
         return new_curation_data
 
     @transaction.atomic
@@ -450,14 +488,63 @@ class CurationDataSerializer(serializers.ModelSerializer):
         instance.status = "manual"
         instance.save()
 
+        self.save_panels(instance)
+
         return instance
 
+    def prepare_publish(self, data):
+        """
+        First phase of the publication of a record, it runs before publish()
+        so that the external APIs are not queried while the transaction holds
+        the row locks.
+
+        The publications that are not stored in G2P (EuropePMC) and the HPO terms
+        that are not stored locally (HPO API) are fetched concurrently and saved in
+        the table external_lookup_cache, publish() reads them from the table.
+        The PMIDs are validated.
+
+        Args:
+            data: CurationData object to publish (JSON format)
+        """
+        pmids = [
+            str(publication["pmid"]) for publication in data.json_data["publications"]
+        ]
+        # The invalid PMIDs are reported by PublicationSerializer
+        valid_pmids = [pmid for pmid in pmids if pmid.isdigit()]
+        existing_pmids = {
+            str(pmid)
+            for pmid in Publication.objects.filter(pmid__in=valid_pmids).values_list(
+                "pmid", flat=True
+            )
+        }
+        new_pmids = [pmid for pmid in valid_pmids if pmid not in existing_pmids]
+        accessions = [
+            hpo["accession"]
+            for phenotype_pmid in data.json_data["phenotypes"]
+            for hpo in phenotype_pmid["hpo_terms"]
+        ]
+
+        try:
+            publications = fetch_external_data(new_pmids, accessions)
+        except ExternalLookupError:
+            raise serializers.ValidationError(
+                {
+                    "error": "Could not fetch the publications or the phenotypes from the external APIs"
+                }
+            )
+
+        for pmid in new_pmids:
+            response = publications[pmid]
+            if response is None or response["hitCount"] == 0:
+                raise serializers.ValidationError({"error": f"Invalid PMID {pmid}"})
+
     @transaction.atomic
     def publish(self, data):
         """
         Publish a record under curation.
         This method is wrapped in a single transation (@transaction.atomic) ensuring
         that all related database operations are treated as a single unit.
+        The external data should be fetched before by prepare_publish().
 
         Args:
             data: CurationData object to publish (JSON format)
@@ -579,9 +666,7 @@ class CurationDataSerializer(serializers.ModelSerializer):
         # Get mechanism value from controlled vocabulary table for molecular mechanism
         mechanism_name = data.json_data["molecular_mechanism"]["name"]
         try:
-            mechanism_obj = CVMolecularMechanism.objects.get(
-                value=mechanism_name, type="mechanism"
-            )
+            mechanism_obj = vocabulary.get_mechanism("mechanism", mechanism_name)
         except CVMolecularMechanism.DoesNotExist:
             raise serializers.ValidationError(
                 {"error": f"Invalid mechanism value '{mechanism_name}'"}
@@ -590,8 +675,8 @@ class CurationDataSerializer(serializers.ModelSerializer):
         # Get mechanism support from controlled vocabulary table for molecular mechanism
         mechanism_support = data.json_data["molecular_mechanism"]["support"]
         try:
-            mechanism_support_obj = CVMolecularMechanism.objects.get(
-                value=mechanism_support, type="support"
+            mechanism_support_obj = vocabulary.get_mechanism(
+                "support", mechanism_support
             )
         except CVMolecularMechanism.DoesNotExist:
             raise serializers.ValidationError(
@@ -708,6 +793,7 @@ class CurationDataSerializer(serializers.ModelSerializer):
         #             }
         #         ]
         # }
+        # The HPO terms that are not stored locally were fetched by prepare_publish()
         for phenotype_pmid in data.json_data["phenotypes"]:
             # TODO improve this method to send a list of phenotypes to LGDPhenotypeSerializer
             hpo_terms = phenotype_pmid["hpo_terms"]
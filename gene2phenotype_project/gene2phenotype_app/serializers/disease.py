@@ -1,5 +1,4 @@
 from rest_framework import serializers
-from django.db.models import Q, FilteredRelation
 from typing import Any, Optional
 from datetime import date
 import re
@@ -12,7 +11,6 @@ from ..models import (
     Attrib,
     LocusGenotypeDisease,
     OntologyTerm,
-    Source,
     GeneDisease,
 )
 
@@ -20,7 +18,9 @@ from ..utils import (
     clean_string,
     get_ontology_source,
     validate_disease_name,
+    vocabulary,
 )
+from .records_summary import get_records_summary
 
 
 class DiseaseOntologyTermSerializer(serializers.ModelSerializer):
@@ -69,11 +69,9 @@ class DiseaseOntologyTermSerializer(serializers.ModelSerializer):
             ontology_obj = OntologyTerm.objects.get(accession=ontology_accession)
 
         except OntologyTerm.DoesNotExist:
-            source = Source.objects.get(name=ontology_source["name"])
+            source = vocabulary.get_source(ontology_source["name"])
             # Get attrib 'disease'
-            attrib_disease = Attrib.objects.get(
-                value="disease", type__code="ontology_term_group"
-            )
+            attrib_disease = vocabulary.get_attrib("ontology_term_group", "disease")
 
             ontology_obj = OntologyTerm.objects.create(
                 accession=ontology_accession,
@@ -84,9 +82,7 @@ class DiseaseOntologyTermSerializer(serializers.ModelSerializer):
             )
 
         try:
-            attrib = Attrib.objects.get(
-                value="Data source", type__code="ontology_mapping"
-            )
+            attrib = vocabulary.get_attrib("ontology_mapping", "Data source")
         except Attrib.DoesNotExist:
             raise serializers.ValidationError(
                 {"message": "Cannot find attrib 'Data source'"}
@@ -137,7 +133,10 @@ class DiseaseSerializer(serializers.ModelSerializer):
         """
         Returns the ontology terms associated with the disease.
         """
-        disease_ontologies = DiseaseOntologyTerm.objects.filter(disease=id)
+        # Use the data prefetched by LocusGenotypeDiseaseSerializer.prefetch_queryset() if available
+        disease_ontologies = getattr(id, "prefetched_ontology_terms", None)
+        if disease_ontologies is None:
+            disease_ontologies = DiseaseOntologyTerm.objects.filter(disease=id)
         return DiseaseOntologyTermSerializer(disease_ontologies, many=True).data
 
     def get_synonyms(self, id: int) -> list[str]:
@@ -145,7 +144,9 @@ class DiseaseSerializer(serializers.ModelSerializer):
         Returns disease synonyms used in other sources.
         """
         synonyms = []
-        disease_synonyms = DiseaseSynonym.objects.filter(disease=id)
+        disease_synonyms = getattr(id, "prefetched_synonyms", None)
+        if disease_synonyms is None:
+            disease_synonyms = DiseaseSynonym.objects.filter(disease=id)
         for d_synonym in disease_synonyms:
             synonyms.append(d_synonym.synonym)
         return synonyms
@@ -183,151 +184,28 @@ class DiseaseDetailSerializer(DiseaseSerializer):
         If the user is non-authenticated:
             - only returns records linked to visible panels
         """
-        if user.is_authenticated:
-            lgd_select = (
-                LocusGenotypeDisease.objects.filter(
-                    disease=id,
-                    is_deleted=0,
-                    lgdpanel__is_deleted=0,
-                )
-                .annotate(
-                    active_variant_consequence=FilteredRelation(
-                        "lgdvariantgenccconsequence",
-                        condition=Q(lgdvariantgenccconsequence__is_deleted=0),
-                    ),
-                    active_variant_type=FilteredRelation(
-                        "lgdvarianttype",
-                        condition=Q(lgdvarianttype__is_deleted=0),
-                    ),
-                )
-                .select_related("locus", "genotype", "confidence", "mechanism")
-                .prefetch_related(
-                    "lgd_panel",
-                    "panel",
-                    "lgd_variant_gencc_consequence",
-                    "lgd_variant_type",
-                    "g2pstable_id",
-                )
-                .order_by("-date_review")
-            )
-
-        else:
-            lgd_select = (
-                LocusGenotypeDisease.objects.filter(
-                    disease=id,
-                    is_deleted=0,
-                    lgdpanel__panel__is_visible=1,
-                    lgdpanel__is_deleted=0,
-                )
-                .annotate(
-                    active_variant_consequence=FilteredRelation(
-                        "lgdvariantgenccconsequence",
-                        condition=Q(lgdvariantgenccconsequence__is_deleted=0),
-                    ),
-                    active_variant_type=FilteredRelation(
-                        "lgdvarianttype",
-                        condition=Q(lgdvarianttype__is_deleted=0),
-                    ),
-                )
-                .select_related("locus", "genotype", "confidence", "mechanism")
-                .prefetch_related(
-                    "lgd_panel",
-                    "panel",
-                    "lgd_variant_gencc_consequence",
-                    "lgd_variant_type",
-                    "g2pstable_id",
-                )
-                .order_by("-date_review")
-            )
-
-        lgd_objects_list = list(
-            lgd_select.values(
-                "locus__name",
-                "lgdpanel__panel__name",
-                "stable_id__stable_id",  # to get the stable_id stableID
-                "genotype__value",
-                "confidence__value",
-                "active_variant_consequence__variant_consequence__term",
-                "active_variant_type__variant_type_ot__term",
-                "mechanism__value",
-            )
+        # The panel filters are applied to the same panel (one filter call)
+        panel_filter = {"lgdpanel__is_deleted": 0}
+        if not user.is_authenticated:
+            panel_filter["lgdpanel__panel__is_visible"] = 1
+        lgd_select = LocusGenotypeDisease.objects.filter(
+            disease=id, is_deleted=0, **panel_filter
         )
 
-        aggregated_data = {}
-        for lgd_obj in lgd_objects_list:
-            if lgd_obj["stable_id__stable_id"] not in aggregated_data.keys():
-                variant_consequences = []
-                variant_types = []
-                panels = []
-
-                panels.append(lgd_obj["lgdpanel__panel__name"])
-                if (
-                    lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    is not None
-                ):
-                    variant_consequences.append(
-                        lgd_obj[
-                            "active_variant_consequence__variant_consequence__term"
-                        ]
-                    )
-                if lgd_obj["active_variant_type__variant_type_ot__term"] is not None:
-                    variant_types.append(
-                        lgd_obj["active_variant_type__variant_type_ot__term"]
-                    )
-
-                aggregated_data[lgd_obj["stable_id__stable_id"]] = {
-                    "locus": lgd_obj["locus__name"],
-                    "genotype": lgd_obj["genotype__value"],
-                    "confidence": lgd_obj["confidence__value"],
-                    "panels": panels,
-                    "variant_consequence": variant_consequences,
-                    "variant_type": variant_types,
-                    "molecular_mechanism": lgd_obj["mechanism__value"],
-                    "stable_id": lgd_obj["stable_id__stable_id"],
-                }
-
-            else:
-                if (
-                    lgd_obj["lgdpanel__panel__name"]
-                    not in aggregated_data[lgd_obj["stable_id__stable_id"]]["panels"]
-                ):
-                    aggregated_data[lgd_obj["stable_id__stable_id"]]["panels"].append(
-                        lgd_obj["lgdpanel__panel__name"]
-                    )
-                if (
-                    lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    not in aggregated_data[lgd_obj["stable_id__stable_id"]][
-                        "variant_consequence"
-                    ]
-                    and lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    is not None
-                ):
-                    aggregated_data[lgd_obj["stable_id__stable_id"]][
-                        "variant_consequence"
-                    ].append(
-                        lgd_obj[
-                            "active_variant_consequence__variant_consequence__term"
-                        ]
-                    )
-                if (
-                    lgd_obj["active_variant_type__variant_type_ot__term"]
-                    not in aggregated_data[lgd_obj["stable_id__stable_id"]][
-                        "variant_type"
-                    ]
-                    and lgd_obj["active_variant_type__variant_type_ot__term"]
-                    is not None
-                ):
-                    aggregated_data[lgd_obj["stable_id__stable_id"]][
-                        "variant_type"
-                    ].append(lgd_obj["active_variant_type__variant_type_ot__term"])
-
-        return aggregated_data.values()
+        return get_records_summary(
+            lgd_select,
+            [
+                "locus",
+                "genotype",
+                "confidence",
+                "panels",
+                "variant_consequence",
+                "variant_type",
+                "molecular_mechanism",
+                "stable_id",
+            ],
+            visible_panels_only=not user.is_authenticated,
+        )
 
     class Meta:
         model = Disease
@@ -393,10 +271,8 @@ class CreateDiseaseSerializer(serializers.ModelSerializer):
             disease_obj = Disease.objects.create(name=disease_name)
 
         # Get attributes
-        attrib_disease = Attrib.objects.get(
-            value="disease", type__code="ontology_term_group"
-        )
-        attrib = Attrib.objects.get(value="Data source", type__code="ontology_mapping")
+        attrib_disease = vocabulary.get_attrib("ontology_term_group", "disease")
+        attrib = vocabulary.get_attrib("ontology_mapping", "Data source")
 
         for ontology in ontologies_list:
             ontology_accession = ontology["ontology_term"]["accession"]
@@ -441,7 +317,7 @@ class CreateDiseaseSerializer(serializers.ModelSerializer):
                     ontology_term = new_ontology_term
                     ontology_desc = new_ontology_term
 
-                    source_obj = Source.objects.get(name=source)
+                    source_obj = vocabulary.get_source(source)
 
                     ontology_obj = OntologyTerm.objects.create(
                         accession=ontology_accession,
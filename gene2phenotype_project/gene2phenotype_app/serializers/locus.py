@@ -1,5 +1,4 @@
 from rest_framework import serializers
-from django.db.models import Q, FilteredRelation
 from typing import Optional
 from datetime import date
 
@@ -7,11 +6,12 @@ from ..models import (
     Locus,
     LocusIdentifier,
     LocusAttrib,
-    AttribType,
     UniprotAnnotation,
     GeneStats,
     LocusGenotypeDisease,
 )
+from ..utils import vocabulary
+from .records_summary import get_records_summary
 
 
 class LocusSerializer(serializers.ModelSerializer):
@@ -32,7 +32,10 @@ class LocusSerializer(serializers.ModelSerializer):
         Locus IDs from external sources.
         It can be the HGNC ID for a gene.
         """
-        locus_ids = LocusIdentifier.objects.filter(locus=id)
+        # Use the data prefetched by LocusGenotypeDiseaseSerializer.prefetch_queryset() if available
+        locus_ids = getattr(id, "prefetched_ids", None)
+        if locus_ids is None:
+            locus_ids = LocusIdentifier.objects.filter(locus=id)
         data = {}
         for id in locus_ids:
             data[id.source.name] = id.identifier
@@ -44,9 +47,14 @@ class LocusSerializer(serializers.ModelSerializer):
         Returns the locus synonyms.
         The locus synonym can be an old gene symbol.
         """
-        attrib_type_obj = AttribType.objects.filter(code="gene_synonym")
+        prefetched_synonyms = getattr(id, "prefetched_synonyms", None)
+        if prefetched_synonyms is not None:
+            locus_attribs = [locus_attrib.value for locus_attrib in prefetched_synonyms]
+            return locus_attribs if locus_attribs else None
+
+        attrib_type_obj = vocabulary.get_attrib_type("gene_synonym")
         locus_attribs = LocusAttrib.objects.filter(
-            locus=id, attrib_type=attrib_type_obj.first().id, is_deleted=0
+            locus=id, attrib_type=attrib_type_obj.id, is_deleted=0
         ).values_list("value", flat=True)
 
         return locus_attribs if locus_attribs else None
@@ -100,155 +108,29 @@ class LocusGeneSerializer(LocusSerializer):
         If the user is non-authenticated:
             - only returns records linked to visible panels
         """
-        if user.is_authenticated:
-            lgd_select = (
-                LocusGenotypeDisease.objects.filter(
-                    locus=self.id,
-                    is_deleted=0,
-                    lgdpanel__is_deleted=0,
-                )
-                .annotate(
-                    active_variant_consequence=FilteredRelation(
-                        "lgdvariantgenccconsequence",
-                        condition=Q(lgdvariantgenccconsequence__is_deleted=0),
-                    ),
-                    active_variant_type=FilteredRelation(
-                        "lgdvarianttype",
-                        condition=Q(lgdvarianttype__is_deleted=0),
-                    ),
-                )
-                .select_related("disease", "genotype", "confidence", "mechanism")
-                .prefetch_related(
-                    "lgd_panel",
-                    "panel",
-                    "lgd_variant_gencc_consequence",
-                    "lgd_variant_type",
-                )
-                .order_by("-date_review")
-            )
-
-        else:
-            lgd_select = (
-                LocusGenotypeDisease.objects.filter(
-                    locus=self.id,
-                    is_deleted=0,
-                    lgdpanel__is_deleted=0,
-                    lgdpanel__panel__is_visible=1,
-                )
-                .annotate(
-                    active_variant_consequence=FilteredRelation(
-                        "lgdvariantgenccconsequence",
-                        condition=Q(lgdvariantgenccconsequence__is_deleted=0),
-                    ),
-                    active_variant_type=FilteredRelation(
-                        "lgdvarianttype",
-                        condition=Q(lgdvarianttype__is_deleted=0),
-                    ),
-                )
-                .select_related("disease", "genotype", "confidence", "mechanism")
-                .prefetch_related(
-                    "lgd_panel",
-                    "panel",
-                    "lgd_variant_gencc_consequence",
-                    "lgd_variant_type",
-                )
-                .order_by("-date_review")
-            )
-
-        lgd_objects_list = list(
-            lgd_select.values(
-                "disease__name",
-                "lgdpanel__panel__name",
-                "stable_id__stable_id",
-                "genotype__value",
-                "confidence__value",
-                "active_variant_consequence__variant_consequence__term",
-                "active_variant_type__variant_type_ot__term",
-                "mechanism__value",
-                "date_review",
-            )
+        # The panel filters are applied to the same panel (one filter call)
+        panel_filter = {"lgdpanel__is_deleted": 0}
+        if not user.is_authenticated:
+            panel_filter["lgdpanel__panel__is_visible"] = 1
+        lgd_select = LocusGenotypeDisease.objects.filter(
+            locus=self.id, is_deleted=0, **panel_filter
         )
 
-        aggregated_data = {}
-        for lgd_obj in lgd_objects_list:
-            if lgd_obj["stable_id__stable_id"] not in aggregated_data.keys():
-                variant_consequences = []
-                variant_types = []
-                panels = []
-
-                panels.append(lgd_obj["lgdpanel__panel__name"])
-                if (
-                    lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    is not None
-                ):
-                    variant_consequences.append(
-                        lgd_obj[
-                            "active_variant_consequence__variant_consequence__term"
-                        ]
-                    )
-                if lgd_obj["active_variant_type__variant_type_ot__term"] is not None:
-                    variant_types.append(
-                        lgd_obj["active_variant_type__variant_type_ot__term"]
-                    )
-
-                date_review = None
-                if lgd_obj["date_review"] is not None:
-                    date_review = lgd_obj["date_review"].strftime("%Y-%m-%d")
-
-                aggregated_data[lgd_obj["stable_id__stable_id"]] = {
-                    "disease": lgd_obj["disease__name"],
-                    "genotype": lgd_obj["genotype__value"],
-                    "confidence": lgd_obj["confidence__value"],
-                    "panels": panels,
-                    "variant_consequence": variant_consequences,
-                    "variant_type": variant_types,
-                    "molecular_mechanism": lgd_obj["mechanism__value"],
-                    "last_updated": date_review,
-                    "stable_id": lgd_obj["stable_id__stable_id"],
-                }
-
-            else:
-                if (
-                    lgd_obj["lgdpanel__panel__name"]
-                    not in aggregated_data[lgd_obj["stable_id__stable_id"]]["panels"]
-                ):
-                    aggregated_data[lgd_obj["stable_id__stable_id"]]["panels"].append(
-                        lgd_obj["lgdpanel__panel__name"]
-                    )
-                if (
-                    lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    not in aggregated_data[lgd_obj["stable_id__stable_id"]][
-                        "variant_consequence"
-                    ]
-                    and lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    is not None
-                ):
-                    aggregated_data[lgd_obj["stable_id__stable_id"]][
-                        "variant_consequence"
-                    ].append(
-                        lgd_obj[
-                            "active_variant_consequence__variant_consequence__term"
-                        ]
-                    )
-                if (
-                    lgd_obj["active_variant_type__variant_type_ot__term"]
-                    not in aggregated_data[lgd_obj["stable_id__stable_id"]][
-                        "variant_type"
-                    ]
-                    and lgd_obj["active_variant_type__variant_type_ot__term"]
-                    is not None
-                ):
-                    aggregated_data[lgd_obj["stable_id__stable_id"]][
-                        "variant_type"
-                    ].append(lgd_obj["active_variant_type__variant_type_ot__term"])
-
-        return aggregated_data.values()
+        return get_records_summary(
+            lgd_select,
+            [
+                "disease",
+                "genotype",
+                "confidence",
+                "panels",
+                "variant_consequence",
+                "variant_type",
+                "molecular_mechanism",
+                "last_updated",
+                "stable_id",
+            ],
+            visible_panels_only=not user.is_authenticated,
+        )
 
     def function(self):
         """
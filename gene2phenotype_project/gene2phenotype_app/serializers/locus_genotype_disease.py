@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.db import IntegrityError, transaction
-from django.db.models import Prefetch, F
+from django.db.models import Prefetch, OuterRef, Subquery
 from django.conf import settings
 from typing import Any, Optional
 from datetime import date
@@ -29,6 +29,12 @@ from ..models import (
     LGDPhenotypeSummary,
     LGDVariantTypeDescription,
     LGDMolecularMechanismSynopsis,
+    LGDPublicationComment,
+    LocusIdentifier,
+    LocusAttrib,
+    DiseaseOntologyTerm,
+    DiseaseSynonym,
+    LGDRecordSummary,
 )
 
 from .publication import LGDPublicationSerializer
@@ -38,8 +44,10 @@ from .disease import DiseaseSerializer
 from .panel import LGDPanelSerializer
 
 from ..utils import (
+    vocabulary,
     ConfidenceCustomMail,
     get_date_now,
+    get_upsert_options,
     validate_mechanism_synopsis,
     validate_confidence_publications,
     article_for_phrase,
@@ -72,11 +80,16 @@ def build_lgd_summary(lgd_obj: LocusGenotypeDisease) -> Optional[str]:
 
     sentences = []
 
+    # Use the data prefetched by LocusGenotypeDiseaseSerializer.prefetch_queryset() if available
+    lgd_publications = getattr(lgd_obj, "prefetched_publications", None)
+    if lgd_publications is None:
+        lgd_publications = LGDPublication.objects.filter(
+            lgd_id=lgd_obj, is_deleted=0
+        ).select_related("publication")
+
     # Count the number of curated publications only for this record to include in the summary
     curated_pmids = set()
-    for row in LGDPublication.objects.filter(
-        lgd_id=lgd_obj, is_deleted=0
-    ).select_related("publication"):
+    for row in lgd_publications:
         pmid = getattr(getattr(row, "publication", None), "pmid", None)
         if pmid is not None:
             curated_pmids.add(pmid)
@@ -89,10 +102,14 @@ def build_lgd_summary(lgd_obj: LocusGenotypeDisease) -> Optional[str]:
         )
 
     # Variant consequences grouped by support value
+    variant_consequences = getattr(lgd_obj, "prefetched_variant_consequences", None)
+    if variant_consequences is None:
+        variant_consequences = LGDVariantGenccConsequence.objects.filter(
+            lgd_id=lgd_obj, is_deleted=0
+        ).select_related("variant_consequence", "support")
+
     variant_support_to_terms = []
-    for row in LGDVariantGenccConsequence.objects.filter(
-        lgd_id=lgd_obj, is_deleted=0
-    ).select_related("variant_consequence", "support"):
+    for row in variant_consequences:
         term = clean_summary_text(
             getattr(getattr(row, "variant_consequence", None), "term", None)
         )
@@ -105,20 +122,28 @@ def build_lgd_summary(lgd_obj: LocusGenotypeDisease) -> Optional[str]:
         variant_phrase = join_with_and(variant_support_to_terms)
 
     # Variant types
+    lgd_variant_types = getattr(lgd_obj, "prefetched_variant_types", None)
+    if lgd_variant_types is None:
+        lgd_variant_types = LGDVariantType.objects.filter(
+            lgd_id=lgd_obj, is_deleted=0
+        ).select_related("variant_type_ot")
+
     variant_types = []
-    for row in LGDVariantType.objects.filter(
-        lgd_id=lgd_obj, is_deleted=0
-    ).select_related("variant_type_ot"):
+    for row in lgd_variant_types:
         variant_type_term = clean_summary_text(
             getattr(getattr(row, "variant_type_ot", None), "term", None)
         )
         if variant_type_term and variant_type_term not in variant_types:
             variant_types.append(variant_type_term)
 
+    lgd_ccms = getattr(lgd_obj, "prefetched_cross_cutting_modifiers", None)
+    if lgd_ccms is None:
+        lgd_ccms = LGDCrossCuttingModifier.objects.filter(
+            lgd_id=lgd_obj, is_deleted=0
+        ).select_related("ccm")
+
     cross_cutting_modifiers = []
-    for row in LGDCrossCuttingModifier.objects.filter(
-        lgd_id=lgd_obj, is_deleted=0
-    ).select_related("ccm"):
+    for row in lgd_ccms:
         ccm_value = clean_summary_text(
             getattr(getattr(row, "ccm", None), "value", None)
         )
@@ -145,21 +170,16 @@ def build_lgd_summary(lgd_obj: LocusGenotypeDisease) -> Optional[str]:
     if mechanism_value:
         if mechanism_support == "evidence":
             mechanism_evidence = []
-            mechanism_evidence_list = (
-                LGDMolecularMechanismEvidence.objects.filter(
-                    lgd_id=lgd_obj, is_deleted=0
-                )
-                .select_related("evidence")
-                .annotate(
-                    evidence_value=F("evidence__value"),
-                    evidence_type=F("evidence__subtype"),
-                )
+            mechanism_evidence_list = getattr(
+                lgd_obj, "prefetched_mechanism_evidence", None
             )
+            if mechanism_evidence_list is None:
+                mechanism_evidence_list = LGDMolecularMechanismEvidence.objects.filter(
+                    lgd_id=lgd_obj, is_deleted=0
+                ).select_related("evidence")
 
             for value in mechanism_evidence_list:
-                new_value = (
-                    f"{value.evidence_value} {value.evidence_type.replace('_', ' ')}"
-                )
+                new_value = f"{value.evidence.value} {value.evidence.subtype.replace('_', ' ')}"
                 if new_value not in mechanism_evidence:
                     mechanism_evidence.append(new_value)
 
@@ -181,6 +201,128 @@ def build_lgd_summary(lgd_obj: LocusGenotypeDisease) -> Optional[str]:
     return " ".join(sentences)
 
 
+def get_lgd_summary(lgd_obj: LocusGenotypeDisease) -> Optional[str]:
+    """
+    Returns the stored summary of the LGMDE record (table lgd_record_summary).
+    If the summary is not stored or it is out of date, the summary is generated.
+    """
+    try:
+        record_summary = lgd_obj.record_summary
+    except LGDRecordSummary.DoesNotExist:
+        record_summary = None
+
+    if record_summary is None or record_summary.is_stale:
+        return build_lgd_summary(lgd_obj)
+
+    return record_summary.summary
+
+
+def prefetch_lgd_summary_data(queryset):
+    """
+    Prefetch the data used by build_lgd_summary() for a LocusGenotypeDisease queryset.
+    """
+    return queryset.select_related(
+        "locus",
+        "disease",
+        "genotype",
+        "confidence",
+        "mechanism",
+        "mechanism_support",
+    ).prefetch_related(
+        Prefetch(
+            "lgdpublication_set",
+            queryset=LGDPublication.objects.filter(is_deleted=0).select_related(
+                "publication"
+            ),
+            to_attr="prefetched_publications",
+        ),
+        Prefetch(
+            "lgdvariantgenccconsequence_set",
+            queryset=LGDVariantGenccConsequence.objects.filter(
+                is_deleted=0
+            ).select_related("variant_consequence", "support"),
+            to_attr="prefetched_variant_consequences",
+        ),
+        Prefetch(
+            "lgdvarianttype_set",
+            queryset=LGDVariantType.objects.filter(is_deleted=0).select_related(
+                "variant_type_ot"
+            ),
+            to_attr="prefetched_variant_types",
+        ),
+        Prefetch(
+            "lgdcrosscuttingmodifier_set",
+            queryset=LGDCrossCuttingModifier.objects.filter(
+                is_deleted=0
+            ).select_related("ccm"),
+            to_attr="prefetched_cross_cutting_modifiers",
+        ),
+        Prefetch(
+            "lgdmolecularmechanismevidence_set",
+            queryset=LGDMolecularMechanismEvidence.objects.filter(
+                is_deleted=0
+            ).select_related("evidence"),
+            to_attr="prefetched_mechanism_evidence",
+        ),
+    )
+
+
+def save_lgd_summaries(queryset, chunk_size: int = 500) -> int:
+    """
+    Generates the summary of the LGMDE records and saves it in the table lgd_record_summary.
+    The records are processed in chunks: the data of each chunk is prefetched
+    and the summaries are saved with a single query.
+
+    Args:
+        queryset: LocusGenotypeDisease queryset
+        chunk_size (int): number of records processed at a time
+
+    Returns the number of summaries saved
+    """
+    queryset = prefetch_lgd_summary_data(queryset).order_by("id")
+    count = 0
+    record_summaries = []
+
+    def save_chunk(record_summaries):
+        # Insert new summaries and update the existing ones
+        LGDRecordSummary.objects.bulk_create(
+            record_summaries,
+            **get_upsert_options(["lgd"], ["summary", "is_stale", "date_update"]),
+        )
+        return len(record_summaries)
+
+    for lgd_obj in queryset.iterator(chunk_size=chunk_size):
+        record_summaries.append(
+            LGDRecordSummary(
+                lgd=lgd_obj,
+                summary=build_lgd_summary(lgd_obj),
+                is_stale=False,
+                date_update=get_date_now(),
+            )
+        )
+        if len(record_summaries) == chunk_size:
+            count += save_chunk(record_summaries)
+            record_summaries = []
+
+    if record_summaries:
+        count += save_chunk(record_summaries)
+
+    return count
+
+
+def refresh_lgd_summaries(lgd_ids: list[int]) -> int:
+    """
+    Generates the summaries of the LGMDE records that are out of date or missing.
+    Called after the data used in the summary is updated (see signals.py).
+
+    Returns the number of summaries saved
+    """
+    queryset = LocusGenotypeDisease.objects.filter(id__in=lgd_ids).exclude(
+        record_summary__is_stale=False
+    )
+    return save_lgd_summaries(queryset)
+
+
 class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
     """
     Serializer for the LocusGenotypeDisease model.
@@ -212,12 +354,196 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
     comments = serializers.SerializerMethodField(allow_null=True)
     is_reviewed = serializers.SerializerMethodField()
 
+    @staticmethod
+    def prefetch_queryset(queryset):
+        """
+        Prefetch plan for the LGD records.
+        Loads all the data used by the serializer in a fixed number of queries,
+        independent of the number of records and of the data linked to them.
+        Deleted data (is_deleted=1) is not loaded.
+
+        The data is prefetched for all users: the methods filter the private
+        data (comments, non visible panels) for non authenticated users.
+        The methods that cannot find the prefetched data query the database.
+
+        Args:
+            queryset: LocusGenotypeDisease queryset
+
+        Returns the queryset with the prefetch plan
+        """
+        date_created = (
+            LocusGenotypeDisease.history.filter(id=OuterRef("id"), history_type="+")
+            .order_by("history_date")
+            .values("history_date")[:1]
+        )
+
+        return (
+            queryset.select_related(
+                "stable_id",
+                "record_summary",
+                "locus__sequence__reference",
+                "disease",
+                "genotype",
+                "confidence",
+                "mechanism",
+                "mechanism_support",
+            )
+            .annotate(prefetched_date_created=Subquery(date_created))
+            .prefetch_related(
+                Prefetch(
+                    "locus__locusidentifier_set",
+                    queryset=LocusIdentifier.objects.select_related("source"),
+                    to_attr="prefetched_ids",
+                ),
+                Prefetch(
+                    "locus__locusattrib_set",
+                    queryset=LocusAttrib.objects.filter(
+                        attrib_type__code="gene_synonym", is_deleted=0
+                    ),
+                    to_attr="prefetched_synonyms",
+                ),
+                Prefetch(
+                    "disease__diseaseontologyterm_set",
+                    queryset=DiseaseOntologyTerm.objects.select_related(
+                        "ontology_term__source"
+                    ),
+                    to_attr="prefetched_ontology_terms",
+                ),
+                Prefetch(
+                    "disease__diseasesynonym_set",
+                    queryset=DiseaseSynonym.objects.all(),
+                    to_attr="prefetched_synonyms",
+                ),
+                Prefetch(
+                    "lgdvariantgenccconsequence_set",
+                    queryset=LGDVariantGenccConsequence.objects.filter(
+                        is_deleted=0
+                    ).select_related("variant_consequence", "support"),
+                    to_attr="prefetched_variant_consequences",
+                ),
+                Prefetch(
+                    "lgdmolecularmechanismsynopsis_set",
+                    queryset=LGDMolecularMechanismSynopsis.objects.filter(
+                        is_deleted=0
+                    ).select_related("synopsis", "synopsis_support"),
+                    to_attr="prefetched_mechanism_synopsis",
+                ),
+                Prefetch(
+                    "lgdmolecularmechanismevidence_set",
+                    queryset=LGDMolecularMechanismEvidence.objects.filter(
+                        is_deleted=0
+                    ).select_related("evidence", "publication"),
+                    to_attr="prefetched_mechanism_evidence",
+                ),
+                Prefetch(
+                    "lgdcrosscuttingmodifier_set",
+                    queryset=LGDCrossCuttingModifier.objects.filter(
+                        is_deleted=0
+                    ).select_related("ccm"),
+                    to_attr="prefetched_cross_cutting_modifiers",
+                ),
+                Prefetch(
+                    "lgdpublication_set",
+                    queryset=LGDPublication.objects.filter(is_deleted=0)
+                    .select_related("publication", "consanguinity")
+                    .prefetch_related(
+                        Prefetch(
+                            "lgdpublicationcomment_set",
+                            queryset=LGDPublicationComment.objects.filter(
+                                is_deleted=0
+                            ).select_related("user"),
+                            to_attr="prefetched_comments",
+                        )
+                    ),
+                    to_attr="prefetched_publications",
+                ),
+                Prefetch(
+                    "lgdminedpublication_set",
+                    queryset=LGDMinedPublication.objects.select_related(
+                        "mined_publication"
+                    ).order_by("-mined_publication__year", "-mined_publication__pmid"),
+                    to_attr="prefetched_mined_publications",
+                ),
+                Prefetch(
+                    "lgdphenotype_set",
+                    queryset=LGDPhenotype.objects.filter(is_deleted=0).select_related(
+                        "phenotype", "publication"
+                    ),
+                    to_attr="prefetched_phenotypes",
+                ),
+                Prefetch(
+                    "lgdphenotypesummary_set",
+                    queryset=LGDPhenotypeSummary.objects.filter(
+                        is_deleted=0
+                    ).select_related("publication"),
+                    to_attr="prefetched_phenotype_summary",
+                ),
+                Prefetch(
+                    "lgdvarianttype_set",
+                    queryset=LGDVariantType.objects.filter(is_deleted=0)
+                    .select_related("variant_type_ot")
+                    .prefetch_related(
+                        Prefetch(
+                            "publications",
+                            queryset=LGDVariantTypePublication.objects.filter(
+                                is_deleted=0
+                            ).select_related("publication"),
+                            to_attr="current_publications",
+                        ),
+                        Prefetch(
+                            "lgdvarianttypecomment_set",
+                            queryset=LGDVariantTypeComment.objects.filter(
+                                is_deleted=0
+                            ),
+                            to_attr="current_comments",
+                        ),
+                    ),
+                    to_attr="prefetched_variant_types",
+                ),
+                Prefetch(
+                    "lgdvarianttypedescription_set",
+                    queryset=LGDVariantTypeDescription.objects.filter(
+                        is_deleted=0
+                    ).select_related("publication"),
+                    to_attr="prefetched_variant_descriptions",
+                ),
+                Prefetch(
+                    "lgdpanel_set",
+                    queryset=LGDPanel.objects.filter(is_deleted=0).select_related(
+                        "panel"
+                    ),
+                    to_attr="prefetched_panels",
+                ),
+                Prefetch(
+                    "lgdcomment_set",
+                    queryset=LGDComment.objects.filter(is_deleted=0).select_related(
+                        "user"
+                    ),
+                    to_attr="prefetched_comments",
+                ),
+            )
+        )
+
+    def is_authenticated_user(self) -> bool:
+        """
+        Returns True if the user in the context is a valid user.
+        The result is saved to avoid querying the user table for each field.
+        """
+        if not hasattr(self, "_authenticated_user"):
+            user = self.context.get("user")
+            if user is None or not getattr(user, "is_authenticated", True):
+                self._authenticated_user = False
+            else:
+                self._authenticated_user = User.objects.filter(email=user).exists()
+
+        return self._authenticated_user
+
     def get_summary(self, id: int) -> Optional[str]:
         """
         Summary of the LGMDE record.
         The summary is automatically generated using the record's data.
         """
-        return build_lgd_summary(id)
+        return get_lgd_summary(id)
 
     def get_locus(self, id: int) -> dict[str, Any]:
         """
@@ -247,7 +573,11 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         Variant consequences linked to the LGMDE record.
         This is the GenCC level of variant consequence: altered_gene_product_level, etc.
         """
-        queryset = LGDVariantGenccConsequence.objects.filter(lgd_id=id, is_deleted=0)
+        queryset = getattr(id, "prefetched_variant_consequences", None)
+        if queryset is None:
+            queryset = LGDVariantGenccConsequence.objects.filter(
+                lgd_id=id, is_deleted=0
+            )
         return LGDVariantGenCCConsequenceSerializer(queryset, many=True).data
 
     def get_molecular_mechanism(self, id: int) -> dict[str, Any]:
@@ -255,24 +585,24 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         Molecular mechanism associated with the LGMDE record.
         If available, also returns the evidence.
         """
-        user = self.context.get("user")
-        try:
-            User.objects.get(email=user)
-            authenticated_user = 1
-        except User.DoesNotExist:
-            authenticated_user = 0
+        authenticated_user = self.is_authenticated_user()
 
         mechanism = id.mechanism.value
         mechanism_support = id.mechanism_support.value
         mechanism_synopsis = []
         mechanism_evidence = {}
 
-        queryset_synopsis = LGDMolecularMechanismSynopsis.objects.filter(
-            lgd_id=id, is_deleted=0
-        ).prefetch_related()
-        queryset_evidence = LGDMolecularMechanismEvidence.objects.filter(
-            lgd_id=id, is_deleted=0
-        ).prefetch_related()
+        queryset_synopsis = getattr(id, "prefetched_mechanism_synopsis", None)
+        if queryset_synopsis is None:
+            queryset_synopsis = LGDMolecularMechanismSynopsis.objects.filter(
+                lgd_id=id, is_deleted=0
+            ).prefetch_related()
+
+        queryset_evidence = getattr(id, "prefetched_mechanism_evidence", None)
+        if queryset_evidence is None:
+            queryset_evidence = LGDMolecularMechanismEvidence.objects.filter(
+                lgd_id=id, is_deleted=0
+            ).prefetch_related()
 
         for synopsis_data in queryset_synopsis:
             mechanism_synopsis.append(
@@ -333,14 +663,18 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         """
         Cross cutting modifier terms associated with the LGMDE record.
         """
-        queryset = LGDCrossCuttingModifier.objects.filter(lgd_id=id, is_deleted=0)
+        queryset = getattr(id, "prefetched_cross_cutting_modifiers", None)
+        if queryset is None:
+            queryset = LGDCrossCuttingModifier.objects.filter(lgd_id=id, is_deleted=0)
         return LGDCrossCuttingModifierSerializer(queryset, many=True).data
 
     def get_publications(self, id: int) -> list[dict[str, dict[str, Any]]]:
         """
         Publications associated with the LGMDE record.
         """
-        queryset = LGDPublication.objects.filter(lgd_id=id, is_deleted=0)
+        queryset = getattr(id, "prefetched_publications", None)
+        if queryset is None:
+            queryset = LGDPublication.objects.filter(lgd_id=id, is_deleted=0)
         # It is necessary to send the user to return public/private comments
         return LGDPublicationSerializer(
             queryset, context={"user": self.context.get("user")}, many=True
@@ -355,11 +689,13 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         2. "curated" - extracted publication which was curated
         3. "rejected" - extracted publication which was rejected by curators
         """
-        queryset = (
-            LGDMinedPublication.objects.filter(lgd_id=id)
-            .select_related("mined_publication")
-            .order_by("-mined_publication__year", "-mined_publication__pmid")
-        )
+        queryset = getattr(id, "prefetched_mined_publications", None)
+        if queryset is None:
+            queryset = (
+                LGDMinedPublication.objects.filter(lgd_id=id)
+                .select_related("mined_publication")
+                .order_by("-mined_publication__year", "-mined_publication__pmid")
+            )
 
         return LGDMinedPublicationSerializer(
             queryset, many=True, context={"user": self.context.get("user")}
@@ -370,9 +706,11 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         Phenotypes associated with the LGMDE record.
         The response includes the list of publications associated with the phenotype.
         """
-        queryset = LGDPhenotype.objects.filter(
-            lgd_id=id, is_deleted=0
-        ).prefetch_related()
+        queryset = getattr(id, "prefetched_phenotypes", None)
+        if queryset is None:
+            queryset = LGDPhenotype.objects.filter(
+                lgd_id=id, is_deleted=0
+            ).prefetch_related()
         data = {}
 
         for lgd_phenotype in queryset:
@@ -401,9 +739,11 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         """
         # The LGD record is supposed to have one summary
         # but one summary can be linked to several publications
-        queryset = LGDPhenotypeSummary.objects.filter(
-            lgd_id=id, is_deleted=0
-        ).prefetch_related()
+        queryset = getattr(id, "prefetched_phenotype_summary", None)
+        if queryset is None:
+            queryset = LGDPhenotypeSummary.objects.filter(
+                lgd_id=id, is_deleted=0
+            ).prefetch_related()
         data = {}
 
         for summary_obj in queryset:
@@ -424,37 +764,34 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         includes the list of publications associated with the variant type.
         """
         # Check if user is authenticated
-        user = self.context.get("user")
-        try:
-            User.objects.get(email=user)
-            authenticated_user = 1
-        except User.DoesNotExist:
-            authenticated_user = 0
-
-        queryset = LGDVariantType.objects.filter(
-            lgd_id=id, is_deleted=0
-        ).prefetch_related(
-            Prefetch(
-                "publications",
-                queryset=LGDVariantTypePublication.objects.filter(
-                    is_deleted=0
-                ).select_related("publication"),
-                to_attr="current_publications",
-            )
-        )
+        authenticated_user = self.is_authenticated_user()
 
-        if authenticated_user == 1:
-            # Authenticated users have access to comments
-            queryset = queryset.prefetch_related(
+        queryset = getattr(id, "prefetched_variant_types", None)
+        if queryset is None:
+            queryset = LGDVariantType.objects.filter(
+                lgd_id=id, is_deleted=0
+            ).prefetch_related(
                 Prefetch(
-                    "lgdvarianttypecomment_set",
-                    queryset=LGDVariantTypeComment.objects.filter(
+                    "publications",
+                    queryset=LGDVariantTypePublication.objects.filter(
                         is_deleted=0
-                    ),  # skip deleted comments
-                    to_attr="current_comments",  # prefetched comments are saved under 'current_comments'
+                    ).select_related("publication"),
+                    to_attr="current_publications",
                 )
             )
 
+            if authenticated_user == 1:
+                # Authenticated users have access to comments
+                queryset = queryset.prefetch_related(
+                    Prefetch(
+                        "lgdvarianttypecomment_set",
+                        queryset=LGDVariantTypeComment.objects.filter(
+                            is_deleted=0
+                        ),  # skip deleted comments
+                        to_attr="current_comments",  # prefetched comments are saved under 'current_comments'
+                    )
+                )
+
         data = {}
 
         for lgd_variant in queryset:
@@ -463,9 +800,11 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
 
             # Prepare the list of comments (a variant type has a single set of
             # comments, since it is unique per lgd+variant type)
-            comments = getattr(
-                lgd_variant, "current_comments", []
-            )  # Get the prefetched comments
+            # Get the prefetched comments
+            # The prefetch plan loads the comments for all users
+            comments = []
+            if authenticated_user == 1:
+                comments = getattr(lgd_variant, "current_comments", [])
             seen_comment_ids = set()
             variant_type_comments = []
             for comment_obj in comments:
@@ -503,9 +842,11 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         Variant HGVS description linked to the LGMDE record and publication(s).
         The response includes a list of publications associated with the HGVS description.
         """
-        queryset = LGDVariantTypeDescription.objects.filter(
-            lgd_id=id, is_deleted=0
-        ).prefetch_related()
+        queryset = getattr(id, "prefetched_variant_descriptions", None)
+        if queryset is None:
+            queryset = LGDVariantTypeDescription.objects.filter(
+                lgd_id=id, is_deleted=0
+            ).prefetch_related()
         data = {}
 
         for lgd_variant in queryset:
@@ -529,16 +870,18 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         Panel(s) associated with the LGMDE record.
         """
         # Check if user is authenticated
-        user = self.context.get("user")
-        try:
-            User.objects.get(email=user)
-            authenticated_user = 1
-        except User.DoesNotExist:
-            authenticated_user = 0
+        authenticated_user = self.is_authenticated_user()
 
         # If user is autenticated return all panels
         # otherwise return only the visible panels
-        if authenticated_user:
+        prefetched_panels = getattr(id, "prefetched_panels", None)
+        if prefetched_panels is not None:
+            queryset = [
+                lgd_panel
+                for lgd_panel in prefetched_panels
+                if authenticated_user or lgd_panel.panel.is_visible == 1
+            ]
+        elif authenticated_user:
             queryset = LGDPanel.objects.filter(lgd_id=id, is_deleted=0)
         else:
             queryset = LGDPanel.objects.filter(
@@ -554,16 +897,18 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         seen by curators.
         """
         # Check if user is authenticated
-        user = self.context.get("user")
-        try:
-            User.objects.get(email=user)
-            authenticated_user = 1
-        except User.DoesNotExist:
-            authenticated_user = 0
+        authenticated_user = self.is_authenticated_user()
 
         # If user is authenticated return all comments
         # otherwise return only the public comments
-        if authenticated_user == 1:
+        prefetched_comments = getattr(id, "prefetched_comments", None)
+        if prefetched_comments is not None:
+            lgd_comments = [
+                comment
+                for comment in prefetched_comments
+                if authenticated_user == 1 or comment.is_public == 1
+            ]
+        elif authenticated_user == 1:
             lgd_comments = LGDComment.objects.filter(
                 lgd_id=id, is_deleted=0
             ).prefetch_related()
@@ -612,7 +957,14 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
         Note: entries that were migrated from the old db don't have the date when they were created.
         """
         date = None
-        lgd_obj = self.instance
+        lgd_obj = id
+
+        # Date prefetched by prefetch_queryset()
+        if hasattr(lgd_obj, "prefetched_date_created"):
+            if lgd_obj.prefetched_date_created is not None:
+                date = lgd_obj.prefetched_date_created.date()
+            return date
+
         insertion_history_type = "+"
         history_records = (
             lgd_obj.history.all()
@@ -687,7 +1039,7 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
 
             # Get genotype
             try:
-                genotype_obj = Attrib.objects.get(value=genotype, type__code="genotype")
+                genotype_obj = vocabulary.get_attrib("genotype", genotype)
             except Attrib.DoesNotExist:
                 raise serializers.ValidationError(
                     {"error": f"Invalid genotype value {genotype}"}
@@ -695,8 +1047,8 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
 
             # Get confidence
             try:
-                confidence_obj = Attrib.objects.get(
-                    value=confidence, type__code="confidence_category"
+                confidence_obj = vocabulary.get_attrib(
+                    "confidence_category", confidence
                 )
             except Attrib.DoesNotExist:
                 raise serializers.ValidationError(
@@ -828,9 +1180,7 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
 
         # Get confidence
         try:
-            confidence_obj = Attrib.objects.get(
-                value=confidence, type__code="confidence_category"
-            )
+            confidence_obj = vocabulary.get_attrib("confidence_category", confidence)
         except Attrib.DoesNotExist:
             raise serializers.ValidationError(
                 {"error": f"Invalid confidence value {confidence}"}
@@ -919,8 +1269,8 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
             molecular_mechanism_value = molecular_mechanism["name"]
 
             try:
-                cv_mechanism_obj = CVMolecularMechanism.objects.get(
-                    value=molecular_mechanism_value, type="mechanism"
+                cv_mechanism_obj = vocabulary.get_mechanism(
+                    "mechanism", molecular_mechanism_value
                 )
             except CVMolecularMechanism.DoesNotExist:
                 raise serializers.ValidationError(
@@ -939,8 +1289,8 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
             ]  # the mechanism support (inferred/evidence)
 
             try:
-                cv_support_obj = CVMolecularMechanism.objects.get(
-                    value=molecular_mechanism_support, type="support"
+                cv_support_obj = vocabulary.get_mechanism(
+                    "support", molecular_mechanism_support
                 )
             except CVMolecularMechanism.DoesNotExist:
                 raise serializers.ValidationError(
@@ -970,8 +1320,8 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
                 cv_synopsis_support_obj = None
 
                 try:
-                    cv_synopsis_obj = CVMolecularMechanism.objects.get(
-                        value=mechanism_synopsis_value, type="mechanism_synopsis"
+                    cv_synopsis_obj = vocabulary.get_mechanism(
+                        "mechanism_synopsis", mechanism_synopsis_value
                     )
                 except CVMolecularMechanism.DoesNotExist:
                     raise serializers.ValidationError(
@@ -981,8 +1331,8 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
                     )
 
                 try:
-                    cv_synopsis_support_obj = CVMolecularMechanism.objects.get(
-                        value=mechanism_synopsis_support, type="support"
+                    cv_synopsis_support_obj = vocabulary.get_mechanism(
+                        "support", mechanism_synopsis_support
                     )
                 except CVMolecularMechanism.DoesNotExist:
                     raise serializers.ValidationError(
@@ -1081,8 +1431,8 @@ class LocusGenotypeDiseaseSerializer(serializers.ModelSerializer):
                 secondary_type = evidence_type["secondary_type"]
                 for m_type in secondary_type:
                     try:
-                        cv_evidence_obj = CVMolecularMechanism.objects.get(
-                            value=m_type.lower(), type="evidence", subtype=primary_type
+                        cv_evidence_obj = vocabulary.get_mechanism(
+                            "evidence", m_type.lower(), subtype=primary_type
                         )
                     except CVMolecularMechanism.DoesNotExist:
                         raise serializers.ValidationError(
@@ -1251,7 +1601,7 @@ class LGDVariantGenCCConsequenceSerializer(serializers.ModelSerializer):
         # Get support value from attrib
         # Values: evidence or inferred
         try:
-            support_obj = Attrib.objects.get(value=support, type__code="support")
+            support_obj = vocabulary.get_attrib("support", support)
         except Attrib.DoesNotExist:
             raise serializers.ValidationError(
                 {"error": f"Invalid support value '{support}'"}
@@ -1315,8 +1665,8 @@ class LGDMechanismSynopsisSerializer(serializers.ModelSerializer):
 
         # Get mechanism synopsis value from controlled vocabulary table for molecular mechanism
         try:
-            data["synopsis"]["value"] = CVMolecularMechanism.objects.get(
-                value=synopsis_name, type="mechanism_synopsis"
+            data["synopsis"]["value"] = vocabulary.get_mechanism(
+                "mechanism_synopsis", synopsis_name
             )
         except CVMolecularMechanism.DoesNotExist:
             raise serializers.ValidationError(
@@ -1325,8 +1675,8 @@ class LGDMechanismSynopsisSerializer(serializers.ModelSerializer):
 
         # Get mechanism synopsis support from controlled vocabulary table for molecular mechanism
         try:
-            data["synopsis_support"]["value"] = CVMolecularMechanism.objects.get(
-                value=synopsis_support, type="support"
+            data["synopsis_support"]["value"] = vocabulary.get_mechanism(
+                "support", synopsis_support
             )
         except CVMolecularMechanism.DoesNotExist:
             raise serializers.ValidationError(
@@ -1402,8 +1752,8 @@ class LGDMechanismEvidenceSerializer(serializers.ModelSerializer):
         for evidence_value in secondary_type:
             # Get mechanism evidence value from the mechanism controlled vocabulary table
             try:
-                evidence_obj = CVMolecularMechanism.objects.get(
-                    value=evidence_value.lower(), type="evidence", subtype=primary_type
+                evidence_obj = vocabulary.get_mechanism(
+                    "evidence", evidence_value.lower(), subtype=primary_type
                 )
             except CVMolecularMechanism.DoesNotExist:
                 raise serializers.ValidationError(
@@ -1455,9 +1805,7 @@ class LGDCrossCuttingModifierSerializer(serializers.ModelSerializer):
 
         # Get cross cutting modifier from attrib
         try:
-            ccm_obj = Attrib.objects.get(
-                value=term, type__code="cross_cutting_modifier"
-            )
+            ccm_obj = vocabulary.get_attrib("cross_cutting_modifier", term)
         except Attrib.DoesNotExist:
             raise serializers.ValidationError(
                 {"error": f"Invalid cross cutting modifier '{term}'"}
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from django.db import IntegrityError
-from django.db.models import Q, FilteredRelation
+from django.db.models import Q, Count, Max
 from typing import Optional
 from datetime import date
 
-from ..models import Panel, LGDPanel, Attrib
+from ..models import Panel, PanelStats, LGDPanel, DataVersion, LocusGenotypeDisease
+from ..utils import get_date_now, get_upsert_options
+from .records_summary import get_records_summary
 
 
 class PanelCreateSerializer(serializers.ModelSerializer):
@@ -121,8 +123,123 @@ class PanelDetailSerializer(serializers.ModelSerializer):
 
         return panel_last_update.date() if panel_last_update else None
 
-    # Calculates the stats on the fly
-    # Returns a JSON object
+    @staticmethod
+    def calculate_all_stats(panel_ids: Optional[list[int]] = None) -> dict[int, dict]:
+        """
+        Calculates the stats for all panels in the database, or only for the
+        panels in panel_ids.
+        The stats are aggregated in the database with two queries:
+            - total number of records, genes and date of the last update by panel
+            - total number of records by panel and confidence
+
+        Returns a dictionary with the stats by panel id.
+        Panels without records are not included.
+        """
+        lgd_panels = LGDPanel.objects.filter(is_deleted=0, lgd__is_deleted=0).order_by()
+        if panel_ids is not None:
+            lgd_panels = lgd_panels.filter(panel_id__in=panel_ids)
+
+        all_stats = {}
+        for row in lgd_panels.values("panel_id").annotate(
+            total_records=Count("id"),
+            total_genes=Count(
+                "lgd__locus__name",
+                distinct=True,
+                filter=Q(lgd__locus__type__value="gene"),
+            ),
+            last_updated=Max("lgd__date_review"),
+        ):
+            all_stats[row["panel_id"]] = {
+                "total_records": row["total_records"],
+                "total_genes": row["total_genes"],
+                "by_confidence": {},
+                "last_updated": row["last_updated"].date()
+                if row["last_updated"]
+                else None,
+            }
+
+        for row in (
+            lgd_panels.values("panel_id", "lgd__confidence__value")
+            .annotate(total=Count("id"))
+            .order_by("panel_id", "lgd__confidence__value")
+        ):
+            all_stats[row["panel_id"]]["by_confidence"][
+                row["lgd__confidence__value"]
+            ] = row["total"]
+
+        return all_stats
+
+    @staticmethod
+    def get_panels_stats(panels: list[Panel]) -> dict[int, PanelStats]:
+        """
+        Returns the stats of the panels stored in the table panel_stats.
+        The stats of the panels are deleted when their records are updated (see
+        invalidate_panel_stats), the missing stats are calculated and saved again.
+        Stats calculated for a previous version of the records of the panel
+        (ex: saved while the records were being updated) are also calculated again.
+
+        Use Panel.objects.select_related("stats") to fetch the panels with their stats.
+
+        Returns a dictionary with the PanelStats by panel id.
+        """
+        # The versions are fetched before the stats are calculated, the stats
+        # saved while the records are being updated have the previous version
+        data_versions = DataVersion.get_versions(
+            [DataVersion.get_panel_key(panel.id) for panel in panels]
+        )
+
+        panels_stats = {}
+        missing_panel_ids = []
+        for panel in panels:
+            data_version = data_versions[DataVersion.get_panel_key(panel.id)]
+            try:
+                panel_stats = panel.stats
+            except PanelStats.DoesNotExist:
+                panel_stats = None
+
+            if panel_stats is not None and panel_stats.data_version == data_version:
+                panels_stats[panel.id] = panel_stats
+            else:
+                missing_panel_ids.append(panel.id)
+
+        if not missing_panel_ids:
+            return panels_stats
+
+        all_stats = PanelDetailSerializer.calculate_all_stats(missing_panel_ids)
+        empty_stats = {
+            "total_records": 0,
+            "total_genes": 0,
+            "by_confidence": {},
+            "last_updated": None,
+        }
+        missing_stats = [
+            PanelStats(
+                panel_id=panel_id,
+                data_version=data_versions[DataVersion.get_panel_key(panel_id)],
+                date_update=get_date_now(),
+                **all_stats.get(panel_id, empty_stats),
+            )
+            for panel_id in missing_panel_ids
+        ]
+        PanelStats.objects.bulk_create(
+            missing_stats,
+            **get_upsert_options(
+                ["panel"],
+                [
+                    "data_version",
+                    "total_records",
+                    "total_genes",
+                    "by_confidence",
+                    "last_updated",
+                    "date_update",
+                ],
+            ),
+        )
+        for panel_stats in missing_stats:
+            panels_stats[panel_stats.panel_id] = panel_stats
+
+        return panels_stats
+
     def calculate_stats(self, panel):
         """
         Returns stats for the panel:
@@ -130,26 +247,19 @@ class PanelDetailSerializer(serializers.ModelSerializer):
             - total number of genes associated with panel
             - total number of records by confidence
         """
-        lgd_panels = LGDPanel.objects.filter(
-            panel=panel.id, is_deleted=0, lgd__is_deleted=0
-        ).select_related()
+        panel_stats = self.get_panels_stats([panel])[panel.id]
 
-        genes = set()
-        confidences = {}
-        attrib_id = Attrib.objects.get(value="gene").id
-        for lgd_panel in lgd_panels:
-            if lgd_panel.lgd.locus.type.id == attrib_id:
-                genes.add(lgd_panel.lgd.locus.name)
-
-            try:
-                confidences[lgd_panel.lgd.confidence.value] += 1
-            except KeyError:
-                confidences[lgd_panel.lgd.confidence.value] = 1
+        return self.format_stats(panel_stats)
 
+    @staticmethod
+    def format_stats(panel_stats: PanelStats) -> dict:
+        """
+        Returns the panel stats in the format used by the panel endpoints.
+        """
         return {
-            "total_records": len(lgd_panels),
-            "total_genes": len(genes),
-            "by_confidence": confidences,
+            "total_records": panel_stats.total_records,
+            "total_genes": panel_stats.total_genes,
+            "by_confidence": panel_stats.by_confidence,
         }
 
     def records_summary(self, panel, user):
@@ -158,161 +268,28 @@ class PanelDetailSerializer(serializers.ModelSerializer):
         If the user is non-authenticated:
             - only returns records linked to visible panels
         """
-        if user.is_authenticated:
-            lgd_panels_selected = (
-                LGDPanel.objects.filter(
-                    panel=panel.id,
-                    is_deleted=0,
-                    lgd__is_deleted=0,
-                )
-                .annotate(
-                    active_variant_consequence=FilteredRelation(
-                        "lgd__lgdvariantgenccconsequence",
-                        condition=Q(lgd__lgdvariantgenccconsequence__is_deleted=0),
-                    ),
-                    active_variant_type=FilteredRelation(
-                        "lgd__lgdvarianttype",
-                        condition=Q(lgd__lgdvarianttype__is_deleted=0),
-                    ),
-                )
-                .select_related(
-                    "lgd",
-                    "lgd__locus",
-                    "lgd__disease",
-                    "lgd__genotype",
-                    "lgd__confidence",
-                    "lgd__mechanism",
-                )
-                .prefetch_related(
-                    "lgd__lgd_variant_gencc_consequence", "lgd__lgd_variant_type"
-                )
-                .order_by("-lgd__date_review")
-            )
-        else:
-            lgd_panels_selected = (
-                LGDPanel.objects.filter(
-                    panel=panel.id,
-                    is_deleted=0,
-                    lgd__is_deleted=0,
-                    panel__is_visible=1,
-                )
-                .annotate(
-                    active_variant_consequence=FilteredRelation(
-                        "lgd__lgdvariantgenccconsequence",
-                        condition=Q(lgd__lgdvariantgenccconsequence__is_deleted=0),
-                    ),
-                    active_variant_type=FilteredRelation(
-                        "lgd__lgdvarianttype",
-                        condition=Q(lgd__lgdvarianttype__is_deleted=0),
-                    ),
-                )
-                .select_related(
-                    "lgd",
-                    "lgd__locus",
-                    "lgd__disease",
-                    "lgd__genotype",
-                    "lgd__confidence",
-                    "lgd__mechanism",
-                )
-                .prefetch_related(
-                    "lgd__lgd_variant_gencc_consequence", "lgd__lgd_variant_type"
-                )
-                .order_by("-lgd__date_review")
-            )
-
-        lgd_objects_list = list(
-            lgd_panels_selected.values(
-                "lgd__locus__name",
-                "lgd__disease__name",
-                "lgd__genotype__value",
-                "lgd__confidence__value",
-                "active_variant_consequence__variant_consequence__term",
-                "active_variant_type__variant_type_ot__term",
-                "lgd__mechanism__value",
-                "lgd__date_review",
-                "lgd__stable_id__stable_id",
-            )
+        # The panel filters are applied to the same panel (one filter call)
+        panel_filter = {"lgdpanel__panel": panel.id, "lgdpanel__is_deleted": 0}
+        if not user.is_authenticated:
+            panel_filter["lgdpanel__panel__is_visible"] = 1
+        lgd_select = LocusGenotypeDisease.objects.filter(is_deleted=0, **panel_filter)
+
+        return get_records_summary(
+            lgd_select,
+            [
+                "locus",
+                "disease",
+                "genotype",
+                "confidence",
+                "variant_consequence",
+                "variant_type",
+                "molecular_mechanism",
+                "last_updated",
+                "stable_id",
+            ],
+            limit=10,
         )
 
-        aggregated_data = {}
-        number_keys = 0
-        for lgd_obj in lgd_objects_list:
-            # Return the last 10 records
-            if (
-                lgd_obj["lgd__stable_id__stable_id"] not in aggregated_data.keys()
-                and number_keys < 10
-            ):
-                variant_consequences = []
-                variant_types = []
-
-                if (
-                    lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    is not None
-                ):
-                    variant_consequences.append(
-                        lgd_obj[
-                            "active_variant_consequence__variant_consequence__term"
-                        ]
-                    )
-                # Some records do not have variant types
-                if lgd_obj["active_variant_type__variant_type_ot__term"] is not None:
-                    variant_types.append(
-                        lgd_obj["active_variant_type__variant_type_ot__term"]
-                    )
-
-                date_review = None
-                if lgd_obj["lgd__date_review"] is not None:
-                    date_review = lgd_obj["lgd__date_review"].strftime("%Y-%m-%d")
-
-                aggregated_data[lgd_obj["lgd__stable_id__stable_id"]] = {
-                    "locus": lgd_obj["lgd__locus__name"],
-                    "disease": lgd_obj["lgd__disease__name"],
-                    "genotype": lgd_obj["lgd__genotype__value"],
-                    "confidence": lgd_obj["lgd__confidence__value"],
-                    "variant_consequence": variant_consequences,
-                    "variant_type": variant_types,
-                    "molecular_mechanism": lgd_obj["lgd__mechanism__value"],
-                    "last_updated": date_review,
-                    "stable_id": lgd_obj["lgd__stable_id__stable_id"],
-                }
-                number_keys += 1
-
-            elif number_keys < 10:
-                if (
-                    lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    not in aggregated_data[lgd_obj["lgd__stable_id__stable_id"]][
-                        "variant_consequence"
-                    ]
-                    and lgd_obj[
-                        "active_variant_consequence__variant_consequence__term"
-                    ]
-                    is not None
-                ):
-                    aggregated_data[lgd_obj["lgd__stable_id__stable_id"]][
-                        "variant_consequence"
-                    ].append(
-                        lgd_obj[
-                            "active_variant_consequence__variant_consequence__term"
-                        ]
-                    )
-                if (
-                    lgd_obj["active_variant_type__variant_type_ot__term"]
-                    not in aggregated_data[lgd_obj["lgd__stable_id__stable_id"]][
-                        "variant_type"
-                    ]
-                    and lgd_obj["active_variant_type__variant_type_ot__term"]
-                    is not None
-                ):
-                    aggregated_data[lgd_obj["lgd__stable_id__stable_id"]][
-                        "variant_type"
-                    ].append(lgd_obj["active_variant_type__variant_type_ot__term"])
-
-        return aggregated_data.values()
-
     class Meta:
         model = Panel
         fields = ["name", "description", "last_updated"]
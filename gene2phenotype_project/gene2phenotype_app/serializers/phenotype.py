@@ -10,7 +10,7 @@ from ..models import (
     LGDPhenotypeSummary,
 )
 
-from ..utils import validate_phenotype
+from ..utils import validate_phenotype, vocabulary, ExternalLookupError
 
 
 class PhenotypeOntologyTermSerializer(serializers.ModelSerializer):
@@ -37,8 +37,16 @@ class PhenotypeOntologyTermSerializer(serializers.ModelSerializer):
         phenotype_accession = accession["accession"]
         phenotype_description = None
 
-        # Check if accession is valid - query HPO API
-        validated_phenotype = validate_phenotype(phenotype_accession)
+        # Check if accession is valid - local HPO terms
+        try:
+            validated_phenotype = validate_phenotype(phenotype_accession)
+        except ExternalLookupError:
+            raise serializers.ValidationError(
+                {
+                    "message": "Could not fetch the phenotype from the HPO API",
+                    "Please check ID": phenotype_accession,
+                }
+            )
 
         if not re.match(r"HP\:\d+", phenotype_accession) or validated_phenotype is None:
             raise serializers.ValidationError(
@@ -48,7 +56,7 @@ class PhenotypeOntologyTermSerializer(serializers.ModelSerializer):
                 }
             )
 
-        # TODO check if the new API has 'isObsolete'
+        # TODO check if the phenotype is obsolete ('isObsolete')
         # if validated_phenotype['isObsolete'] == True:
         #     raise serializers.ValidationError({"message": f"Phenotype accession is obsolete",
         #                                        "Please check id": phenotype_accession})
@@ -59,16 +67,15 @@ class PhenotypeOntologyTermSerializer(serializers.ModelSerializer):
         except OntologyTerm.DoesNotExist:
             # Add new phenotype to ontology table
             try:
-                source_obj = Source.objects.get(name="HPO")
+                source_obj = vocabulary.get_source("HPO")
             except Source.DoesNotExist:
                 raise serializers.ValidationError(
                     {"message": "Problem fetching the phenotype source 'HPO'"}
                 )
 
             try:
-                group_type_obj = Attrib.objects.get(
-                    value="phenotype",
-                    type__code="ontology_term_group"
+                group_type_obj = vocabulary.get_attrib(
+                    "ontology_term_group", "phenotype"
                 )
             except Attrib.DoesNotExist:
                 raise serializers.ValidationError(
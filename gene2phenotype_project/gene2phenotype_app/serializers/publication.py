@@ -3,9 +3,9 @@ import re
 
 from ..models import Publication, LGDPublicationComment, Attrib, LGDPublication
 
-from ..utils import get_publication, get_authors
+from ..utils import get_publication, get_authors, ExternalLookupError
 
-from ..utils import get_date_now, clean_title
+from ..utils import get_date_now, clean_title, vocabulary
 
 
 class LGDPublicationCommentSerializer(serializers.ModelSerializer):
@@ -95,7 +95,12 @@ class PublicationSerializer(serializers.ModelSerializer):
             publication_obj = Publication.objects.get(pmid=pmid)
 
         except Publication.DoesNotExist:
-            response = get_publication(pmid)
+            try:
+                response = get_publication(pmid)
+            except ExternalLookupError:
+                raise serializers.ValidationError(
+                    {"error": f"Could not fetch PMID {pmid} from EuropePMC"}
+                )
 
             if response["hitCount"] == 0:
                 raise serializers.ValidationError(
@@ -148,9 +153,19 @@ class LGDPublicationSerializer(serializers.ModelSerializer):
             (list) comments: list of comments
         """
         user = self.context.get("user")
+        is_authenticated = bool(user and user.is_authenticated)
+
+        # Use the comments prefetched by LocusGenotypeDiseaseSerializer.prefetch_queryset() if available
+        prefetched_comments = getattr(id, "prefetched_comments", None)
+        if prefetched_comments is not None:
+            queryset = [
+                publication_comment
+                for publication_comment in prefetched_comments
+                if is_authenticated or publication_comment.is_public == 1
+            ]
 
         # Authenticated users can view all types of comments
-        if user and user.is_authenticated:
+        elif is_authenticated:
             queryset = LGDPublicationComment.objects.filter(
                 lgd_publication_id=id, is_deleted=0
             ).prefetch_related("user")
@@ -260,8 +275,8 @@ class LGDPublicationSerializer(serializers.ModelSerializer):
         # Get consanguinity from attrib
         if consanguinity:
             try:
-                consanguinity_obj = Attrib.objects.get(
-                    value=consanguinity, type__code="consanguinity"
+                consanguinity_obj = vocabulary.get_attrib(
+                    "consanguinity", consanguinity
                 )
             except Attrib.DoesNotExist:
                 raise serializers.ValidationError(
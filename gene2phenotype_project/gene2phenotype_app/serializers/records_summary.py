@@ -0,0 +1,104 @@
+from typing import Optional
+
+from ..models import LGDPanel, LGDVariantGenccConsequence, LGDVariantType
+
+
+# Fields of the records summary and the column of LocusGenotypeDisease they read
+RECORD_FIELDS = {
+    "locus": "locus__name",
+    "disease": "disease__name",
+    "genotype": "genotype__value",
+    "confidence": "confidence__value",
+    "molecular_mechanism": "mechanism__value",
+    "last_updated": "date_review",
+    "stable_id": "stable_id__stable_id",
+}
+
+
+def get_records_summary(
+    queryset,
+    fields: list[str],
+    limit: Optional[int] = None,
+    visible_panels_only: bool = False,
+) -> list[dict]:
+    """
+    Returns the summary of the records of the queryset, the most recently
+    reviewed records first. Used by the gene, disease and panel summaries.
+
+    The records are selected first (with a LIMIT if limit is defined), then the
+    variant consequences, variant types and panels are fetched only for the
+    selected records and grouped by record. The number of queries is constant
+    (at most 4) and it does not depend on the number of records of the gene or panel.
+
+    Args:
+        queryset (QuerySet): the LocusGenotypeDisease records to include
+        fields (list): the fields of each record summary, in the output order
+                       (RECORD_FIELDS, 'panels', 'variant_consequence' and 'variant_type')
+        limit (int): only returns the last updated records
+        visible_panels_only (bool): only includes the visible panels (non-authenticated users)
+
+    Returns a list of dictionaries (one for each record)
+    """
+    columns = [RECORD_FIELDS[field] for field in fields if field in RECORD_FIELDS]
+    # The filters on the panels can return the same record more than once
+    records = queryset.order_by("-date_review", "-id").values("id", *columns).distinct()
+    if limit is not None:
+        records = records[:limit]
+    records = list(records)
+
+    lgd_ids = [record["id"] for record in records]
+    related_data = {
+        field: {lgd_id: [] for lgd_id in lgd_ids}
+        for field in ("panels", "variant_consequence", "variant_type")
+    }
+
+    if lgd_ids and "panels" in fields:
+        lgd_panels = LGDPanel.objects.filter(lgd_id__in=lgd_ids, is_deleted=0)
+        if visible_panels_only:
+            lgd_panels = lgd_panels.filter(panel__is_visible=1)
+        add_related_data(
+            related_data["panels"], lgd_panels.values_list("lgd_id", "panel__name")
+        )
+
+    if lgd_ids and "variant_consequence" in fields:
+        add_related_data(
+            related_data["variant_consequence"],
+            LGDVariantGenccConsequence.objects.filter(
+                lgd_id__in=lgd_ids, is_deleted=0
+            ).values_list("lgd_id", "variant_consequence__term"),
+        )
+
+    if lgd_ids and "variant_type" in fields:
+        add_related_data(
+            related_data["variant_type"],
+            LGDVariantType.objects.filter(lgd_id__in=lgd_ids, is_deleted=0).values_list(
+                "lgd_id", "variant_type_ot__term"
+            ),
+        )
+
+    summary = []
+    for record in records:
+        record_summary = {}
+        for field in fields:
+            if field in related_data:
+                record_summary[field] = related_data[field][record["id"]]
+            elif field == "last_updated":
+                date_review = record[RECORD_FIELDS[field]]
+                record_summary[field] = (
+                    date_review.strftime("%Y-%m-%d") if date_review else None
+                )
+            else:
+                record_summary[field] = record[RECORD_FIELDS[field]]
+        summary.append(record_summary)
+
+    return summary
+
+
+def add_related_data(data: dict[int, list], rows):
+    """
+    Groups the values by record, keeping the first occurrence of each value.
+    Called by: get_records_summary()
+    """
+    for lgd_id, value in rows.order_by("id"):
+        if value is not None and value not in data[lgd_id]:
+            data[lgd_id].append(value)
@@ -1,7 +1,7 @@
 from rest_framework import serializers
-from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 
-from ..models import G2PStableID
+from ..models import G2PStableID, G2PStableIDSequence
 
 
 class G2PStableIDSerializer(serializers.ModelSerializer):
@@ -13,32 +13,63 @@ class G2PStableIDSerializer(serializers.ModelSerializer):
     objects.
     """
 
-    def create_stable_id():
+    @staticmethod
+    def format_stable_id(number):
+        """
+        Returns the G2P stable ID of the number (ex: 17 -> 'G2P00017').
+        """
+        return f"{G2PStableIDSequence.G2P}{number:05d}"
+
+    @staticmethod
+    def create_stable_id(number=None):
         """
         Creates a new stable identifier instance for gene-to-phenotype mapping.
 
-        This function generates a stable identifier based on the current count of G2PStableID instances
-        in the database and saves the new instance.
+        The number of the stable identifier is reserved from the stable ID sequence
+        (see G2PStableIDSequence), concurrent requests get different numbers.
+
+        Args:
+            number (int): number already reserved from the stable ID sequence,
+                          a new number is reserved if it is not defined
 
         Returns:
             G2PStableID: The newly created stable identifier instance.
+        """
+        with transaction.atomic():
+            if number is None:
+                number = G2PStableIDSequence.reserve()[0]
+            stable_id_instance = G2PStableID.objects.create(
+                stable_id=G2PStableIDSerializer.format_stable_id(number)
+            )
 
-        Raises:
-            ObjectDoesNotExist: If there are no existing G2PStableID instances in the database.
+        return stable_id_instance
+
+    @staticmethod
+    def create_stable_ids(count):
         """
-        # Generate the sequence numbers as part of the ID
-        try:
-            number_obj = G2PStableID.objects.count()
-            number_obj = number_obj + 1
-            sequence_id = f"G2P{number_obj:05d}"
-        except ObjectDoesNotExist:
-            sequence_number = 1
-            sequence_id = f"G2P{sequence_number:05d}"
+        Creates a block of new stable identifiers, used by the batch imports.
+        The numbers are reserved from the stable ID sequence in a single update.
 
-        stable_id_instance = G2PStableID(stable_id=sequence_id)
-        stable_id_instance.save()
+        Args:
+            count (int): number of stable identifiers to create
 
-        return stable_id_instance
+        Returns:
+            list: The newly created G2PStableID instances, in order.
+        """
+        with transaction.atomic():
+            stable_ids = [
+                G2PStableIDSerializer.format_stable_id(number)
+                for number in G2PStableIDSequence.reserve(count)
+            ]
+            # The primary keys are not returned by bulk_create in MySQL
+            G2PStableID.objects.bulk_create(
+                [G2PStableID(stable_id=stable_id) for stable_id in stable_ids]
+            )
+            stable_id_objs = G2PStableID.objects.in_bulk(
+                stable_ids, field_name="stable_id"
+            )
+
+        return [stable_id_objs[stable_id] for stable_id in stable_ids]
 
     def update_g2p_id_status(self, is_live):
         """
@@ -0,0 +1,573 @@
+"""
+Signal handlers used to keep track of data updates.
+
+Every time a record, or data attached to a record, is created, updated or deleted
+the records data version is incremented (see DataVersion), once for each transaction
+after the transaction is committed.
+Bulk updates (queryset.update(), bulk_create()) do not send signals and do not update the version.
+
+The stored record summaries (see LGDRecordSummary) are also kept up to date: when
+the data used in the summary changes, the summary is marked as out of date and
+it is generated again after the transaction is committed.
+The record summaries, the search index (see LGDSearchToken) and the autocomplete index
+are updated once for each transaction, the updates of the transaction are merged
+(see OnCommitUpdates).
+The autocomplete index has its own version (used by the other processes to generate it again).
+
+The activity logs (see ActivityLog) are created when the history rows are created.
+
+The data derived from the records (cached responses, panel stats and panel
+download snapshots) is invalidated by the invalidation bus after the transaction
+is committed, only for the records, genes, diseases and panels affected by the
+update (see invalidation.py).
+
+The reference data (attribs, mechanisms, ontology terms and meta) has its own
+version, used to invalidate the cached reference data (see views/reference_data.py)
+and the vocabulary registry (see utils/vocabulary_utils.py).
+The HPO terms kept in memory (see utils/phenotype_utils.py) are cleared when the
+HPO terms are updated. The gene reference (see utils/locus_utils.py) has its own
+version, incremented when the genes are updated.
+
+The handlers are connected in Gene2PhenotypeAppConfig.ready()
+"""
+
+import threading
+from collections import defaultdict
+
+from django.core.signals import request_started, request_finished
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from simple_history.signals import post_create_historical_record
+
+from .models import (
+    Attrib,
+    AttribType,
+    CVMolecularMechanism,
+    DataVersion,
+    GeneDisease,
+    HPOTerm,
+    Meta,
+    Source,
+    G2PStableID,
+    LGDRecordSummary,
+    LocusGenotypeDisease,
+    LGDMolecularMechanismSynopsis,
+    LGDMolecularMechanismEvidence,
+    LGDCrossCuttingModifier,
+    LGDPhenotype,
+    LGDPhenotypeSummary,
+    LGDVariantType,
+    LGDVariantTypePublication,
+    LGDVariantTypeDescription,
+    LGDVariantTypeComment,
+    LGDVariantGenccConsequence,
+    LGDComment,
+    LGDPublication,
+    LGDPanel,
+    LGDMinedPublication,
+    LGDPublicationComment,
+    LGDReviewCase,
+    LGDReviewItem,
+    LGDOrgan,
+    LGDMutationConsequenceFlag,
+    Locus,
+    LocusIdentifier,
+    LocusAttrib,
+    Disease,
+    DiseaseSynonym,
+    DiseaseOntologyTerm,
+    OntologyTerm,
+    Publication,
+    Panel,
+)
+
+# Models that are part of the records data
+# Updating any of these models increments the records data version and
+# invalidates the derived data of the affected records (see invalidation.py)
+RECORDS_DATA_MODELS = (
+    G2PStableID,
+    LocusGenotypeDisease,
+    LGDMolecularMechanismSynopsis,
+    LGDMolecularMechanismEvidence,
+    LGDCrossCuttingModifier,
+    LGDPhenotype,
+    LGDPhenotypeSummary,
+    LGDVariantType,
+    LGDVariantTypePublication,
+    LGDVariantTypeDescription,
+    LGDVariantTypeComment,
+    LGDVariantGenccConsequence,
+    LGDComment,
+    LGDPublication,
+    LGDPanel,
+    LGDMinedPublication,
+    LGDPublicationComment,
+    LGDReviewCase,
+    LGDReviewItem,
+    LGDOrgan,
+    LGDMutationConsequenceFlag,
+    Locus,
+    LocusIdentifier,
+    LocusAttrib,
+    Disease,
+    DiseaseSynonym,
+    DiseaseOntologyTerm,
+    Publication,
+    Panel,
+)
+
+# Models used to generate the record summary (see build_lgd_summary)
+# Updating any of these models refreshes the summary of the records
+RECORD_SUMMARY_MODELS = (
+    LocusGenotypeDisease,
+    LGDMolecularMechanismEvidence,
+    LGDCrossCuttingModifier,
+    LGDVariantType,
+    LGDVariantGenccConsequence,
+    LGDPublication,
+    Locus,
+    Disease,
+)
+
+# Models used to generate the search index (see update_search_index)
+SEARCH_INDEX_MODELS = (
+    LocusGenotypeDisease,
+    LGDPhenotype,
+    Disease,
+    DiseaseSynonym,
+    OntologyTerm,
+)
+
+# Models used in the autocomplete index (see AutocompleteIndex)
+AUTOCOMPLETE_MODELS = (
+    Locus,
+    LocusAttrib,
+    Disease,
+    DiseaseSynonym,
+    OntologyTerm,
+    LGDPhenotype,
+)
+
+# Reference data returned by the cached endpoints (see views/reference_data.py)
+# Updating any of these models increments the reference data version
+# (only the variant types for the ontology terms)
+REFERENCE_DATA_MODELS = (
+    Attrib,
+    AttribType,
+    CVMolecularMechanism,
+    OntologyTerm,
+    Meta,
+    Source,
+)
+
+# Models used to build the gene reference (see utils/locus_utils.py)
+# Updating any of these models increments the gene reference version
+GENE_REFERENCE_MODELS = (
+    Locus,
+    LocusIdentifier,
+    LocusAttrib,
+    GeneDisease,
+)
+
+# Models with names used in the URLs, or linked to data with names used in the URLs
+# The data that used the stored version is also invalidated when they are updated
+RENAMED_DATA_MODELS = (
+    LocusGenotypeDisease,
+    Locus,
+    Disease,
+    Panel,
+)
+
+from .invalidation import (
+    invalidation_bus,
+    get_instance_dependencies,
+    get_previous_dependencies,
+)
+from .utils.phenotype_utils import hpo_terms
+from .utils.locus_utils import gene_reference
+from .utils.vocabulary_utils import (
+    vocabulary,
+    reset_avoided_queries,
+    log_avoided_queries,
+)
+
+
+def get_affected_lgd_ids(instance) -> list[int]:
+    """
+    Returns the ids of the LGD records that use the data of the instance.
+    """
+    if isinstance(instance, LocusGenotypeDisease):
+        return [instance.id]
+    if isinstance(instance, Locus):
+        return list(
+            LocusGenotypeDisease.objects.filter(locus_id=instance.id).values_list(
+                "id", flat=True
+            )
+        )
+    if isinstance(instance, Disease):
+        return list(
+            LocusGenotypeDisease.objects.filter(disease_id=instance.id).values_list(
+                "id", flat=True
+            )
+        )
+    if isinstance(instance, DiseaseSynonym):
+        return list(
+            LocusGenotypeDisease.objects.filter(
+                disease_id=instance.disease_id
+            ).values_list("id", flat=True)
+        )
+    if isinstance(instance, OntologyTerm):
+        return list(
+            LGDPhenotype.objects.filter(phenotype_id=instance.id).values_list(
+                "lgd_id", flat=True
+            )
+        )
+    return [instance.lgd_id]
+
+
+class OnCommitUpdates:
+    """
+    Merges the updates of the same transaction and processes them once, after
+    the transaction is committed (or immediately if there is no transaction).
+    The updates are (key, ids), the ids of the same key are merged.
+
+    The updates of the transaction are processed by the first callback that
+    runs, the other callbacks do nothing.
+    Updates of rolled back transactions are processed with the next commit,
+    updating the index of data that did not change is harmless.
+    """
+
+    def __init__(self, process):
+        # Function called with the merged updates: dict {key: set of ids}
+        self.process = process
+        self.local = threading.local()
+
+    def get_pending(self) -> defaultdict:
+        """
+        Returns the updates waiting for the transaction to be committed
+        (one set for each thread, the transactions are bound to the thread).
+        """
+        if not hasattr(self.local, "pending"):
+            self.local.pending = defaultdict(set)
+        return self.local.pending
+
+    def add(self, updates: list[tuple[str, list[int]]]):
+        pending = self.get_pending()
+        for key, ids in updates:
+            pending[key].update(ids)
+
+        transaction.on_commit(self.dispatch, robust=True)
+
+    def dispatch(self):
+        pending = self.get_pending()
+        if not pending:
+            return
+        self.local.pending = defaultdict(set)
+
+        self.process(pending)
+
+
+def refresh_record_summaries(pending):
+    """
+    Generates the summaries of the records updated in the transaction.
+    Called by: OnCommitUpdates.dispatch()
+    """
+    # Import here to avoid loading the serializers when the app is initialised
+    from .serializers import refresh_lgd_summaries
+
+    refresh_lgd_summaries(list(pending["lgd"]))
+
+
+record_summary_updates = OnCommitUpdates(refresh_record_summaries)
+
+
+def record_summary_updated(sender, instance, raw=False, **kwargs):
+    """
+    Marks the summary of the affected records as out of date and generates
+    the summaries again after the transaction is committed (once for each transaction).
+    Data loaded from fixtures (raw=True) is ignored.
+
+    The summaries already marked as out of date are not updated again, this way
+    a record updated several times in the same transaction is only written once.
+    """
+    if raw:
+        return
+
+    lgd_ids = get_affected_lgd_ids(instance)
+    if not lgd_ids:
+        return
+
+    LGDRecordSummary.objects.filter(lgd_id__in=lgd_ids, is_stale=False).update(
+        is_stale=True
+    )
+    record_summary_updates.add([("lgd", lgd_ids)])
+
+
+def refresh_search_index(pending):
+    """
+    Updates the search index of the records updated in the transaction.
+    Called by: OnCommitUpdates.dispatch()
+    """
+    # Import here to avoid loading the views when the app is initialised
+    from .views.search import update_search_index
+
+    update_search_index(list(pending["lgd"]))
+
+
+search_index_updates = OnCommitUpdates(refresh_search_index)
+
+
+def search_index_updated(sender, instance, raw=False, **kwargs):
+    """
+    Updates the search index of the affected records after the transaction is committed.
+    Data loaded from fixtures (raw=True) is ignored.
+    """
+    if raw:
+        return
+
+    lgd_ids = get_affected_lgd_ids(instance)
+    if not lgd_ids:
+        return
+
+    search_index_updates.add([("lgd", lgd_ids)])
+
+
+def refresh_autocomplete_index(pending):
+    """
+    Updates the autocomplete index with the rows updated in the transaction.
+    Called by: OnCommitUpdates.dispatch()
+    """
+    # Import here to avoid loading the views when the app is initialised
+    from .views.autocomplete import update_autocomplete_index
+
+    update_autocomplete_index(
+        [(source, sorted(ids)) for source, ids in pending.items()]
+    )
+
+
+autocomplete_updates = OnCommitUpdates(refresh_autocomplete_index)
+
+
+def autocomplete_data_updated(sender, instance, raw=False, **kwargs):
+    """
+    Increments the autocomplete data version and updates the autocomplete index
+    of this process after the transaction is committed (once for each transaction).
+    Data loaded from fixtures (raw=True) is ignored.
+    """
+    if raw:
+        return
+
+    DataVersion.increment_on_commit(DataVersion.AUTOCOMPLETE)
+
+    # Import here to avoid loading the views when the app is initialised
+    from .views.autocomplete import get_autocomplete_updates
+
+    autocomplete_updates.add(get_autocomplete_updates(instance))
+
+
+def activity_log_created(sender, history_instance, **kwargs):
+    """
+    Creates the activity log of the new history row, in the same transaction.
+    History rows of tables not included in the activity logs are ignored.
+    """
+    # Import here to avoid loading the views when the app is initialised
+    from .views.meta import create_activity_log, get_activity_log_source
+
+    source = get_activity_log_source(sender)
+    if source is None:
+        return
+
+    create_activity_log(source, history_instance)
+
+
+def is_reference_data(instance) -> bool:
+    """
+    Returns True if the instance is returned by the reference data endpoints.
+    Only the ontology terms of the variant types are reference data (see
+    VariantTypesList), the phenotypes and the disease cross references are
+    created during the curation.
+    """
+    if not isinstance(instance, OntologyTerm):
+        return True
+
+    try:
+        group = vocabulary.get_attrib("ontology_term_group", "variant_type")
+    except Attrib.DoesNotExist:
+        return False
+
+    return instance.group_type_id == group.id
+
+
+def reference_data_updated(sender, instance, raw=False, **kwargs):
+    """
+    Increments the reference data version, clears the reference data cache
+    and the vocabulary registry of this process after the transaction is committed.
+    Data loaded from fixtures (raw=True) only clears the vocabulary registry.
+    Ontology terms that are not reference data are ignored (see is_reference_data).
+    """
+    if raw:
+        vocabulary.clear()
+        return
+
+    if not is_reference_data(instance):
+        return
+
+    DataVersion.increment_on_commit(DataVersion.REFERENCE_DATA)
+
+    # Import here to avoid loading the views when the app is initialised
+    from .views.reference_data import reference_data_cache
+
+    transaction.on_commit(reference_data_cache.clear, robust=True)
+    transaction.on_commit(vocabulary.clear, robust=True)
+
+
+def hpo_terms_updated(sender, instance, raw=False, **kwargs):
+    """
+    Clears the HPO terms of this process after the transaction is committed.
+    The command load_hpo_terms (bulk updates) increments the HPO data version,
+    used by the other processes to reload the terms.
+    """
+    if raw:
+        hpo_terms.clear()
+        return
+
+    transaction.on_commit(hpo_terms.clear, robust=True)
+
+
+def gene_reference_updated(sender, instance, raw=False, **kwargs):
+    """
+    Increments the gene reference version and clears the gene reference of this
+    process after the transaction is committed.
+    Data loaded from fixtures (raw=True) only clears the gene reference.
+    """
+    if raw:
+        gene_reference.clear()
+        return
+
+    DataVersion.increment_on_commit(DataVersion.GENE_REFERENCE)
+    transaction.on_commit(gene_reference.clear, robust=True)
+
+
+def records_data_updated(sender, instance, raw=False, **kwargs):
+    """
+    Increments the records data version and invalidates the derived data of
+    the affected records after the transaction is committed.
+    Data loaded from fixtures (raw=True) is ignored.
+    """
+    if raw:
+        return
+
+    DataVersion.increment_on_commit(DataVersion.RECORDS)
+    invalidation_bus.publish(get_instance_dependencies(instance))
+
+
+def records_data_renamed(sender, instance, raw=False, **kwargs):
+    """
+    Invalidates the derived data that used the stored version of the instance
+    (ex: the previous name of a disease), before the instance is updated.
+    Data loaded from fixtures (raw=True) is ignored.
+    """
+    if raw:
+        return
+
+    invalidation_bus.publish(get_previous_dependencies(instance))
+
+
+def connect_signals():
+    for model in RECORDS_DATA_MODELS:
+        post_save.connect(
+            records_data_updated,
+            sender=model,
+            dispatch_uid=f"records_data_updated_save_{model.__name__}",
+        )
+        post_delete.connect(
+            records_data_updated,
+            sender=model,
+            dispatch_uid=f"records_data_updated_delete_{model.__name__}",
+        )
+
+    for model in RENAMED_DATA_MODELS:
+        pre_save.connect(
+            records_data_renamed,
+            sender=model,
+            dispatch_uid=f"records_data_renamed_save_{model.__name__}",
+        )
+
+    for model in RECORD_SUMMARY_MODELS:
+        post_save.connect(
+            record_summary_updated,
+            sender=model,
+            dispatch_uid=f"record_summary_updated_save_{model.__name__}",
+        )
+        # Deleting a record deletes its summary (on_delete=CASCADE)
+        if model is not LocusGenotypeDisease:
+            post_delete.connect(
+                record_summary_updated,
+                sender=model,
+                dispatch_uid=f"record_summary_updated_delete_{model.__name__}",
+            )
+
+    for model in SEARCH_INDEX_MODELS:
+        post_save.connect(
+            search_index_updated,
+            sender=model,
+            dispatch_uid=f"search_index_updated_save_{model.__name__}",
+        )
+        # Deleting a record deletes its search index (on_delete=CASCADE)
+        if model is not LocusGenotypeDisease:
+            post_delete.connect(
+                search_index_updated,
+                sender=model,
+                dispatch_uid=f"search_index_updated_delete_{model.__name__}",
+            )
+
+    for model in AUTOCOMPLETE_MODELS:
+        post_save.connect(
+            autocomplete_data_updated,
+            sender=model,
+            dispatch_uid=f"autocomplete_data_updated_save_{model.__name__}",
+        )
+        post_delete.connect(
+            autocomplete_data_updated,
+            sender=model,
+            dispatch_uid=f"autocomplete_data_updated_delete_{model.__name__}",
+        )
+
+    for model in REFERENCE_DATA_MODELS:
+        post_save.connect(
+            reference_data_updated,
+            sender=model,
+            dispatch_uid=f"reference_data_updated_save_{model.__name__}",
+        )
+        post_delete.connect(
+            reference_data_updated,
+            sender=model,
+            dispatch_uid=f"reference_data_updated_delete_{model.__name__}",
+        )
+
+    post_save.connect(
+        hpo_terms_updated, sender=HPOTerm, dispatch_uid="hpo_terms_updated_save"
+    )
+    post_delete.connect(
+        hpo_terms_updated, sender=HPOTerm, dispatch_uid="hpo_terms_updated_delete"
+    )
+
+    for model in GENE_REFERENCE_MODELS:
+        post_save.connect(
+            gene_reference_updated,
+            sender=model,
+            dispatch_uid=f"gene_reference_updated_save_{model.__name__}",
+        )
+        post_delete.connect(
+            gene_reference_updated,
+            sender=model,
+            dispatch_uid=f"gene_reference_updated_delete_{model.__name__}",
+        )
+
+    # Count the vocabulary lookups that did not query the database in each request
+    request_started.connect(reset_avoided_queries, dispatch_uid="reset_avoided_queries")
+    request_finished.connect(log_avoided_queries, dispatch_uid="log_avoided_queries")
+
+    post_create_historical_record.connect(
+        activity_log_created, dispatch_uid="activity_log_created"
+    )
@@ -0,0 +1,68 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from gene2phenotype_app.models import ActivityLog, LGDPanel, LocusGenotypeDisease
+
+
+class TestBackfillActivityLogsCommand(TestCase):
+    fixtures = [
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/cv_molecular_mechanism.json",
+        "gene2phenotype_app/fixtures/disease.json",
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/lgd_panel.json",
+        "gene2phenotype_app/fixtures/locus_genotype_disease.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/source.json",
+        "gene2phenotype_app/fixtures/user_panels.json",
+    ]
+
+    def setUp(self):
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        lgd_panel = LGDPanel.objects.filter(lgd=lgd_obj).first()
+        for i in range(5):
+            lgd_panel.is_deleted = (i + 1) % 2
+            lgd_panel.save()
+            # Duplicated record history
+            lgd_obj.save()
+
+    def get_logs(self):
+        return list(
+            ActivityLog.objects.order_by("data_type", "history_id").values(
+                "date",
+                "change_type",
+                "data_type",
+                "stable_id",
+                "object_id",
+                "history_id",
+                "value",
+            )
+        )
+
+    def test_backfill_activity_logs(self):
+        expected_logs = self.get_logs()
+        # 5 panel updates + 1 record update
+        self.assertEqual(len(expected_logs), 6)
+
+        ActivityLog.objects.all().delete()
+        call_command("backfill_activity_logs", "--batch_size", "2")
+
+        self.assertEqual(self.get_logs(), expected_logs)
+
+        # Running the command again does not duplicate the logs
+        call_command("backfill_activity_logs")
+        self.assertEqual(ActivityLog.objects.count(), 6)
+
+    def test_backfill_activity_logs_data_type(self):
+        ActivityLog.objects.all().delete()
+        call_command("backfill_activity_logs", "--data_type", "record")
+
+        self.assertEqual(ActivityLog.objects.filter(data_type="record").count(), 1)
+        self.assertEqual(ActivityLog.objects.filter(data_type="panel").count(), 0)
+
+    def test_invalid_data_type(self):
+        with self.assertRaisesMessage(CommandError, "Invalid data type: invalid"):
+            call_command("backfill_activity_logs", "--data_type", "invalid")
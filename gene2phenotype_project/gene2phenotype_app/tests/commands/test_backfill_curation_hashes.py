@@ -0,0 +1,55 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from gene2phenotype_app.models import CurationData
+from gene2phenotype_app.utils import get_curation_data_hash
+
+
+class TestBackfillCurationHashesCommand(TestCase):
+    fixtures = [
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/user_panels.json",
+        "gene2phenotype_app/fixtures/curation_data.json",
+    ]
+
+    def test_backfill_curation_hashes(self):
+        self.assertTrue(CurationData.objects.filter(json_hash__isnull=True).exists())
+
+        call_command("backfill_curation_hashes", "--batch_size", "2")
+
+        for curation_data in CurationData.objects.all():
+            self.assertEqual(
+                curation_data.json_hash,
+                get_curation_data_hash(curation_data.json_data),
+            )
+        # The history rows are not created
+        self.assertFalse(CurationData.history.exists())
+
+    def test_backfill_all(self):
+        call_command("backfill_curation_hashes")
+        CurationData.objects.update(json_hash="outdated")
+
+        call_command("backfill_curation_hashes")
+        self.assertEqual(CurationData.objects.filter(json_hash="outdated").count(), 7)
+
+        call_command("backfill_curation_hashes", "--all")
+        self.assertFalse(CurationData.objects.filter(json_hash="outdated").exists())
+
+    def test_invalid_batch_size(self):
+        with self.assertRaisesMessage(CommandError, "--batch_size"):
+            call_command("backfill_curation_hashes", "--batch_size", "0")
+
+    def test_hash_ignores_session_name_and_key_order(self):
+        self.assertEqual(
+            get_curation_data_hash(
+                {"session_name": "session 1", "locus": "CEP290", "panels": ["DD"]}
+            ),
+            get_curation_data_hash(
+                {"panels": ["DD"], "locus": "CEP290", "session_name": "session 2"}
+            ),
+        )
+        self.assertNotEqual(
+            get_curation_data_hash({"locus": "CEP290", "panels": ["DD", "Eye"]}),
+            get_curation_data_hash({"locus": "CEP290", "panels": ["Eye", "DD"]}),
+        )
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+
+
+class TestGeneratePanelSnapshotsCommand(TestCase):
+    fixtures = [
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/cv_molecular_mechanism.json",
+        "gene2phenotype_app/fixtures/disease.json",
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/lgd_panel.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/locus_genotype_disease.json",
+        "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/source.json",
+        "gene2phenotype_app/fixtures/user_panels.json",
+    ]
+
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.snapshot_dir)
+
+    def test_generate_panel_snapshots(self):
+        with override_settings(PANEL_DOWNLOAD_SNAPSHOT_DIR=self.snapshot_dir):
+            call_command("generate_panel_snapshots", "--panel", "DD", "--panel", "all")
+
+            files = sorted(os.listdir(self.snapshot_dir))
+            self.assertEqual(
+                files,
+                [
+                    "DD_authenticated.json",
+                    "DD_authenticated_0.csv.gz",
+                    "DD_public.json",
+                    "DD_public_0.csv.gz",
+                    "all_authenticated.json",
+                    "all_authenticated_0.csv.gz",
+                    "all_public.json",
+                    "all_public_0.csv.gz",
+                ],
+            )
+
+            # The files are up to date, nothing to generate
+            with self.assertNoLogs("gene2phenotype_app", level="INFO"):
+                call_command("generate_panel_snapshots", "--panel", "DD")
+
+    def test_invalid_panel(self):
+        with override_settings(PANEL_DOWNLOAD_SNAPSHOT_DIR=self.snapshot_dir):
+            with self.assertRaisesMessage(CommandError, "Invalid panel: Ears"):
+                call_command("generate_panel_snapshots", "--panel", "Ears")
+
+    def test_missing_snapshot_dir(self):
+        with override_settings(PANEL_DOWNLOAD_SNAPSHOT_DIR=None):
+            with self.assertRaises(CommandError):
+                call_command("generate_panel_snapshots")
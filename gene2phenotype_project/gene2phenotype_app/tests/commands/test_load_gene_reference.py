@@ -0,0 +1,217 @@
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+
+from gene2phenotype_app.models import (
+    DataVersion,
+    HGNCGene,
+    LocusAttrib,
+    LocusIdentifier,
+)
+from gene2phenotype_app.utils import gene_reference, validate_gene
+
+
+HGNC_HEADERS = [
+    "hgnc_id",
+    "symbol",
+    "name",
+    "locus_group",
+    "status",
+    "alias_symbol",
+    "prev_symbol",
+    "ensembl_gene_id",
+]
+
+HGNC_ROWS = [
+    [
+        "HGNC:29021",
+        "CEP290",
+        "centrosomal protein 290",
+        "protein-coding gene",
+        "Approved",
+        '"BBS14|CT87|MKS4"',
+        "",
+        "ENSG00000198707",
+    ],
+    [
+        "HGNC:30650",
+        "STRA6",
+        "signaling receptor and transporter of retinol STRA6",
+        "protein-coding gene",
+        "Approved",
+        "FLJ12541",
+        "MCOPS9",
+        "ENSG00000137868",
+    ],
+    [
+        "HGNC:1101",
+        "BRCA2",
+        "BRCA2 DNA repair associated",
+        "protein-coding gene",
+        "Approved",
+        '"FANCD1|CT87"',
+        "",
+        "ENSG00000139618",
+    ],
+    [
+        "HGNC:20774",
+        "TUBB4A",
+        "tubulin beta 4A class IVa",
+        "protein-coding gene",
+        "Approved",
+        "",
+        '"TUBB4|TDF"',
+        "ENSG00000104833",
+    ],
+    [
+        "HGNC:9999",
+        "MPI",
+        "withdrawn gene",
+        "protein-coding gene",
+        "Entry Withdrawn",
+        "MPI2",
+        "",
+        "",
+    ],
+]
+
+
+class TestLoadGeneReferenceCommand(TestCase):
+    fixtures = [
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/gene_disease.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/source.json",
+    ]
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+        # The gene reference loaded in memory is not rolled back with the test data
+        gene_reference.clear()
+
+    def write_file(self, headers, rows):
+        path = os.path.join(self.data_dir, "hgnc_complete_set.txt")
+        with open(path, "w") as fh:
+            for row in [headers, *rows]:
+                fh.write("\t".join(row) + "\n")
+        return path
+
+    def test_load_gene_reference(self):
+        """
+        Test all the approved HGNC genes are loaded, the genes stored in G2P
+        are updated
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "load_gene_reference",
+                "--data_file",
+                self.write_file(HGNC_HEADERS, HGNC_ROWS),
+            )
+
+        self.assertEqual(DataVersion.get_version(DataVersion.GENE_REFERENCE), 1)
+        self.assertEqual(DataVersion.get_version(DataVersion.AUTOCOMPLETE), 1)
+        self.assertEqual(
+            set(HGNCGene.objects.values_list("symbol", flat=True)),
+            {"CEP290", "STRA6", "BRCA2", "TUBB4A"},
+        )
+        self.assertEqual(
+            HGNCGene.objects.get(hgnc_id="HGNC:29021").alias_symbols,
+            ["BBS14", "CT87", "MKS4"],
+        )
+        # The aliases are not added as synonyms
+        self.assertEqual(
+            set(
+                LocusAttrib.objects.filter(
+                    locus__name="CEP290", is_deleted=0
+                ).values_list("value", flat=True)
+            ),
+            {"BBS14", "CT87"},
+        )
+        self.assertEqual(
+            set(
+                LocusAttrib.objects.filter(locus__name="STRA6").values_list(
+                    "value", flat=True
+                )
+            ),
+            {"FLJ12541", "MCOPS9"},
+        )
+        # The previous symbol TDF is a synonym of SRY
+        self.assertEqual(
+            set(
+                LocusAttrib.objects.filter(locus__name="TUBB4A").values_list(
+                    "value", flat=True
+                )
+            ),
+            {"BETA-5", "DYT4", "TUBB4"},
+        )
+        self.assertEqual(
+            set(
+                LocusAttrib.objects.filter(value="TDF").values_list(
+                    "locus__name", flat=True
+                )
+            ),
+            {"SRY"},
+        )
+        self.assertEqual(
+            LocusIdentifier.objects.get(identifier="HGNC:29021").description,
+            "centrosomal protein 290",
+        )
+        # The genes not stored in G2P are only saved in hgnc_gene
+        self.assertFalse(LocusAttrib.objects.filter(value="FANCD1").exists())
+        # The withdrawn genes are ignored
+        self.assertFalse(HGNCGene.objects.filter(symbol="MPI").exists())
+        self.assertFalse(LocusAttrib.objects.filter(value="MPI2").exists())
+
+    def test_invalid_file(self):
+        with self.assertRaisesMessage(CommandError, "Missing data"):
+            call_command(
+                "load_gene_reference",
+                "--data_file",
+                self.write_file(HGNC_HEADERS[:2], [row[:2] for row in HGNC_ROWS]),
+            )
+
+        self.assertEqual(DataVersion.get_version(DataVersion.GENE_REFERENCE), 0)
+
+    @override_settings(GENE_REFERENCE_API_FALLBACK=False)
+    def test_validate_gene(self):
+        """
+        Test the genes are validated from memory by symbol, synonym, alias or
+        identifier, including the HGNC genes not stored in G2P
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "load_gene_reference",
+                "--data_file",
+                self.write_file(HGNC_HEADERS, HGNC_ROWS),
+            )
+
+        gene = validate_gene("mks4")
+        self.assertEqual(gene["display_id"], "CEP290")
+        self.assertEqual(gene["primary_id"], "HGNC:29021")
+        self.assertEqual(gene["description"], "centrosomal protein 290")
+        self.assertEqual(gene["ensembl_id"], "ENSG00000198707")
+        self.assertEqual([mim["id"] for mim in gene["mim"]], ["610188", "610189"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(validate_gene("CEP290")["display_id"], "CEP290")
+            self.assertEqual(validate_gene("HGNC:30650")["display_id"], "STRA6")
+            self.assertEqual(validate_gene("ENSG00000137868")["display_id"], "STRA6")
+            # Deleted synonym
+            self.assertIsNone(validate_gene("KIAA0373"))
+            # The synonyms have priority over the aliases of other genes
+            self.assertEqual(validate_gene("CT87")["display_id"], "CEP290")
+            # Gene not stored in G2P
+            gene = validate_gene("fancd1")
+            self.assertEqual(gene["display_id"], "BRCA2")
+            self.assertEqual(gene["primary_id"], "HGNC:1101")
+            self.assertEqual(gene["ensembl_id"], "ENSG00000139618")
+            self.assertNotIn("mim", gene)
+            # Withdrawn gene not stored in G2P
+            self.assertIsNone(validate_gene("MPI2"))
@@ -0,0 +1,187 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+
+from gene2phenotype_app.models import DataVersion, HPOTerm
+from gene2phenotype_app.utils import hpo_terms, validate_phenotypes
+
+
+OBO_DATA = """format-version: 1.2
+ontology: hp
+
+[Term]
+id: HP:0000118
+name: Phenotypic abnormality
+def: "A phenotypic abnormality." [HPO:probinson]
+synonym: "Organ abnormality" EXACT []
+is_a: HP:0000001 ! All
+
+[Term]
+id: HP:0009726
+name: Renal neoplasm
+def: "The presence of a \\"neoplasm\\" of the kidney." [HPO:probinson]
+is_a: HP:0010786 ! Urinary tract neoplasm
+is_a: HP:0000077 ! Abnormality of the kidney
+
+[Term]
+id: HP:0000006
+name: obsolete Autosomal dominant inheritance
+is_obsolete: true
+replaced_by: HP:0000007
+
+[Typedef]
+id: part_of
+name: part of
+"""
+
+OBOGRAPHS_DATA = {
+    "graphs": [
+        {
+            "nodes": [
+                {
+                    "id": "http://purl.obolibrary.org/obo/HP_0000118",
+                    "lbl": "Phenotypic abnormality",
+                    "type": "CLASS",
+                    "meta": {
+                        "definition": {"val": "A phenotypic abnormality."},
+                        "synonyms": [{"val": "Organ abnormality"}],
+                    },
+                },
+                {
+                    "id": "http://purl.obolibrary.org/obo/HP_0000006",
+                    "lbl": "obsolete Autosomal dominant inheritance",
+                    "type": "CLASS",
+                    "meta": {
+                        "deprecated": True,
+                        "basicPropertyValues": [
+                            {
+                                "pred": "http://purl.obolibrary.org/obo/IAO_0100001",
+                                "val": "http://purl.obolibrary.org/obo/HP_0000007",
+                            }
+                        ],
+                    },
+                },
+                {
+                    "id": "http://purl.obolibrary.org/obo/UBERON_0002113",
+                    "lbl": "kidney",
+                    "type": "CLASS",
+                },
+            ],
+            "edges": [
+                {
+                    "sub": "http://purl.obolibrary.org/obo/HP_0000118",
+                    "pred": "is_a",
+                    "obj": "http://purl.obolibrary.org/obo/HP_0000001",
+                }
+            ],
+        }
+    ]
+}
+
+
+class TestLoadHPOTermsCommand(TestCase):
+    fixtures = ["gene2phenotype_app/fixtures/hpo_term.json"]
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+        # The terms loaded in memory are not rolled back with the test data
+        hpo_terms.clear()
+
+    def write_file(self, name, data):
+        path = os.path.join(self.data_dir, name)
+        with open(path, "w") as fh:
+            fh.write(data)
+        return path
+
+    def test_load_obo(self):
+        """
+        Test the terms of the OBO file replace the stored terms
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "load_hpo_terms", "--data_file", self.write_file("hp.obo", OBO_DATA)
+            )
+
+        self.assertEqual(
+            set(HPOTerm.objects.values_list("accession", flat=True)),
+            {"HP:0000118", "HP:0009726", "HP:0000006"},
+        )
+        self.assertEqual(DataVersion.get_version(DataVersion.HPO), 1)
+
+        term = HPOTerm.objects.get(accession="HP:0009726")
+        self.assertEqual(term.definition, 'The presence of a "neoplasm" of the kidney.')
+        self.assertEqual(term.parents, ["HP:0010786", "HP:0000077"])
+        self.assertEqual(
+            HPOTerm.objects.get(accession="HP:0000118").synonyms, ["Organ abnormality"]
+        )
+
+        obsolete_term = HPOTerm.objects.get(accession="HP:0000006")
+        self.assertEqual(obsolete_term.is_obsolete, 1)
+        self.assertEqual(obsolete_term.replaced_by, "HP:0000007")
+
+    def test_load_obographs(self):
+        """
+        Test the HPO terms of the JSON file are loaded, the other ontologies are ignored
+        """
+        call_command(
+            "load_hpo_terms",
+            "--data_file",
+            self.write_file("hp.json", json.dumps(OBOGRAPHS_DATA)),
+        )
+
+        self.assertEqual(
+            set(HPOTerm.objects.values_list("accession", flat=True)),
+            {"HP:0000118", "HP:0000006"},
+        )
+        term = HPOTerm.objects.get(accession="HP:0000118")
+        self.assertEqual(term.parents, ["HP:0000001"])
+        self.assertEqual(term.definition, "A phenotypic abnormality.")
+
+        obsolete_term = HPOTerm.objects.get(accession="HP:0000006")
+        self.assertEqual(obsolete_term.is_obsolete, 1)
+        self.assertEqual(obsolete_term.replaced_by, "HP:0000007")
+
+    def test_invalid_file(self):
+        with self.assertRaisesMessage(CommandError, "Unsupported file format"):
+            call_command(
+                "load_hpo_terms", "--data_file", self.write_file("hp.txt", OBO_DATA)
+            )
+
+        with self.assertRaisesMessage(CommandError, "No HPO terms found"):
+            call_command(
+                "load_hpo_terms", "--data_file", self.write_file("hp.obo", "")
+            )
+
+        self.assertEqual(HPOTerm.objects.count(), 9)
+
+    @override_settings(HPO_API_FALLBACK=False)
+    def test_validate_phenotypes(self):
+        """
+        Test the phenotypes are validated from memory after the terms are loaded
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "load_hpo_terms", "--data_file", self.write_file("hp.obo", OBO_DATA)
+            )
+
+        # Load the terms
+        validate_phenotypes(["HP:0000118"])
+
+        with self.assertNumQueries(0):
+            phenotypes = validate_phenotypes(
+                ["HP:0009726", "HP:0000006", "HP:0010786"]
+            )
+
+        self.assertEqual(phenotypes["HP:0009726"]["name"], "Renal neoplasm")
+        self.assertFalse(phenotypes["HP:0009726"]["isObsolete"])
+        self.assertTrue(phenotypes["HP:0000006"]["isObsolete"])
+        self.assertEqual(phenotypes["HP:0000006"]["replacedBy"], "HP:0000007")
+        # Deleted by the new release
+        self.assertIsNone(phenotypes["HP:0010786"])
@@ -0,0 +1,85 @@
+from unittest.mock import patch
+
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import TestCase
+
+from gene2phenotype_app.models import LGDRecordSummary, LocusGenotypeDisease
+from gene2phenotype_app.serializers import build_lgd_summary
+from gene2phenotype_app.utils import get_upsert_options
+
+
+class TestRebuildRecordSummariesCommand(TestCase):
+    fixtures = [
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/cv_molecular_mechanism.json",
+        "gene2phenotype_app/fixtures/disease.json",
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/lgd_mechanism_evidence.json",
+        "gene2phenotype_app/fixtures/lgd_panel.json",
+        "gene2phenotype_app/fixtures/lgd_publication.json",
+        "gene2phenotype_app/fixtures/lgd_variant_type.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/locus_genotype_disease.json",
+        "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/publication.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/source.json",
+        "gene2phenotype_app/fixtures/user_panels.json",
+    ]
+
+    def test_rebuild_record_summaries(self):
+        call_command("rebuild_record_summaries")
+
+        lgd_records = LocusGenotypeDisease.objects.filter(is_deleted=0)
+        self.assertEqual(LGDRecordSummary.objects.count(), lgd_records.count())
+
+        for lgd_obj in lgd_records:
+            record_summary = LGDRecordSummary.objects.get(lgd=lgd_obj)
+            self.assertFalse(record_summary.is_stale)
+            self.assertEqual(record_summary.summary, build_lgd_summary(lgd_obj))
+
+    def test_rebuild_record_summary_stable_id(self):
+        call_command("rebuild_record_summaries", "--stable_id", "G2P00002")
+
+        self.assertEqual(
+            list(
+                LGDRecordSummary.objects.values_list(
+                    "lgd__stable_id__stable_id", flat=True
+                )
+            ),
+            ["G2P00002"],
+        )
+
+    def test_invalid_stable_id(self):
+        with self.assertRaisesMessage(CommandError, "Invalid G2P ID: G2P00000"):
+            call_command("rebuild_record_summaries", "--stable_id", "G2P00000")
+
+    def test_rebuild_existing_summaries(self):
+        """
+        Test the existing summaries are updated
+        """
+        call_command("rebuild_record_summaries")
+        LGDRecordSummary.objects.update(is_stale=True, summary="")
+
+        call_command("rebuild_record_summaries")
+
+        self.assertFalse(LGDRecordSummary.objects.filter(is_stale=True).exists())
+        for record_summary in LGDRecordSummary.objects.select_related("lgd"):
+            self.assertEqual(
+                record_summary.summary, build_lgd_summary(record_summary.lgd)
+            )
+
+    def test_upsert_options_without_conflict_target(self):
+        """
+        Test the unique fields are not used if the database does not support
+        them (MySQL)
+        """
+        with patch.object(
+            connection.features, "supports_update_conflicts_with_target", False
+        ):
+            options = get_upsert_options(["lgd"], ["summary"])
+
+        self.assertEqual(
+            options, {"update_conflicts": True, "update_fields": ["summary"]}
+        )
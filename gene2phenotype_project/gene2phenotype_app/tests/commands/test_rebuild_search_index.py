@@ -0,0 +1,39 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from gene2phenotype_app.models import DataVersion, LGDSearchToken
+
+
+class TestRebuildSearchIndexCommand(TestCase):
+    fixtures = [
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/cv_molecular_mechanism.json",
+        "gene2phenotype_app/fixtures/disease.json",
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/lgd_phenotype.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/locus_genotype_disease.json",
+        "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/publication.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/source.json",
+    ]
+
+    def test_rebuild_search_index(self):
+        self.assertEqual(DataVersion.get_version(DataVersion.SEARCH_INDEX), 0)
+
+        call_command("rebuild_search_index")
+
+        self.assertEqual(DataVersion.get_version(DataVersion.SEARCH_INDEX), 1)
+        self.assertEqual(
+            set(
+                LGDSearchToken.objects.filter(
+                    lgd__stable_id__stable_id="G2P00001",
+                    field=LGDSearchToken.DISEASE,
+                ).values_list("token", flat=True)
+            ),
+            {"cep290", "related", "joubert", "syndrome", "type", "5"},
+        )
+        self.assertTrue(
+            LGDSearchToken.objects.filter(field=LGDSearchToken.PHENOTYPE).exists()
+        )
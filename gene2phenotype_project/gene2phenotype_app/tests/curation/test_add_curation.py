@@ -1,8 +1,10 @@
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from gene2phenotype_app.models import User, CurationData
+from gene2phenotype_app.utils import get_curation_data_hash
 
 
 class LGDAddCurationEndpoint(TestCase):
@@ -138,6 +140,10 @@ class LGDAddCurationEndpoint(TestCase):
 
         curation_entries = CurationData.objects.filter(session_name="unit test session")
         self.assertEqual(len(curation_entries), 1)
+        self.assertEqual(
+            curation_entries[0].json_hash,
+            get_curation_data_hash(curation_to_add["json_data"]),
+        )
 
     def test_add_automatic_curation_success(self):
         """
@@ -401,6 +407,49 @@ class LGDAddCurationEndpoint(TestCase):
             "Data already under curation. Please check session 'test session'",
         )
 
+    def test_add_curation_existing_curation_hash(self):
+        """
+        Test call to add curation endpoint with existing curation
+        when the drafts have a JSON hash (the keys are in a different order)
+        """
+        call_command("backfill_curation_hashes")
+        self.assertFalse(CurationData.objects.filter(json_hash__isnull=True).exists())
+
+        self.login_user()
+
+        curation_to_add = {
+            "json_data": {
+                "session_name": "unit test session",
+                "locus": "CEP290",
+                "variant_types": [],
+                "variant_descriptions": [],
+                "variant_consequences": [],
+                "publications": [],
+                "public_comment": "",
+                "private_comment": "",
+                "phenotypes": [],
+                "panels": [],
+                "molecular_mechanism": {"support": "", "name": ""},
+                "mechanism_synopsis": [],
+                "mechanism_evidence": [],
+                "disease": {"disease_name": "", "cross_references": []},
+                "cross_cutting_modifier": [],
+                "confidence": "",
+                "allelic_requirement": "",
+            }
+        }
+
+        response = self.client.post(
+            self.url_add_curation, curation_to_add, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response_data = response.json()
+        self.assertEqual(
+            response_data["error"],
+            "Data already under curation. Please check session 'test session'",
+        )
+
     def test_add_curation_duplicate_session_name(self):
         """
         Test adding a curation draft with existing session name
@@ -555,6 +604,52 @@ class LGDAddCurationEndpoint(TestCase):
         )
         self.assertIn("'Patient Cells' is not of type 'array'", response_data["error"])
 
+    def test_add_curation_multiple_schema_errors(self):
+        """
+        Test call to add curation endpoint with several invalid fields
+        All the validation errors are reported in the same response
+        """
+        self.login_user()
+
+        curation_to_add = {
+            "json_data": {
+                "allelic_requirement": "",
+                "confidence": None,
+                "cross_cutting_modifier": [],
+                "disease": {"cross_references": [], "disease_name": ""},
+                "locus": "CEP290",
+                "mechanism_evidence": [],
+                "mechanism_synopsis": [],
+                "molecular_mechanism": {"name": "", "support": ""},
+                "panels": "Developmental disorders",
+                "phenotypes": [],
+                "private_comment": "",
+                "public_comment": "",
+                "publications": [],
+                "session_name": "multiple schema errors",
+                "variant_consequences": [],
+                "variant_descriptions": [],
+                "variant_types": [],
+            }
+        }
+
+        response = self.client.post(
+            self.url_add_curation, curation_to_add, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response_data = response.json()
+        self.assertIn(
+            "JSON data does not follow the required format.", response_data["error"]
+        )
+        self.assertIn(
+            "None is not of type 'string' (path: $.confidence)", response_data["error"]
+        )
+        self.assertIn(
+            "'Developmental disorders' is not of type 'array' (path: $.panels)",
+            response_data["error"],
+        )
+
     def test_add_curation_missing_nested_required_field(self):
         """
         Test call to add curation endpoint with a missing nested required field
@@ -1,8 +1,10 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from gene2phenotype_app.models import User
+from gene2phenotype_app.models import CurationData, User
 
 
 class LGDListCurationDraftsEndpoint(TestCase):
@@ -177,6 +179,65 @@ class LGDListCurationDraftsEndpoint(TestCase):
         )
         self.assertNotIn("G2P00016", [item["stable_id"] for item in results])
 
+    def test_list_curation_automatic_with_panel_access(self):
+        """
+        Test call to list curation drafts endpoint with 'type' = 'automatic' and 'scope' = 'all'
+        by a user that can edit the panel of the draft G2P00016
+        The drafts are filtered by panel without reading the JSON data
+        """
+        # Login
+        user = User.objects.get(email="john@test.ac.uk")
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+
+        # Authenticate by setting cookie on the test client
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE"]] = access_token
+
+        url = f"{self.url_list_curation}?type=automatic&scope=all"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        results = response.data.get("results")
+        self.assertEqual(response.data.get("count"), 4)
+        result = next(item for item in results if item["stable_id"] == "G2P00016")
+        self.assertEqual(result["locus"], "TUBB4A")
+        self.assertEqual(result["allelic_requirement"], "monoallelic_Y_hemizygous")
+        self.assertEqual(result["molecular_mechanism"], None)
+        self.assertEqual(result["panels"], ["Cardiac disorders"])
+        self.assertFalse(
+            any(
+                "json_data" in query["sql"]
+                for query in queries.captured_queries
+                if "curation_data" in query["sql"]
+            )
+        )
+
+    def test_list_curation_locus(self):
+        """
+        Test the locus of the draft is returned as it is in the JSON data,
+        the empty values are returned as None
+        """
+        curation_data = CurationData.objects.get(stable_id__stable_id="G2P00016")
+        curation_data.json_data["locus"] = "TUBB4"
+        curation_data.save()
+
+        user = User.objects.get(email="john@test.ac.uk")
+        refresh = RefreshToken.for_user(user)
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE"]] = str(
+            refresh.access_token
+        )
+
+        response = self.client.get(f"{self.url_list_curation}?type=automatic&scope=all")
+        self.assertEqual(response.status_code, 200)
+
+        result = next(
+            item for item in response.data["results"] if item["stable_id"] == "G2P00016"
+        )
+        self.assertEqual(result["locus"], "TUBB4")
+        self.assertIsNone(result["disease"])
+        self.assertIsNone(result["molecular_mechanism"])
+
     def test_list_curation_success_with_scope_junior(self):
         """
         Test successful call to list curation drafts endpoint with 'scope' = 'junior'
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.urls import reverse
 from django.conf import settings
@@ -8,10 +10,15 @@ from gene2phenotype_app.models import (
     LGDComment,
     LGDPublication,
     LGDPublicationComment,
+    LGDPhenotype,
 )
+from gene2phenotype_app.serializers import refresh_lgd_summaries
+from gene2phenotype_app.views.autocomplete import update_autocomplete_index
+from gene2phenotype_app.views.search import update_search_index
+from gene2phenotype_app.tests.stub_api import StubAPIServerMixin
 
 
-class LGDAddCurationEndpoint(TestCase):
+class LGDAddCurationEndpoint(StubAPIServerMixin, TestCase):
     """
     Test endpoint to publish a record
     """
@@ -31,9 +38,11 @@ class LGDAddCurationEndpoint(TestCase):
         "gene2phenotype_app/fixtures/disease.json",
         "gene2phenotype_app/fixtures/disease_external.json",
         "gene2phenotype_app/fixtures/gene_disease.json",
+        "gene2phenotype_app/fixtures/hpo_term.json",
     ]
 
     def setUp(self):
+        super().setUp()
         self.url_add_curation = reverse("add_curation_data")
 
     def login_user(self):
@@ -1172,3 +1181,90 @@ class LGDAddCurationEndpoint(TestCase):
             response_data_publish["error"],
             "Cannot publish record 'G2P00010': status is 'automatic'. Please update the record before publishing.",
         )
+
+    def publish_record_with_phenotypes(self):
+        """
+        Saves and publishes a draft with several phenotypes.
+        """
+        self.login_user()
+        data_to_add = self.get_publishable_curation_payload()
+        data_to_add["json_data"]["phenotypes"] = [
+            {
+                "hpo_terms": [
+                    {"accession": "HP:0012372", "term": "Abnormal eye morphology"},
+                    {"accession": "HP:0009726", "term": "Renal neoplasm"},
+                    {"accession": "HP:0010786", "term": "Urinary tract neoplasm"},
+                ],
+                "pmid": "1",
+                "summary": "test comment",
+            }
+        ]
+
+        response = self.client.post(
+            self.url_add_curation, data_to_add, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        url_publish = reverse(
+            "publish_record", kwargs={"stable_id": response.json()["result"]}
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response_publish = self.client.post(
+                url_publish, content_type="application/json"
+            )
+        self.assertEqual(response_publish.status_code, 201)
+
+    def test_publish_updates_search_index_once(self):
+        """
+        Test the search index is updated once when a record with several
+        phenotypes is published
+        """
+        with patch(
+            "gene2phenotype_app.views.search.update_search_index",
+            wraps=update_search_index,
+        ) as mock_update:
+            self.publish_record_with_phenotypes()
+
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00017")
+        self.assertEqual(
+            LGDPhenotype.objects.filter(lgd=lgd_obj, is_deleted=0).count(), 3
+        )
+
+        mock_update.assert_called_once()
+        self.assertIn(lgd_obj.id, mock_update.call_args.args[0])
+
+    def test_publish_refreshes_record_summary_once(self):
+        """
+        Test the record summary is generated once when a record with several
+        phenotypes is published
+        """
+        with patch(
+            "gene2phenotype_app.serializers.refresh_lgd_summaries",
+            wraps=refresh_lgd_summaries,
+        ) as mock_refresh:
+            self.publish_record_with_phenotypes()
+
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00017")
+        mock_refresh.assert_called_once()
+        self.assertIn(lgd_obj.id, mock_refresh.call_args.args[0])
+        self.assertFalse(lgd_obj.record_summary.is_stale)
+
+    def test_publish_updates_autocomplete_index_once(self):
+        """
+        Test the autocomplete index is updated once when a record with several
+        phenotypes is published
+        """
+        with patch(
+            "gene2phenotype_app.views.autocomplete.update_autocomplete_index",
+            wraps=update_autocomplete_index,
+        ) as mock_update:
+            self.publish_record_with_phenotypes()
+
+        mock_update.assert_called_once()
+
+        updates = dict(mock_update.call_args.args[0])
+        phenotype_ids = LGDPhenotype.objects.filter(
+            lgd__stable_id__stable_id="G2P00017", is_deleted=0
+        ).values_list("phenotype_id", flat=True)
+        self.assertEqual(len(phenotype_ids), 3)
+        self.assertTrue(set(phenotype_ids) <= set(updates["phenotype"]))
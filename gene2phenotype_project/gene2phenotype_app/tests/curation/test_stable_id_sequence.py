@@ -0,0 +1,117 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase
+
+from gene2phenotype_app.models import G2PStableID, G2PStableIDSequence
+from gene2phenotype_app.serializers import G2PStableIDSerializer
+
+
+class G2PStableIDSequenceTest(TestCase):
+    """
+    Test the allocation of the G2P stable IDs
+    """
+
+    fixtures = ["gene2phenotype_app/fixtures/g2p_stable_id.json"]
+
+    def test_create_stable_id(self):
+        """
+        Test the sequence starts after the highest stable ID already used
+        """
+        G2PStableID.objects.filter(stable_id="G2P00003").delete()
+
+        stable_id = G2PStableIDSerializer.create_stable_id()
+        self.assertEqual(stable_id.stable_id, "G2P00017")
+        self.assertEqual(
+            G2PStableIDSerializer.create_stable_id().stable_id, "G2P00018"
+        )
+
+    def test_create_stable_ids(self):
+        """
+        Test a block of stable IDs is reserved in one update
+        """
+        stable_ids = G2PStableIDSerializer.create_stable_ids(3)
+        self.assertEqual(
+            [stable_id.stable_id for stable_id in stable_ids],
+            ["G2P00017", "G2P00018", "G2P00019"],
+        )
+        self.assertTrue(all(stable_id.pk for stable_id in stable_ids))
+
+        stable_id = G2PStableIDSerializer.create_stable_id()
+        self.assertEqual(stable_id.stable_id, "G2P00020")
+
+    def test_sequence_created_by_migration(self):
+        """
+        Test the counter row exists before the first stable ID is created
+        """
+        self.assertTrue(
+            G2PStableIDSequence.objects.filter(key=G2PStableIDSequence.G2P).exists()
+        )
+
+    def test_missing_sequence(self):
+        """
+        Test the counter row is created again if it is missing
+        """
+        G2PStableIDSequence.objects.all().delete()
+
+        self.assertEqual(G2PStableIDSequence.reserve(2), range(17, 19))
+        self.assertEqual(
+            G2PStableIDSequence.objects.get(key=G2PStableIDSequence.G2P).last_value, 18
+        )
+
+    def test_reserve_invalid_count(self):
+        with self.assertRaises(ValueError):
+            G2PStableIDSequence.reserve(0)
+
+
+class G2PStableIDSequenceConcurrencyTest(TransactionTestCase):
+    """
+    Test the stable IDs created by concurrent workers are unique
+    """
+
+    def allocate(self, count):
+        """
+        The in-memory SQLite test database locks the tables instead of waiting
+        for the other transactions (MySQL waits for the row lock). The failed
+        transaction is rolled back and its numbers are not used, it is retried.
+        """
+        while True:
+            try:
+                if count == 1:
+                    return [G2PStableIDSerializer.create_stable_id()]
+                return G2PStableIDSerializer.create_stable_ids(count)
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+
+    def create_stable_ids(self, worker):
+        try:
+            stable_ids = []
+            for i in range(10):
+                # Odd workers create one ID at a time, even workers reserve blocks
+                stable_ids.extend(self.allocate(1 if worker % 2 else 2))
+            return [stable_id.stable_id for stable_id in stable_ids]
+        finally:
+            connection.close()
+
+    def test_concurrent_workers(self):
+        # The on commit invalidation of the records can also find the SQLite
+        # tables locked, the errors are logged and ignored
+        logging.disable(logging.ERROR)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(self.create_stable_ids, range(8)))
+        finally:
+            logging.disable(logging.NOTSET)
+
+        stable_ids = [stable_id for result in results for stable_id in result]
+        self.assertEqual(len(stable_ids), 120)
+        self.assertEqual(
+            sorted(stable_ids),
+            [G2PStableIDSerializer.format_stable_id(n) for n in range(1, 121)],
+        )
+        self.assertEqual(
+            G2PStableIDSequence.objects.get(key=G2PStableIDSequence.G2P).last_value,
+            120,
+        )
@@ -163,6 +163,21 @@ class LGDUpdateCurationEndpoint(TestCase):
         # Check curation_data table
         curation_entries = CurationData.objects.filter(session_name="test session")
         self.assertEqual(len(curation_entries), 1)
+        curation_obj = curation_entries[0]
+        self.assertEqual(
+            curation_obj.disease_name, "CEP290-related bardet-biedl syndrome"
+        )
+        self.assertEqual(curation_obj.genotype, "biallelic_autosomal")
+        self.assertEqual(curation_obj.mechanism, "loss of function")
+        self.assertEqual(curation_obj.confidence, "limited")
+        self.assertEqual(
+            list(
+                curation_obj.curation_panels.values_list(
+                    "panel__description", flat=True
+                )
+            ),
+            ["Developmental disorders"],
+        )
 
         # Test history table
         history_records = CurationData.history.filter(stable_id__stable_id="G2P00004")
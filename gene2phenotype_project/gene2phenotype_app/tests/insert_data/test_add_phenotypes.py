@@ -28,6 +28,7 @@ class LGDEditPhenotypeEndpoint(TestCase):
         "gene2phenotype_app/fixtures/sequence.json",
         "gene2phenotype_app/fixtures/user_panels.json",
         "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/hpo_term.json",
         "gene2phenotype_app/fixtures/source.json",
         "gene2phenotype_app/fixtures/lgd_publication.json",
         "gene2phenotype_app/fixtures/lgd_phenotype.json",
@@ -14,9 +14,10 @@ from gene2phenotype_app.models import (
     LGDVariantTypeDescription,
     LGDMinedPublication,
 )
+from gene2phenotype_app.tests.stub_api import StubAPIServerMixin
 
 
-class LGDEditPublicationsEndpoint(TestCase):
+class LGDEditPublicationsEndpoint(StubAPIServerMixin, TestCase):
     """
     Test endpoint to add publications (+ associated data) to a LGD record
     """
@@ -45,6 +46,7 @@ class LGDEditPublicationsEndpoint(TestCase):
     ]
 
     def setUp(self):
+        super().setUp()
         self.url_add_publication = reverse(
             "lgd_publication", kwargs={"stable_id": "G2P00001"}
         )
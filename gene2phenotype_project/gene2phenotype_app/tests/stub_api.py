@@ -0,0 +1,136 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import override_settings
+
+from gene2phenotype_app.utils import hpo_terms
+
+
+"""
+Local server with the external APIs (EuropePMC and the HPO API), the tests that
+validate publications or phenotypes use it instead of the real APIs.
+"""
+
+PUBLICATIONS = {
+    "1234": {
+        "title": "Change in the kinetics of sulphacetamide tissue distribution in Walker tumor-bearing rats.",
+        "authorString": "Nadeau D, Marchand C.",
+        "pubYear": "1975",
+    },
+    "1235": {"title": "Publication 1235", "authorString": "A B.", "pubYear": "1980"},
+    "1236": {"title": "Publication 1236", "authorString": "C D.", "pubYear": "1981"},
+    "1237": {"title": "Publication 1237", "authorString": "E F.", "pubYear": "1982"},
+    "1": {
+        "title": "Formate assay in body fluids: application in methanol poisoning.",
+        "authorString": "Makar AB, McMartin KE, Palese M, Tephly TR.",
+        "pubYear": "1975",
+    },
+    "7866404": {
+        "title": "Autosomal dominant spondylarthropathy due to a type II procollagen gene (COL2A1) point mutation.",
+        "pubYear": "1994",
+    },
+    "32302040": {
+        "title": "CDH1-related blepharocheilodontic syndrome is associated with diffuse gastric cancer risk.",
+        "pubYear": "2020",
+    },
+}
+
+PHENOTYPES = {
+    "HP:0009726": {
+        "name": "Renal neoplasm",
+        "definition": "The presence of a neoplasm of the kidney.",
+    },
+    "HP:0010786": {"name": "Urinary tract neoplasm"},
+    "HP:0003549": {"name": "Abnormality of connective tissue"},
+}
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """
+    Local server with the EuropePMC and HPO API endpoints used by the app
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+
+        # Slow responses, the requests of a list of IDs overlap
+        time.sleep(0.1)
+
+        status, data = self.get_response()
+        with server.lock:
+            server.active -= 1
+
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_response(self):
+        match = re.match(r"^/europepmc/article/MED/(\w+)\?format=json$", self.path)
+        if match:
+            pmid = match.group(1)
+            if pmid == "500":
+                return 500, {"error": "Internal error"}
+            if pmid in PUBLICATIONS:
+                return 200, {"hitCount": 1, "result": PUBLICATIONS[pmid]}
+            return 200, {"hitCount": 0}
+
+        match = re.match(r"^/hpo/terms/(.+)$", self.path)
+        if match and not re.match(r"^HP:\d{7}$", match.group(1)):
+            return 400, {"error": "Invalid HPO ID"}
+        if match and match.group(1) in PHENOTYPES:
+            return 200, PHENOTYPES[match.group(1)]
+
+        return 404, {"error": "Not found"}
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubAPIServerMixin:
+    """
+    Starts the local server and points the EuropePMC and HPO API URLs to it
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+        cls.server.lock = threading.Lock()
+        cls.server_thread = threading.Thread(
+            target=cls.server.serve_forever, daemon=True
+        )
+        cls.server_thread.start()
+
+        url = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.settings_override = override_settings(
+            EUROPEPMC_URL=f"{url}/europepmc",
+            HPO_API_URL=f"{url}/hpo",
+            HPO_API_FALLBACK=True,
+            EXTERNAL_LOOKUP_RETRIES=1,
+            EXTERNAL_LOOKUP_BACKOFF=0,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.active = 0
+        self.server.max_active = 0
+        # The local HPO terms are empty, the phenotypes are fetched from the HPO API
+        hpo_terms.clear()
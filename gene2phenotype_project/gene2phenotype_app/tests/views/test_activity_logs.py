@@ -0,0 +1,160 @@
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from gene2phenotype_app.models import (
+    ActivityLog,
+    Disease,
+    LGDPanel,
+    LocusGenotypeDisease,
+    User,
+)
+from gene2phenotype_app.views.meta import (
+    create_activity_log,
+    get_activity_log_source,
+)
+
+
+class ActivityLogsTests(TestCase):
+    """
+    Test the activity logs endpoint: ActivityLogs
+    """
+
+    fixtures = [
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/cv_molecular_mechanism.json",
+        "gene2phenotype_app/fixtures/disease.json",
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/lgd_panel.json",
+        "gene2phenotype_app/fixtures/locus_genotype_disease.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/source.json",
+        "gene2phenotype_app/fixtures/user_panels.json",
+    ]
+
+    def setUp(self):
+        self.url_activity_logs = reverse("activity_logs")
+
+        user = User.objects.get(email="user5@test.ac.uk")
+        refresh = RefreshToken.for_user(user)
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE"]] = str(
+            refresh.access_token
+        )
+
+        # Create history for the record G2P00001
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        lgd_panel = LGDPanel.objects.filter(lgd=lgd_obj).first()
+        for i in range(25):
+            lgd_panel.is_deleted = (i + 1) % 2
+            lgd_panel.save()
+
+            # Saving the record without changes creates duplicated history rows
+            lgd_obj.save()
+            if i == 10:
+                lgd_obj.is_reviewed = 0
+                lgd_obj.save()
+
+    def get_all_pages(self, url):
+        """
+        Follows the 'next' links and returns the results of all pages.
+        """
+        results = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            results.extend(response.data["results"])
+            url = response.data["next"]
+        return results
+
+    def test_activity_logs_record(self):
+        """
+        Test the activity logs of a record are paginated with a cursor
+        and the duplicated record history is removed.
+        """
+        response = self.client.get(f"{self.url_activity_logs}?stable_id=G2P00001")
+
+        self.assertEqual(response.status_code, 200)
+        # 25 panel updates + 2 record updates
+        self.assertEqual(response.data["count"], 27)
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertIsNotNone(response.data["next"])
+
+        results = self.get_all_pages(f"{self.url_activity_logs}?stable_id=G2P00001")
+
+        self.assertEqual(len(results), 27)
+        self.assertEqual([log["data_type"] for log in results].count("record"), 2)
+        dates = [log["date"] for log in results]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_activity_logs_pages(self):
+        """
+        Test the pages of the activity logs are read with a single query.
+        """
+        response = self.client.get(self.url_activity_logs)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.data)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 7)
+        self.assertIsNone(response.data["next"])
+
+    def test_activity_logs_created(self):
+        """
+        Test the activity logs are created when the history is created
+        """
+        logs = ActivityLog.objects.filter(stable_id="G2P00001")
+        # 25 panel updates + 2 record updates (duplicates are not saved)
+        self.assertEqual(logs.count(), 27)
+        self.assertEqual(logs.filter(data_type="record").count(), 2)
+
+        panel_log = logs.filter(data_type="panel").latest("date")
+        self.assertEqual(panel_log.change_type, "updated")
+        self.assertEqual(
+            panel_log.value,
+            {"panel_name": "DD", "g2p_id": "G2P00001", "is_deleted": 1},
+        )
+
+    def test_activity_log_not_duplicated(self):
+        """
+        Test the activity log of a history row is only created once
+        """
+        history_instance = LGDPanel.history.latest("history_id")
+        logs = ActivityLog.objects.filter(
+            data_type="panel", history_id=history_instance.history_id
+        )
+        self.assertEqual(logs.count(), 1)
+
+        create_activity_log(get_activity_log_source(LGDPanel), history_instance)
+
+        self.assertEqual(logs.count(), 1)
+
+    def test_activity_logs_record_disease(self):
+        """
+        Test the activity logs of a record include the updates of its disease
+        """
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        disease_obj = Disease.objects.get(id=lgd_obj.disease_id)
+        disease_obj.name = "CEP290-related Joubert syndrome (updated)"
+        disease_obj.save()
+
+        response = self.client.get(f"{self.url_activity_logs}?stable_id=G2P00001")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 28)
+        self.assertEqual(response.data["results"][0]["data_type"], "disease")
+        self.assertEqual(
+            response.data["results"][0]["name"],
+            "CEP290-related Joubert syndrome (updated)",
+        )
+
+    def test_activity_logs_invalid_cursor(self):
+        """
+        Test the endpoint with an invalid cursor
+        """
+        response = self.client.get(f"{self.url_activity_logs}?cursor=abc")
+        self.assertEqual(response.status_code, 400)
@@ -3,6 +3,7 @@ from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 from gene2phenotype_app.models import Attrib, AttribType
+from gene2phenotype_app.views.reference_data import reference_data_cache
 
 
 class AttribTypeListTestEndpoint(TestCase):
@@ -10,6 +11,7 @@ class AttribTypeListTestEndpoint(TestCase):
 
     def setUp(self):
         self.url_attribtypelist = reverse("list_attrib_type")
+        reference_data_cache.clear()
 
     def test_attrib_type_list(self):
         response = self.client.get(self.url_attribtypelist)
@@ -17,10 +19,66 @@ class AttribTypeListTestEndpoint(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("confidence_category", response.data)
 
+    def test_attrib_type_list_cached(self):
+        """
+        Test the attribs are only fetched from the database in the first request
+        """
+        response = self.client.get(self.url_attribtypelist)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response_cached = self.client.get(self.url_attribtypelist)
+
+        self.assertEqual(response_cached.status_code, 200)
+        self.assertEqual(response_cached.data, response.data)
+
+    def test_attrib_type_list_not_modified(self):
+        """
+        Test the response is 304 Not Modified if the client has the same data (ETag)
+        """
+        response = self.client.get(self.url_attribtypelist)
+        etag = response.headers["ETag"]
+
+        response_not_modified = self.client.get(
+            self.url_attribtypelist, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response_not_modified.status_code, 304)
+        self.assertEqual(response_not_modified.content, b"")
+        self.assertEqual(response_not_modified.headers["ETag"], etag)
+
+        response_modified = self.client.get(
+            self.url_attribtypelist, headers={"If-None-Match": '"old"'}
+        )
+        self.assertEqual(response_modified.status_code, 200)
+
+    def test_attrib_type_list_updated(self):
+        """
+        Test the cached attribs are updated when an attrib is created
+        """
+        response = self.client.get(self.url_attribtypelist)
+        etag = response.headers["ETag"]
+        self.assertNotIn("very strong", response.data["confidence_category"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attrib.objects.create(
+                type=AttribType.objects.get(code="confidence_category"),
+                value="very strong",
+            )
+
+        response = self.client.get(
+            self.url_attribtypelist, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("very strong", response.data["confidence_category"])
+        self.assertNotEqual(response.headers["ETag"], etag)
+
 
 class AttribListTestEndpoint(TestCase):
     fixtures = ["gene2phenotype_app/fixtures/attribs.json"]
 
+    def setUp(self):
+        reference_data_cache.clear()
+
     def test_attrib_list_code(self):
         url_attriblist = reverse(
             "list_attribs_by_type", kwargs={"attrib_type": "confidence_category"}
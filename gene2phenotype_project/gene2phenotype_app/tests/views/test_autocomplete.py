@@ -0,0 +1,209 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+from gene2phenotype_app.models import DataVersion, Disease, DiseaseSynonym
+from gene2phenotype_app.views.autocomplete import PrefixIndex, autocomplete_index
+
+
+class AutocompleteTests(TestCase):
+    """
+    Test the autocomplete endpoint: Autocomplete
+    """
+
+    fixtures = [
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/cv_molecular_mechanism.json",
+        "gene2phenotype_app/fixtures/disease.json",
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/lgd_phenotype.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/locus_genotype_disease.json",
+        "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/publication.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/source.json",
+    ]
+
+    def setUp(self):
+        self.url_autocomplete = reverse("autocomplete")
+        # The index is kept in memory, generate it with the data of the test
+        autocomplete_index.clear()
+
+    def test_autocomplete_gene(self):
+        """
+        Test the autocomplete by gene symbol and gene synonym
+        """
+        response = self.client.get(f"{self.url_autocomplete}?q=cep&type=gene")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [{"name": "CEP290"}])
+
+        response = self.client.get(f"{self.url_autocomplete}?q=BBS")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"], [{"name": "CEP290", "synonym": "BBS14"}]
+        )
+
+    def test_autocomplete_disease(self):
+        """
+        Test the autocomplete by disease, matching the beginning of any word.
+        Matches in the beginning of the name are returned first.
+        """
+        response = self.client.get(f"{self.url_autocomplete}?q=Griscelli&type=disease")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            {"name": "STRA6-related Griscelli Type 2"}, response.data["results"]
+        )
+
+        response = self.client.get(f"{self.url_autocomplete}?q=cong&type=disease")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"][:2],
+            [
+                {"name": "Congenital ichthyosis type 1"},
+                {"name": "CONGENITAL DISORDERS OF GLYCOSYLATION"},
+            ],
+        )
+
+    def test_autocomplete_phenotype(self):
+        """
+        Test the autocomplete by phenotype term and accession.
+        Only phenotypes linked to records are returned.
+        """
+        response = self.client.get(f"{self.url_autocomplete}?q=neoplasm&type=phenotype")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"name": "Renal neoplasm", "accession": "HP:0009726"},
+                {"name": "Urinary tract neoplasm", "accession": "HP:0010786"},
+            ],
+        )
+
+        response = self.client.get(
+            f"{self.url_autocomplete}?q=HP:0009726&type=phenotype"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [{"name": "Renal neoplasm", "accession": "HP:0009726"}],
+        )
+
+    def test_autocomplete_limit(self):
+        """
+        Test the maximum number of results
+        """
+        response = self.client.get(f"{self.url_autocomplete}?q=a&type=disease&limit=1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+
+    def test_autocomplete_updated(self):
+        """
+        Test the index is updated after the data is updated
+        """
+        response = self.client.get(f"{self.url_autocomplete}?q=cerebello&type=disease")
+        self.assertEqual(response.data["count"], 0)
+
+        disease = Disease.objects.get(name="CEP290-related JOUBERT SYNDROME TYPE 5")
+        with self.captureOnCommitCallbacks(execute=True):
+            synonym = DiseaseSynonym.objects.create(
+                disease=disease, synonym="Cerebellooculorenal syndrome"
+            )
+
+        response = self.client.get(f"{self.url_autocomplete}?q=cerebello&type=disease")
+        self.assertEqual(
+            response.data["results"],
+            [
+                {
+                    "name": "CEP290-related JOUBERT SYNDROME TYPE 5",
+                    "synonym": "Cerebellooculorenal syndrome",
+                }
+            ],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            synonym.delete()
+
+        response = self.client.get(f"{self.url_autocomplete}?q=cerebello&type=disease")
+        self.assertEqual(response.data["count"], 0)
+
+    def test_autocomplete_data_version(self):
+        """
+        Test the process that updated the index saves the new data version,
+        updates done by other processes generate the index in the background
+        """
+        self.client.get(f"{self.url_autocomplete}?q=cep&type=gene")
+        self.assertEqual(autocomplete_index.data_version, 0)
+
+        disease = Disease.objects.get(name="CEP290-related JOUBERT SYNDROME TYPE 5")
+        with self.captureOnCommitCallbacks(execute=True):
+            DiseaseSynonym.objects.create(
+                disease=disease, synonym="Cerebellooculorenal syndrome"
+            )
+        self.assertEqual(DataVersion.get_version(DataVersion.AUTOCOMPLETE), 1)
+        self.assertEqual(autocomplete_index.data_version, 1)
+
+        with patch.object(autocomplete_index, "schedule_refresh") as schedule_refresh:
+            autocomplete_index.last_check = 0
+            autocomplete_index.check_data_version()
+            schedule_refresh.assert_not_called()
+
+            # Update done by another process
+            DataVersion.increment(DataVersion.AUTOCOMPLETE)
+            autocomplete_index.last_check = 0
+            response = self.client.get(f"{self.url_autocomplete}?q=cep&type=gene")
+            schedule_refresh.assert_called_once()
+
+        # The current index is used until the new index is ready
+        self.assertEqual(response.data["results"], [{"name": "CEP290"}])
+
+    def test_prefix_index_load(self):
+        """
+        Test the index loaded with all the entries is the same as adding them
+        """
+        entries = [
+            (("disease", 1), ["joubert syndrome", "syndrome"], {"name": "Joubert"}),
+            (("disease", 2), ["marfan syndrome", "syndrome"], {"name": "Marfan"}),
+            (("disease", 3), ["syndrome", "syndrome"], {"name": "syndrome"}),
+        ]
+        loaded_index = PrefixIndex()
+        loaded_index.load(entries)
+        index = PrefixIndex()
+        for entry_id, keys, data in reversed(entries):
+            index.add(entry_id, keys, data)
+
+        self.assertEqual(loaded_index.keys, index.keys)
+        self.assertEqual(len(loaded_index), 3)
+        self.assertEqual(
+            [data["name"] for data in loaded_index.search("synd", 10)],
+            ["syndrome", "Marfan", "Joubert"],
+        )
+
+    def test_autocomplete_invalid_type(self):
+        """
+        Test the endpoint with an invalid type
+        """
+        response = self.client.get(f"{self.url_autocomplete}?q=cep&type=panel")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"],
+            "Invalid type 'panel'. Valid types are: gene, disease, phenotype",
+        )
+
+    def test_autocomplete_without_query(self):
+        """
+        Test the endpoint without the query text
+        """
+        response = self.client.get(f"{self.url_autocomplete}?type=gene")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Query parameter 'q' is required")
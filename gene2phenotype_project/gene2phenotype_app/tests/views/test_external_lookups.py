@@ -0,0 +1,357 @@
+import datetime
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from gene2phenotype_app.models import (
+    CurationData,
+    ExternalLookupCache,
+    LGDPhenotype,
+    LocusGenotypeDisease,
+    User,
+)
+
+from gene2phenotype_app.tests.stub_api import StubAPIServerMixin
+
+
+class ExternalLookupsTests(StubAPIServerMixin, TestCase):
+    """
+    Test the publication and phenotype endpoints with a local server:
+    PublicationDetail and PhenotypeDetail
+    """
+
+    fixtures = [
+        "gene2phenotype_app/fixtures/publication.json",
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/source.json",
+    ]
+
+    def test_publications_fetched_concurrently(self):
+        """
+        Test the PMIDs not found in G2P are fetched from EuropePMC concurrently
+        """
+        url = reverse(
+            "publication_details", kwargs={"pmids": "3897232,1234,1235,1236,1237"}
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(
+            [(item["pmid"], item["source"]) for item in response.data["results"]],
+            [
+                (3897232, "G2P"),
+                (1234, "EuropePMC"),
+                (1235, "EuropePMC"),
+                (1236, "EuropePMC"),
+                (1237, "EuropePMC"),
+            ],
+        )
+        self.assertEqual(response.data["results"][1]["year"], 1975)
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertGreater(self.server.max_active, 1)
+
+    def test_publications_cached(self):
+        """
+        Test the EuropePMC responses are saved and used by the next requests
+        """
+        url = reverse("publication_details", kwargs={"pmids": "1234,1235"})
+        self.client.get(url)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(
+            ExternalLookupCache.objects.filter(
+                source=ExternalLookupCache.SOURCE_EUROPEPMC
+            ).count(),
+            2,
+        )
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_publications_cache_expired(self):
+        """
+        Test the saved responses older than EXTERNAL_LOOKUP_CACHE_TTL are fetched again
+        """
+        url = reverse("publication_details", kwargs={"pmids": "1234"})
+        self.client.get(url)
+
+        ExternalLookupCache.objects.update(
+            date_update=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_publication_not_found(self):
+        """
+        Test the PMIDs not found in EuropePMC are invalid, the response is also saved
+        """
+        url = reverse("publication_details", kwargs={"pmids": "1234,9999,abc"})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data["error"], "Invalid PMID(s): 9999, abc")
+
+        self.client.get(url)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_publication_not_found_expired(self):
+        """
+        Test the PMIDs not found are fetched again after
+        EXTERNAL_LOOKUP_NOT_FOUND_CACHE_TTL, the valid PMIDs are still saved
+        """
+        url = reverse("publication_details", kwargs={"pmids": "1234,9999"})
+        self.client.get(url)
+
+        date_update = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            seconds=settings.EXTERNAL_LOOKUP_NOT_FOUND_CACHE_TTL + 60
+        )
+        ExternalLookupCache.objects.update(date_update=date_update)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            sorted(self.server.requests),
+            [
+                "/europepmc/article/MED/1234?format=json",
+                "/europepmc/article/MED/9999?format=json",
+                "/europepmc/article/MED/9999?format=json",
+            ],
+        )
+
+    def test_publication_api_error(self):
+        """
+        Test the failed requests are retried and the error is not saved
+        """
+        url = reverse("publication_details", kwargs={"pmids": "500"})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.data["error"], "Could not fetch the publications from EuropePMC"
+        )
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertFalse(ExternalLookupCache.objects.exists())
+
+    def test_phenotypes(self):
+        """
+        Test the phenotypes not found in the local HPO terms are fetched from
+        the HPO API and saved
+        """
+        url = reverse(
+            "phenotype_details", kwargs={"hpo_list": "HP:0009726,HP:0010786"}
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.data["results"]),
+            [
+                {
+                    "accession": "HP:0009726",
+                    "term": "Renal neoplasm",
+                    "description": "The presence of a neoplasm of the kidney.",
+                },
+                {
+                    "accession": "HP:0010786",
+                    "term": "Urinary tract neoplasm",
+                    "description": None,
+                },
+            ],
+        )
+
+        self.client.get(url)
+        self.assertEqual(len(self.server.requests), 2)
+
+    @override_settings(HPO_API_FALLBACK=False)
+    def test_phenotypes_empty_hpo_terms(self):
+        """
+        Test the HPO API is queried while the table hpo_term is empty, even if
+        HPO_API_FALLBACK is disabled
+        """
+        url = reverse("phenotype_details", kwargs={"hpo_list": "HP:0009726"})
+        with self.assertLogs("gene2phenotype_app.utils.phenotype_utils", "WARNING"):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["term"], "Renal neoplasm")
+        self.assertEqual(self.server.requests, ["/hpo/terms/HP:0009726"])
+
+    def test_phenotype_not_found(self):
+        """
+        Test the HPO IDs not found in the HPO API are invalid, the response
+        of an invalid ID (bad request) is not saved
+        """
+        url = reverse(
+            "phenotype_details", kwargs={"hpo_list": "HP:0009726,HP:0000000,HPO:1"}
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            response.data["error"], "Invalid HPO term(s): HP:0000000, HPO:1"
+        )
+        self.assertEqual(
+            ExternalLookupCache.objects.get(key="HP:0000000").data, None
+        )
+        # The bad requests are not saved
+        self.assertFalse(ExternalLookupCache.objects.filter(key="HPO:1").exists())
+
+
+class PublishExternalLookupsTests(StubAPIServerMixin, TestCase):
+    """
+    Test the external data of a curation draft is fetched before the record
+    is published (PublishRecord)
+    """
+
+    fixtures = [
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/user_panels.json",
+        "gene2phenotype_app/fixtures/auth_groups.json",
+        "gene2phenotype_app/fixtures/curation_data.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/source.json",
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/cv_molecular_mechanism.json",
+        "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/locus_genotype_disease.json",
+        "gene2phenotype_app/fixtures/disease.json",
+        "gene2phenotype_app/fixtures/disease_external.json",
+        "gene2phenotype_app/fixtures/gene_disease.json",
+    ]
+
+    def login_user(self):
+        user = User.objects.get(email="user5@test.ac.uk")
+        refresh = RefreshToken.for_user(user)
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE"]] = str(
+            refresh.access_token
+        )
+
+    def add_draft(self, pmids):
+        """
+        Saves a curation draft with the publications and returns its G2P ID
+        """
+        json_data = {
+            "allelic_requirement": "monoallelic_Y_hemizygous",
+            "confidence": "limited",
+            "cross_cutting_modifier": [],
+            "disease": {
+                "cross_references": [],
+                "disease_name": "SRY-related 46,xx sex reversal",
+            },
+            "locus": "SRY",
+            "mechanism_evidence": [],
+            "mechanism_synopsis": [],
+            "molecular_mechanism": {"name": "loss of function", "support": "evidence"},
+            "panels": ["Developmental disorders"],
+            "phenotypes": [
+                {
+                    "hpo_terms": [
+                        {"accession": "HP:0009726", "description": "", "term": ""},
+                        {"accession": "HP:0010786", "description": "", "term": ""},
+                    ],
+                    "pmid": pmids[0],
+                    "summary": "",
+                }
+            ],
+            "private_comment": "",
+            "public_comment": "",
+            "publications": [
+                {
+                    "affectedIndividuals": 1,
+                    "ancestries": "",
+                    "authors": "",
+                    "comment": "",
+                    "consanguineous": "unknown",
+                    "families": 1,
+                    "pmid": pmid,
+                    "source": "G2P",
+                    "title": "",
+                    "year": 2000,
+                }
+                for pmid in pmids
+            ],
+            "session_name": "publish external data",
+            "variant_consequences": [
+                {
+                    "support": "inferred",
+                    "variant_consequence": "decreased_gene_product_level",
+                }
+            ],
+            "variant_descriptions": [],
+            "variant_types": [],
+        }
+        response = self.client.post(
+            reverse("add_curation_data"),
+            {"json_data": json_data},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        return response.json()["result"]
+
+    def test_publish_fetches_external_data(self):
+        """
+        Test the publications and the phenotypes are fetched concurrently
+        before the record is published
+        """
+        self.login_user()
+        stable_id = self.add_draft(["1234", "1235"])
+
+        url = reverse("publish_record", kwargs={"stable_id": stable_id})
+        with self.assertLogs("gene2phenotype_app.views.curation", level="INFO") as logs:
+            response = self.client.post(url, content_type="application/json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            sorted(self.server.requests),
+            [
+                "/europepmc/article/MED/1234?format=json",
+                "/europepmc/article/MED/1235?format=json",
+                "/hpo/terms/HP:0009726",
+                "/hpo/terms/HP:0010786",
+            ],
+        )
+        # The requests of both APIs overlap
+        self.assertGreater(self.server.max_active, 2)
+        self.assertIn(
+            f"Record '{stable_id}' published, transaction time:", logs.output[0]
+        )
+
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id=stable_id)
+        self.assertEqual(
+            set(
+                LGDPhenotype.objects.filter(lgd=lgd_obj).values_list(
+                    "phenotype__accession", flat=True
+                )
+            ),
+            {"HP:0009726", "HP:0010786"},
+        )
+        self.assertFalse(CurationData.objects.filter(stable_id=lgd_obj.stable_id))
+
+    def test_publish_invalid_pmid(self):
+        """
+        Test the record is not published if a PMID is not found in EuropePMC
+        """
+        self.login_user()
+        stable_id = self.add_draft(["1234", "9999"])
+
+        url = reverse("publish_record", kwargs={"stable_id": stable_id})
+        response = self.client.post(url, content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Invalid PMID 9999")
+        self.assertFalse(
+            LocusGenotypeDisease.objects.filter(
+                stable_id__stable_id=stable_id
+            ).exists()
+        )
+        self.assertTrue(
+            CurationData.objects.filter(stable_id__stable_id=stable_id).exists()
+        )
@@ -1,7 +1,10 @@
+from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase
 from django.urls import reverse
 
-from gene2phenotype_app.models import LGDVariantGenccConsequence
+from gene2phenotype_app.models import Attrib, LGDVariantGenccConsequence, Locus
+from gene2phenotype_app.serializers import LocusGeneSerializer
+from gene2phenotype_app.utils import get_avoided_queries, vocabulary
 
 
 class GeneEndpointTests(TestCase):
@@ -37,6 +40,41 @@ class GeneEndpointTests(TestCase):
         expected_data_synonyms = ["BBS14", "CT87"]
         self.assertCountEqual(response.data["synonyms"], expected_data_synonyms)
 
+    def test_get_gene_vocabulary_registry(self):
+        """
+        Test the attrib lookups of the gene endpoint do not query the database
+        after the vocabularies are loaded
+        """
+        vocabulary.clear()
+        response = self.client.get(self.url_gene)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_avoided_queries(), 1)
+
+        response = self.client.get(self.url_gene)
+        self.assertEqual(response.status_code, 200)
+        # locus_type 'gene' and gene_synonym
+        self.assertEqual(get_avoided_queries(), 2)
+
+    def test_vocabulary_registry_lookups(self):
+        """
+        Test the vocabulary registry lookups
+        """
+        vocabulary.clear()
+        gene_attrib = vocabulary.get_attrib("locus_type", "gene")
+        self.assertEqual(gene_attrib, Attrib.objects.get(value="gene"))
+        self.assertEqual(vocabulary.get_attrib("LOCUS_TYPE", "Gene"), gene_attrib)
+
+        with self.assertRaises(Attrib.DoesNotExist):
+            vocabulary.get_attrib("locus_type", "new_type")
+
+        # The registry is cleared when the attribs are updated
+        with self.captureOnCommitCallbacks(execute=True):
+            Attrib.objects.create(type=gene_attrib.type, value="new_type")
+
+        self.assertEqual(
+            vocabulary.get_attrib("locus_type", "new_type").value, "new_type"
+        )
+
 
 class GeneSummaryEndpointTests(TestCase):
     """
@@ -141,6 +179,20 @@ class GeneSummaryEndpointTests(TestCase):
             record["variant_type"], ["inframe_insertion", "intron_variant"]
         )
 
+    def test_get_summary_number_of_queries(self):
+        """
+        Test the summary is built with one query for the records and one query
+        for each type of related data (panels, variant consequences and variant types)
+        """
+        locus = Locus.objects.get(name="RAB27A")
+
+        with self.assertNumQueries(4):
+            summary = LocusGeneSerializer.records_summary(locus, AnonymousUser())
+
+        self.assertEqual(
+            [record["stable_id"] for record in summary], ["G2P00006", "G2P00002"]
+        )
+
 
 class GeneFunctionEndpointTests(TestCase):
     """
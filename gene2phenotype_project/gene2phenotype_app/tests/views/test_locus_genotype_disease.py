@@ -1,9 +1,24 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.renderers import JSONRenderer
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from gene2phenotype_app.models import LGDPanel, User
+from gene2phenotype_app.models import (
+    Attrib,
+    LGDPanel,
+    LGDRecordSummary,
+    LocusGenotypeDisease,
+    User,
+)
+from gene2phenotype_app.serializers import (
+    LocusGenotypeDiseaseSerializer,
+    build_lgd_summary,
+    save_lgd_summaries,
+)
 
 
 class LocusGenotypeDiseaseDetailEndpoint(TestCase):
@@ -363,3 +378,214 @@ class LocusGenotypeDiseaseDetailEndpoint(TestCase):
             inframe_insertion["inherited"],
             False,
         )
+
+    def test_lgd_detail_number_of_queries(self):
+        """
+        Test the number of queries used to display a record.
+        The record data is loaded by the prefetch plan: the number of queries
+        does not depend on the amount of data linked to the record.
+        The nested data (publication comments, variant type publications and comments)
+        is only queried if the record has publications or variant types.
+        """
+        with self.assertNumQueries(21):
+            response = self.client.get(self.url_list_lgd)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(23):
+            response = self.client.get(self.url_list_lgd_2)
+        self.assertEqual(response.status_code, 200)
+
+    def test_lgd_detail_authenticated_number_of_queries(self):
+        """
+        Test the number of queries used to display a record for authenticated users.
+        """
+        user = User.objects.get(email="user5@test.ac.uk")
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE"]] = access_token
+
+        with self.assertNumQueries(23):
+            response = self.client.get(self.url_list_lgd)
+        self.assertEqual(response.status_code, 200)
+
+    def test_prefetch_queryset(self):
+        """
+        Test the serializer returns the same data with and without the prefetch plan.
+        """
+        user = User.objects.get(email="user5@test.ac.uk")
+        queryset = LocusGenotypeDisease.objects.filter(is_deleted=0).order_by("id")
+        prefetched_queryset = LocusGenotypeDiseaseSerializer.prefetch_queryset(
+            queryset
+        )
+
+        for context_user in [AnonymousUser(), user]:
+            context = {"user": context_user}
+            for lgd_obj, prefetched_lgd_obj in zip(queryset, prefetched_queryset):
+                self.assertEqual(
+                    JSONRenderer().render(
+                        LocusGenotypeDiseaseSerializer(
+                            prefetched_lgd_obj, context=context
+                        ).data
+                    ),
+                    JSONRenderer().render(
+                        LocusGenotypeDiseaseSerializer(lgd_obj, context=context).data
+                    ),
+                )
+
+
+    def test_lgd_detail_stored_summary(self):
+        """
+        Test the record summary is read from the table lgd_record_summary
+        and it is generated when the stored summary is out of date.
+        """
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        LGDRecordSummary.objects.create(
+            lgd=lgd_obj,
+            summary="Stored summary",
+            is_stale=False,
+            date_update=lgd_obj.date_review,
+        )
+
+        response = self.client.get(self.url_list_lgd)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["summary"], "Stored summary")
+
+        LGDRecordSummary.objects.filter(lgd=lgd_obj).update(is_stale=True)
+
+        response = self.client.get(self.url_list_lgd)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["summary"], build_lgd_summary(lgd_obj))
+
+    def test_lgd_summary_refresh(self):
+        """
+        Test the stored summary is refreshed after the record data is updated.
+        """
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        save_lgd_summaries(LocusGenotypeDisease.objects.filter(id=lgd_obj.id))
+        self.assertEqual(
+            LGDRecordSummary.objects.get(lgd=lgd_obj).summary,
+            build_lgd_summary(lgd_obj),
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lgd_obj.confidence = Attrib.objects.get(value="limited")
+            lgd_obj.save()
+            # The summary is out of date until the transaction is committed
+            self.assertTrue(LGDRecordSummary.objects.get(lgd=lgd_obj).is_stale)
+
+        record_summary = LGDRecordSummary.objects.get(lgd=lgd_obj)
+        self.assertFalse(record_summary.is_stale)
+        self.assertIn("limited", record_summary.summary)
+        self.assertEqual(record_summary.summary, build_lgd_summary(lgd_obj))
+
+
+class LocusGenotypeDiseaseBatchEndpoint(TestCase):
+    """
+    Test endpoint that returns a list of locus genotype disease records
+    """
+
+    fixtures = LocusGenotypeDiseaseDetailEndpoint.fixtures
+
+    def setUp(self):
+        self.url_batch = reverse("lgd_batch")
+        self.stable_ids = [
+            "G2P00001",
+            "G2P00002",
+            "G2P00003",  # deleted
+            "G2P00007",  # merged
+            "G2P00000",  # invalid
+            "G2P00005",  # only in non-visible panel
+        ]
+
+    def login(self):
+        user = User.objects.get(email="user5@test.ac.uk")
+        refresh = RefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE"]] = access_token
+
+    def test_lgd_batch(self):
+        """
+        Test each result is the same as the response of the detail endpoint
+        """
+        response = self.client.post(
+            self.url_batch, {"stable_ids": self.stable_ids}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], len(self.stable_ids))
+
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["stable_id"] for result in results], self.stable_ids
+        )
+        self.assertEqual(
+            [result["status"] for result in results], [200, 200, 410, 410, 404, 404]
+        )
+        for result in results:
+            response_detail = self.client.get(
+                reverse("lgd", kwargs={"stable_id": result["stable_id"]})
+            )
+            self.assertEqual(result["status"], response_detail.status_code)
+            self.assertEqual(result["data"], response_detail.json())
+
+    def test_lgd_batch_authenticated(self):
+        """
+        Test authenticated users have access to records in non-visible panels
+        """
+        self.login()
+        response = self.client.post(
+            self.url_batch, {"stable_ids": self.stable_ids}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["status"] for result in results], [200, 200, 410, 410, 404, 200]
+        )
+        response_detail = self.client.get(reverse("lgd", kwargs={"stable_id": "G2P00005"}))
+        self.assertEqual(results[5]["data"], response_detail.json())
+
+    def test_lgd_batch_number_of_queries(self):
+        """
+        Test the number of queries does not depend on the number of records
+        """
+        with CaptureQueriesContext(connection) as single_record_queries:
+            self.client.post(
+                self.url_batch, {"stable_ids": ["G2P00002"]}, content_type="application/json"
+            )
+
+        with CaptureQueriesContext(connection) as batch_queries:
+            response = self.client.post(
+                self.url_batch,
+                {"stable_ids": self.stable_ids},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(batch_queries), len(single_record_queries))
+
+    def test_lgd_batch_invalid_input(self):
+        """
+        Test calling the endpoint without a list of stable IDs
+        """
+        response = self.client.post(
+            self.url_batch, {"stable_ids": "G2P00001"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"],
+            "Please provide a list of G2P stable IDs in 'stable_ids'",
+        )
+
+    @override_settings(LGD_BATCH_MAX_SIZE=2)
+    def test_lgd_batch_too_many_ids(self):
+        """
+        Test calling the endpoint with more stable IDs than allowed
+        """
+        response = self.client.post(
+            self.url_batch, {"stable_ids": self.stable_ids}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"],
+            "Too many stable IDs. The maximum number of IDs is 2",
+        )
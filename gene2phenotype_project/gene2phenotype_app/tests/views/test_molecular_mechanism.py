@@ -1,6 +1,8 @@
 from django.test import TestCase
 from django.urls import reverse
 
+from gene2phenotype_app.views.reference_data import reference_data_cache
+
 
 class ListMolecularMechanismsEndpoint(TestCase):
     """
@@ -11,6 +13,7 @@ class ListMolecularMechanismsEndpoint(TestCase):
 
     def setUp(self):
         self.url_list_mechanisms = reverse("list_mechanisms")
+        reference_data_cache.clear()
 
     def test_mechanism_list(self):
         """
@@ -1,10 +1,24 @@
 import csv
+import gzip
+import shutil
+import tempfile
 from io import StringIO
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.conf import settings
+from django.db import transaction
 from django.urls import reverse
 import datetime
-from gene2phenotype_app.models import LGDVariantGenccConsequence, User
+from gene2phenotype_app.models import (
+    Attrib,
+    DataVersion,
+    LGDVariantGenccConsequence,
+    LocusGenotypeDisease,
+    Panel,
+    PanelStats,
+    User,
+)
+from gene2phenotype_app.serializers.records_summary import get_records_summary
+from gene2phenotype_app.views.panel import write_panel_snapshots
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
@@ -88,6 +102,74 @@ class PanelDetailsEndpointTests(TestCase):
         }
         self.assertEqual(response.data, expected_data)
 
+    def test_panel_stats_updated(self):
+        """
+        Test the stored panel stats are calculated again after the records are updated.
+        """
+        url_panel_dd = reverse("panel_details", kwargs={"name": "DD"})
+        response = self.client.get(url_panel_dd)
+        self.assertEqual(response.data["stats"]["by_confidence"], {"definitive": 1})
+        self.assertEqual(PanelStats.objects.get(panel__name="DD").total_records, 1)
+
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        lgd_obj.confidence = Attrib.objects.get(value="limited")
+        # The stats are deleted after the transaction is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            lgd_obj.save()
+
+        response = self.client.get(url_panel_dd)
+        self.assertEqual(response.data["stats"]["by_confidence"], {"limited": 1})
+        self.assertEqual(
+            PanelStats.objects.get(panel__name="DD").by_confidence, {"limited": 1}
+        )
+
+    def test_panel_stats_previous_version(self):
+        """
+        Test the stats saved for a previous version of the records of the panel
+        (ex: calculated while the records were being updated) are not used.
+        """
+        url_panel_dd = reverse("panel_details", kwargs={"name": "DD"})
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        with self.captureOnCommitCallbacks(execute=True):
+            lgd_obj.save()
+
+        # Stats saved after the invalidation, calculated with the previous data
+        PanelStats.objects.create(
+            panel=Panel.objects.get(name="DD"),
+            data_version=0,
+            total_records=10,
+            date_update=datetime.datetime.now(datetime.timezone.utc),
+        )
+
+        response = self.client.get(url_panel_dd)
+        self.assertEqual(response.data["stats"]["total_records"], 1)
+        self.assertEqual(PanelStats.objects.get(panel__name="DD").data_version, 1)
+
+    def test_panel_list_number_of_queries(self):
+        """
+        Test the panel list uses the stored stats.
+        The number of queries does not depend on the number of panels.
+        """
+        url_panels = reverse("list_panels")
+        response = self.client.get(url_panels)
+        self.assertEqual(response.status_code, 200)
+
+        # Queries to fetch the panels with their stats and the versions of the panels
+        with self.assertNumQueries(2):
+            response = self.client.get(url_panels)
+        self.assertEqual(response.status_code, 200)
+
+        panels = {panel["name"]: panel for panel in response.data["results"]}
+        self.assertEqual(
+            panels["DD"]["stats"],
+            {
+                "total_records": 1,
+                "total_genes": 1,
+                "by_confidence": {"definitive": 1},
+            },
+        )
+        self.assertEqual(panels["DD"]["last_updated"], datetime.date(2017, 4, 24))
+
     def test_panel_no_permission(self):
         """
         Returns code 401 for non-authenticated users when accessing a non-visible panel.
@@ -154,6 +236,30 @@ class PanelSummaryEndpointTests(TestCase):
         self.assertEqual(len(list(records_summary)[0]["variant_type"]), 2)
         self.assertEqual(len(list(records_summary)[0]["variant_consequence"]), 1)
 
+    def test_panel_summary_last_records(self):
+        """
+        Test the summary only returns the last updated records, with one
+        query for the records and one query for each type of related data.
+        """
+        queryset = LocusGenotypeDisease.objects.filter(
+            is_deleted=0, lgdpanel__panel__name="Eye", lgdpanel__is_deleted=0
+        )
+
+        with self.assertNumQueries(2):
+            summary = get_records_summary(
+                queryset, ["stable_id", "last_updated", "variant_type"], limit=2
+            )
+
+        all_records = get_records_summary(queryset, ["stable_id", "last_updated"])
+        self.assertGreater(len(all_records), 2)
+        self.assertEqual(
+            [record["stable_id"] for record in summary],
+            [record["stable_id"] for record in all_records[:2]],
+        )
+        self.assertGreaterEqual(
+            summary[0]["last_updated"], summary[1]["last_updated"]
+        )
+
     def test_get_panel_summary_with_only_deleted_variant_consequence(self):
         """
         Records with only deleted variant consequences should still be returned.
@@ -221,7 +327,7 @@ class PanelDownloadEndpointTests(TestCase):
         self.assertTrue(content_disposition.startswith("attachment"))
         self.assertIn("filename=", content_disposition)
 
-        content = response.content.decode("utf-8")
+        content = response.getvalue().decode("utf-8")
         csv_reader = csv.reader(StringIO(content))
         rows = list(csv_reader)
 
@@ -273,7 +379,7 @@ class PanelDownloadEndpointTests(TestCase):
         self.assertTrue(content_disposition.startswith("attachment"))
         self.assertIn("filename=", content_disposition)
 
-        content = response.content.decode("utf-8")
+        content = response.getvalue().decode("utf-8")
         csv_reader = csv.reader(StringIO(content))
         rows = list(csv_reader)
 
@@ -336,7 +442,7 @@ class PanelDownloadEndpointTests(TestCase):
         self.assertTrue(content_disposition.startswith("attachment"))
         self.assertIn("filename=", content_disposition)
 
-        content = response.content.decode("utf-8")
+        content = response.getvalue().decode("utf-8")
         csv_reader = csv.reader(StringIO(content))
         rows = list(csv_reader)
 
@@ -396,3 +502,226 @@ class PanelDownloadEndpointTests(TestCase):
             row[17].split("; "), ["HP:0003549", "HP:0010786", "HP:0033127"]
         )
         self.assertCountEqual(row[18].split("; "), ["12451214", "15214012"])
+
+    def test_download_streamed_in_chunks(self):
+        """
+        Download all visible panels reading one record at a time.
+        The file content should be the same as the content of a single chunk download.
+        """
+        url_panel = reverse("panel_download", kwargs={"name": "all"})
+        response = self.client.get(url_panel)
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(StringIO(response.getvalue().decode("utf-8"))))
+
+        with override_settings(PANEL_DOWNLOAD_CHUNK_SIZE=1):
+            response_chunks = self.client.get(url_panel)
+
+        self.assertEqual(response_chunks.status_code, 200)
+        self.assertTrue(response_chunks.streaming)
+        rows_chunks = list(
+            csv.reader(StringIO(response_chunks.getvalue().decode("utf-8")))
+        )
+        self.assertEqual(len(rows_chunks), 6)
+        self.assertEqual(rows_chunks, rows)
+
+    def test_download_compressed_file(self):
+        """
+        Download a visible panel as a compressed file (format=csv.gz).
+        """
+        url_panel = reverse("panel_download", kwargs={"name": "DD"})
+        response = self.client.get(url_panel)
+        response_gz = self.client.get(f"{url_panel}?format=csv.gz")
+
+        self.assertEqual(response_gz.status_code, 200)
+        self.assertEqual(response_gz["Content-Type"], "application/gzip")
+        self.assertNotIn("Content-Encoding", response_gz)
+        self.assertTrue(response_gz["Content-Disposition"].endswith('.csv.gz"'))
+        self.assertEqual(
+            gzip.decompress(response_gz.getvalue()), response.getvalue()
+        )
+
+    def test_download_gzip_encoding(self):
+        """
+        The streamed file is compressed when the client accepts gzip.
+        """
+        url_panel = reverse("panel_download", kwargs={"name": "all"})
+        response = self.client.get(url_panel)
+        response_gzip = self.client.get(url_panel, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response_gzip.status_code, 200)
+        self.assertTrue(response_gzip.streaming)
+        self.assertEqual(response_gzip["Content-Type"], "text/csv")
+        self.assertEqual(response_gzip["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(response_gzip.getvalue()), response.getvalue()
+        )
+
+    def test_download_invalid_panel(self):
+        """
+        Download an invalid panel returns 404 before streaming any data.
+        """
+        url_panel = reverse("panel_download", kwargs={"name": "Ears"})
+        response = self.client.get(url_panel)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.streaming)
+
+
+class PanelDownloadSnapshotTests(TestCase):
+    """
+    Test the panel download endpoint using precomputed files: PanelDownload
+    """
+
+    fixtures = PanelDownloadEndpointTests.fixtures
+
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            PANEL_DOWNLOAD_SNAPSHOT_DIR=self.snapshot_dir
+        )
+        self.settings_override.enable()
+        self.url_panel = reverse("panel_download", kwargs={"name": "all"})
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.snapshot_dir)
+
+    def get_live_content(self):
+        with override_settings(PANEL_DOWNLOAD_SNAPSHOT_DIR=None):
+            response = self.client.get(self.url_panel)
+        return response.getvalue()
+
+    def test_download_snapshot(self):
+        """
+        Download all visible panels from the precomputed file.
+        The content should be the same as the file generated on request.
+        """
+        live_content = self.get_live_content()
+        created = write_panel_snapshots()
+        self.assertIn("all_public", created)
+        self.assertIn("DD_public", created)
+        self.assertIn("DD_authenticated", created)
+        # Non-visible panels are only available to authenticated users
+        self.assertNotIn("Demo_public", created)
+
+        response = self.client.get(self.url_panel)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertTrue(response["Content-Disposition"].startswith("attachment"))
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        self.assertEqual(response.getvalue(), live_content)
+
+    def test_download_snapshot_gzip(self):
+        """
+        Clients that accept gzip get the compressed file.
+        """
+        live_content = self.get_live_content()
+        write_panel_snapshots()
+
+        response = self.client.get(self.url_panel, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.getvalue()), live_content)
+
+    def test_download_snapshot_compressed_file(self):
+        """
+        Download the precomputed compressed file (format=csv.gz).
+        """
+        live_content = self.get_live_content()
+        write_panel_snapshots()
+
+        response = self.client.get(f"{self.url_panel}?format=csv.gz")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(gzip.decompress(response.getvalue()), live_content)
+
+    def test_download_snapshot_not_modified(self):
+        """
+        Conditional requests return 304 if the file was not updated.
+        """
+        write_panel_snapshots()
+        response = self.client.get(self.url_panel)
+
+        response_etag = self.client.get(
+            self.url_panel, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response_etag.status_code, 304)
+
+        response_date = self.client.get(
+            self.url_panel, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response_date.status_code, 304)
+
+    def test_download_stale_snapshot(self):
+        """
+        The precomputed file is not used after the records are updated.
+        """
+        write_panel_snapshots()
+
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        lgd_obj.date_review = datetime.datetime(
+            2025, 1, 1, tzinfo=datetime.timezone.utc
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            lgd_obj.save()
+
+        response = self.client.get(self.url_panel)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertIn("2025-01-01", response.getvalue().decode("utf-8"))
+
+        # Only the files of the panels of the record are generated again
+        self.assertEqual(
+            sorted(write_panel_snapshots()),
+            [
+                "DD_authenticated",
+                "DD_public",
+                "Ear_authenticated",
+                "Eye_authenticated",
+                "Eye_public",
+                "all_authenticated",
+                "all_public",
+            ],
+        )
+        self.assertEqual(write_panel_snapshots(), [])
+
+    def test_download_snapshot_previous_version(self):
+        """
+        The precomputed file is not used if it was generated with a previous
+        version of the records (ex: while the records were being updated),
+        even if its metadata was not deleted.
+        """
+        write_panel_snapshots()
+        DataVersion.increment(DataVersion.RECORDS)
+
+        response = self.client.get(self.url_panel)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertEqual(write_panel_snapshots(), ["all_public", "all_authenticated"])
+
+    def test_data_version_incremented_on_commit(self):
+        """
+        The records data version is incremented once for each transaction,
+        after the transaction is committed.
+        """
+        data_version = DataVersion.get_version(DataVersion.RECORDS)
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                lgd_obj.save()
+                lgd_obj.save()
+                self.assertEqual(
+                    DataVersion.get_version(DataVersion.RECORDS), data_version
+                )
+
+        self.assertEqual(
+            DataVersion.get_version(DataVersion.RECORDS), data_version + 1
+        )
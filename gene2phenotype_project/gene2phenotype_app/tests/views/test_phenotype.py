@@ -9,6 +9,7 @@ class PhenotypeTests(TestCase):
 
     fixtures = [
         "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/hpo_term.json",
         "gene2phenotype_app/fixtures/attribs.json",
         "gene2phenotype_app/fixtures/source.json",
     ]
@@ -1,8 +1,9 @@
 from django.test import TestCase
 from django.urls import reverse
+from gene2phenotype_app.tests.stub_api import StubAPIServerMixin
 
 
-class PublicationTests(TestCase):
+class PublicationTests(StubAPIServerMixin, TestCase):
     """
     Test the publication endpoint: PublicationDetail
     """
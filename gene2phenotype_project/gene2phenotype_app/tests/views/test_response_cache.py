@@ -0,0 +1,252 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from gene2phenotype_app.invalidation import Dependencies
+from gene2phenotype_app.models import (
+    Attrib,
+    CurationData,
+    LocusGenotypeDisease,
+    User,
+)
+
+
+RESPONSE_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "response_cache": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test_response_cache",
+    },
+}
+
+
+@override_settings(CACHES=RESPONSE_CACHES)
+class ResponseCacheTests(TestCase):
+    """
+    Test the response cache of the public read endpoints
+    """
+
+    fixtures = [
+        "gene2phenotype_app/fixtures/attribs.json",
+        "gene2phenotype_app/fixtures/auth_groups.json",
+        "gene2phenotype_app/fixtures/curation_data.json",
+        "gene2phenotype_app/fixtures/cv_molecular_mechanism.json",
+        "gene2phenotype_app/fixtures/disease.json",
+        "gene2phenotype_app/fixtures/g2p_stable_id.json",
+        "gene2phenotype_app/fixtures/lgd_panel.json",
+        "gene2phenotype_app/fixtures/locus_genotype_disease.json",
+        "gene2phenotype_app/fixtures/locus.json",
+        "gene2phenotype_app/fixtures/ontology_term.json",
+        "gene2phenotype_app/fixtures/publication.json",
+        "gene2phenotype_app/fixtures/sequence.json",
+        "gene2phenotype_app/fixtures/source.json",
+        "gene2phenotype_app/fixtures/user_panels.json",
+    ]
+
+    def setUp(self):
+        caches["response_cache"].clear()
+        self.url_lgd = reverse("lgd", kwargs={"stable_id": "G2P00001"})
+        self.url_lgd_private = reverse("lgd", kwargs={"stable_id": "G2P00005"})
+
+    def login(self, email):
+        user = User.objects.get(email=email)
+        refresh = RefreshToken.for_user(user)
+        self.client.cookies[settings.SIMPLE_JWT["AUTH_COOKIE"]] = str(
+            refresh.access_token
+        )
+
+    def test_response_cached(self):
+        """
+        Test the second request is read from the cache with one query
+        """
+        response = self.client.get(self.url_lgd)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+
+        # Query to fetch the data versions
+        with self.assertNumQueries(1):
+            response_cached = self.client.get(self.url_lgd)
+
+        self.assertEqual(response_cached.status_code, 200)
+        self.assertEqual(response_cached.headers["X-Cache"], "HIT")
+        self.assertEqual(response_cached.content, response.content)
+
+    def test_query_params_normalized(self):
+        """
+        Test the order of the query parameters does not change the cache key
+        """
+        url_search = reverse("search")
+        response = self.client.get(f"{url_search}?type=gene&query=CEP290")
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+
+        response = self.client.get(f"{url_search}?query=CEP290&type=gene")
+        self.assertEqual(response.headers["X-Cache"], "HIT")
+
+    def test_response_cache_user_type(self):
+        """
+        Test the responses of anonymous and authenticated users are cached separately
+        """
+        response = self.client.get(self.url_lgd_private)
+        self.assertEqual(response.status_code, 404)
+
+        self.login("user5@test.ac.uk")
+        response = self.client.get(self.url_lgd_private)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+
+    def test_response_cache_updated(self):
+        """
+        Test the cached response is not returned after the record is updated
+        """
+        response = self.client.get(self.url_lgd)
+        self.assertEqual(response.data["confidence"], "definitive")
+
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        lgd_obj.confidence = Attrib.objects.get(
+            value="strong", type__code="confidence_category"
+        )
+        # The cache is invalidated after the transaction is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            lgd_obj.save()
+
+        response = self.client.get(self.url_lgd)
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        self.assertEqual(response.data["confidence"], "strong")
+
+    def test_search_draft_not_cached(self):
+        """
+        Test the searches of drafts are not cached, the deleted draft is not returned
+        """
+        self.login("user5@test.ac.uk")
+        url_search_draft = f"{reverse('search')}?type=draft&query=CEP290"
+
+        for _ in range(2):
+            response = self.client.get(url_search_draft)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["count"], 1)
+            self.assertEqual(response.headers["X-Cache"], "MISS")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CurationData.objects.filter(gene_symbol="CEP290").delete()
+
+        response = self.client.get(url_search_draft)
+        self.assertEqual(response.status_code, 404)
+
+    def get_cache_status_after_update(self):
+        """
+        Returns the cache status of the responses after the record G2P00001 is updated
+        """
+        url_lgd_other = reverse("lgd", kwargs={"stable_id": "G2P00008"})
+        url_gene = reverse("locus_gene_summary", kwargs={"name": "CEP290"})
+        url_gene_other = reverse("locus_gene_summary", kwargs={"name": "HADHB"})
+        url_panels = reverse("list_panels")
+        urls = {
+            "lgd": self.url_lgd,
+            "lgd_other": url_lgd_other,
+            "gene": url_gene,
+            "gene_other": url_gene_other,
+            "panels": url_panels,
+        }
+        for url in urls.values():
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        lgd_obj = LocusGenotypeDisease.objects.get(stable_id__stable_id="G2P00001")
+        with self.captureOnCommitCallbacks(execute=True):
+            lgd_obj.save_without_historical_record()
+
+        return {
+            name: self.client.get(url).headers["X-Cache"] for name, url in urls.items()
+        }
+
+    def test_response_cache_dependencies(self):
+        """
+        Test only the cached responses that depend on the updated record are
+        invalidated if the cache is shared by the processes
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        shared_caches = {
+            **RESPONSE_CACHES,
+            "response_cache": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": cache_dir,
+            },
+        }
+
+        with override_settings(CACHES=shared_caches):
+            cache_status = self.get_cache_status_after_update()
+
+        self.assertEqual(
+            cache_status,
+            {
+                "lgd": "MISS",
+                "lgd_other": "HIT",
+                "gene": "MISS",
+                "gene_other": "HIT",
+                "panels": "MISS",
+            },
+        )
+
+    def test_response_cache_local_memory(self):
+        """
+        Test all the cached responses are invalidated by an update if the cache
+        is not shared (the other processes do not see the new tag generations)
+        """
+        cache_status = self.get_cache_status_after_update()
+
+        self.assertEqual(set(cache_status.values()), {"MISS"})
+
+    def test_record_dependencies(self):
+        """
+        Test the tags of the data that depends on a record
+        """
+        with self.assertNumQueries(9):
+            tags = Dependencies(lgd_ids=[1]).resolve()
+
+        self.assertEqual(
+            tags,
+            {
+                "records",
+                "record:g2p00001",
+                "locus:cep290",
+                # Gene synonyms
+                "locus:bbs14",
+                "locus:ct87",
+                "locus:kiaa0373",
+                "disease:cep290-related joubert syndrome type 5",
+                # Disease ontology accession
+                "disease:610188",
+                "panel:dd",
+                "panel:ear",
+                "panel:eye",
+            },
+        )
+
+    def test_response_cache_metrics(self):
+        """
+        Test the response cache metrics endpoint
+        """
+        self.client.get(self.url_lgd)
+        self.client.get(self.url_lgd)
+
+        url_metrics = reverse("response_cache_metrics")
+        self.login("user5@test.ac.uk")
+        response = self.client.get(url_metrics)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["hits"], 1)
+        self.assertEqual(response.data["misses"], 1)
+        self.assertEqual(response.data["hit_ratio"], 0.5)
+
+    def test_response_cache_metrics_no_permission(self):
+        """
+        Test the response cache metrics endpoint is only available to super users
+        """
+        self.login("user1@test.ac.uk")
+        response = self.client.get(reverse("response_cache_metrics"))
+        self.assertEqual(response.status_code, 403)
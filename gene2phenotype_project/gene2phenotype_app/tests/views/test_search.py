@@ -1,10 +1,23 @@
+import gzip
+import json
 from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from gene2phenotype_app.models import User
+from gene2phenotype_app.models import (
+    DataVersion,
+    Disease,
+    DiseaseSynonym,
+    LGDSearchToken,
+    LocusGenotypeDisease,
+    User,
+)
+from gene2phenotype_app.views.search import (
+    get_search_index_filters,
+    update_search_index,
+)
 
 
 class SearchTests(TestCase):
@@ -34,6 +47,7 @@ class SearchTests(TestCase):
 
     def setUp(self):
         self.base_url_search = reverse("search")
+        update_search_index()
         self.expected_data = [
             {
                 "stable_id": "G2P00001",
@@ -244,6 +258,10 @@ class SearchTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data["count"], 1)
+        # The empty values of the draft are returned as they are in the JSON data
+        result = response.data["results"][0]
+        self.assertEqual(result["disease_name"], "")
+        self.assertEqual(result["confidence"], "")
 
     def test_search_draft_not_found(self):
         """
@@ -459,6 +477,115 @@ class SearchTests(TestCase):
         ]
         self.assertEqual(response.data["results"], expected_data)
 
+    def test_search_disease_without_search_index(self):
+        """
+        Test the search by disease before the search index is generated
+        """
+        LGDSearchToken.objects.all().delete()
+        DataVersion.objects.filter(key=DataVersion.SEARCH_INDEX).delete()
+
+        url_search_disease = f"{self.base_url_search}?type=disease&query=JOUBERT SYNDROME TYPE 5"
+        response = self.client.get(url_search_disease)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], self.expected_data)
+
+    def test_search_index_filters(self):
+        """
+        Test the records of the search index are selected with a subquery
+        """
+        # Only the search index version is fetched
+        with self.assertNumQueries(1):
+            filters = get_search_index_filters(
+                "JOUBERT SYNDROME", [LGDSearchToken.DISEASE]
+            )
+
+        self.assertEqual(
+            list(
+                LocusGenotypeDisease.objects.filter(filters[0])
+                .order_by("stable_id__stable_id")
+                .values_list("stable_id__stable_id", flat=True)
+            ),
+            ["G2P00001", "G2P00007"],
+        )
+
+    def test_search_disease_partial_word(self):
+        """
+        Test the search by disease only matches complete words
+        """
+        url_search_disease = f"{self.base_url_search}?type=disease&query=JOUBERT SYNDROM"
+        response = self.client.get(url_search_disease)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            response.data["error"],
+            "No matching Disease found for: JOUBERT SYNDROM",
+        )
+
+    def test_search_index_updated(self):
+        """
+        Test the search index is updated after the data is updated
+        """
+        disease = Disease.objects.get(name="CEP290-related JOUBERT SYNDROME TYPE 5")
+        with self.captureOnCommitCallbacks(execute=True):
+            DiseaseSynonym.objects.create(disease=disease, synonym="Cerebellooculorenal syndrome")
+
+        self.assertTrue(
+            LGDSearchToken.objects.filter(
+                lgd__stable_id__stable_id="G2P00001",
+                field=LGDSearchToken.DISEASE,
+                token="cerebellooculorenal",
+            ).exists()
+        )
+
+        url_search_disease = (
+            f"{self.base_url_search}?type=disease&query=cerebellooculorenal syndrome"
+        )
+        response = self.client.get(url_search_disease)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], self.expected_data)
+
+    def test_search_index_updated_twice(self):
+        """
+        Test the search index is updated by each update of the same transaction
+        """
+        disease = Disease.objects.get(name="CEP290-related JOUBERT SYNDROME TYPE 5")
+        with self.captureOnCommitCallbacks(execute=True):
+            synonym = DiseaseSynonym.objects.create(
+                disease=disease, synonym="Cerebellooculorenal syndrome"
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            synonym.delete()
+
+        self.assertFalse(
+            LGDSearchToken.objects.filter(
+                lgd__stable_id__stable_id="G2P00001",
+                field=LGDSearchToken.DISEASE,
+                token="cerebellooculorenal",
+            ).exists()
+        )
+
+        url_search_disease = (
+            f"{self.base_url_search}?type=disease&query=cerebellooculorenal syndrome"
+        )
+        response = self.client.get(url_search_disease)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_search_number_of_queries(self):
+        """
+        Test the number of queries used by the search.
+        The panels are fetched for all records of the page with one query.
+        """
+        url_search_gene = f"{self.base_url_search}?type=gene&query=CEP290"
+        with self.assertNumQueries(3):
+            response = self.client.get(url_search_gene)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], self.expected_data)
+
     def test_search_with_mechanism(self):
         """
         Test the response when searching a gene and filtering by mechanism
@@ -517,3 +644,19 @@ class SearchTests(TestCase):
         self.assertEqual(response.data["next"], None)
         self.assertEqual(response.data["previous"], None)
         self.assertEqual(response.data["results"], self.expected_data_mpi)
+
+    def test_search_gzip(self):
+        """
+        Test the response is compressed when the client accepts gzip
+        """
+        url_search_disease = f"{self.base_url_search}?type=disease&query=related"
+        response = self.client.get(url_search_disease)
+        response_gzip = self.client.get(url_search_disease, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response_gzip.status_code, 200)
+        self.assertEqual(response_gzip["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response_gzip["Vary"])
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(
+            json.loads(gzip.decompress(response_gzip.content)), response.json()
+        )
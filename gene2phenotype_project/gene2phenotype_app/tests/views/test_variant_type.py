@@ -1,6 +1,9 @@
 from django.test import TestCase
 from django.urls import reverse
 
+from gene2phenotype_app.models import Attrib, DataVersion, OntologyTerm, Source
+from gene2phenotype_app.views.reference_data import reference_data_cache
+
 
 class ListVariantTypesEndpoint(TestCase):
     """
@@ -15,6 +18,7 @@ class ListVariantTypesEndpoint(TestCase):
 
     def setUp(self):
         self.url_list_variant_types = reverse("list_variant_types")
+        reference_data_cache.clear()
 
     def test_variant_types(self):
         """
@@ -28,3 +32,26 @@ class ListVariantTypesEndpoint(TestCase):
         self.assertEqual(len(response.data["protein_changing_variants"]), 7)
         self.assertEqual(len(response.data["regulatory_variants"]), 3)
         self.assertEqual(len(response.data["other_variants"]), 8)
+
+    def create_term(self, accession, term, source_name, group):
+        return OntologyTerm.objects.create(
+            accession=accession,
+            term=term,
+            source=Source.objects.get(name=source_name),
+            group_type=Attrib.objects.get(
+                type__code="ontology_term_group", value=group
+            ),
+        )
+
+    def test_reference_data_version(self):
+        """
+        Test only the variant types increment the reference data version,
+        new phenotypes do not invalidate the reference data
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_term("HP:9999999", "New phenotype", "HPO", "phenotype")
+        self.assertEqual(DataVersion.get_version(DataVersion.REFERENCE_DATA), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_term("SO:9999999", "new_variant", "SO", "variant_type")
+        self.assertEqual(DataVersion.get_version(DataVersion.REFERENCE_DATA), 1)
@@ -17,10 +17,14 @@ urlpatterns = [
         ),
         name="swagger-ui",
     ),
+    path(
+        "lgd/batch/", views.LocusGenotypeDiseaseBatch.as_view(), name="lgd_batch"
+    ),
     path(
         "lgd/<str:stable_id>/", views.LocusGenotypeDiseaseDetail.as_view(), name="lgd"
     ),
     path("search/", views.SearchView.as_view(), name="search"),
+    path("autocomplete/", views.Autocomplete.as_view(), name="autocomplete"),
     path("panels/", views.PanelList.as_view(), name="list_panels"),
     path("panel/<str:name>/", views.PanelDetail.as_view(), name="panel_details"),
     path(
@@ -277,4 +281,11 @@ urlpatterns = [
 
     ### Activity logs ###
     path("activity_logs/", views.ActivityLogs.as_view(), name="activity_logs"),
+
+    ### Response cache ###
+    path(
+        "response_cache/metrics/",
+        views.ResponseCacheMetrics.as_view(),
+        name="response_cache_metrics",
+    ),
 ]
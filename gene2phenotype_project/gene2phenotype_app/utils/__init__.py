@@ -6,12 +6,26 @@ from .disease_utils import (
     validate_disease_name,
     clean_disease_summary_text,
 )
-from .publication_utils import get_publication, get_authors, clean_title
-from .locus_utils import validate_gene
-from .phenotype_utils import validate_phenotype
+from .publication_utils import (
+    get_publication,
+    get_publications,
+    get_authors,
+    clean_title,
+)
+from .locus_utils import validate_gene, gene_reference
+from .phenotype_utils import validate_phenotype, validate_phenotypes, hpo_terms
+from .external_utils import ExternalLookupError
 from .user_utils import CustomMail
 from .url_utils import build_public_url
 from .date_utils import get_date_now
+from .db_utils import get_upsert_options
+from .curation_utils import (
+    get_curation_data_hash,
+    get_curation_data_fields,
+    fetch_external_data,
+)
+from .schema_utils import schema_registry
+from .vocabulary_utils import vocabulary, get_avoided_queries
 from .curationinfo_utils import ConfidenceCustomMail
 from .lgd_utils import (
     validate_mechanism_synopsis,
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+from typing import Optional
+
+from .external_utils import get_cached_lookups_by_source
+from .phenotype_utils import get_phenotype_url, hpo_terms
+from .publication_utils import get_publication_url
+
+
+def get_curation_data_hash(json_data: dict) -> str:
+    """
+    Returns the fingerprint of the JSON data of a curation draft, used to find
+    duplicated drafts (see CurationDataSerializer.compare_curation_data).
+
+    The hash is calculated from the canonical JSON: the keys are sorted and the
+    session name is ignored, the same data saved in different sessions (or with
+    the keys in a different order) has the same hash.
+    """
+    data = {key: value for key, value in json_data.items() if key != "session_name"}
+    canonical_json = json.dumps(
+        data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+
+    return hashlib.sha256(canonical_json.encode("utf-8")).hexdigest()
+
+
+def get_curation_data_fields(json_data: dict) -> dict:
+    """
+    Returns the fields of a curation draft displayed in the list of drafts and in
+    the search results. They are saved in the curation_data columns (see
+    CurationData.save) so that the drafts can be listed without reading the JSON.
+    The values are returned as they are in the JSON data (the empty values are
+    empty strings), the missing values are returned as None.
+    """
+    disease = json_data.get("disease") or {}
+    mechanism = json_data.get("molecular_mechanism") or {}
+
+    return {
+        "locus": json_data.get("locus"),
+        "disease_name": disease.get("disease_name"),
+        "genotype": json_data.get("allelic_requirement"),
+        "mechanism": mechanism.get("name"),
+        "confidence": json_data.get("confidence"),
+    }
+
+
+def fetch_external_data(pmids: list, accessions: list) -> dict[str, Optional[dict]]:
+    """
+    Fetches the external data of a curation draft before it is published:
+    the publications from EuropePMC and the HPO terms that are not stored locally
+    (from the HPO API, only if HPO_API_FALLBACK is enabled or the table hpo_term
+    is empty).
+    The requests of both APIs run concurrently, the responses are saved in the
+    table external_lookup_cache where they are read when the record is published.
+
+    Args:
+        pmids (list): the PMIDs that are not stored in G2P
+        accessions (list): the HPO accessions
+
+    Returns a dictionary with the EuropePMC response by PMID (None if the PMID
+    does not exist)
+    Raises ExternalLookupError if one of the APIs cannot be reached
+    """
+    # Import here, the utils are loaded before the models
+    from ..models import ExternalLookupCache
+
+    lookups = {ExternalLookupCache.SOURCE_EUROPEPMC: (pmids, get_publication_url)}
+    if hpo_terms.use_api():
+        missing_accessions = [
+            accession for accession in accessions if hpo_terms.get(accession) is None
+        ]
+        lookups[ExternalLookupCache.SOURCE_HPO] = (
+            missing_accessions,
+            get_phenotype_url,
+        )
+
+    return get_cached_lookups_by_source(lookups)[ExternalLookupCache.SOURCE_EUROPEPMC]
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+
+from django.db import connections
+
+
+def get_upsert_options(
+    unique_fields: list[str], update_fields: list[str], using: str = "default"
+) -> dict:
+    """
+    Returns the arguments of bulk_create() to update the rows that already exist
+    instead of inserting them (upsert).
+
+    MySQL does not support the columns of the conflict (unique_fields), the
+    existing rows are found by any of the unique indexes of the table
+    (INSERT ... ON DUPLICATE KEY UPDATE). The other databases use unique_fields.
+
+    Args:
+        unique_fields (list): fields of the unique index used to find the existing rows
+        update_fields (list): fields updated in the existing rows
+        using (str): database alias
+    """
+    options = {"update_conflicts": True, "update_fields": update_fields}
+    if connections[using].features.supports_update_conflicts_with_target:
+        options["unique_fields"] = unique_fields
+
+    return options
@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .date_utils import get_date_now
+from .db_utils import get_upsert_options
+
+
+"""
+Requests to the external APIs (EuropePMC and the HPO API).
+
+    - one requests.Session by host, the connections are reused by all requests
+    - the requests of a list of IDs run concurrently in a thread pool shared by
+      the process (at most EXTERNAL_LOOKUP_MAX_WORKERS requests at the same time)
+    - each request has a timeout (EXTERNAL_LOOKUP_TIMEOUT) and the failed requests
+      are retried with exponential backoff, the total wait is bounded
+    - the responses are saved in the table external_lookup_cache and they are
+      used until they are older than EXTERNAL_LOOKUP_CACHE_TTL seconds, the
+      "not found" responses are only used for EXTERNAL_LOOKUP_NOT_FOUND_CACHE_TTL
+      seconds (the ID can be created later)
+    - the "bad request" responses (status code 400) are not saved, the request
+      can be accepted later
+
+The URLs of the APIs are defined in the settings (EUROPEPMC_URL, HPO_API_URL),
+they can point to a local server (ex: in the tests).
+"""
+
+logger = logging.getLogger(__name__)
+
+# Status codes returned when the ID does not exist
+NOT_FOUND_STATUS_CODES = (400, 404)
+# The ID is not valid for the API but it is not known if it exists
+NOT_CACHED_STATUS_CODES = (400,)
+
+
+class ExternalLookupError(Exception):
+    """
+    Raised when the external API cannot be reached or returns an error.
+    """
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Returns the session used for the host of the URL.
+    """
+    host = urlsplit(url).netloc
+
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=settings.EXTERNAL_LOOKUP_MAX_WORKERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+
+    return session
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool used to run the requests.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EXTERNAL_LOOKUP_MAX_WORKERS,
+                thread_name_prefix="external_lookup",
+            )
+
+    return _executor
+
+
+def fetch_json(url: str) -> tuple[Optional[dict], bool]:
+    """
+    Returns the JSON response of the URL and if the response can be saved.
+    The response is None if the ID does not exist (status code 400 or 404),
+    the response of status code 400 is not saved.
+
+    Raises ExternalLookupError if the request fails after all the retries.
+    """
+    error = None
+
+    for attempt in range(settings.EXTERNAL_LOOKUP_RETRIES + 1):
+        if attempt:
+            time.sleep(settings.EXTERNAL_LOOKUP_BACKOFF * 2 ** (attempt - 1))
+
+        try:
+            response = get_session(url).get(
+                url,
+                headers={"Accept": "application/json"},
+                timeout=settings.EXTERNAL_LOOKUP_TIMEOUT,
+            )
+            if response.status_code in NOT_FOUND_STATUS_CODES:
+                return None, response.status_code not in NOT_CACHED_STATUS_CODES
+            response.raise_for_status()
+            return response.json(), True
+
+        except (requests.RequestException, ValueError) as exc:
+            logger.warning(f"Attempt {attempt + 1} to fetch {url} failed: {exc}")
+            error = exc
+
+    raise ExternalLookupError(f"Failed to fetch {url}: {error}")
+
+
+def fetch_all(urls: list[str]) -> list[tuple[Optional[dict], bool]]:
+    """
+    Fetches the URLs concurrently, the responses (see fetch_json()) are in the
+    same order as the URLs.
+    Raises ExternalLookupError if one of the requests fails.
+    """
+    if len(urls) == 1:
+        return [fetch_json(urls[0])]
+
+    futures = [get_executor().submit(fetch_json, url) for url in urls]
+
+    return [future.result() for future in futures]
+
+
+def is_not_found(data: Optional[dict]) -> bool:
+    """
+    Returns True if the response means the ID does not exist.
+    EuropePMC returns 'hitCount' 0 (status code 200) for the unknown PMIDs.
+    """
+    return data is None or (isinstance(data, dict) and data.get("hitCount") == 0)
+
+
+def get_cached_lookups(
+    source: str, keys: list[str], get_url: Callable[[str], str]
+) -> dict[str, Optional[dict]]:
+    """
+    Returns the response of the external API for each key (ex: PMID).
+    The responses are read from the table external_lookup_cache, the keys that
+    are not saved (or are out of date) are fetched concurrently and saved.
+
+    Args:
+        source (str): the external API (see ExternalLookupCache)
+        keys (list): the IDs
+        get_url (function): returns the URL of the ID
+
+    Returns a dictionary with the response by key (None if the ID does not exist)
+    Raises ExternalLookupError if the API cannot be reached
+    """
+    return get_cached_lookups_by_source({source: (keys, get_url)})[source]
+
+
+def get_cached_lookups_by_source(
+    lookups: dict[str, tuple[list[str], Callable[[str], str]]],
+) -> dict[str, dict[str, Optional[dict]]]:
+    """
+    Same as get_cached_lookups() for several external APIs: the keys of all the
+    APIs that are not saved are fetched concurrently.
+
+    Args:
+        lookups (dict): the keys and the function that returns the URL of a key,
+                        by external API (see ExternalLookupCache)
+
+    Returns a dictionary with the responses by key, by external API
+    Raises ExternalLookupError if one of the APIs cannot be reached
+    """
+    # Import here, the utils are loaded before the models
+    from ..models import ExternalLookupCache
+
+    date_now = get_date_now()
+    min_date = date_now - timedelta(seconds=settings.EXTERNAL_LOOKUP_CACHE_TTL)
+    min_date_not_found = date_now - timedelta(
+        seconds=settings.EXTERNAL_LOOKUP_NOT_FOUND_CACHE_TTL
+    )
+
+    results = {}
+    missing = []
+    for source, (keys, get_url) in lookups.items():
+        keys = list(dict.fromkeys(str(key) for key in keys))
+        results[source] = {}
+        if not keys:
+            continue
+
+        for key, data, date_update in ExternalLookupCache.objects.filter(
+            source=source, key__in=keys, date_update__gte=min_date
+        ).values_list("key", "data", "date_update"):
+            if date_update >= min_date_not_found or not is_not_found(data):
+                results[source][key] = data
+        missing.extend(
+            (source, key, get_url(key)) for key in keys if key not in results[source]
+        )
+
+    if missing:
+        responses = fetch_all([url for _, _, url in missing])
+        date_now = get_date_now()
+        ExternalLookupCache.objects.bulk_create(
+            [
+                ExternalLookupCache(
+                    source=source, key=key, data=data, date_update=date_now
+                )
+                for (source, key, _), (data, cacheable) in zip(missing, responses)
+                if cacheable
+            ],
+            **get_upsert_options(["source", "key"], ["data", "date_update"]),
+        )
+        for (source, key, _), (data, _) in zip(missing, responses):
+            results[source][key] = data
+
+    return results
@@ -1,58 +1,274 @@
 #!/usr/bin/env python3
 
-import os
-import sys
-import requests
+import threading
+import time
+from typing import Optional
 
+from django.conf import settings
 
-def query_ensembl(url):
-    r = requests.get(url, headers={"Content-Type": "application/json"})
+from .external_utils import get_cached_lookups
 
-    if not r.ok:
-        r.raise_for_status()
-        sys.exit()
 
-    decoded = r.json()
+"""
+Validation of the genes (symbols, previous symbols, HGNC and Ensembl IDs).
 
-    return decoded
+The gene reference is built from the genes stored in G2P (Locus, LocusIdentifier,
+LocusAttrib and GeneDisease) and from all the approved HGNC genes (HGNCGene), it
+is kept in memory by each process and the validation is a dictionary lookup.
+The HGNC data (approved names, previous symbols, aliases and Ensembl IDs) is
+loaded by the command load_gene_reference.
+The symbols and the identifiers have priority over the previous symbols, and the
+previous symbols over the aliases (an alias can be used by several genes).
+The gene reference is loaded again when the genes are updated (the gene reference
+data version is checked every REFERENCE_DATA_CACHE_REFRESH_INTERVAL seconds).
 
+The Ensembl REST API is only queried if GENE_REFERENCE_API_FALLBACK is enabled,
+for the genes not found in the gene reference.
+"""
 
-def validate_gene(gene_name):
-    url = f"https://rest.ensembl.org/xrefs/name/human/{gene_name}?content-type=application/json"
-    url_symbol = f"https://rest.ensembl.org/xrefs/symbol/homo_sapiens/{gene_name}?content-type=application/json"
-    url_phenotype = f"https://rest.ensembl.org/phenotype/gene/homo_sapiens/{gene_name}?content-type=application/json"
+# Position of the fields in the tuple of each gene
+NAME, HGNC_ID, DESCRIPTION, ENSEMBL_ID, SYNONYMS, MIM = range(6)
+
+
+class GeneReference:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.genes = None
+        self.index = None
+        self.data_version = None
+        self.last_check = 0.0
+
+    def clear(self):
+        """
+        Clears the gene reference of this process.
+        It is loaded again in the next lookup.
+        """
+        with self.lock:
+            self.genes = None
+            self.index = None
+            self.data_version = None
+
+    def load(self):
+        """
+        Loads the genes and builds the index of the symbols, synonyms and
+        identifiers (5 queries).
+        The HGNC genes not stored in G2P are keyed by their HGNC ID.
+        """
+        # Import here, the utils are loaded before the models
+        from ..models import (
+            DataVersion,
+            GeneDisease,
+            HGNCGene,
+            Locus,
+            LocusAttrib,
+            LocusIdentifier,
+        )
+
+        data_version = DataVersion.get_version(DataVersion.GENE_REFERENCE)
+
+        genes = {
+            locus_id: [name, None, None, None, [], []]
+            for locus_id, name in Locus.objects.values_list("id", "name")
+        }
+
+        identifiers = LocusIdentifier.objects.filter(
+            source__name__in=["HGNC", "Ensembl"]
+        ).values_list("locus_id", "identifier", "description", "source__name")
+        for locus_id, identifier, description, source in identifiers:
+            if source == "HGNC":
+                genes[locus_id][HGNC_ID] = identifier
+                genes[locus_id][DESCRIPTION] = description
+            else:
+                genes[locus_id][ENSEMBL_ID] = identifier
+
+        for locus_id, synonym in LocusAttrib.objects.filter(
+            attrib_type__code="gene_synonym", is_deleted=0
+        ).values_list("locus_id", "value"):
+            genes[locus_id][SYNONYMS].append(synonym)
+
+        for locus_id, identifier, disease in (
+            GeneDisease.objects.filter(source__name="OMIM")
+            .order_by("id")
+            .values_list("gene_id", "identifier", "disease")
+        ):
+            genes[locus_id][MIM].append((identifier, disease))
+
+        locus_by_hgnc_id = {
+            gene[HGNC_ID]: locus_id for locus_id, gene in genes.items() if gene[HGNC_ID]
+        }
+        aliases = []
+        for hgnc_id, symbol, name, ensembl_id, prev_symbols, alias_symbols in (
+            HGNCGene.objects.values_list(
+                "hgnc_id",
+                "symbol",
+                "name",
+                "ensembl_id",
+                "prev_symbols",
+                "alias_symbols",
+            ).iterator(chunk_size=5000)
+        ):
+            key = locus_by_hgnc_id.get(hgnc_id)
+            if key is None:
+                key = hgnc_id
+                genes[key] = [symbol, hgnc_id, name, ensembl_id, list(prev_symbols), []]
+            for alias in alias_symbols:
+                aliases.append((alias, key))
+                if alias not in genes[key][SYNONYMS]:
+                    genes[key][SYNONYMS].append(alias)
+
+        genes = {
+            locus_id: (
+                gene[NAME],
+                gene[HGNC_ID],
+                gene[DESCRIPTION],
+                gene[ENSEMBL_ID],
+                tuple(gene[SYNONYMS]),
+                tuple(gene[MIM]),
+            )
+            for locus_id, gene in genes.items()
+        }
+
+        # The symbols have priority over the synonyms of other genes, and the
+        # genes stored in G2P over the other HGNC genes
+        alias_keys = set(aliases)
+        index = {}
+        for locus_id, gene in genes.items():
+            index.setdefault(gene[NAME].upper(), locus_id)
+            for identifier in (gene[HGNC_ID], gene[ENSEMBL_ID]):
+                if identifier:
+                    index.setdefault(identifier.upper(), locus_id)
+        for locus_id, gene in genes.items():
+            for synonym in gene[SYNONYMS]:
+                if (synonym, locus_id) not in alias_keys:
+                    index.setdefault(synonym.upper(), locus_id)
+        for alias, locus_id in aliases:
+            index.setdefault(alias.upper(), locus_id)
+
+        self.genes = genes
+        self.index = index
+        self.data_version = data_version
+        self.last_check = time.monotonic()
+
+    def get_gene_data(self) -> tuple[dict, dict]:
+        """
+        Returns the genes and the index, they are loaded if they were not loaded
+        yet or if the genes were updated by another process.
+        """
+        from ..models import DataVersion
+
+        with self.lock:
+            if self.genes is None:
+                self.load()
+                return self.genes, self.index
+
+            now = time.monotonic()
+            if now - self.last_check >= settings.REFERENCE_DATA_CACHE_REFRESH_INTERVAL:
+                self.last_check = now
+                data_version = DataVersion.get_version(DataVersion.GENE_REFERENCE)
+                if data_version != self.data_version:
+                    self.load()
+
+            return self.genes, self.index
+
+    def get(self, gene_name: str) -> Optional[dict]:
+        """
+        Returns the gene data of the symbol, synonym, HGNC ID or Ensembl ID.
+        The lookup is case insensitive.
+        Returns None if the gene is not in G2P or in the HGNC genes.
+        """
+        genes, index = self.get_gene_data()
+
+        locus_id = index.get(gene_name.strip().upper())
+        if locus_id is None:
+            return None
+
+        gene = genes[locus_id]
+        gene_data = {
+            "display_id": gene[NAME],
+            "primary_id": gene[HGNC_ID],
+            "db_display_name": "HGNC Symbol",
+            "description": gene[DESCRIPTION],
+            "synonyms": list(gene[SYNONYMS]),
+            "ensembl_id": gene[ENSEMBL_ID],
+        }
+        if gene[MIM]:
+            gene_data["mim"] = [
+                {"id": mim_id, "ensembl_id": gene[ENSEMBL_ID], "disease": disease}
+                for mim_id, disease in gene[MIM]
+            ]
+
+        return gene_data
+
+
+gene_reference = GeneReference()
+
+
+def get_ensembl_url(key: str) -> str:
+    """
+    Returns the Ensembl REST URL of the key '<endpoint>:<gene name>'.
+    """
+    endpoint, gene_name = key.split(":", 1)
+    paths = {
+        "name": f"xrefs/name/human/{gene_name}",
+        "symbol": f"xrefs/symbol/homo_sapiens/{gene_name}",
+        "phenotype": f"phenotype/gene/homo_sapiens/{gene_name}",
+    }
+
+    return f"{settings.ENSEMBL_URL}/{paths[endpoint]}?content-type=application/json"
+
+
+def query_ensembl(gene_name: str) -> Optional[dict]:
+    """
+    Queries the Ensembl REST API to fetch the gene data (the three requests run
+    concurrently, the responses are saved in the table external_lookup_cache).
+    Returns None if the gene is not found.
+    Raises ExternalLookupError if the Ensembl REST API cannot be reached
+    """
+    # Import here, the utils are loaded before the models
+    from ..models import ExternalLookupCache
+
+    responses = get_cached_lookups(
+        ExternalLookupCache.SOURCE_ENSEMBL,
+        [f"name:{gene_name}", f"symbol:{gene_name}", f"phenotype:{gene_name}"],
+        get_ensembl_url,
+    )
 
-    decoded = query_ensembl(url)
     validated = None
+    for data in responses[f"name:{gene_name}"] or []:
+        if data["db_display_name"] == "HGNC Symbol":
+            validated = data
+
+    if validated is None:
+        return None
+
+    decoded_symbol = responses[f"symbol:{gene_name}"] or []
+    if len(decoded_symbol) > 0:
+        validated["ensembl_id"] = decoded_symbol[0]["id"]
+
+    for pheno in responses[f"phenotype:{gene_name}"] or []:
+        if pheno["source"] == "MIM morbid":
+            validated.setdefault("mim", []).append(
+                {
+                    "id": pheno["attributes"]["external_id"],
+                    "ensembl_id": pheno["Gene"],
+                    "disease": pheno["description"],
+                }
+            )
+
+    return validated
+
+
+def validate_gene(gene_name):
+    """
+    Returns the data of the gene (symbol, previous symbol, alias, HGNC ID or
+    Ensembl ID), see GeneReference.get().
+    The Ensembl REST API is only queried if GENE_REFERENCE_API_FALLBACK is enabled.
+    Returns None if the gene is not found.
+    Raises ExternalLookupError if the Ensembl REST API cannot be reached
+    """
+    validated = gene_reference.get(gene_name)
 
-    if len(decoded) > 0:
-        for data in decoded:
-            if data["db_display_name"] == "HGNC Symbol":
-                validated = data
-
-        decoded_symbol = query_ensembl(url_symbol)
-        if len(decoded_symbol) > 0:
-            validated["ensembl_id"] = decoded_symbol[0]["id"]
-
-        decoded_phenotype = query_ensembl(url_phenotype)
-        if len(decoded_phenotype) > 0:
-            for pheno in decoded_phenotype:
-                if pheno["source"] == "MIM morbid":
-                    if "mim" not in validated:
-                        validated["mim"] = [
-                            {
-                                "id": pheno["attributes"]["external_id"],
-                                "ensembl_id": pheno["Gene"],
-                                "disease": pheno["description"],
-                            }
-                        ]
-                    else:
-                        validated["mim"].append(
-                            {
-                                "id": pheno["attributes"]["external_id"],
-                                "ensembl_id": pheno["Gene"],
-                                "disease": pheno["description"],
-                            }
-                        )
+    if validated is None and settings.GENE_REFERENCE_API_FALLBACK:
+        validated = query_ensembl(gene_name)
 
     return validated
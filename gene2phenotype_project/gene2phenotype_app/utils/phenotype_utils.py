@@ -1,18 +1,182 @@
 #!/usr/bin/env python3
 
-import os
-import sys
-import requests
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+
+from .external_utils import get_cached_lookups
+
 
 """
-    Queries the HPO API to fetch the phenotype data.
+Validation of the phenotypes (HPO terms).
+
+The HPO terms are loaded from the table hpo_term (see the command load_hpo_terms)
+and kept in memory by each process, the validation is a dictionary lookup.
+The terms are loaded again when another process loads a new HPO release
+(the HPO data version is checked every REFERENCE_DATA_CACHE_REFRESH_INTERVAL seconds).
+
+The HPO API is only queried if HPO_API_FALLBACK is enabled, for the accessions
+not found in the local terms (ex: terms added after the loaded release).
+If the table hpo_term is empty (the command load_hpo_terms was not run) all the
+accessions are validated with the HPO API, a warning is logged.
+
+The phenotype data has the same keys as the HPO API response ('name' and
+'definition'), with the local data also 'synonyms', 'isObsolete', 'replacedBy'
+and 'parents'.
 """
+
+logger = logging.getLogger(__name__)
+
+
+class HPOTermStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.terms = None
+        self.data_version = None
+        self.last_check = 0.0
+
+    def clear(self):
+        """
+        Clears the HPO terms of this process.
+        They are loaded again in the next lookup.
+        """
+        with self.lock:
+            self.terms = None
+            self.data_version = None
+
+    def load(self):
+        """
+        Loads all the HPO terms (one query).
+        The terms are saved as tuples to keep the memory usage low.
+        """
+        # Import here, the utils are loaded before the models
+        from ..models import DataVersion, HPOTerm
+
+        data_version = DataVersion.get_version(DataVersion.HPO)
+        rows = HPOTerm.objects.values_list(
+            "accession",
+            "name",
+            "definition",
+            "synonyms",
+            "is_obsolete",
+            "replaced_by",
+            "parents",
+        )
+
+        terms = {}
+        for row in rows.iterator(chunk_size=5000):
+            # name, definition, synonyms, is_obsolete, replaced_by, parents
+            terms[row[0]] = (
+                row[1],
+                row[2],
+                tuple(row[3]),
+                bool(row[4]),
+                row[5],
+                tuple(row[6]),
+            )
+
+        if not terms:
+            logger.warning(
+                "The table hpo_term is empty, the phenotypes are validated with the"
+                " HPO API (run the command load_hpo_terms)"
+            )
+
+        self.terms = terms
+        self.data_version = data_version
+        self.last_check = time.monotonic()
+
+    def get_terms(self) -> dict:
+        """
+        Returns the HPO terms, they are loaded if they were not loaded yet or
+        if a new release was loaded by another process.
+        """
+        from ..models import DataVersion
+
+        with self.lock:
+            if self.terms is None:
+                self.load()
+                return self.terms
+
+            now = time.monotonic()
+            if now - self.last_check >= settings.REFERENCE_DATA_CACHE_REFRESH_INTERVAL:
+                self.last_check = now
+                if DataVersion.get_version(DataVersion.HPO) != self.data_version:
+                    self.load()
+
+            return self.terms
+
+    def use_api(self) -> bool:
+        """
+        Returns True if the HPO API is queried for the accessions not found in
+        the local terms: HPO_API_FALLBACK is enabled or the table hpo_term is empty.
+        """
+        return settings.HPO_API_FALLBACK or not self.get_terms()
+
+    def get(self, accession: str) -> Optional[dict]:
+        """
+        Returns the data of the HPO term (see the module docstring).
+        Returns None if the accession is not in the local terms.
+        """
+        term = self.get_terms().get(accession)
+        if term is None:
+            return None
+
+        name, definition, synonyms, is_obsolete, replaced_by, parents = term
+
+        return {
+            "id": accession,
+            "name": name,
+            "definition": definition,
+            "synonyms": list(synonyms),
+            "isObsolete": is_obsolete,
+            "replacedBy": replaced_by,
+            "parents": list(parents),
+        }
+
+
+hpo_terms = HPOTermStore()
+
+
+def get_phenotype_url(accession) -> str:
+    return f"{settings.HPO_API_URL}/terms/{accession}"
+
+
+def validate_phenotypes(accessions) -> dict:
+    """
+    Returns the data of each HPO term of the list.
+    The terms are read from the local HPO terms, the HPO API is only queried
+    for the terms not found if HPO_API_FALLBACK is enabled or if the table
+    hpo_term is empty (concurrently, the responses are saved in the table
+    external_lookup_cache).
+
+    Returns a dictionary with the phenotype data by accession (None if the
+    accession does not exist)
+    Raises ExternalLookupError if the HPO API cannot be reached
+    """
+    # Import here, the utils are loaded before the models
+    from ..models import ExternalLookupCache
+
+    results = {accession: hpo_terms.get(accession) for accession in accessions}
+
+    missing_accessions = [
+        accession for accession, data in results.items() if data is None
+    ]
+    if missing_accessions and hpo_terms.use_api():
+        results.update(
+            get_cached_lookups(
+                ExternalLookupCache.SOURCE_HPO, missing_accessions, get_phenotype_url
+            )
+        )
+
+    return results
+
+
 def validate_phenotype(accession):
-    r = requests.get(f"https://ontology.jax.org/api/hp/terms/{accession}")
-    obj = None
-    try:
-        obj = r.json()
-    except requests.exceptions.JSONDecodeError:
-        pass
-
-    return obj
+    """
+    Returns the data of the HPO term.
+    Returns None if the accession does not exist.
+    """
+    return validate_phenotypes([accession])[accession]
@@ -1,39 +1,44 @@
 #!/usr/bin/env python3
 
-import sys
 import html
 import re
-import time
-import requests
+
+from django.conf import settings
+
+from .external_utils import get_cached_lookups
+
+
+def get_publication_url(pmid) -> str:
+    return f"{settings.EUROPEPMC_URL}/article/MED/{pmid}?format=json"
+
+
+def get_publications(pmids) -> dict[int, dict]:
+    """
+    Fetches the publications from EuropePMC (concurrently), the responses
+    are saved in the table external_lookup_cache.
+
+    Returns a dictionary with the EuropePMC response by PMID
+    ('hitCount' is 0 if the PMID does not exist)
+    Raises ExternalLookupError if EuropePMC cannot be reached
+    """
+    # Import here, the utils are loaded before the models
+    from ..models import ExternalLookupCache
+
+    responses = get_cached_lookups(
+        ExternalLookupCache.SOURCE_EUROPEPMC, pmids, get_publication_url
+    )
+
+    return {
+        int(pmid): response or {"hitCount": 0} for pmid, response in responses.items()
+    }
 
 
 def get_publication(pmid):
-    url = f"https://www.ebi.ac.uk/europepmc/webservices/rest/article/MED/{pmid}?format=json"
-
-    max_retries=3
-    wait_seconds=30
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            r = requests.get(url, headers={"Content-Type": "application/json"})
-
-            # Check if the response was successful
-            if r.ok:
-                return r.json()
-            else:
-                print(f"Attempt {attempt}: Request failed with status {r.status_code}")
-                r.raise_for_status()
-
-        except requests.RequestException as e:
-            print(f"Attempt {attempt} failed due to: {e}")
-
-            # Only wait if we have retries left
-            if attempt < max_retries:
-                print(f"Retrying in {wait_seconds} seconds...")
-                time.sleep(wait_seconds)
-            else:
-                print("Max retries reached. Exiting.")
-                sys.exit(1)
+    """
+    Returns the EuropePMC response of the PMID.
+    Raises ExternalLookupError if EuropePMC cannot be reached
+    """
+    return get_publications([pmid])[int(pmid)]
 
 
 def get_authors(response):
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import threading
+
+from django.conf import settings
+from jsonschema.validators import validator_for
+
+
+"""
+Validation of the JSON data against the JSON schemas stored in utils/
+(ex: curation_schema.json).
+
+The schema is loaded, checked and compiled into a validator once per process.
+The validator is built again when the schema file is modified (the modification
+time of the file is checked in every validation).
+"""
+
+
+class SchemaRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Validator and modification time of each schema file
+        self.validators = {}
+
+    def clear(self):
+        """
+        Clears the validators of this process.
+        They are built again in the next validation.
+        """
+        with self.lock:
+            self.validators = {}
+
+    def get_validator(self, schema_name: str):
+        """
+        Returns the validator of the schema file, it is built if it was not built
+        yet or if the file was modified.
+        Raises FileNotFoundError if the schema file does not exist
+        """
+        schema_path = settings.BASE_DIR.joinpath(
+            "gene2phenotype_app", "utils", schema_name
+        )
+        mtime = os.stat(schema_path).st_mtime_ns
+
+        with self.lock:
+            if schema_name in self.validators:
+                validator, validator_mtime = self.validators[schema_name]
+                if validator_mtime == mtime:
+                    return validator
+
+            with open(schema_path, "r") as file:
+                schema = json.load(file)
+
+            validator_class = validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema)
+            self.validators[schema_name] = (validator, mtime)
+
+            return validator
+
+    def validate(self, instance, schema_name: str) -> list[str]:
+        """
+        Validates the data against the schema.
+        Returns the list of all the validation errors (empty if the data is valid),
+        each error includes the path of the invalid value.
+        Raises FileNotFoundError if the schema file does not exist
+        """
+        validator = self.get_validator(schema_name)
+
+        errors = []
+        for error in sorted(validator.iter_errors(instance), key=lambda e: e.json_path):
+            errors.append(f"{error.message} (path: {error.json_path})")
+
+        return errors
+
+
+schema_registry = SchemaRegistry()
@@ -0,0 +1,201 @@
+import contextvars
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+
+
+"""
+In-memory registry of the controlled vocabularies: attribs (Attrib, AttribType),
+molecular mechanism terms (CVMolecularMechanism) and sources (Source).
+
+The vocabularies are small and only updated on deploy or by curators, they are
+loaded once by each process and kept in memory:
+    - the registry of the process that updated the data is cleared after the
+      transaction is committed (see signals.py)
+    - the other processes check the reference data version (see DataVersion)
+      every REFERENCE_DATA_CACHE_REFRESH_INTERVAL seconds
+
+The lookups raise the same exceptions as the queries they replace
+(ex: Attrib.DoesNotExist) and they are case insensitive, like the database
+collation. The returned objects are shared by all requests and must not be updated.
+
+The number of lookups served from memory in the current request is available in
+get_avoided_queries(), it is logged at the end of each request (debug level).
+"""
+
+logger = logging.getLogger(__name__)
+
+# Number of lookups that did not query the database in the current request
+avoided_queries = contextvars.ContextVar("avoided_queries", default=0)
+
+
+def get_avoided_queries() -> int:
+    return avoided_queries.get()
+
+
+def reset_avoided_queries(**kwargs):
+    avoided_queries.set(0)
+
+
+def log_avoided_queries(**kwargs):
+    count = avoided_queries.get()
+    if count:
+        logger.debug(f"Vocabulary registry: {count} queries avoided")
+
+
+class VocabularyRegistry:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.data = None
+        self.data_version = None
+        self.last_check = 0.0
+
+    def clear(self):
+        """
+        Clears the vocabularies of this process.
+        They are loaded again in the next lookup.
+        """
+        with self.lock:
+            self.data = None
+            self.data_version = None
+
+    def load(self):
+        """
+        Loads all the vocabularies (4 queries).
+        """
+        # Import here, the utils are loaded before the models
+        from gene2phenotype_app.models import (
+            Attrib,
+            AttribType,
+            CVMolecularMechanism,
+            DataVersion,
+            Source,
+        )
+
+        data_version = DataVersion.get_version(DataVersion.REFERENCE_DATA)
+
+        attrib_types = {
+            attrib_type.code.lower(): attrib_type
+            for attrib_type in AttribType.objects.all()
+        }
+        attrib_types_by_id = {
+            attrib_type.id: attrib_type for attrib_type in attrib_types.values()
+        }
+
+        attribs = {}
+        for attrib in Attrib.objects.all():
+            # Avoid a query to fetch the type of the attrib
+            attrib.type = attrib_types_by_id[attrib.type_id]
+            attribs[(attrib.type.code.lower(), attrib.value.lower())] = attrib
+
+        mechanisms = {}
+        for mechanism in CVMolecularMechanism.objects.all():
+            mechanisms.setdefault(
+                (mechanism.type.lower(), mechanism.value.lower()), []
+            ).append(mechanism)
+
+        sources = {source.name.lower(): source for source in Source.objects.all()}
+
+        self.data = {
+            "attrib_types": attrib_types,
+            "attribs": attribs,
+            "mechanisms": mechanisms,
+            "sources": sources,
+        }
+        self.data_version = data_version
+        self.last_check = time.monotonic()
+
+    def get_data(self, name: str) -> dict:
+        """
+        Returns the vocabulary, the vocabularies are loaded if they were not
+        loaded yet or if they were updated by another process.
+        """
+        from gene2phenotype_app.models import DataVersion
+
+        with self.lock:
+            if self.data is None:
+                self.load()
+                return self.data[name]
+
+            now = time.monotonic()
+            interval = settings.REFERENCE_DATA_CACHE_REFRESH_INTERVAL
+            if now - self.last_check >= interval:
+                self.last_check = now
+                data_version = DataVersion.get_version(DataVersion.REFERENCE_DATA)
+                if data_version != self.data_version:
+                    self.load()
+                    return self.data[name]
+
+            avoided_queries.set(avoided_queries.get() + 1)
+
+            return self.data[name]
+
+    def get_attrib_type(self, code: str):
+        """
+        Returns the attrib type with the code.
+        Raises AttribType.DoesNotExist if the attrib type does not exist.
+        """
+        from gene2phenotype_app.models import AttribType
+
+        try:
+            return self.get_data("attrib_types")[code.lower()]
+        except KeyError:
+            raise AttribType.DoesNotExist(f"Invalid attrib type '{code}'")
+
+    def get_attrib(self, type_code: str, value: str):
+        """
+        Returns the attrib with the type and value (deleted attribs are included).
+        Raises Attrib.DoesNotExist if the attrib does not exist.
+        """
+        from gene2phenotype_app.models import Attrib
+
+        try:
+            return self.get_data("attribs")[(type_code.lower(), value.lower())]
+        except KeyError:
+            raise Attrib.DoesNotExist(f"Invalid {type_code} value '{value}'")
+
+    def get_mechanism(self, type: str, value: str, subtype: Optional[str] = None):
+        """
+        Returns the molecular mechanism term with the type and value.
+        The subtype is only used to select the term if it is defined.
+        Raises CVMolecularMechanism.DoesNotExist if the term does not exist and
+        CVMolecularMechanism.MultipleObjectsReturned if more than one term matches.
+        """
+        from gene2phenotype_app.models import CVMolecularMechanism
+
+        mechanisms = [
+            mechanism
+            for mechanism in self.get_data("mechanisms").get(
+                (type.lower(), value.lower()), []
+            )
+            if subtype is None or (mechanism.subtype or "").lower() == subtype.lower()
+        ]
+
+        if not mechanisms:
+            raise CVMolecularMechanism.DoesNotExist(
+                f"Invalid mechanism {type} value '{value}'"
+            )
+        if len(mechanisms) > 1:
+            raise CVMolecularMechanism.MultipleObjectsReturned(
+                f"More than one mechanism {type} with value '{value}'"
+            )
+
+        return mechanisms[0]
+
+    def get_source(self, name: str):
+        """
+        Returns the source with the name.
+        Raises Source.DoesNotExist if the source does not exist.
+        """
+        from gene2phenotype_app.models import Source
+
+        try:
+            return self.get_data("sources")[name.lower()]
+        except KeyError:
+            raise Source.DoesNotExist(f"Invalid source '{name}'")
+
+
+vocabulary = VocabularyRegistry()
@@ -5,6 +5,7 @@ from .base import (
     BaseUpdate,
     CustomPagination,
     IsNotJuniorCurator,
+    compress_response,
 )
 
 from .panel import (
@@ -42,6 +43,8 @@ from .curation import (
 
 from .search import SearchView
 
+from .autocomplete import Autocomplete
+
 from .attrib import AttribTypeList, AttribTypeDescriptionList, AttribList
 
 from .user import (
@@ -59,12 +62,13 @@ from .user import (
 
 from .publication import PublicationDetail, AddPublication, LGDEditPublications
 
-from .meta import MetaView, ActivityLogs
+from .meta import MetaView, ActivityLogs, ResponseCacheMetrics
 
 from .locus_genotype_disease import (
     ListMolecularMechanisms,
     VariantTypesList,
     LocusGenotypeDiseaseDetail,
+    LocusGenotypeDiseaseBatch,
     LGDEditCCM,
     LGDEditComment,
     LGDEditVariantConsequences,
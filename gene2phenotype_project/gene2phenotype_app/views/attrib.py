@@ -6,6 +6,37 @@ from drf_spectacular.utils import extend_schema
 from gene2phenotype_app.serializers import AttribTypeSerializer, AttribSerializer
 from gene2phenotype_app.models import AttribType, Attrib
 
+from .reference_data import (
+    CachedData,
+    get_etag,
+    reference_data_cache,
+    reference_data_response,
+)
+
+
+def get_attribs_by_type(description=False, include_deleted=False):
+    """
+    Returns the attribs grouped by attrib type code.
+    The attribs are returned as a list of values or, if description=True,
+    a list of {value: description}.
+    Deleted attrib types and attribs are only included if include_deleted=True.
+    """
+    attrib_types = AttribType.objects.all()
+    attribs = Attrib.objects.all()
+    if not include_deleted:
+        attrib_types = attrib_types.filter(is_deleted=0)
+        attribs = attribs.filter(type__is_deleted=0, is_deleted=0)
+
+    result = {
+        code: [] for code in attrib_types.order_by("id").values_list("code", flat=True)
+    }
+    for code, value, attrib_description in attribs.order_by("id").values_list(
+        "type__code", "value", "description"
+    ):
+        result[code].append({value: attrib_description} if description else value)
+
+    return result
+
 
 @extend_schema(exclude=True)
 class AttribTypeList(APIView):
@@ -18,15 +49,9 @@ class AttribTypeList(APIView):
         Returns: A dictionary where the keys represent attribute types,
                 and the values are lists of their respective attributes.
         """
-        queryset = AttribType.objects.filter(is_deleted=0)
-
-        result = {}
-        for attrib_type in queryset:
-            serializer = AttribTypeSerializer(attrib_type)
-            all_attribs = serializer.get_all_attribs(attrib_type.id)
-            result[attrib_type.code] = all_attribs
+        cached_data = reference_data_cache.get("attrib_types", get_attribs_by_type)
 
-        return Response(result)
+        return reference_data_response(request, cached_data)
 
 
 @extend_schema(exclude=True)
@@ -53,17 +78,11 @@ class AttribTypeDescriptionList(APIView):
                 ]
             }
         """
-        # Fetch attrib types that are not deleted
-        queryset = AttribType.objects.filter(is_deleted=0)
-        result = {}
-        for attrib_type in queryset:
-            serializer = AttribTypeSerializer(attrib_type)
-            all_attribs_description = serializer.get_all_attrib_description(
-                attrib_type.id
-            )
-            result[attrib_type.code] = all_attribs_description
+        cached_data = reference_data_cache.get(
+            "attrib_type_descriptions", lambda: get_attribs_by_type(description=True)
+        )
 
-        return Response(result)
+        return reference_data_response(request, cached_data)
 
 
 @extend_schema(exclude=True)
@@ -71,16 +90,6 @@ class AttribList(APIView):
     lookup_field = "type"
     serializer_class = AttribSerializer
 
-    def get_queryset(self):
-        attrib_type = self.kwargs["attrib_type"]
-
-        try:
-            attrib_type_obj = AttribType.objects.get(code=attrib_type)
-        except AttribType.DoesNotExist:
-            return None
-        else:
-            return Attrib.objects.filter(type=attrib_type_obj)
-
     def get(self, request, *args, **kwargs):
         """
         Fetch all attribute values for a specific attribute type.
@@ -106,14 +115,17 @@ class AttribList(APIView):
                 }
         """
         attrib_type = self.kwargs["attrib_type"]
-        queryset = self.get_queryset()
+        attribs_by_type = reference_data_cache.get(
+            "attribs", lambda: get_attribs_by_type(include_deleted=True)
+        ).data
 
-        if not queryset:
+        attrib_type_list = attribs_by_type.get(attrib_type)
+        if not attrib_type_list:
             return Response(
                 {"error": f"Attrib type '{attrib_type}' not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        attrib_type_list = [attrib.value for attrib in queryset]
+        data = {"results": attrib_type_list, "count": len(attrib_type_list)}
 
-        return Response({"results": attrib_type_list, "count": len(attrib_type_list)})
+        return reference_data_response(request, CachedData(data, get_etag(data)))
@@ -0,0 +1,546 @@
+import bisect
+import heapq
+import logging
+import re
+import textwrap
+import threading
+import time
+from itertools import islice
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
+from drf_spectacular.utils import (
+    extend_schema,
+    OpenApiParameter,
+    OpenApiExample,
+    OpenApiResponse,
+)
+from rest_framework import status
+from rest_framework.response import Response
+
+from gene2phenotype_app.models import (
+    DataVersion,
+    Disease,
+    DiseaseSynonym,
+    LGDPhenotype,
+    Locus,
+    LocusAttrib,
+    OntologyTerm,
+)
+
+from .base import BaseAPIView
+
+logger = logging.getLogger(__name__)
+
+# Maximum length of the indexed keys, longer texts are truncated
+KEY_MAX_LENGTH = 50
+
+# Maximum number of keys checked to rank the results of a query
+MAX_MATCHES = 2000
+
+# Default and maximum number of results returned by the endpoint
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def get_word_keys(text: str) -> list[str]:
+    """
+    Returns the keys used to index the text: the text starting at each word.
+    This way the text can be found by the prefix of any of its words.
+    Example: "Joubert syndrome" -> ["joubert syndrome", "syndrome"]
+    """
+    text = text.lower()
+    return [text[match.start() :] for match in re.finditer(r"\w+", text)]
+
+
+class PrefixIndex:
+    """
+    Sorted list of keys (lowercase text) that supports prefix searches.
+    Each entry has an id (ex: ("locus", 1)) so it can be updated or removed
+    when the data changes.
+    """
+
+    def __init__(self):
+        # Sorted list of (key, position, entry_id)
+        # position is the index of the key in the list of keys of the entry,
+        # the first key is the complete text
+        self.keys = []
+        # Keys and data of each entry
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def get_entry_keys(entry_id: tuple, keys: list[str]) -> list[tuple]:
+        """
+        Returns the keys of the entry saved in the index (without duplicates).
+        """
+        entry_keys = []
+        for position, key in enumerate(keys):
+            entry_key = (key[:KEY_MAX_LENGTH], position, entry_id)
+            if entry_key not in entry_keys:
+                entry_keys.append(entry_key)
+        return entry_keys
+
+    def add(self, entry_id: tuple, keys: list[str], data: dict):
+        """
+        Adds the entry to the index. If the entry already exists it is replaced.
+        Use load() to add all the entries of a new index.
+        """
+        self.remove(entry_id)
+
+        entry_keys = self.get_entry_keys(entry_id, keys)
+        for entry_key in entry_keys:
+            bisect.insort(self.keys, entry_key)
+
+        self.entries[entry_id] = (entry_keys, data)
+
+    def load(self, entries):
+        """
+        Adds the entries to the index and sorts all the keys once.
+        Each entry is a tuple (entry_id, keys, data), the entry ids are unique.
+        """
+        for entry_id, keys, data in entries:
+            entry_keys = self.get_entry_keys(entry_id, keys)
+            self.keys.extend(entry_keys)
+            self.entries[entry_id] = (entry_keys, data)
+
+        self.keys.sort()
+
+    def remove(self, entry_id: tuple):
+        """
+        Removes the entry from the index, if it exists.
+        """
+        if entry_id not in self.entries:
+            return
+
+        entry_keys, data = self.entries.pop(entry_id)
+        for entry_key in entry_keys:
+            i = bisect.bisect_left(self.keys, entry_key)
+            if i < len(self.keys) and self.keys[i] == entry_key:
+                del self.keys[i]
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        """
+        Returns the data of the entries with a key that starts with the prefix.
+
+        The results are ranked by:
+            - exact matches
+            - matches in the beginning of the text
+            - matches in the name (not in the synonyms)
+            - length of the name
+        Each name is only returned once.
+        """
+        prefix = prefix.lower()[:KEY_MAX_LENGTH]
+        start = bisect.bisect_left(self.keys, (prefix,))
+
+        ranked = {}
+        for key, position, entry_id in islice(self.keys, start, start + MAX_MATCHES):
+            if not key.startswith(prefix):
+                break
+
+            data = self.entries[entry_id][1]
+            rank = (
+                key != prefix,
+                position > 0,
+                "synonym" in data,
+                len(data["name"]),
+                data["name"],
+            )
+            if data["name"] not in ranked or rank < ranked[data["name"]][0]:
+                ranked[data["name"]] = (rank, data)
+
+        return [data for rank, data in heapq.nsmallest(limit, ranked.values())]
+
+
+class AutocompleteIndex:
+    """
+    In-memory prefix index of the genes, diseases and phenotypes.
+
+    The index is generated the first time it is used. Data updated in this
+    process is updated in the index when the transaction is committed (see signals.py).
+    Each update increments the autocomplete data version, the process that
+    updated its index saves the new version.
+    Updates done by other processes are detected by checking the autocomplete
+    data version every AUTOCOMPLETE_REFRESH_INTERVAL seconds; if the version
+    changed the index is generated again in a background thread, the current
+    index is used until the new index is ready.
+    """
+
+    GENE = "gene"
+    DISEASE = "disease"
+    PHENOTYPE = "phenotype"
+    TYPES = (GENE, DISEASE, PHENOTYPE)
+
+    # Tables used to generate the index
+    SOURCES = ("locus", "locus_attrib", "disease", "disease_synonym", "phenotype")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.indexes = None
+        self.data_version = None
+        self.last_check = 0
+        self.refreshing = False
+
+    def clear(self):
+        with self.lock:
+            self.indexes = None
+
+    def build(self):
+        """
+        Generates the index with all the genes, diseases and phenotypes.
+        The data is fetched without holding the lock, the searches use the
+        current index until the new index is ready.
+        """
+        data_version = DataVersion.get_version(DataVersion.AUTOCOMPLETE)
+
+        entries = {index_type: [] for index_type in self.TYPES}
+        for source in self.SOURCES:
+            for entry_id, index_type, keys, data in self.get_entries(source):
+                entries[index_type].append((entry_id, keys, data))
+
+        indexes = {}
+        for index_type in self.TYPES:
+            indexes[index_type] = PrefixIndex()
+            indexes[index_type].load(entries[index_type])
+
+        with self.lock:
+            self.indexes = indexes
+            self.data_version = data_version
+            self.last_check = time.monotonic()
+
+    def get_entries(self, source: str, ids: Optional[list[int]] = None):
+        """
+        Returns the entries of the source (table) to add to the index.
+        If ids are specified only returns the entries of these rows.
+
+        Each entry is a tuple (entry_id, index type, keys, data).
+        """
+        if source == "locus":
+            queryset = Locus.objects.filter(type__value="gene")
+            if ids is not None:
+                queryset = queryset.filter(id__in=ids)
+            for locus_id, name in queryset.values_list("id", "name"):
+                yield (source, locus_id), self.GENE, [name.lower()], {"name": name}
+
+        elif source == "locus_attrib":
+            queryset = LocusAttrib.objects.filter(
+                attrib_type__code="gene_synonym",
+                is_deleted=0,
+                locus__type__value="gene",
+            )
+            if ids is not None:
+                queryset = queryset.filter(id__in=ids)
+            for attrib_id, synonym, name in queryset.values_list(
+                "id", "value", "locus__name"
+            ):
+                yield (source, attrib_id), self.GENE, [synonym.lower()], {
+                    "name": name,
+                    "synonym": synonym,
+                }
+
+        elif source == "disease":
+            queryset = Disease.objects.all()
+            if ids is not None:
+                queryset = queryset.filter(id__in=ids)
+            for disease_id, name in queryset.values_list("id", "name"):
+                yield (source, disease_id), self.DISEASE, get_word_keys(name), {
+                    "name": name
+                }
+
+        elif source == "disease_synonym":
+            queryset = DiseaseSynonym.objects.all()
+            if ids is not None:
+                queryset = queryset.filter(id__in=ids)
+            for synonym_id, synonym, name in queryset.values_list(
+                "id", "synonym", "disease__name"
+            ):
+                yield (source, synonym_id), self.DISEASE, get_word_keys(synonym), {
+                    "name": name,
+                    "synonym": synonym,
+                }
+
+        elif source == "phenotype":
+            # Only the phenotypes linked to records
+            queryset = OntologyTerm.objects.filter(
+                id__in=LGDPhenotype.objects.filter(is_deleted=0).values(
+                    "phenotype_id"
+                )
+            )
+            if ids is not None:
+                queryset = queryset.filter(id__in=ids)
+            for term_id, term, accession in queryset.values_list(
+                "id", "term", "accession"
+            ):
+                yield (source, term_id), self.PHENOTYPE, get_word_keys(term) + [
+                    accession.lower()
+                ], {"name": term, "accession": accession}
+
+    def update(self, source: str, ids: list[int]):
+        """
+        Updates the entries of the source (table) in the index.
+        Rows that do not exist anymore, or are not valid, are removed from the index.
+        """
+        with self.lock:
+            if self.indexes is None:
+                return
+
+            found = set()
+            for entry_id, index_type, keys, data in self.get_entries(source, ids):
+                self.indexes[index_type].add(entry_id, keys, data)
+                found.add(entry_id)
+
+            for row_id in ids:
+                if (source, row_id) not in found:
+                    for index in self.indexes.values():
+                        index.remove((source, row_id))
+
+    def save_data_version(self):
+        """
+        Saves the autocomplete data version after the index was updated in this
+        process (the version was incremented by the update, see signals.py).
+        If the version was also incremented by other processes, the version is
+        not saved and the index is generated again in the next check.
+        """
+        data_version = DataVersion.get_version(DataVersion.AUTOCOMPLETE)
+
+        with self.lock:
+            if self.indexes is not None and data_version == self.data_version + 1:
+                self.data_version = data_version
+
+    def check_data_version(self):
+        """
+        Generates the index if it does not exist. If the data was updated by
+        another process, the index is generated again in a background thread.
+        """
+        with self.lock:
+            if self.indexes is None:
+                self.build()
+                return
+
+            now = time.monotonic()
+            if (
+                self.refreshing
+                or now - self.last_check < settings.AUTOCOMPLETE_REFRESH_INTERVAL
+            ):
+                return
+            self.last_check = now
+            data_version = self.data_version
+
+        if DataVersion.get_version(DataVersion.AUTOCOMPLETE) != data_version:
+            self.schedule_refresh()
+
+    def schedule_refresh(self):
+        """
+        Generates the index again in a background thread, if it is not
+        being generated already.
+        Called by: check_data_version()
+        """
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def refresh(self):
+        """
+        Generates the index again, runs in a background thread.
+        Called by: schedule_refresh()
+        """
+        try:
+            self.build()
+        except Exception:
+            logger.exception("Failed to generate the autocomplete index")
+        finally:
+            with self.lock:
+                self.refreshing = False
+            # The thread has its own database connection
+            connection.close()
+
+    def search(self, index_type: str, prefix: str, limit: int) -> list[dict]:
+        self.check_data_version()
+
+        with self.lock:
+            return self.indexes[index_type].search(prefix, limit)
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def get_autocomplete_updates(instance) -> list[tuple[str, list[int]]]:
+    """
+    Returns the entries of the autocomplete index affected by the update of the instance.
+    The synonyms are also updated when the gene or disease is updated as they
+    include the gene symbol or disease name.
+
+    Returns a list of (source, ids)
+    """
+    if isinstance(instance, Locus):
+        return [
+            ("locus", [instance.id]),
+            (
+                "locus_attrib",
+                list(
+                    LocusAttrib.objects.filter(locus_id=instance.id).values_list(
+                        "id", flat=True
+                    )
+                ),
+            ),
+        ]
+    if isinstance(instance, LocusAttrib):
+        return [("locus_attrib", [instance.id])]
+    if isinstance(instance, Disease):
+        return [
+            ("disease", [instance.id]),
+            (
+                "disease_synonym",
+                list(
+                    DiseaseSynonym.objects.filter(
+                        disease_id=instance.id
+                    ).values_list("id", flat=True)
+                ),
+            ),
+        ]
+    if isinstance(instance, DiseaseSynonym):
+        return [("disease_synonym", [instance.id])]
+    if isinstance(instance, OntologyTerm):
+        return [("phenotype", [instance.id])]
+    if isinstance(instance, LGDPhenotype):
+        return [("phenotype", [instance.phenotype_id])]
+    return []
+
+
+def update_autocomplete_index(updates: list[tuple[str, list[int]]]):
+    """
+    Updates the autocomplete index after the data is updated (see signals.py).
+    The updates of a transaction are merged, the index is locked once.
+    """
+    with autocomplete_index.lock:
+        for source, ids in updates:
+            if ids:
+                autocomplete_index.update(source, ids)
+
+    autocomplete_index.save_data_version()
+
+
+@extend_schema(
+    tags=["Search records"],
+    description=textwrap.dedent("""
+    Suggest gene symbols, disease names or phenotypes that start with the query text.
+    Diseases and phenotypes are found by the beginning of any of their words.
+    Phenotypes can also be found by their accession (e.g. HP:0000853).
+
+    **Required Parameters**
+    - `q`
+      The beginning of the text.
+
+    **Optional Parameters**
+    - `type`
+      gene (default), disease or phenotype
+    - `limit`
+      Maximum number of results (default 10, maximum 50).
+
+    **Example Requests**
+    - `/autocomplete/?q=FBN&type=gene`
+    - `/autocomplete/?q=marfan&type=disease`
+    """),
+    parameters=[
+        OpenApiParameter(
+            name="q",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="Beginning of the text",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="type",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="Type of data: gene, disease or phenotype",
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            description="Maximum number of results",
+        ),
+    ],
+    examples=[
+        OpenApiExample(
+            "Gene",
+            description="Suggest genes starting with FBN",
+            value={
+                "results": [
+                    {"name": "FBN1"},
+                    {"name": "FBN2"},
+                ],
+                "count": 2,
+            },
+        )
+    ],
+    responses={
+        200: OpenApiResponse(
+            description="Autocomplete response",
+            response={
+                "type": "object",
+                "properties": {
+                    "results": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "name": {"type": "string"},
+                                "synonym": {"type": "string"},
+                                "accession": {"type": "string"},
+                            },
+                        },
+                    },
+                    "count": {"type": "integer"},
+                },
+            },
+        )
+    },
+)
+class Autocomplete(BaseAPIView):
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the genes, diseases or phenotypes that start with the query text.
+        The results are ranked: exact matches first, then matches in the beginning of the name.
+
+        Returns a dictionary with the following values:
+            results (list): names (and matched synonym or phenotype accession)
+            count (int): number of results
+        """
+        query = request.query_params.get("q", "").strip()
+        index_type = request.query_params.get("type", AutocompleteIndex.GENE)
+
+        if not query:
+            return Response(
+                {"error": "Query parameter 'q' is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if index_type not in AutocompleteIndex.TYPES:
+            return Response(
+                {
+                    "error": f"Invalid type '{index_type}'. "
+                    f"Valid types are: {', '.join(AutocompleteIndex.TYPES)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {"error": "Parameter 'limit' must be a number"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        results = autocomplete_index.search(index_type, query, limit)
+
+        return Response({"results": results, "count": len(results)})
@@ -1,6 +1,8 @@
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.http import Http404
+from django.middleware.gzip import GZipMiddleware
+from django.utils.decorators import decorator_from_middleware
 from django.urls import reverse
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
@@ -204,3 +206,21 @@ class CustomPagination(PageNumberPagination):
     """
 
     page_size = 20
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses the response with gzip if the client accepts it (Accept-Encoding).
+    Streamed responses are compressed while they are sent.
+    Responses that are already compressed files (application/gzip) are not compressed again.
+    """
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith("application/gzip"):
+            return response
+
+        return super().process_response(request, response)
+
+
+# Decorator to compress the response of a view
+compress_response = decorator_from_middleware(CompressionMiddleware)
@@ -1,29 +1,70 @@
-import json, jsonschema
+import logging
+import time
+
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from jsonschema import validate, exceptions
-from django.conf import settings
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
-from django.db.models import Q, F
+from django.db import transaction
+from django.db.models import Q, F, Prefetch
+from django.utils.decorators import method_decorator
 
 from gene2phenotype_app.serializers import CurationDataSerializer, UserSerializer
+from gene2phenotype_app.utils import schema_registry
 
 from gene2phenotype_app.models import (
     G2PStableID,
     CurationData,
+    CurationDataPanel,
     LocusGenotypeDisease,
     User,
+    UserPanel,
+)
+
+from .base import (
+    BaseView,
+    BaseAdd,
+    BaseUpdate,
+    IsNotJuniorCurator,
+    compress_response,
 )
 
-from .base import BaseView, BaseAdd, BaseUpdate, IsNotJuniorCurator
+
+logger = logging.getLogger(__name__)
 
 
 def get_user_panel_descriptions(user):
     return set(UserSerializer(context={"user": user}).get_panels(user.id))
 
 
+def validate_curation_schema(json_data):
+    """
+    Validates the JSON data of a curation draft against the curation schema.
+    The schema validator is built once per process (see utils/schema_utils.py).
+
+    Returns:
+        A Response with all the validation errors or None if the data is valid.
+    """
+    try:
+        errors = schema_registry.validate(json_data, "curation_schema.json")
+    except FileNotFoundError:
+        return Response(
+            {"error": "Schema file not found"}, status=status.HTTP_404_NOT_FOUND
+        )
+
+    if errors:
+        return Response(
+            {
+                "error": "JSON data does not follow the required format. "
+                + "; ".join(errors)
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    return None
+
+
 ### Curation data
 @extend_schema(exclude=True)
 class AddCurationData(BaseAdd):
@@ -52,29 +93,10 @@ class AddCurationData(BaseAdd):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # json format accepts null values but in python these values are represented as 'None'
-        # dumps() converts 'None' to 'null' before json validation
-        input_json_data = json.loads(json.dumps(input_data["json_data"]))
-
-        json_file_path = settings.BASE_DIR.joinpath(
-            "gene2phenotype_app", "utils", "curation_schema.json"
-        )
-        try:
-            with open(json_file_path, "r") as file:
-                schema = json.load(file)
-        except FileNotFoundError:
-            return Response(
-                {"error": "Schema file not found"}, status=status.HTTP_404_NOT_FOUND
-            )
-
         # Validate the JSON data against the schema
-        try:
-            validate(instance=input_json_data, schema=schema)
-        except jsonschema.exceptions.ValidationError as e:
-            return Response(
-                {"error": "JSON data does not follow the required format. " + str(e)},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        validation_response = validate_curation_schema(input_data["json_data"])
+        if validation_response:
+            return validation_response
 
         # Check if json is already present for this user
         self.serializer_class(context={"user": user}).validate_to_save(input_data)
@@ -95,25 +117,11 @@ class AddCurationData(BaseAdd):
 
 
 @extend_schema(exclude=True)
+@method_decorator(compress_response, name="dispatch")
 class ListCurationEntries(BaseView):
     serializer_class = CurationDataSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def curation_matches_user_panels(self, curation_data, user_panels):
-        """
-        Check if a curation draft is accessible to a user based on panels.
-        If the draft has no panels, it is accessible to all users.
-
-        Args:
-            curation_data: CurationData object
-            user_panels: list of panel descriptions the user can edit
-
-        Returns:
-            True if the draft is accessible, False otherwise.
-        """
-        panels = curation_data.json_data.get("panels", [])
-        return not panels or bool(set(panels).intersection(user_panels))
-
     def get_queryset(self):
         """
         Retrieve the queryset of CurationData objects filtered according to the provided optional query parameters.
@@ -150,8 +158,22 @@ class ListCurationEntries(BaseView):
             # If "scope" is "all", retrieve curations of all users (no filter applied)
             pass
 
+        # The JSON data is not needed to list the drafts, the listed fields
+        # are saved in the curation_data columns
+        curation_panels = CurationDataPanel.objects.select_related("panel").order_by(
+            "id"
+        )
         queryset = (
             CurationData.objects.filter(query_filter)
+            .defer("json_data")
+            .select_related("stable_id")
+            .prefetch_related(
+                Prefetch(
+                    "curation_panels",
+                    queryset=curation_panels,
+                    to_attr="prefetched_panels",
+                )
+            )
             .annotate(
                 first_name=F("user_id__first_name"),
                 last_name=F("user_id__last_name"),
@@ -164,13 +186,13 @@ class ListCurationEntries(BaseView):
         # For automatic curations, only return records assigned to panels the user has access to.
         # If the record has empty panels, it is accessible to all users.
         if status_param == "automatic":
-            user_panels = get_user_panel_descriptions(user)
-            accessible_ids = [
-                data.pk
-                for data in queryset
-                if self.curation_matches_user_panels(data, user_panels)
-            ]
-            queryset = queryset.filter(pk__in=accessible_ids)
+            user_panels = UserPanel.objects.filter(user=user, is_deleted=0).values(
+                "panel_id"
+            )
+            queryset = queryset.filter(
+                Q(curation_panels__isnull=True)
+                | Q(curation_panels__panel_id__in=user_panels)
+            )
 
         return queryset
 
@@ -195,11 +217,11 @@ class ListCurationEntries(BaseView):
         list_data = []
         for data in queryset:
             entry = {
-                "locus": data.json_data["locus"],
-                "disease": data.json_data["disease"]["disease_name"] or None,
-                "allelic_requirement": data.json_data["allelic_requirement"] or None,
-                "molecular_mechanism": data.json_data["molecular_mechanism"]["name"] or None,
-                "panels": data.json_data["panels"],
+                "locus": data.locus,
+                "disease": data.disease_name or None,
+                "allelic_requirement": data.genotype or None,
+                "molecular_mechanism": data.mechanism or None,
+                "panels": [cp.panel.description for cp in data.prefetched_panels],
                 "session_name": data.session_name,
                 "stable_id": data.stable_id.stable_id,
                 "type": data.status,
@@ -424,36 +446,16 @@ class UpdateCurationData(BaseUpdate):
         # Get curation entry to be updated
         curation_obj = self.get_queryset().first()
 
-        json_file_path = settings.BASE_DIR.joinpath(
-            "gene2phenotype_app", "utils", "curation_schema.json"
-        )
-        try:
-            with open(json_file_path, "r") as file:
-                schema = json.load(file)
-        except FileNotFoundError:
-            return Response(
-                {"error": "Schema file not found"}, status=status.HTTP_404_NOT_FOUND
-            )
-
-        # json format accepts null values but in python these values are represented as 'None'
-        # dumps() converts 'None' to 'null' before json validation
-        input_data = json.dumps(request.data)
-        input_json_data = json.loads(input_data)
-
-        if "json_data" not in input_json_data:
+        if "json_data" not in request.data:
             return Response(
                 {"error": "Invalid data format: 'json_data' is missing"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         # Validate the JSON data against the schema
-        try:
-            validate(instance=input_json_data["json_data"], schema=schema)
-        except jsonschema.exceptions.ValidationError as e:
-            return Response(
-                {"error": "JSON data does not follow the required format. " + str(e)},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        validation_response = validate_curation_schema(request.data["json_data"])
+        if validation_response:
+            return validation_response
 
         # Update data - it replaces the data
         serializer = CurationDataSerializer(
@@ -548,11 +550,21 @@ class PublishRecord(BaseUpdate):
             try:
                 # 'user' is the curator that publishes the record
                 # 'is_junior_curator' is used to determine if the user that created the draft is a junior curator
-                lgd_obj, check = self.serializer_class(context={"user": user, "is_junior_curator": is_junior_curator}).publish(
-                    curation_obj
+                serializer = self.serializer_class(context={"user": user, "is_junior_curator": is_junior_curator})
+
+                # Fetch the external data before the transaction starts
+                serializer.prepare_publish(curation_obj)
+
+                # The transaction only writes the record
+                start_time = time.monotonic()
+                with transaction.atomic():
+                    lgd_obj, check = serializer.publish(curation_obj)
+                    # Delete entry from 'curation_data'
+                    curation_obj.delete()
+                logger.info(
+                    f"Record '{stable_id}' published, "
+                    f"transaction time: {time.monotonic() - start_time:.3f}s"
                 )
-                # Delete entry from 'curation_data'
-                curation_obj.delete()
 
                 if check:
                     return Response(
@@ -18,7 +18,6 @@ from gene2phenotype_app.serializers import (
 )
 
 from gene2phenotype_app.models import (
-    AttribType,
     Locus,
     OntologyTerm,
     DiseaseOntologyTerm,
@@ -30,8 +29,9 @@ from gene2phenotype_app.models import (
     DiseaseExternal,
 )
 
-from ..utils import clean_omim_disease, validate_disease_name
+from ..utils import clean_omim_disease, validate_disease_name, vocabulary
 from .base import BaseAPIView, BaseAdd, IsSuperUser
+from .response_cache import cache_response
 
 
 @extend_schema(exclude=True)
@@ -45,9 +45,9 @@ class GeneDiseaseView(BaseAPIView):
 
         if not queryset.exists():
             # Try to find gene in locus_attrib (gene synonyms)
-            attrib_type = AttribType.objects.filter(code="gene_synonym")
+            attrib_type = vocabulary.get_attrib_type("gene_synonym")
             queryset = LocusAttrib.objects.filter(
-                value=name, attrib_type=attrib_type.first().id, is_deleted=0
+                value=name, attrib_type=attrib_type.id, is_deleted=0
             )
 
             if not queryset.exists():
@@ -216,6 +216,7 @@ class DiseaseDetail(BaseAPIView):
     },
 )
 class DiseaseSummary(DiseaseDetail):
+    @cache_response("disease", "id")
     def get(self, request, *args, **kwargs):
         """
         Fetch a summary of the G2P entries associated with the disease.
@@ -2,11 +2,14 @@ from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
 import textwrap
 
-from gene2phenotype_app.models import AttribType, Attrib, Locus, LocusAttrib
+from gene2phenotype_app.models import Locus, LocusAttrib
 
 from gene2phenotype_app.serializers import LocusGeneSerializer
 
 from .base import BaseAPIView
+from .response_cache import cache_response
+
+from ..utils import vocabulary
 
 
 @extend_schema(exclude=True)
@@ -16,15 +19,14 @@ class LocusGene(BaseAPIView):
 
     def get_queryset(self):
         name = self.kwargs["name"]
-        attrib_type = AttribType.objects.filter(code="locus_type")
-        attrib = Attrib.objects.filter(type=attrib_type.first().id, value="gene")
-        queryset = Locus.objects.filter(name=name, type=attrib.first().id)
+        attrib = vocabulary.get_attrib("locus_type", "gene")
+        queryset = Locus.objects.filter(name=name, type=attrib.id)
 
         if not queryset.exists():
             # Try to find gene in locus_attrib (gene synonyms)
-            attrib_type = AttribType.objects.filter(code="gene_synonym")
+            attrib_type = vocabulary.get_attrib_type("gene_synonym")
             queryset = LocusAttrib.objects.filter(
-                value=name, attrib_type=attrib_type.first().id, is_deleted=0
+                value=name, attrib_type=attrib_type.id, is_deleted=0
             )
 
             if not queryset.exists():
@@ -176,6 +178,7 @@ class LocusGene(BaseAPIView):
 class LocusGeneSummary(BaseAPIView):
     serializer_class = LocusGeneSerializer
 
+    @cache_response("locus", "name")
     def get(self, request, name, *args, **kwargs):
         """
         Return a summary of the G2P entries associated with the gene.
@@ -187,15 +190,14 @@ class LocusGeneSummary(BaseAPIView):
                 gene_symbol (string)
                 records_summary (list)
         """
-        attrib_type = AttribType.objects.filter(code="locus_type")
-        attrib = Attrib.objects.filter(type=attrib_type.first().id, value="gene")
-        queryset = Locus.objects.filter(name=name, type=attrib.first().id)
+        attrib = vocabulary.get_attrib("locus_type", "gene")
+        queryset = Locus.objects.filter(name=name, type=attrib.id)
 
         if not queryset.exists():
             # Try to find gene in locus_attrib (gene synonyms)
-            attrib_type = AttribType.objects.filter(code="gene_synonym")
+            attrib_type = vocabulary.get_attrib_type("gene_synonym")
             queryset = LocusAttrib.objects.filter(
-                value=name, attrib_type=attrib_type.first().id, is_deleted=0
+                value=name, attrib_type=attrib_type.id, is_deleted=0
             )
 
             if not queryset.exists():
@@ -229,15 +231,14 @@ class GeneFunction(BaseAPIView):
                 function (dict): gene product function from UniProt;
                 gene_stats (dict): gene scores (Badonyi probabilities and gnomAD constraint metrics scores)
         """
-        attrib_type = AttribType.objects.filter(code="locus_type")
-        attrib = Attrib.objects.filter(type=attrib_type.first().id, value="gene")
-        queryset = Locus.objects.filter(name=name, type=attrib.first().id)
+        attrib = vocabulary.get_attrib("locus_type", "gene")
+        queryset = Locus.objects.filter(name=name, type=attrib.id)
 
         if not queryset.exists():
             # Try to find gene in locus_attrib (gene synonyms)
-            attrib_type = AttribType.objects.filter(code="gene_synonym")
+            attrib_type = vocabulary.get_attrib_type("gene_synonym")
             queryset = LocusAttrib.objects.filter(
-                value=name, attrib_type=attrib_type.first().id, is_deleted=0
+                value=name, attrib_type=attrib_type.id, is_deleted=0
             )
 
             if not queryset.exists():
@@ -6,6 +6,7 @@ from rest_framework.views import APIView
 from django.db import transaction, IntegrityError
 from django.db.models import Model, QuerySet
 from django.shortcuts import get_object_or_404
+from django.conf import settings
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse
 
 import re
@@ -54,8 +55,10 @@ from gene2phenotype_app.models import (
 )
 
 from .base import BaseAPIView, BaseUpdate, CustomPermissionAPIView, IsSuperUser
+from .reference_data import reference_data_cache, reference_data_response
+from .response_cache import cache_response
 
-from ..utils import get_date_now
+from ..utils import get_date_now, vocabulary
 
 
 @extend_schema(
@@ -138,6 +141,11 @@ class ListMolecularMechanisms(APIView):
         Return the molecular mechanisms terms by type and subtype (if applicable).
         Returns a dictionary where the key is the type the value is a list.
         """
+        cached_data = reference_data_cache.get("molecular_mechanisms", self.get_data)
+
+        return reference_data_response(request, cached_data)
+
+    def get_data(self):
         queryset = (
             CVMolecularMechanism.objects.all()
             .values("type", "subtype", "value", "description")
@@ -166,7 +174,7 @@ class ListMolecularMechanisms(APIView):
                 else:
                     result[mechanismtype].append({value: description})
 
-        return Response(result)
+        return result
 
 
 @extend_schema(exclude=True)
@@ -182,6 +190,11 @@ class VariantTypesList(APIView):
         Return all variant types by group.
         Returns a dictionary where the key is the variant group and the value is a list of terms.
         """
+        cached_data = reference_data_cache.get("variant_types", self.get_data)
+
+        return reference_data_response(request, cached_data)
+
+    def get_data(self):
         queryset = self.get_queryset()
         list_nmd = []
         list_splice = []
@@ -206,15 +219,13 @@ class VariantTypesList(APIView):
             else:
                 list.append({"term": obj.term, "accession": obj.accession})
 
-        return Response(
-            {
-                "NMD_variants": list_nmd,
-                "splice_variants": list_splice,
-                "regulatory_variants": list_regulatory,
-                "protein_changing_variants": list_protein,
-                "other_variants": list,
-            }
-        )
+        return {
+            "NMD_variants": list_nmd,
+            "splice_variants": list_splice,
+            "regulatory_variants": list_regulatory,
+            "protein_changing_variants": list_protein,
+            "other_variants": list,
+        }
 
 
 @extend_schema(
@@ -455,6 +466,7 @@ class LocusGenotypeDiseaseDetail(BaseAPIView):
         else:
             return queryset
 
+    @cache_response("record", "stable_id")
     def get(self, request, *args, **kwargs):
         """
         Return all data for a G2P record.
@@ -486,13 +498,191 @@ class LocusGenotypeDiseaseDetail(BaseAPIView):
                 # No comment or comment with other description is considered to be simply deleted
                 return self.handle_deleted_record(stable_id)
 
-        queryset = self.get_queryset().first()
+        # Load all the data linked to the record with the prefetch plan
+        queryset = LocusGenotypeDiseaseSerializer.prefetch_queryset(
+            self.get_queryset()
+        ).first()
         serializer = LocusGenotypeDiseaseSerializer(
             queryset, context={"user": self.request.user}
         )
         return Response(serializer.data)
 
 
+@extend_schema(
+    tags=["G2P record"],
+    description=textwrap.dedent(f"""
+    Fetch detailed information about a list of records using the G2P stable IDs.
+
+    The request body is a JSON object with the list of stable IDs
+    (maximum {settings.LGD_BATCH_MAX_SIZE} IDs, set by `LGD_BATCH_MAX_SIZE`).
+
+    The response has one result for each stable ID, in the same order as the request.
+    Each result includes the status code and the data returned by `/lgd/<stable_id>/` for the record:
+    - 200: record data
+    - 404: invalid record or record not available
+    - 410: record is no longer available (deleted or merged into another record)
+
+    **Example Request**
+    - `{{"stable_ids": ["G2P00001", "G2P00002"]}}`
+    """),
+    request={
+        "application/json": {
+            "type": "object",
+            "properties": {
+                "stable_ids": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["stable_ids"],
+        }
+    },
+    responses={
+        200: OpenApiResponse(
+            description="List of records",
+            response={
+                "type": "object",
+                "properties": {
+                    "count": {"type": "integer"},
+                    "results": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "stable_id": {"type": "string"},
+                                "status": {"type": "integer"},
+                                "data": {"type": "object"},
+                            },
+                        },
+                    },
+                },
+            },
+        ),
+        400: OpenApiResponse(description="Invalid list of stable IDs"),
+    },
+)
+class LocusGenotypeDiseaseBatch(BaseAPIView):
+    http_method_names = ["post", "options"]
+
+    def post(self, request):
+        """
+        Return all data for a list of G2P records.
+        The data linked to the records is loaded once for all records (see
+        LocusGenotypeDiseaseSerializer.prefetch_queryset), the number of
+        queries does not depend on the number of records.
+
+        Args:
+            stable_ids (list): list of G2P stable IDs
+
+        Returns a dictionary:
+            count (int): number of results
+            results (list): one result for each stable ID with keys 'stable_id', 'status' and 'data'
+        """
+        stable_ids = None
+        if isinstance(request.data, dict):
+            stable_ids = request.data.get("stable_ids")
+
+        if (
+            not isinstance(stable_ids, list)
+            or not stable_ids
+            or not all(isinstance(stable_id, str) for stable_id in stable_ids)
+        ):
+            return Response(
+                {"error": "Please provide a list of G2P stable IDs in 'stable_ids'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(stable_ids) > settings.LGD_BATCH_MAX_SIZE:
+            return Response(
+                {
+                    "error": f"Too many stable IDs. The maximum number of IDs is {settings.LGD_BATCH_MAX_SIZE}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = self.request.user
+
+        # Fetch the G2P stable IDs without considering if ID is deleted
+        g2p_stable_ids = {
+            g2p_stable_id.stable_id: g2p_stable_id
+            for g2p_stable_id in G2PStableID.objects.filter(
+                stable_id__in=set(stable_ids)
+            )
+        }
+        live_stable_ids = [
+            g2p_stable_id.id
+            for g2p_stable_id in g2p_stable_ids.values()
+            if not g2p_stable_id.is_deleted
+        ]
+
+        # Authenticated users (curators) can see all entries:
+        #   - in visible and non-visible panels
+        if user.is_authenticated:
+            queryset = LocusGenotypeDisease.objects.filter(
+                stable_id__in=live_stable_ids, is_deleted=0
+            )
+        else:
+            queryset = LocusGenotypeDisease.objects.filter(
+                stable_id__in=live_stable_ids,
+                is_deleted=0,
+                lgdpanel__is_deleted=0,
+                lgdpanel__panel__is_visible=1,
+            ).distinct()
+
+        lgd_list = list(LocusGenotypeDiseaseSerializer.prefetch_queryset(queryset))
+        # Serialize all records at once to share the user check between records
+        lgd_data = LocusGenotypeDiseaseSerializer(
+            lgd_list, many=True, context={"user": user}
+        ).data
+        records_data = {
+            lgd.stable_id.stable_id: data for lgd, data in zip(lgd_list, lgd_data)
+        }
+
+        results = [
+            self.get_record_result(
+                stable_id, g2p_stable_ids.get(stable_id), records_data
+            )
+            for stable_id in stable_ids
+        ]
+
+        return Response({"count": len(results), "results": results})
+
+    def get_record_result(self, stable_id, g2p_stable_id, records_data):
+        """
+        Returns the result for a stable ID.
+        The status and the data are the same as the response of LocusGenotypeDiseaseDetail.
+
+        Args:
+            stable_id (str): G2P stable ID
+            g2p_stable_id (G2PStableID): stable ID object or None if the ID is invalid
+            records_data (dict): serialized records, key is the stable ID
+        """
+        if g2p_stable_id is None:
+            status_code = status.HTTP_404_NOT_FOUND
+            data = {"error": "No G2PStableID matches the given query."}
+
+        elif g2p_stable_id.is_deleted:
+            comment = g2p_stable_id.comment
+            match = None
+            # Merged records have a comment that starts with "Merged into"
+            if comment and comment.startswith("Merged into"):
+                match = re.search(r"G2P\d{5,}", comment)
+
+            if match:
+                response = self.handle_merged_record(stable_id, match.group())
+            else:
+                response = self.handle_deleted_record(stable_id)
+            status_code = response.status_code
+            data = response.data
+
+        elif stable_id in records_data:
+            status_code = status.HTTP_200_OK
+            data = records_data[stable_id]
+
+        else:
+            status_code = status.HTTP_404_NOT_FOUND
+            data = {"error": f"No matching Entry found for: {stable_id}"}
+
+        return {"stable_id": stable_id, "status": status_code, "data": data}
+
+
 ### Add or delete data ###
 @extend_schema(exclude=True)
 class LGDUpdateConfidence(BaseUpdate):
@@ -1067,7 +1257,7 @@ class LGDEditCCM(CustomPermissionAPIView):
             )
 
         try:
-            ccm_obj = Attrib.objects.get(value=ccm, type__code="cross_cutting_modifier")
+            ccm_obj = vocabulary.get_attrib("cross_cutting_modifier", ccm)
         except Attrib.DoesNotExist:
             return Response(
                 {"error": f"Invalid cross cutting modifier '{ccm}'"},
@@ -1959,9 +2149,8 @@ def MergeRecords(request):
                                     # Update the genotype if "new_genotype" is set in the input data
                                     if new_genotype:
                                         try:
-                                            genotype_obj = Attrib.objects.get(
-                                                value=new_genotype,
-                                                type__code="genotype",
+                                            genotype_obj = vocabulary.get_attrib(
+                                                "genotype", new_genotype
                                             )
                                         except Attrib.DoesNotExist:
                                             errors.append(
@@ -3,12 +3,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import replace_query_param
 from django.db.models import Q, Max
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+import base64
+import json
 import textwrap
 from datetime import datetime
 
 from gene2phenotype_app.models import (
+    ActivityLog,
     Disease,
     G2PStableID,
     Meta,
@@ -28,7 +33,9 @@ from gene2phenotype_app.models import (
 
 from gene2phenotype_app.serializers import MetaSerializer
 
-from .base import BaseView, CustomPagination
+from .base import BaseView, CustomPagination, IsSuperUser, compress_response
+from .reference_data import reference_data_cache, reference_data_response
+from .response_cache import get_response_cache_metrics
 
 
 @extend_schema(
@@ -80,6 +87,11 @@ class MetaView(APIView):
         Returns:
             Response: A serialized list of the latest meta records.
         """
+        cached_data = reference_data_cache.get("meta", self.get_data)
+
+        return reference_data_response(request, cached_data)
+
+    def get_data(self):
         queryset = self.get_queryset()
         serializer = MetaSerializer(queryset, many=True)
 
@@ -92,20 +104,25 @@ class MetaView(APIView):
                 query_data.source.name = "Added by curators"
                 query_data.version = f"Checked against version {query_data.version}"
 
-        return Response(serializer.data)
+        return list(serializer.data)
 
 
 @extend_schema(exclude=True)
+@method_decorator(compress_response, name="dispatch")
 class ActivityLogs(BaseView):
-    pagination_class = CustomPagination
     permission_classes = [permissions.IsAuthenticated]
+    # Number of logs by page
+    page_size = CustomPagination.page_size
 
     def list(self, request, *args, **kwargs):
         """
-        Returns a dictionary where key is the type of data and value is a list of activities.
+        Returns the list of activities sorted by date (most recent first).
+        The results are paginated with a cursor: 'next' is the link to the next page.
+        The total number of activities ('count') is only returned for a single record.
         Options:
             stable_id
             date_cutoff
+            cursor
 
         Examples:
             gene2phenotype/api/activity_logs/?stable_id=G2P03520
@@ -140,470 +157,357 @@ class ActivityLogs(BaseView):
                 self.handle_no_permission("G2P record", stable_id)
 
         # Define the filters
+        # The logs of a record include the logs of its disease
         filter_query = Q()
-        filter_query_disease = Q()
-        filter_query_record = Q()
         if stable_id:
-            filter_query &= Q(lgd_id=lgd_obj.id)
-            filter_query_disease &= Q(id=lgd_obj.disease.id)
-            filter_query_record &= Q(stable_id__stable_id=stable_id)
+            filter_query &= Q(stable_id=stable_id) | Q(
+                data_type="disease", object_id=lgd_obj.disease_id
+            )
         # Add the date to filter the results by date
         if start_date:
-            filter_query &= Q(history_date__gte=date_input)
-            filter_query_disease &= Q(history_date__gte=date_input)
-            filter_query_record &= Q(history_date__gte=date_input)
-
-        history_records_lgdpanel = LGDPanel.history.filter(filter_query).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "panel_id__name",
-            "lgd_id__stable_id__stable_id",
-            "is_deleted",
-        )
+            filter_query &= Q(date__gte=date_input)
 
-        history_records_lgdpublication = LGDPublication.history.filter(
-            filter_query
-        ).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "publication_id__pmid",
-            "lgd_id__stable_id__stable_id",
-            "is_deleted",
+        queryset = (
+            ActivityLog.objects.filter(filter_query)
+            .select_related("user")
+            .order_by("-date", "-id")
         )
 
-        history_records_ccm = LGDCrossCuttingModifier.history.filter(
-            filter_query
-        ).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "ccm_id__value",
-            "lgd_id__stable_id__stable_id",
-            "is_deleted",
-        )
-
-        history_records_phenotype = LGDPhenotype.history.filter(filter_query).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "phenotype_id__accession",
-            "publication_id__pmid",
-            "lgd_id__stable_id__stable_id",
-            "is_deleted",
-        )
+        cursor_param = self.request.query_params.get("cursor", None)
+        if cursor_param:
+            log_date, log_id = decode_activity_cursor(cursor_param)
+            page_queryset = queryset.filter(
+                Q(date__lt=log_date) | Q(date=log_date, id__lt=log_id)
+            )
+        else:
+            page_queryset = queryset
+
+        # Read one extra log to know if there is a next page
+        logs = list(page_queryset[: self.page_size + 1])
+
+        next_url = None
+        if len(logs) > self.page_size:
+            logs = logs[: self.page_size]
+            next_url = replace_query_param(
+                self.request.build_absolute_uri(),
+                "cursor",
+                encode_activity_cursor(logs[-1].date, logs[-1].id),
+            )
 
-        history_records_phenotype_sum = LGDPhenotypeSummary.history.filter(
-            filter_query
-        ).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "summary",
-            "publication_id__pmid",
-            "lgd_id__stable_id__stable_id",
-            "is_deleted",
-        )
+        response_data = {
+            "next": next_url,
+            "results": [self.format_log(log) for log in logs],
+        }
 
-        history_records_consequence = LGDVariantGenccConsequence.history.filter(
-            filter_query
-        ).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "variant_consequence_id__term",
-            "lgd_id__stable_id__stable_id",
-            "is_deleted",
-        )
+        # The total number of logs is only returned for a single record
+        if stable_id:
+            response_data["count"] = queryset.count()
 
-        history_records_var_type = LGDVariantType.history.filter(filter_query).values(
-            "id",
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "variant_type_ot_id__term",
-            "lgd_id__stable_id__stable_id",
-            "inherited",
-            "de_novo",
-            "unknown_inheritance",
-            "is_deleted",
-        )
+        return Response(response_data)
 
-        history_records_var_desc = LGDVariantTypeDescription.history.filter(
-            filter_query
-        ).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "description",
-            "publication_id__pmid",
-            "lgd_id__stable_id__stable_id",
-            "is_deleted",
+    def format_log(self, log):
+        """
+        Returns the log data returned by the endpoint.
+        """
+        log_data = {}
+        log_data["user"] = (
+            f"{log.user.first_name} {log.user.last_name}" if log.user else None
         )
+        log_data["change_type"] = log.change_type
+        log_data["date"] = log.date.strftime("%Y-%m-%d %H:%M:%S")
+        log_data.update(log.value)
+        log_data["data_type"] = log.data_type
 
-        history_records_mechanism_evidence = (
-            LGDMolecularMechanismEvidence.history.filter(filter_query).values(
-                "history_user__first_name",
-                "history_user__last_name",
-                "history_date",
-                "history_type",
-                "description",
-                "publication_id__pmid",
-                "lgd_id__stable_id__stable_id",
-                "evidence_id__value",
-                "evidence_id__subtype",
-                "is_deleted",
-            )
-        )
+        return log_data
 
-        history_records_mechanism_synopsis = (
-            LGDMolecularMechanismSynopsis.history.filter(filter_query).values(
-                "history_user__first_name",
-                "history_user__last_name",
-                "history_date",
-                "history_type",
-                "synopsis_id__value",
-                "synopsis_support_id__value",
-                "lgd_id__stable_id__stable_id",
-                "is_deleted",
-            )
-        )
 
-        history_records_comments = LGDComment.history.filter(filter_query).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "comment",
-            "is_public",
-            "lgd_id__stable_id__stable_id",
-            "is_deleted",
-        )
+@extend_schema(exclude=True)
+class ResponseCacheMetrics(APIView):
+    permission_classes = [permissions.IsAuthenticated, IsSuperUser]
 
-        # Get the main record sorted by history date
-        history_records_lgd = (
-            LocusGenotypeDisease.history.filter(filter_query_record)
-            .order_by("-history_date")
-            .values(
-                "history_user__first_name",
-                "history_user__last_name",
-                "history_date",
-                "history_type",
-                "confidence_id__value",
-                "genotype_id__value",
-                "mechanism_id__value",
-                "mechanism_support_id__value",
-                "disease_id__name",
-                "is_reviewed",
-                "stable_id__stable_id",
-                "is_deleted",
-            )
-        )
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the number of hits and misses of the response cache.
+        Only available to super users.
 
+        Example:
+            {"hits": 120, "misses": 30, "hit_ratio": 0.8, "enabled": true}
+        """
+        return Response(get_response_cache_metrics())
+
+
+# Tables (history) included in the activity logs (see ActivityLog)
+#   fields: key returned by the endpoint and respective history field
+ACTIVITY_LOG_SOURCES = [
+    {
+        "data_type": "panel",
+        "model": LGDPanel,
+        "fields": {
+            "panel_name": "panel_id__name",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "publication",
+        "model": LGDPublication,
+        "fields": {
+            "publication_pmid": "publication_id__pmid",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "cross_cutting_modifier",
+        "model": LGDCrossCuttingModifier,
+        "fields": {
+            "ccm": "ccm_id__value",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "phenotype",
+        "model": LGDPhenotype,
+        "fields": {
+            "phenotype": "phenotype_id__accession",
+            "publication_pmid": "publication_id__pmid",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "phenotype_summary",
+        "model": LGDPhenotypeSummary,
+        "fields": {
+            "summary": "summary",
+            "publication_pmid": "publication_id__pmid",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "variant_consequence",
+        "model": LGDVariantGenccConsequence,
+        "fields": {
+            "variant_consequence": "variant_consequence_id__term",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        # Variant type history without the publications info
+        "data_type": "variant_type",
+        "model": LGDVariantType,
+        "fields": {
+            "variant_type": "variant_type_ot_id__term",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "inherited": "inherited",
+            "de_novo": "de_novo",
+            "unknown_inheritance": "unknown_inheritance",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        # Variant description (HGVS) history
+        "data_type": "variant_description",
+        "model": LGDVariantTypeDescription,
+        "fields": {
+            "description": "description",
+            "publication_pmid": "publication_id__pmid",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "mechanism_evidence",
+        "model": LGDMolecularMechanismEvidence,
+        "fields": {
+            "description": "description",
+            "publication_pmid": "publication_id__pmid",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "evidence": "evidence_id__value",
+            "evidence_type": "evidence_id__subtype",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "mechanism_synopsis",
+        "model": LGDMolecularMechanismSynopsis,
+        "fields": {
+            "synopsis": "synopsis_id__value",
+            "support": "synopsis_support_id__value",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "record_comment",
+        "model": LGDComment,
+        "fields": {
+            "comment": "comment",
+            "is_public": "is_public",
+            "g2p_id": "lgd_id__stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
+    },
+    {
+        "data_type": "record",
+        "model": LocusGenotypeDisease,
+        "fields": {
+            "confidence": "confidence_id__value",
+            "genotype": "genotype_id__value",
+            "mechanism": "mechanism_id__value",
+            "mechanism_support": "mechanism_support_id__value",
+            "disease": "disease_id__name",
+            "is_reviewed": "is_reviewed",
+            "g2p_id": "stable_id__stable_id",
+            "is_deleted": "is_deleted",
+        },
         # Updating the date_review has been triggering history rows
         # This means we have to clean these rows from this results before we report them
-        new_history_records_lgd = self.remove_duplicates_history(history_records_lgd)
-
-        # Get the disease info
-        history_records_disease = Disease.history.filter(filter_query_disease).values(
-            "history_user__first_name",
-            "history_user__last_name",
-            "history_date",
-            "history_type",
-            "name",
-        )
-
-        type_of_change = {"~": "updated", "+": "created", "-": "deleted"}
-
-        output_data = []
-
-        # Get panel history
-        for log in history_records_lgdpanel:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["panel_name"] = log.get("panel_id__name")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "panel"
-
-            output_data.append(log_data)
-
-        # Get publication history
-        for log in history_records_lgdpublication:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["publication_pmid"] = log.get("publication_id__pmid")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "publication"
-
-            output_data.append(log_data)
-
-        # Get ccm history
-        for log in history_records_ccm:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["ccm"] = log.get("ccm_id__value")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "cross_cutting_modifier"
-
-            output_data.append(log_data)
-
-        # Get phenotype history
-        for log in history_records_phenotype:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["phenotype"] = log.get("phenotype_id__accession")
-            log_data["publication_pmid"] = log.get("publication_id__pmid")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "phenotype"
-
-            output_data.append(log_data)
-
-        # Get phenotype summary history
-        for log in history_records_phenotype_sum:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["summary"] = log.get("summary")
-            log_data["publication_pmid"] = log.get("publication_id__pmid")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "phenotype_summary"
-
-            output_data.append(log_data)
-
-        # Get variant gencc consequence history
-        for log in history_records_consequence:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["variant_consequence"] = log.get("variant_consequence_id__term")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "variant_consequence"
-
-            output_data.append(log_data)
-
-        # Get variant type history without the publications info
-        for log in history_records_var_type:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["variant_type"] = log.get("variant_type_ot_id__term")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["inherited"] = log.get("inherited")
-            log_data["de_novo"] = log.get("de_novo")
-            log_data["unknown_inheritance"] = log.get("unknown_inheritance")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "variant_type"
-
-            output_data.append(log_data)
-
-        # Get variant description (HGVS) history
-        for log in history_records_var_desc:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["description"] = log.get("description")
-            log_data["publication_pmid"] = log.get("publication_id__pmid")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "variant_description"
-
-            output_data.append(log_data)
-
-        # Get mechanism evidence
-        for log in history_records_mechanism_evidence:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["description"] = log.get("description")
-            log_data["publication_pmid"] = log.get("publication_id__pmid")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["evidence"] = log.get("evidence_id__value")
-            log_data["evidence_type"] = log.get("evidence_id__subtype")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "mechanism_evidence"
-
-            output_data.append(log_data)
-
-        # Get mechanism synopsis
-        for log in history_records_mechanism_synopsis:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["synopsis"] = log.get("synopsis_id__value")
-            log_data["support"] = log.get("synopsis_support_id__value")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "mechanism_synopsis"
-
-            output_data.append(log_data)
-
-        # Get lgd comments
-        for log in history_records_comments:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
-            )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["comment"] = log.get("comment")
-            log_data["is_public"] = log.get("is_public")
-            log_data["g2p_id"] = log.get("lgd_id__stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "record_comment"
-
-            output_data.append(log_data)
-
-        # Get record info
-        for log in new_history_records_lgd:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
+        "remove_duplicates": True,
+    },
+    {
+        "data_type": "disease",
+        "model": Disease,
+        "fields": {"name": "name"},
+    },
+]
+
+
+def get_activity_log_source(model):
+    """
+    Returns the activity log source of the model (or historical model).
+    Returns None if the model is not included in the activity logs.
+    """
+    for source in ACTIVITY_LOG_SOURCES:
+        if model in (source["model"], source["model"].history.model):
+            return source
+    return None
+
+
+def get_activity_log_rows(source):
+    """
+    Returns the queryset of the history rows of the source with the fields
+    used to create the activity logs.
+    """
+    return source["model"].history.values(
+        "id",
+        "history_id",
+        "history_user_id",
+        "history_date",
+        "history_type",
+        *source["fields"].values(),
+    )
+
+
+def build_activity_logs(source, rows, previous=None):
+    """
+    Returns the activity logs (not saved) of the history rows of the source.
+    The rows have to be sorted by object id and date.
+
+    For the records (LocusGenotypeDisease) the rows that are duplicates of
+    the previous row of the same record are skipped, see is_duplicate_history().
+    'previous' is the history row before the first row.
+    """
+    type_of_change = {"~": "updated", "+": "created", "-": "deleted"}
+    logs = []
+
+    for row in rows:
+        if source.get("remove_duplicates"):
+            is_duplicate = (
+                previous is not None
+                and previous["id"] == row["id"]
+                and is_duplicate_history(previous, row)
             )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["confidence"] = log.get("confidence_id__value")
-            log_data["genotype"] = log.get("genotype_id__value")
-            log_data["mechanism"] = log.get("mechanism_id__value")
-            log_data["mechanism_support"] = log.get("mechanism_support_id__value")
-            log_data["disease"] = log.get("disease_id__name")
-            log_data["is_reviewed"] = log.get("is_reviewed")
-            log_data["g2p_id"] = log.get("stable_id__stable_id")
-            log_data["is_deleted"] = log.get("is_deleted")
-            log_data["data_type"] = "record"
-
-            output_data.append(log_data)
-
-        # Get disease
-        for log in history_records_disease:
-            date_formatted = log.get("history_date").strftime("%Y-%m-%d %H:%M:%S")
-            log_data = {}
-            log_data["user"] = (
-                f"{log.get('history_user__first_name')} {log.get('history_user__last_name')}"
+            previous = row
+            if is_duplicate:
+                continue
+
+        value = {key: row[field] for key, field in source["fields"].items()}
+        logs.append(
+            ActivityLog(
+                date=row["history_date"],
+                user_id=row["history_user_id"],
+                change_type=type_of_change[row["history_type"]],
+                data_type=source["data_type"],
+                stable_id=value.get("g2p_id"),
+                object_id=row["id"],
+                history_id=row["history_id"],
+                value=value,
             )
-            log_data["change_type"] = type_of_change[log.get("history_type")]
-            log_data["date"] = date_formatted
-            log_data["name"] = log.get("name")
-            log_data["data_type"] = "disease"
-
-            output_data.append(log_data)
-
-        # Sort the results by date
-        sorted_output_data = sorted(
-            output_data,
-            key=lambda x: datetime.strptime(x["date"], "%Y-%m-%d %H:%M:%S"),
-            reverse=True,
         )
 
-        paginated_output = self.paginate_queryset(sorted_output_data)
-
-        if paginated_output is not None:
-            return self.get_paginated_response(paginated_output)
-
-        return Response(
-            {"results": sorted_output_data, "count": len(sorted_output_data)}
-        )
-
-    def remove_duplicates_history(self, history_records_lgd):
-        """
-        Remove duplicates from the list of LocusGenotypeDisease history records
-        where a duplicate is defined as:
-            - the current element matches the previous element in all fields
-            except 'history_date', 'history_user__first_name' and 'history_user__last_name'.
-        """
-        if not history_records_lgd:
-            return []
-
-        # Keep the first element
-        result = [history_records_lgd[0]]
-        prev = history_records_lgd[0]
-
-        for current in history_records_lgd[1:]:
-            # Compare all keys except date and user
-            filtered_prev = {
-                k: v
-                for k, v in prev.items()
-                if k
-                not in (
-                    "history_date",
-                    "history_user__first_name",
-                    "history_user__last_name",
-                )
-            }
-            filtered_curr = {
-                k: v
-                for k, v in current.items()
-                if k
-                not in (
-                    "history_date",
-                    "history_user__first_name",
-                    "history_user__last_name",
+    return logs
+
+
+def create_activity_log(source, history_instance):
+    """
+    Creates the activity log of a new history row.
+    Called when the history row is created (see signals.py).
+    """
+    history_rows = get_activity_log_rows(source)
+    row = history_rows.get(history_id=history_instance.history_id)
+
+    previous = None
+    if source.get("remove_duplicates"):
+        previous = (
+            history_rows.filter(id=row["id"])
+            .filter(
+                Q(history_date__lt=row["history_date"])
+                | Q(
+                    history_date=row["history_date"],
+                    history_id__lt=row["history_id"],
                 )
-            }
-
-            if filtered_prev != filtered_curr:
-                result.append(current)
-                # update the previous only if it is not duplicate
-                prev = current
+            )
+            .order_by("-history_date", "-history_id")
+            .first()
+        )
 
-        return result
+    # The log can already exist (ex: created by the command backfill_activity_logs)
+    # Only the duplicated logs are skipped, other errors are raised
+    logs = build_activity_logs(source, [row], previous)
+    if not logs:
+        return
+    if ActivityLog.objects.filter(
+        data_type=source["data_type"], history_id=row["history_id"]
+    ).exists():
+        return
+
+    ActivityLog.objects.bulk_create(logs)
+
+
+def is_duplicate_history(previous, current):
+    """
+    Checks if the history row is a duplicate of the previous row, where a duplicate is defined as:
+        - the current element matches the previous element in all fields
+        except 'history_id', 'history_date' and 'history_user_id'.
+    """
+    ignored_fields = ("history_id", "history_date", "history_user_id")
+
+    return all(
+        value == previous.get(key)
+        for key, value in current.items()
+        if key not in ignored_fields
+    )
+
+
+def encode_activity_cursor(log_date, log_id):
+    """
+    Returns the cursor that points to a log.
+    The cursor is opaque to the clients: they should only use the 'next' link.
+    """
+    cursor = json.dumps([log_date.isoformat(), log_id])
+    return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+
+def decode_activity_cursor(cursor):
+    """
+    Returns the log position (date, id) from the cursor.
+    """
+    try:
+        log_date, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(log_date), int(log_id)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
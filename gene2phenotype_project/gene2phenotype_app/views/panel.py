@@ -2,8 +2,14 @@ from rest_framework import generics, status, permissions
 from rest_framework.renderers import BaseRenderer
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.http import Http404, HttpResponse
+from django.http import Http404, StreamingHttpResponse, FileResponse
 from django.db.models import Q
+from django.db.models.functions import Lower
+from django.db import connections
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.text import compress_sequence
 from rest_framework.decorators import api_view, renderer_classes
 from drf_spectacular.utils import (
     extend_schema,
@@ -14,12 +20,22 @@ from drf_spectacular.utils import (
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from datetime import datetime
+from pathlib import Path
 import textwrap
+import threading
+import logging
+import hashlib
+import gzip
+import json
+import time
 import csv
+import os
 import re
 
 from gene2phenotype_app.models import (
+    DataVersion,
     Panel,
+    PanelStats,
     User,
     LocusGenotypeDisease,
     LGDVariantType,
@@ -39,13 +55,22 @@ from gene2phenotype_app.serializers import (
     PanelDetailSerializer,
     LGDPanelSerializer,
     UserSerializer,
-    build_lgd_summary,
+    get_lgd_summary,
 )
 
-from .base import BaseAPIView, IsSuperUser, CustomPermissionAPIView
+from .base import (
+    BaseAPIView,
+    IsSuperUser,
+    CustomPermissionAPIView,
+    compress_response,
+)
+from .response_cache import cache_response
 
+from ..invalidation import ALL_TAG, get_tag_names
 from ..utils import get_date_now
 
+logger = logging.getLogger(__name__)
+
 
 class CSVRenderer(BaseRenderer):
     media_type = "text/csv"
@@ -57,6 +82,20 @@ class CSVRenderer(BaseRenderer):
         return data
 
 
+class GzipCSVRenderer(BaseRenderer):
+    """
+    Renderer for the compressed csv file, selected with ?format=csv.gz
+    """
+
+    media_type = "application/gzip"
+    format = "csv.gz"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
 @extend_schema(exclude=True)
 class PanelCreateView(generics.CreateAPIView):
     serializer_class = PanelCreateSerializer
@@ -165,6 +204,7 @@ class PanelCreateView(generics.CreateAPIView):
 class PanelList(APIView):
     serializer_class = PanelDetailSerializer
 
+    @cache_response()
     def get(self, request, *args, **kwargs):
         """
         Return all panels info.
@@ -179,22 +219,23 @@ class PanelList(APIView):
         """
         user = self.request.user
 
-        queryset = Panel.objects.all()
-        serializer = PanelDetailSerializer()
+        queryset = Panel.objects.select_related("stats")
+        if not user.is_authenticated:
+            queryset = queryset.filter(is_visible=1)
+
+        # The stats are precomputed (see PanelStats)
+        panels_stats = PanelDetailSerializer.get_panels_stats(queryset)
         panel_list = []
 
         for panel in queryset:
             panel_info = {}
-            if panel.is_visible == 1 or (
-                user.is_authenticated and panel.is_visible == 0
-            ):
-                stats = serializer.calculate_stats(panel)
-                last_updated = serializer.get_last_updated(panel)
-                panel_info["name"] = panel.name
-                panel_info["description"] = panel.description
-                panel_info["stats"] = stats
-                panel_info["last_updated"] = last_updated
-                panel_list.append(panel_info)
+            panel_info["name"] = panel.name
+            panel_info["description"] = panel.description
+            panel_info["stats"] = PanelDetailSerializer.format_stats(
+                panels_stats[panel.id]
+            )
+            panel_info["last_updated"] = panels_stats[panel.id].last_updated
+            panel_list.append(panel_info)
 
         sorted_panels = sorted(
             panel_list, key=lambda panel_info: panel_info["description"]
@@ -292,7 +333,7 @@ class PanelDetail(BaseAPIView):
             stats (dict)
         """
         user = self.request.user
-        queryset = Panel.objects.filter(name=name)
+        queryset = Panel.objects.filter(name=name).select_related("stats")
 
         flag = 0
         for panel in queryset:
@@ -304,14 +345,14 @@ class PanelDetail(BaseAPIView):
                 return self.handle_no_permission_authentication("Panel", name)
 
         if flag == 1:
-            serializer = PanelDetailSerializer()
-            last_update = serializer.get_last_updated(queryset.first())
-            stats = serializer.calculate_stats(queryset.first())
+            panel = queryset.first()
+            # The stats are precomputed (see PanelStats)
+            panel_stats = PanelDetailSerializer.get_panels_stats([panel])[panel.id]
             response_data = {
-                "name": queryset.first().name,
-                "description": queryset.first().description,
-                "last_updated": last_update,
-                "stats": stats,
+                "name": panel.name,
+                "description": panel.description,
+                "last_updated": panel_stats.last_updated,
+                "stats": PanelDetailSerializer.format_stats(panel_stats),
             }
             return Response(response_data)
 
@@ -323,6 +364,7 @@ class PanelDetail(BaseAPIView):
 class PanelRecordsSummary(BaseAPIView):
     serializer_class = PanelDetailSerializer
 
+    @cache_response("panel", "name")
     def get(self, request, name, *args, **kwargs):
         """
         Display a summary of the latest G2P entries associated with panel.
@@ -524,30 +566,44 @@ class LGDEditPanel(CustomPermissionAPIView):
 
     To download records from all panels input `all` as the short name.
 
-    It returns an uncompressed csv file.
-    
+    It returns a csv file. The response is compressed if the client supports gzip (`Accept-Encoding`).
+
+    To download a compressed csv file (csv.gz) use `?format=csv.gz`.
+
     **Example Requests**
     - Download DD records:
         `/panel/DD/download`
+    - Download DD records as a compressed file:
+        `/panel/DD/download?format=csv.gz`
     """),
     responses={
         (200, "text/csv"): OpenApiResponse(
             response=OpenApiTypes.BINARY,
-            description="Uncompressed CSV export for the selected panel or for all visible panels.",
-        )
+            description="CSV export for the selected panel or for all visible panels.",
+        ),
+        (200, "application/gzip"): OpenApiResponse(
+            response=OpenApiTypes.BINARY,
+            description="Compressed CSV export (format=csv.gz) for the selected panel or for all visible panels.",
+        ),
     },
 )
+@compress_response
 @api_view(["GET"])
-@renderer_classes([CSVRenderer])
+@renderer_classes([CSVRenderer, GzipCSVRenderer])
 def PanelDownload(request, name):
     """
     Method to download the panel data.
     Authenticated users can download data for all panels.
 
+    If an up to date snapshot of the panel is available (see write_panel_snapshots)
+    the precomputed file is returned, supporting conditional requests (ETag/Last-Modified).
+    Otherwise the file is streamed: the records are read in chunks and each row is
+    sent to the client as soon as it is built.
+
     Args:
         name (str): the short name of the panel to download or 'all' to download all panels
 
-    Returns: Uncompressed csv file
+    Returns: csv file or compressed csv file (format=csv.gz)
 
     Raises: Invalid panel
     """
@@ -561,14 +617,12 @@ def PanelDownload(request, name):
     except User.DoesNotExist:
         user_obj = None
 
+    is_authenticated = bool(user_obj and user_obj.is_authenticated)
+
     all_panels = False  # By default, we don't download all panels
-    only_visible_panels = True
     # If name = "all" download all panels taking into account authentication
     if name.lower() == "all":
         all_panels = True
-        if user_obj and user_obj.is_authenticated:
-            # Authenticated users can access non-visible panels
-            only_visible_panels = False
     else:
         # Check if panel is valid
         try:
@@ -576,6 +630,10 @@ def PanelDownload(request, name):
         except Panel.DoesNotExist:
             raise Http404(f"No matching panel found for: {name}")
 
+        # Non authenticated users can only download visible panels
+        if panel.is_visible == 0 and not is_authenticated:
+            raise Http404(f"No matching panel found for: {name}")
+
     # Process the extra columns
     include_record_summary = False
     if extra_columns:
@@ -587,496 +645,830 @@ def PanelDownload(request, name):
     date_now = datetime.today().strftime("%Y-%m-%d")
     filename = f"G2P_{name}_{date_now}.csv"
 
+    # Compressed file requested with ?format=csv.gz
+    compressed_file = request.accepted_renderer.format == GzipCSVRenderer.format
+    if compressed_file:
+        filename += ".gz"
+
+    # The snapshots do not include the extra columns
+    if not include_record_summary:
+        snapshot = get_panel_snapshot(
+            panel.name if panel else "all",
+            is_authenticated,
+            get_panel_data_version(panel),
+        )
+        if snapshot:
+            return panel_snapshot_response(request, snapshot, filename, compressed_file)
+
+    queryset = get_panel_download_queryset(panel, is_authenticated)
+    rows = panel_download_rows(
+        queryset,
+        is_authenticated,
+        include_record_summary,
+        settings.PANEL_DOWNLOAD_CHUNK_SIZE,
+    )
+
     # Prepare endpoint response
-    response = HttpResponse(
-        content_type="text/csv",
+    if compressed_file:
+        content = compress_sequence(line.encode("utf-8") for line in stream_csv_rows(rows))
+        content_type = GzipCSVRenderer.media_type
+    else:
+        content = stream_csv_rows(rows)
+        content_type = CSVRenderer.media_type
+
+    response = StreamingHttpResponse(
+        content,
+        content_type=content_type,
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
-    # Preload data attached to the g2p entries
+    return response
+
+
+class Echo:
+    """
+    File-like object that returns the value written to it instead of buffering it.
+    Used by the csv writer to build each row of a streamed response.
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv_rows(rows):
+    """
+    Convert rows (lists of values) into csv formatted lines.
+    Called by: PanelDownload()
+    """
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def get_panel_download_queryset(panel, is_authenticated):
+    """
+    Returns the records to be downloaded.
+    If the panel is not defined, it returns the records of all panels
+    taking into account the user authentication:
+        - non authenticated users only get records from visible panels
+        - authenticated users get records from all panels excluding the Demo panel
+    Called by: PanelDownload()
+
+    Args:
+        panel (Panel): the panel object or None to download all panels
+        is_authenticated (bool): whether the user is authenticated
+    """
+    if panel:
+        # Download specific panel
+        filter_query = Q(
+            is_deleted=0,
+            lgdpanel__panel=panel,
+            lgdpanel__is_deleted=0,
+        )
+    elif not is_authenticated:
+        # Download all visible panels
+        filter_query = Q(
+            is_deleted=0,
+            lgdpanel__panel__is_visible=1,
+            lgdpanel__is_deleted=0,
+        )
+    else:
+        # Download all visible and non-visible panels excluding Demo panel
+        filter_query = Q(is_deleted=0, lgdpanel__is_deleted=0) & ~Q(
+            lgdpanel__panel__name="Demo"
+        )
+
+    return (
+        LocusGenotypeDisease.objects.filter(filter_query)
+        .distinct()
+        .select_related(
+            "stable_id",
+            "locus",
+            "disease",
+            "genotype",
+            "confidence",
+            "mechanism",
+            "mechanism_support",
+        )
+        .order_by("id")
+    )
+
+
+def iterate_in_chunks(queryset, chunk_size):
+    """
+    Iterate over the records using keyset pagination on the primary key.
+    Each chunk is fetched with a 'id > last_id' filter, this way the cost of
+    each query does not grow with the position in the table.
+    The queryset has to be ordered by 'id'.
+    Called by: panel_download_rows()
+    """
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        yield chunk
+        last_id = chunk[-1].id
+        if len(chunk) < chunk_size:
+            break
+
+
+def panel_download_rows(queryset, is_authenticated, include_record_summary, chunk_size):
+    """
+    Generator that yields the rows of the panel download file.
+    The first row is the header.
+    The data attached to the records is only loaded for the records of the
+    current chunk, the memory usage does not depend on the number of records.
+    Called by: PanelDownload()
+
+    Args:
+        queryset: LocusGenotypeDisease queryset ordered by id
+        is_authenticated (bool): authenticated users have access to all panels
+        include_record_summary (bool): include the record summary as the last column
+        chunk_size (int): number of records loaded in each chunk
+    """
+    header_row = [
+        "g2p id",
+        "gene symbol",
+        "gene mim",
+        "hgnc id",
+        "previous gene symbols",
+        "disease name",
+        "disease mim",
+        "disease MONDO",
+        "allelic requirement",
+        "cross cutting modifier",
+        "confidence",
+        "variant consequence",
+        "variant types",
+        "molecular mechanism",
+        "molecular mechanism support",
+        "molecular mechanism categorisation",
+        "molecular mechanism evidence",
+        "phenotypes",
+        "publications",
+        "additional mined publications",
+        "panel",
+        "comments",
+        "date of last review",
+        "review",
+    ]
+    if include_record_summary:
+        header_row.append("summary")
+        # Read the stored summaries (see get_lgd_summary)
+        queryset = queryset.select_related("record_summary")
+    yield header_row
+
+    for lgd_chunk in iterate_in_chunks(queryset, chunk_size):
+        lgd_ids = [lgd.id for lgd in lgd_chunk]
+        chunk_data = preload_panel_download_data(lgd_ids, is_authenticated)
+
+        for lgd in lgd_chunk:
+            yield build_panel_download_row(lgd, chunk_data, include_record_summary)
+
+
+def preload_panel_download_data(lgd_ids, is_authenticated):
+    """
+    Preload the data attached to a list of records.
+    Returns a dictionary where the key is the type of data and the value
+    is a dictionary with key = lgd_id.
+    Called by: panel_download_rows()
+    """
     # Preload variant types
     lgd_variantype_data = {}  # key = lgd_id; value = variant type term
-    queryset_lgd_variantype = (
-        LGDVariantType.objects.filter(is_deleted=0)
-        .select_related("lgd__id", "variant_type_ot__term")
-        .values("lgd__id", "variant_type_ot__term")
-    )
+    queryset_lgd_variantype = LGDVariantType.objects.filter(
+        lgd_id__in=lgd_ids, is_deleted=0
+    ).values("lgd_id", "variant_type_ot__term")
 
     for data in queryset_lgd_variantype:
-        if data["lgd__id"] not in lgd_variantype_data:
-            # Save terms in a set to make sure they are unique
-            lgd_variantype_data[data["lgd__id"]] = set()
-            lgd_variantype_data[data["lgd__id"]].add(data["variant_type_ot__term"])
-        else:
-            lgd_variantype_data[data["lgd__id"]].add(data["variant_type_ot__term"])
+        # Save terms in a set to make sure they are unique
+        lgd_variantype_data.setdefault(data["lgd_id"], set()).add(
+            data["variant_type_ot__term"]
+        )
 
     # Preload variant GenCC consequence
     lgd_varianconsequence_data = {}  # key = lgd_id; value = variant consequence term
-    queryset_lgd_var_cons = (
-        LGDVariantGenccConsequence.objects.filter(is_deleted=0)
-        .select_related("lgd__id", "variant_consequence__term", "support__value")
-        .values("lgd__id", "variant_consequence__term", "support__value")
-    )
+    queryset_lgd_var_cons = LGDVariantGenccConsequence.objects.filter(
+        lgd_id__in=lgd_ids, is_deleted=0
+    ).values("lgd_id", "variant_consequence__term")
 
     for data in queryset_lgd_var_cons:
-        if data["lgd__id"] not in lgd_varianconsequence_data:
-            lgd_varianconsequence_data[data["lgd__id"]] = [
-                data["variant_consequence__term"]
-            ]
-        else:
-            lgd_varianconsequence_data[data["lgd__id"]].append(
-                data["variant_consequence__term"]
-            )
+        lgd_varianconsequence_data.setdefault(data["lgd_id"], []).append(
+            data["variant_consequence__term"]
+        )
 
     # Preload molecular mechanism synopsis
     mechanism_synopsis_data = {}
     queryset_lgd_mechanism_synopsis = (
-        LGDMolecularMechanismSynopsis.objects.filter(is_deleted=0)
-        .select_related("lgd__id")
-        .values("lgd__id", "synopsis__value", "synopsis_support__value")
+        LGDMolecularMechanismSynopsis.objects.filter(lgd_id__in=lgd_ids, is_deleted=0)
+        .order_by("id")
+        .values("lgd_id", "synopsis__value", "synopsis_support__value")
     )
 
     for queryset_data in queryset_lgd_mechanism_synopsis:
-        if queryset_data["lgd__id"] not in mechanism_synopsis_data:
-            mechanism_synopsis_data[queryset_data["lgd__id"]] = [
-                f"{queryset_data['synopsis__value']}:{queryset_data['synopsis_support__value']}"
-            ]
-        else:
-            mechanism_synopsis_data[queryset_data["lgd__id"]].append(
-                f"{queryset_data['synopsis__value']}:{queryset_data['synopsis_support__value']}"
-            )
+        mechanism_synopsis_data.setdefault(queryset_data["lgd_id"], []).append(
+            f"{queryset_data['synopsis__value']}:{queryset_data['synopsis_support__value']}"
+        )
 
     # Preload molecular mechanism evidence
     mechanism_evidence_data = {}  # key = lgd_id; value = evidence
     queryset_lgd_mechanism_evidence = (
-        LGDMolecularMechanismEvidence.objects.filter(is_deleted=0)
-        .select_related("lgd__id")
-        .values("lgd__id", "evidence__subtype", "evidence__value", "publication__pmid")
+        LGDMolecularMechanismEvidence.objects.filter(lgd_id__in=lgd_ids, is_deleted=0)
+        .order_by("id")
+        .values("lgd_id", "evidence__subtype", "evidence__value", "publication__pmid")
     )
 
     for queryset_data in queryset_lgd_mechanism_evidence:
-        if queryset_data["lgd__id"] not in mechanism_evidence_data:
-            mechanism_evidence_data[queryset_data["lgd__id"]] = [
-                {
-                    "subtype": queryset_data["evidence__subtype"],
-                    "value": queryset_data["evidence__value"],
-                    "pmid": queryset_data["publication__pmid"],
-                }
-            ]
-        else:
-            mechanism_evidence_data[queryset_data["lgd__id"]].append(
-                {
-                    "subtype": queryset_data["evidence__subtype"],
-                    "value": queryset_data["evidence__value"],
-                    "pmid": queryset_data["publication__pmid"],
-                }
-            )
+        mechanism_evidence_data.setdefault(queryset_data["lgd_id"], []).append(
+            {
+                "subtype": queryset_data["evidence__subtype"],
+                "value": queryset_data["evidence__value"],
+                "pmid": queryset_data["publication__pmid"],
+            }
+        )
 
     # Preload phenotypes
     lgd_phenotype_data = {}  # key = lgd_id; value = phenotype accession
-    queryset_lgd_phenotype = (
-        LGDPhenotype.objects.filter(is_deleted=0)
-        .select_related("lgd__id", "phenotype__accession")
-        .values("lgd__id", "phenotype__accession")
-    )
+    queryset_lgd_phenotype = LGDPhenotype.objects.filter(
+        lgd_id__in=lgd_ids, is_deleted=0
+    ).values("lgd_id", "phenotype__accession")
 
     for data in queryset_lgd_phenotype:
-        if data["lgd__id"] not in lgd_phenotype_data:
-            lgd_phenotype_data[data["lgd__id"]] = set()
-            lgd_phenotype_data[data["lgd__id"]].add(data["phenotype__accession"])
-        else:
-            lgd_phenotype_data[data["lgd__id"]].add(data["phenotype__accession"])
+        lgd_phenotype_data.setdefault(data["lgd_id"], set()).add(
+            data["phenotype__accession"]
+        )
 
     # Preload publications
     lgd_publication_data = {}  # key = lgd_id; value = pmid
-    queryset_lgd_publication = (
-        LGDPublication.objects.filter(is_deleted=0)
-        .select_related("lgd__id", "publication__pmid")
-        .values("lgd__id", "publication__pmid")
-    )
+    queryset_lgd_publication = LGDPublication.objects.filter(
+        lgd_id__in=lgd_ids, is_deleted=0
+    ).values("lgd_id", "publication__pmid")
 
     for data in queryset_lgd_publication:
-        if data["lgd__id"] not in lgd_publication_data:
-            lgd_publication_data[data["lgd__id"]] = [str(data["publication__pmid"])]
-        else:
-            lgd_publication_data[data["lgd__id"]].append(str(data["publication__pmid"]))
+        lgd_publication_data.setdefault(data["lgd_id"], []).append(
+            str(data["publication__pmid"])
+        )
 
     # Preload mined publications
     # Return the publications that haven't been curated or rejected yet
-    lgd_mined_publication_data = {} # key = lgd_id; value = pmid
-    queryset_lgd_mined_publication = (
-        LGDMinedPublication.objects.filter(status="mined")
-        .select_related("lgd__id", "mined_publication__pmid")
-        .values("lgd__id", "mined_publication__pmid")
-    )
+    lgd_mined_publication_data = {}  # key = lgd_id; value = pmid
+    queryset_lgd_mined_publication = LGDMinedPublication.objects.filter(
+        lgd_id__in=lgd_ids, status="mined"
+    ).values("lgd_id", "mined_publication__pmid")
 
     for data in queryset_lgd_mined_publication:
-        if data["lgd__id"] not in lgd_mined_publication_data:
-            lgd_mined_publication_data[data["lgd__id"]] = [str(data["mined_publication__pmid"])]
-        else:
-            lgd_mined_publication_data[data["lgd__id"]].append(str(data["mined_publication__pmid"]))
+        lgd_mined_publication_data.setdefault(data["lgd_id"], []).append(
+            str(data["mined_publication__pmid"])
+        )
 
     # Preload cross cutting modifier
-    lgd_ccm_data = {}  # key = lgd_id; value = pmid
+    lgd_ccm_data = {}  # key = lgd_id; value = ccm value
     queryset_lgd_ccm = (
-        LGDCrossCuttingModifier.objects.filter(is_deleted=0)
-        .select_related("lgd__id", "ccm__value")
-        .values("lgd__id", "ccm__value")
+        LGDCrossCuttingModifier.objects.filter(lgd_id__in=lgd_ids, is_deleted=0)
+        .order_by("id")
+        .values("lgd_id", "ccm__value")
     )
 
     for data in queryset_lgd_ccm:
-        if data["lgd__id"] not in lgd_ccm_data:
-            lgd_ccm_data[data["lgd__id"]] = [data["ccm__value"]]
-        else:
-            lgd_ccm_data[data["lgd__id"]].append(data["ccm__value"])
+        lgd_ccm_data.setdefault(data["lgd_id"], []).append(data["ccm__value"])
 
     # Preload panels
     lgd_panel_data = {}
     # For authenticated users pre-load all available panels
-    if user_obj and user_obj.is_authenticated:
-        filter_panels = Q(is_deleted=0)
+    if is_authenticated:
+        filter_panels = Q(lgd_id__in=lgd_ids, is_deleted=0)
     else:
         # Non authenticated users only get visible panels
-        filter_panels = Q(is_deleted=0, panel__is_visible=1)
+        filter_panels = Q(lgd_id__in=lgd_ids, is_deleted=0, panel__is_visible=1)
     queryset_lgd_panel = (
         LGDPanel.objects.filter(filter_panels)
-        .select_related("lgd__id", "panel__name")
-        .values("lgd__id", "panel__name")
+        .order_by("id")
+        .values("lgd_id", "panel__name")
     )
 
     for data in queryset_lgd_panel:
-        if data["lgd__id"] not in lgd_panel_data:
-            lgd_panel_data[data["lgd__id"]] = [data["panel__name"]]
-        else:
-            lgd_panel_data[data["lgd__id"]].append(data["panel__name"])
+        lgd_panel_data.setdefault(data["lgd_id"], []).append(data["panel__name"])
 
     # Preload comments
     lgd_comments = {}
     # Only download public comments
     queryset_lgd_comment = (
-        LGDComment.objects.filter(is_deleted=0, is_public=1)
-        .select_related("lgd__id")
-        .values("lgd__id", "comment")
+        LGDComment.objects.filter(lgd_id__in=lgd_ids, is_deleted=0, is_public=1)
+        .order_by("id")
+        .values("lgd_id", "comment")
     )
 
     for data in queryset_lgd_comment:
         comment = re.sub(r"[\n\r]+", " ", data["comment"])
-        if data["lgd__id"] not in lgd_comments:
-            lgd_comments[data["lgd__id"]] = [comment]
-        else:
-            lgd_comments[data["lgd__id"]].append(comment)
+        lgd_comments.setdefault(data["lgd_id"], []).append(comment)
+
+    # Get extra info for the disease and the locus:
+    #  disease - ids from external dbs (omim, mondo)
+    #  locus - previous gene symbols (from ensembl) and external ids (hgnc, ensembl)
+    extra_data_dict = {}
+    queryset_extra = LocusGenotypeDisease.objects.filter(id__in=lgd_ids).values(
+        "id",
+        "disease__diseaseontologyterm__ontology_term__accession",
+        "locus__locusattrib__value",
+        "locus__locusidentifier__identifier",
+    )
 
-    writer = csv.writer(response)
-    # Write file header
-    header_row = [
-        "g2p id",
-        "gene symbol",
-        "gene mim",
-        "hgnc id",
-        "previous gene symbols",
-        "disease name",
-        "disease mim",
-        "disease MONDO",
-        "allelic requirement",
-        "cross cutting modifier",
-        "confidence",
-        "variant consequence",
-        "variant types",
-        "molecular mechanism",
-        "molecular mechanism support",
-        "molecular mechanism categorisation",
-        "molecular mechanism evidence",
-        "phenotypes",
-        "publications",
-        "additional mined publications",
-        "panel",
-        "comments",
-        "date of last review",
-        "review",
-    ]
-    if include_record_summary:
-        header_row.append("summary")
-    writer.writerow(header_row)
-
-    # Authenticated users can download all panels
-    # Non authenticated users can only download visible panels
-    if (
-        panel
-        and (
-            panel.is_visible == 1
-            or (user_obj and user_obj.is_authenticated and panel.is_visible == 0)
-        )
-    ) or all_panels:
-        # Download specific panel
-        filter_query = Q(
-            is_deleted=0,
-            lgdpanel__panel=panel,
-            lgdpanel__is_deleted=0,
+    for data in queryset_extra:
+        lgd_extra_data = extra_data_dict.setdefault(
+            data["id"],
+            {"disease_ids": [], "locus_previous_symbols": [], "locus_ids": []},
         )
 
-        if all_panels:
-            if only_visible_panels:
-                # Download all visible panels
-                filter_query = Q(
-                    is_deleted=0,
-                    lgdpanel__panel__is_visible=1,
-                    lgdpanel__is_deleted=0,
-                )
-            else:
-                # Download all visible and non-visible panels excluding Demo panel
-                filter_query = Q(is_deleted=0, lgdpanel__is_deleted=0) & ~Q(
-                    lgdpanel__panel__name="Demo"
-                )
-
-        # Download entries
-        queryset_list = (
-            LocusGenotypeDisease.objects.filter(filter_query)
-            .distinct()
-            .select_related(
-                "stable_id",
-                "locus",
-                "disease",
-                "genotype",
-                "confidence",
-                "mechanism",
-                "mechanism_support",
-            )
-            .prefetch_related("disease", "locus")
+        disease_id = data["disease__diseaseontologyterm__ontology_term__accession"]
+        if disease_id is not None and disease_id not in lgd_extra_data["disease_ids"]:
+            lgd_extra_data["disease_ids"].append(disease_id)
+
+        previous_symbol = data["locus__locusattrib__value"]
+        if (
+            previous_symbol is not None
+            and previous_symbol not in lgd_extra_data["locus_previous_symbols"]
+        ):
+            lgd_extra_data["locus_previous_symbols"].append(previous_symbol)
+
+        locus_id = data["locus__locusidentifier__identifier"]
+        if locus_id is not None and locus_id not in lgd_extra_data["locus_ids"]:
+            lgd_extra_data["locus_ids"].append(locus_id)
+
+    return {
+        "variant_types": lgd_variantype_data,
+        "variant_consequences": lgd_varianconsequence_data,
+        "mechanism_synopsis": mechanism_synopsis_data,
+        "mechanism_evidence": mechanism_evidence_data,
+        "phenotypes": lgd_phenotype_data,
+        "publications": lgd_publication_data,
+        "mined_publications": lgd_mined_publication_data,
+        "ccm": lgd_ccm_data,
+        "panels": lgd_panel_data,
+        "comments": lgd_comments,
+        "extra_data": extra_data_dict,
+    }
+
+
+def build_panel_download_row(lgd, chunk_data, include_record_summary):
+    """
+    Build the row of the download file for one record.
+    Called by: panel_download_rows()
+
+    Args:
+        lgd (LocusGenotypeDisease): the record
+        chunk_data (dict): data preloaded by preload_panel_download_data()
+        include_record_summary (bool): include the record summary as the last column
+    """
+    lgd_id = lgd.id
+    variant_types = ""
+    variant_consequences = ""
+    molecular_mechanism_categorisation = ""
+    molecular_mechanism_evidence = ""
+    phenotypes = ""
+    publications = ""
+    mined_publications = ""
+    ccm = ""
+    panels = ""
+    comments = ""
+
+    # extra data for disease and locus
+    disease_mim = ""
+    disease_mondo = ""
+    gene_mim = ""
+    hgnc_id = ""
+    locus_previous = ""
+
+    extra_data = chunk_data["extra_data"].get(lgd_id, {})
+    if extra_data.get("disease_ids"):
+        # Separate disease MIM from MONDO ID
+        disease_mim, disease_mondo = extract_disease_id(extra_data["disease_ids"])
+    if extra_data.get("locus_ids"):
+        # Separate MIM from HGNC ID
+        gene_mim, hgnc_id = extract_locus_id(extra_data["locus_ids"])
+    if extra_data.get("locus_previous_symbols"):
+        locus_previous = "; ".join(extra_data["locus_previous_symbols"])
+
+    # Get preloaded variant types for this g2p entry
+    if lgd_id in chunk_data["variant_types"]:
+        variant_types = "; ".join(sorted(chunk_data["variant_types"][lgd_id]))
+
+    # Get preloaded variant consequences for this g2p entry
+    if lgd_id in chunk_data["variant_consequences"]:
+        variant_consequences = "; ".join(
+            sorted(chunk_data["variant_consequences"][lgd_id])
         )
 
-        # Get extra info for the disease and the locus:
-        #  disease - ids from external dbs (omim, mondo)
-        #  locus - previous gene symbols (from ensembl) and external ids (hgnc, ensembl)
-        queryset_list_extra = list(
-            queryset_list.values(
-                "stable_id",
-                "disease__diseaseontologyterm__ontology_term__accession",
-                "locus__locusattrib__value",
-                "locus__locusidentifier__identifier",
-            )
+    molecular_mechanism = lgd.mechanism.value
+    molecular_mechanism_support = lgd.mechanism_support.value
+
+    # Get preloaded mechanism synopsis/categorisation
+    if lgd_id in chunk_data["mechanism_synopsis"]:
+        molecular_mechanism_categorisation = "; ".join(
+            chunk_data["mechanism_synopsis"][lgd_id]
         )
 
-        extra_data_dict = {}
-        for data in queryset_list_extra:
-            g2p_id = data["stable_id"]
-
-            if g2p_id not in extra_data_dict:
-                extra_data_dict[g2p_id] = {}
-
-                if (
-                    data["disease__diseaseontologyterm__ontology_term__accession"]
-                    is not None
-                ):
-                    extra_data_dict[g2p_id]["disease_ids"] = [
-                        data["disease__diseaseontologyterm__ontology_term__accession"]
-                    ]
-
-                if data["locus__locusattrib__value"] is not None:
-                    extra_data_dict[g2p_id]["locus_previous_symbols"] = [
-                        data["locus__locusattrib__value"]
-                    ]
-
-                if data["locus__locusidentifier__identifier"] is not None:
-                    extra_data_dict[g2p_id]["locus_ids"] = [
-                        data["locus__locusidentifier__identifier"]
-                    ]
-
-            else:
-                if (
-                    data["disease__diseaseontologyterm__ontology_term__accession"]
-                    is not None
-                    and data["disease__diseaseontologyterm__ontology_term__accession"]
-                    not in extra_data_dict[g2p_id]["disease_ids"]
-                ):
-                    extra_data_dict[g2p_id]["disease_ids"].append(
-                        data["disease__diseaseontologyterm__ontology_term__accession"]
-                    )
-
-                if (
-                    data["locus__locusattrib__value"] is not None
-                    and data["locus__locusattrib__value"]
-                    not in extra_data_dict[g2p_id]["locus_previous_symbols"]
-                ):
-                    extra_data_dict[g2p_id]["locus_previous_symbols"].append(
-                        data["locus__locusattrib__value"]
-                    )
-
-                if (
-                    data["locus__locusidentifier__identifier"] is not None
-                    and data["locus__locusidentifier__identifier"]
-                    not in extra_data_dict[g2p_id]["locus_ids"]
-                ):
-                    extra_data_dict[g2p_id]["locus_ids"].append(
-                        data["locus__locusidentifier__identifier"]
-                    )
-
-        # Prepare final data
-        for lgd in queryset_list:
-            internal_stable_id = lgd.stable_id.id
-            lgd_id = lgd.id
-            variant_types = ""
-            variant_consequences = ""
-            molecular_mechanism = ""
-            molecular_mechanism_support = ""
-            molecular_mechanism_categorisation = ""
-            molecular_mechanism_evidence = ""
-            phenotypes = ""
-            publications = ""
-            mined_publications = ""
-            ccm = ""
-            panels = ""
-            comments = ""
-
-            # extra data for disease and locus
-            disease_mim = ""
-            disease_mondo = ""
-            gene_mim = ""
-            hgnc_id = ""
-            locus_previous = ""
-
-            if internal_stable_id in extra_data_dict:
-                if "disease_ids" in extra_data_dict[internal_stable_id]:
-                    # Separate disease MIM from MONDO ID
-                    disease_mim, disease_mondo = extract_disease_id(
-                        extra_data_dict[internal_stable_id]["disease_ids"]
-                    )
-                if "locus_ids" in extra_data_dict[internal_stable_id]:
-                    # Separate MIM from HGNC ID
-                    gene_mim, hgnc_id = extract_locus_id(
-                        extra_data_dict[internal_stable_id]["locus_ids"]
-                    )
-                if "locus_previous_symbols" in extra_data_dict[internal_stable_id]:
-                    locus_previous = "; ".join(
-                        extra_data_dict[internal_stable_id]["locus_previous_symbols"]
-                    )
-
-            # Get preloaded variant types for this g2p entry
-            if lgd_id in lgd_variantype_data:
-                variant_types = "; ".join(sorted(lgd_variantype_data[lgd_id]))
-
-            # Get preloaded variant consequences for this g2p entry
-            if lgd_id in lgd_varianconsequence_data:
-                variant_consequences = "; ".join(
-                    sorted(lgd_varianconsequence_data[lgd_id])
-                )
-
-            # Get preloaded molecular mechanism evidence for this g2p entry
-            molecular_mechanism = lgd.mechanism.value
-            molecular_mechanism_support = lgd.mechanism_support.value
-
-            # Get preloaded mechanism synopsis/categorisation
-            if lgd_id in mechanism_synopsis_data:
-                molecular_mechanism_categorisation = "; ".join(
-                    mechanism_synopsis_data[lgd_id]
-                )
-
-            # Get preloaded mechanism evidence data
-            if lgd_id in mechanism_evidence_data:
-                mechanism_evidence_by_pmid = {}
-                for evidence_data in mechanism_evidence_data[lgd_id]:
-                    if evidence_data["pmid"] not in mechanism_evidence_by_pmid:
-                        mechanism_evidence_by_pmid[evidence_data["pmid"]] = {}
-                        mechanism_evidence_by_pmid[evidence_data["pmid"]][
-                            evidence_data["subtype"]
-                        ] = [evidence_data["value"]]
-                    elif (
-                        evidence_data["subtype"]
-                        not in mechanism_evidence_by_pmid[evidence_data["pmid"]]
-                    ):
-                        mechanism_evidence_by_pmid[evidence_data["pmid"]][
-                            evidence_data["subtype"]
-                        ] = [evidence_data["value"]]
-                    else:
-                        mechanism_evidence_by_pmid[evidence_data["pmid"]][
-                            evidence_data["subtype"]
-                        ].append(evidence_data["value"])
-
-                # repr() returns a printable representation of an object
-                # molecular_mechanism_evidence = repr(mechanism_evidence_by_pmid)
-
-                mm_list = []
-                for mechanism_publication in mechanism_evidence_by_pmid:
-                    synopsis_list = []
-                    for synopsis_type in mechanism_evidence_by_pmid[
-                        mechanism_publication
-                    ]:
-                        mechanism_terms_list = ", ".join(
-                            mechanism_evidence_by_pmid[mechanism_publication][
-                                synopsis_type
-                            ]
-                        )
-                        mechanism_list_by_synopsis = (
-                            f"{synopsis_type}: {mechanism_terms_list}"
-                        )
-                        synopsis_list.append(mechanism_list_by_synopsis)
-
-                    synopsis_list_final = "; ".join(synopsis_list)
-                    mm_list.append(f"{mechanism_publication} -> {synopsis_list_final}")
-                molecular_mechanism_evidence = " & ".join(mm_list)
-
-            # Get preloaded phenotypes for this g2p entry
-            if lgd_id in lgd_phenotype_data:
-                phenotypes = "; ".join(sorted(lgd_phenotype_data[lgd_id]))
-
-            # Get preloaded publications for this g2p entry
-            if lgd_id in lgd_publication_data:
-                publications = "; ".join(sorted(lgd_publication_data[lgd_id]))
-
-            # Get preloaded mined publications for this g2p entry
-            if lgd_id in lgd_mined_publication_data:
-                mined_publications = "; ".join(sorted(lgd_mined_publication_data[lgd_id]))
-
-            # Get preloaded cross cutting modifier for this g2p entry
-            if lgd_id in lgd_ccm_data:
-                ccm = "; ".join(lgd_ccm_data[lgd_id])
-
-            if lgd_id in lgd_panel_data:
-                panels = "; ".join(lgd_panel_data[lgd_id])
-
-            if lgd_id in lgd_comments:
-                comments = "; ".join(lgd_comments[lgd_id])
-
-            review = ""
-            if not lgd.is_reviewed:
-                review = "under review"
-
-            if include_record_summary:
-                summary = build_lgd_summary(lgd)
-
-            # Write data to output file
-            row = [
-                lgd.stable_id.stable_id,
-                lgd.locus.name,
-                gene_mim,
-                hgnc_id,
-                locus_previous,
-                lgd.disease.name,
-                disease_mim,
-                disease_mondo,
-                lgd.genotype.value,
-                ccm,
-                lgd.confidence.value,
-                variant_consequences,
-                variant_types,
-                molecular_mechanism,
-                molecular_mechanism_support,
-                molecular_mechanism_categorisation,
-                molecular_mechanism_evidence,
-                phenotypes,
-                publications,
-                mined_publications,
-                panels,
-                comments,
-                lgd.date_review,
-                review,
-            ]
-            if include_record_summary:
-                row.append(summary)
-            writer.writerow(row)
+    # Get preloaded mechanism evidence data
+    if lgd_id in chunk_data["mechanism_evidence"]:
+        mechanism_evidence_by_pmid = {}
+        for evidence_data in chunk_data["mechanism_evidence"][lgd_id]:
+            mechanism_evidence_by_pmid.setdefault(evidence_data["pmid"], {}).setdefault(
+                evidence_data["subtype"], []
+            ).append(evidence_data["value"])
+
+        mm_list = []
+        for mechanism_publication, evidence_by_type in mechanism_evidence_by_pmid.items():
+            synopsis_list = []
+            for synopsis_type, mechanism_terms in evidence_by_type.items():
+                mechanism_terms_list = ", ".join(mechanism_terms)
+                synopsis_list.append(f"{synopsis_type}: {mechanism_terms_list}")
+
+            synopsis_list_final = "; ".join(synopsis_list)
+            mm_list.append(f"{mechanism_publication} -> {synopsis_list_final}")
+        molecular_mechanism_evidence = " & ".join(mm_list)
+
+    # Get preloaded phenotypes for this g2p entry
+    if lgd_id in chunk_data["phenotypes"]:
+        phenotypes = "; ".join(sorted(chunk_data["phenotypes"][lgd_id]))
+
+    # Get preloaded publications for this g2p entry
+    if lgd_id in chunk_data["publications"]:
+        publications = "; ".join(sorted(chunk_data["publications"][lgd_id]))
+
+    # Get preloaded mined publications for this g2p entry
+    if lgd_id in chunk_data["mined_publications"]:
+        mined_publications = "; ".join(sorted(chunk_data["mined_publications"][lgd_id]))
+
+    # Get preloaded cross cutting modifier for this g2p entry
+    if lgd_id in chunk_data["ccm"]:
+        ccm = "; ".join(chunk_data["ccm"][lgd_id])
+
+    if lgd_id in chunk_data["panels"]:
+        panels = "; ".join(chunk_data["panels"][lgd_id])
+
+    if lgd_id in chunk_data["comments"]:
+        comments = "; ".join(chunk_data["comments"][lgd_id])
+
+    review = ""
+    if not lgd.is_reviewed:
+        review = "under review"
+
+    row = [
+        lgd.stable_id.stable_id,
+        lgd.locus.name,
+        gene_mim,
+        hgnc_id,
+        locus_previous,
+        lgd.disease.name,
+        disease_mim,
+        disease_mondo,
+        lgd.genotype.value,
+        ccm,
+        lgd.confidence.value,
+        variant_consequences,
+        variant_types,
+        molecular_mechanism,
+        molecular_mechanism_support,
+        molecular_mechanism_categorisation,
+        molecular_mechanism_evidence,
+        phenotypes,
+        publications,
+        mined_publications,
+        panels,
+        comments,
+        lgd.date_review,
+        review,
+    ]
+    if include_record_summary:
+        row.append(get_lgd_summary(lgd))
+
+    return row
+
+
+def get_panel_snapshot_key(panel_name, is_authenticated):
+    """
+    Returns the name used to save the snapshot of the panel download file.
+    Authenticated and non authenticated users have different snapshots.
+    """
+    access = "authenticated" if is_authenticated else "public"
+    return f"{panel_name}_{access}"
+
+
+def get_panel_data_version(panel):
+    """
+    Returns the version of the records of the panel (see DataVersion.get_panel_key),
+    or the version of all the records if panel is None ('all').
+    Called by: PanelDownload(), write_panel_snapshots()
+    """
+    if panel is None:
+        return DataVersion.get_version(DataVersion.RECORDS)
+
+    return DataVersion.get_version(DataVersion.get_panel_key(panel.id))
+
+
+def get_panel_snapshot(panel_name, is_authenticated, data_version):
+    """
+    Returns the metadata of the panel download snapshot if it is up to date.
+    Returns None if the snapshots are not enabled, the snapshot does not exist
+    or the records were updated after the snapshot was created.
+    The metadata file is also deleted when the records of the panel are updated
+    (see invalidate_panel_snapshots).
+    Called by: PanelDownload(), write_panel_snapshots()
+
+    Args:
+        panel_name (str): the panel name or 'all'
+        is_authenticated (bool): whether the user is authenticated
+        data_version (int): current version of the records of the panel
+    """
+    if not settings.PANEL_DOWNLOAD_SNAPSHOT_DIR:
+        return None
+
+    snapshot_dir = Path(settings.PANEL_DOWNLOAD_SNAPSHOT_DIR)
+    key = get_panel_snapshot_key(panel_name, is_authenticated)
+
+    try:
+        with open(snapshot_dir / f"{key}.json") as metadata_file:
+            metadata = json.load(metadata_file)
+    except (OSError, ValueError):
+        return None
+
+    if metadata.get("data_version") != data_version:
+        return None
+
+    metadata["path"] = snapshot_dir / metadata["file"]
+    if not metadata["path"].is_file():
+        return None
+
+    return metadata
+
+
+def write_panel_snapshot(panel, is_authenticated, data_version):
+    """
+    Generates the panel download file and saves it compressed (gzip) in the
+    snapshot directory, together with a metadata file (<key>.json).
+    The files are written to a temporary file and then renamed, requests
+    being served while the snapshot is created keep reading the previous file.
+    Called by: write_panel_snapshots()
+
+    Args:
+        panel (Panel): the panel object or None to generate the file for all panels
+        is_authenticated (bool): whether the file is for authenticated users
+        data_version (int): version of the records of the panel used to generate the file
+    """
+    snapshot_dir = Path(settings.PANEL_DOWNLOAD_SNAPSHOT_DIR)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    panel_name = panel.name if panel else "all"
+    key = get_panel_snapshot_key(panel_name, is_authenticated)
+    filename = f"{key}_{data_version}.csv.gz"
+    tmp_path = snapshot_dir / f".{filename}.tmp"
+
+    queryset = get_panel_download_queryset(panel, is_authenticated)
+    rows = panel_download_rows(
+        queryset, is_authenticated, False, settings.PANEL_DOWNLOAD_CHUNK_SIZE
+    )
+
+    # The checksum of the uncompressed content is used as the ETag
+    checksum = hashlib.sha256()
+    with open(tmp_path, "wb") as output_file:
+        # mtime=0 makes the compressed file only depend on its content
+        with gzip.GzipFile(fileobj=output_file, mode="wb", mtime=0) as gzip_file:
+            for line in stream_csv_rows(rows):
+                data = line.encode("utf-8")
+                checksum.update(data)
+                gzip_file.write(data)
+    os.replace(tmp_path, snapshot_dir / filename)
+
+    metadata = {
+        "panel": panel_name,
+        "is_authenticated": is_authenticated,
+        "data_version": data_version,
+        "file": filename,
+        "etag": checksum.hexdigest(),
+        "last_modified": int(time.time()),
+    }
+    tmp_path = snapshot_dir / f".{key}.json.tmp"
+    with open(tmp_path, "w") as metadata_file:
+        json.dump(metadata, metadata_file)
+    os.replace(tmp_path, snapshot_dir / f"{key}.json")
+
+    # Remove the files of the previous versions
+    for old_file in snapshot_dir.glob(f"{key}_*.csv.gz"):
+        if old_file.name != filename:
+            old_file.unlink(missing_ok=True)
+
+    return metadata
+
+
+def write_panel_snapshots(panel_names=None, force=False):
+    """
+    Generates the panel download snapshots that are missing or out of date.
+    There is one snapshot for each panel and one for all panels ('all'), for
+    non authenticated and authenticated users. Non visible panels are only
+    available to authenticated users.
+    Called by: management command generate_panel_snapshots, schedule_panel_snapshots_refresh()
+
+    Args:
+        panel_names (list): only generate the snapshots for these panels (use 'all' for all panels)
+        force (bool): generate the snapshots even if they are up to date
+
+    Returns the list of snapshots created
+    """
+    if not settings.PANEL_DOWNLOAD_SNAPSHOT_DIR:
+        return []
+
+    targets = []
+    if not panel_names or "all" in panel_names:
+        targets.extend([(None, False), (None, True)])
+
+    queryset = Panel.objects.order_by("name")
+    if panel_names:
+        queryset = queryset.filter(name__in=panel_names)
+    for panel in queryset:
+        if panel.is_visible:
+            targets.append((panel, False))
+        targets.append((panel, True))
+
+    created = []
+    for panel, is_authenticated in targets:
+        panel_name = panel.name if panel else "all"
+        # The version is fetched before the file is generated, a file generated
+        # while the records are being updated has the previous version
+        data_version = get_panel_data_version(panel)
+        if not force and get_panel_snapshot(
+            panel_name, is_authenticated, data_version
+        ):
+            continue
+        write_panel_snapshot(panel, is_authenticated, data_version)
+        created.append(get_panel_snapshot_key(panel_name, is_authenticated))
+
+    return created
+
+
+def filter_panels_by_tags(queryset, tags: set[str]):
+    """
+    Returns the panels of the tags (the tags are lowercase).
+    """
+    return queryset.annotate(lower_name=Lower("name")).filter(
+        lower_name__in=get_tag_names(tags, "panel")
+    )
+
+
+def increment_panel_versions(tags: set[str]):
+    """
+    Increments the version of the records of the updated panels (see
+    DataVersion.get_panel_key). The panel stats and the panel download snapshots
+    generated with the previous version are not used anymore, including the
+    ones generated while the transaction was running.
+    Called by the invalidation bus after the transaction is committed, before
+    the panel stats and snapshots are deleted (see invalidation.py)
+    """
+    panels = Panel.objects.all()
+    if ALL_TAG not in tags:
+        panels = filter_panels_by_tags(panels, tags)
+
+    for panel_id in panels.values_list("id", flat=True):
+        DataVersion.increment(DataVersion.get_panel_key(panel_id))
+
+
+def invalidate_panel_snapshots(tags: set[str]):
+    """
+    Deletes the metadata of the panel download snapshots of the updated panels
+    and the snapshots of all panels ('all'), the files are not used anymore.
+    If PANEL_DOWNLOAD_SNAPSHOT_AUTO_REFRESH is enabled, these snapshots are
+    regenerated in a background thread.
+    Called by the invalidation bus after the transaction is committed
+    (see invalidation.py)
+    """
+    if not settings.PANEL_DOWNLOAD_SNAPSHOT_DIR:
+        return
+
+    panels = Panel.objects.all()
+    if ALL_TAG not in tags:
+        panels = filter_panels_by_tags(panels, tags)
+    panel_names = set(panels.values_list("name", flat=True))
+    panel_names.add("all")
+
+    snapshot_dir = Path(settings.PANEL_DOWNLOAD_SNAPSHOT_DIR)
+    for panel_name in panel_names:
+        for is_authenticated in (False, True):
+            key = get_panel_snapshot_key(panel_name, is_authenticated)
+            (snapshot_dir / f"{key}.json").unlink(missing_ok=True)
+
+    if settings.PANEL_DOWNLOAD_SNAPSHOT_AUTO_REFRESH:
+        schedule_panel_snapshots_refresh(panel_names)
+
+
+def invalidate_panel_stats(tags: set[str]):
+    """
+    Deletes the stored stats of the updated panels, they are calculated again
+    in the next request (see PanelDetailSerializer.get_panels_stats).
+    Called by the invalidation bus after the transaction is committed
+    (see invalidation.py)
+    """
+    panels = Panel.objects.all()
+    if ALL_TAG not in tags:
+        panels = filter_panels_by_tags(panels, tags)
+    PanelStats.objects.filter(panel__in=panels).delete()
+
+
+_snapshots_refresh_requested = threading.Event()
+_snapshots_refresh_lock = threading.Lock()
+# Panels waiting to be refreshed
+_snapshots_refresh_panels = set()
+_snapshots_refresh_panels_lock = threading.Lock()
+
+
+def schedule_panel_snapshots_refresh(panel_names):
+    """
+    Regenerates the panel download snapshots of the panels that are out of
+    date in a background thread. Refresh requests received while the snapshots
+    are being generated are merged into a single new run.
+    Called by: invalidate_panel_snapshots()
+    """
+    with _snapshots_refresh_panels_lock:
+        _snapshots_refresh_panels.update(panel_names)
+    _snapshots_refresh_requested.set()
+    if _snapshots_refresh_lock.acquire(blocking=False):
+        threading.Thread(target=refresh_panel_snapshots, daemon=True).start()
+
+
+def refresh_panel_snapshots():
+    """
+    Runs write_panel_snapshots() until there are no more refresh requests.
+    Called by: schedule_panel_snapshots_refresh()
+    """
+    try:
+        while _snapshots_refresh_requested.is_set():
+            _snapshots_refresh_requested.clear()
+            with _snapshots_refresh_panels_lock:
+                panel_names = sorted(_snapshots_refresh_panels)
+                _snapshots_refresh_panels.clear()
+            try:
+                write_panel_snapshots(panel_names)
+            except Exception:
+                logger.exception("Failed to refresh the panel download snapshots")
+    finally:
+        connections.close_all()
+        _snapshots_refresh_lock.release()
+
+
+def read_file_in_chunks(path, chunk_size=64 * 1024):
+    """
+    Reads and uncompresses the gzip file in chunks.
+    Called by: panel_snapshot_response()
+    """
+    with gzip.open(path, "rb") as input_file:
+        while chunk := input_file.read(chunk_size):
+            yield chunk
+
+
+def panel_snapshot_response(request, snapshot, filename, compressed_file):
+    """
+    Returns the panel download snapshot.
+    If the compressed file was requested (format=csv.gz) or the client accepts
+    gzip, the compressed file is sent as it is.
+    Otherwise, the file is uncompressed while it is sent.
+    Conditional requests (If-None-Match, If-Modified-Since) return 304 if
+    the client already has the current version of the file.
+    Called by: PanelDownload()
+    """
+    accepts_gzip = bool(
+        re.search(r"\bgzip\b", request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    )
+
+    # Each format and encoding is a different representation of the file
+    if compressed_file:
+        etag = f'"{snapshot["etag"]}-gz"'
+    elif accepts_gzip:
+        etag = f'"{snapshot["etag"]}-gzip"'
     else:
-        # If user is not authenticated then it can only download visible panels
-        # Return no matching panel
-        raise Http404(f"No matching panel found for: {name}")
+        etag = f'"{snapshot["etag"]}"'
+    last_modified = snapshot["last_modified"]
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+
+    if response is None:
+        if compressed_file:
+            response = FileResponse(
+                open(snapshot["path"], "rb"), content_type=GzipCSVRenderer.media_type
+            )
+        elif accepts_gzip:
+            response = FileResponse(
+                open(snapshot["path"], "rb"), content_type=CSVRenderer.media_type
+            )
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = StreamingHttpResponse(
+                read_file_in_chunks(snapshot["path"]),
+                content_type=CSVRenderer.media_type,
+            )
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    patch_vary_headers(response, ["Accept-Encoding"])
 
     return response
 
@@ -1085,7 +1477,7 @@ def extract_locus_id(locus_ids):
     """
     Method to extract the gene MIM ID and the
     HGNC ID from a list of locus IDs.
-    Called by: PanelDownload()
+    Called by: build_panel_download_row()
     """
     gene_mim = ""
     hgnc_id = ""
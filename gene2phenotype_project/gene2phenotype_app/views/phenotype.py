@@ -27,7 +27,7 @@ from gene2phenotype_app.models import (
 
 from .base import BaseAdd, CustomPermissionAPIView, IsSuperUser
 
-from ..utils import validate_phenotype, get_date_now
+from ..utils import validate_phenotypes, get_date_now, ExternalLookupError
 
 
 @extend_schema(exclude=True)
@@ -50,31 +50,37 @@ def PhenotypeDetail(request, hpo_list):
     data = []
     invalid_hpos = []
 
+    # Validate the HPO IDs with the correct format (local HPO terms)
+    try:
+        hpo_responses = validate_phenotypes(
+            [hpo for hpo in id_list if re.match(r"HP\:\d+", hpo)]
+        )
+    except ExternalLookupError:
+        return Response(
+            {"error": "Could not fetch the phenotypes from the HPO API"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
     for hpo in id_list:
-        # HPO has invalid format
-        if not re.match(r"HP\:\d+", hpo):
-            invalid_hpos.append(hpo)
+        response = hpo_responses.get(hpo)
 
+        # HPO has invalid format or it was not found
+        if not response:
+            invalid_hpos.append(hpo)
         else:
-            # HPO has the correct format
-            response = validate_phenotype(hpo)
-
-            if not response:
-                invalid_hpos.append(hpo)
+            # check if phenotype has a description
+            if "definition" in response:
+                phenotype_description = response["definition"]
             else:
-                # check if phenotype has a description
-                if "definition" in response:
-                    phenotype_description = response["definition"]
-                else:
-                    phenotype_description = None
-
-                data.append(
-                    {
-                        "accession": hpo,
-                        "term": response["name"],
-                        "description": phenotype_description,
-                    }
-                )
+                phenotype_description = None
+
+            data.append(
+                {
+                    "accession": hpo,
+                    "term": response["name"],
+                    "description": phenotype_description,
+                }
+            )
 
     # if any of the HPO IDs is invalid raise error and display all invalid IDs
     if invalid_hpos:
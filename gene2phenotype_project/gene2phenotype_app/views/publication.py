@@ -35,7 +35,13 @@ from gene2phenotype_app.models import (
 
 from .base import BaseAdd, BaseUpdate, IsSuperUser
 
-from ..utils import get_publication, get_authors, clean_title, get_date_now
+from ..utils import (
+    get_publications,
+    get_authors,
+    clean_title,
+    get_date_now,
+    ExternalLookupError,
+)
 
 
 @extend_schema(exclude=True)
@@ -59,48 +65,64 @@ def PublicationDetail(request, pmids):
     data = []
     invalid_pmids = []
 
+    valid_pmids = {}
     for pmid_str in id_list:
         try:
-            pmid = int(pmid_str)
+            valid_pmids[pmid_str] = int(pmid_str)
+        except ValueError:
+            pass
+
+    # Fetch the PMIDs with the correct format from G2P (one query)
+    publications = Publication.objects.in_bulk(
+        set(valid_pmids.values()), field_name="pmid"
+    )
+
+    # Query EuropePMC for the PMIDs not found in G2P (concurrently)
+    try:
+        europepmc_responses = get_publications(
+            [pmid for pmid in valid_pmids.values() if pmid not in publications]
+        )
+    except ExternalLookupError:
+        return Response(
+            {"error": "Could not fetch the publications from EuropePMC"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
 
-        except:
+    for pmid_str in id_list:
+        pmid = valid_pmids.get(pmid_str)
+        if pmid is None:
+            invalid_pmids.append(pmid_str)
+        elif pmid in publications:
+            publication = publications[pmid]
+            data.append(
+                {
+                    "pmid": int(publication.pmid),
+                    "title": publication.title,
+                    "authors": publication.authors,
+                    "year": int(publication.year),
+                    "source": "G2P",
+                }
+            )
+        elif europepmc_responses[pmid]["hitCount"] == 0:
             invalid_pmids.append(pmid_str)
-
         else:
-            # The PMID has the correct format
-            try:
-                publication = Publication.objects.get(pmid=pmid)
-                data.append(
-                    {
-                        "pmid": int(publication.pmid),
-                        "title": publication.title,
-                        "authors": publication.authors,
-                        "year": int(publication.year),
-                        "source": "G2P",
-                    }
-                )
-            except Publication.DoesNotExist:
-                # Query EuropePMC
-                response = get_publication(pmid)
-                if response["hitCount"] == 0:
-                    invalid_pmids.append(pmid_str)
-                else:
-                    authors = get_authors(response)
-                    year = None
-                    publication_info = response["result"]
-                    title = clean_title(publication_info["title"])
-                    if "pubYear" in publication_info:
-                        year = publication_info["pubYear"]
-
-                    data.append(
-                        {
-                            "pmid": int(pmid),
-                            "title": title,
-                            "authors": authors,
-                            "year": int(year),
-                            "source": "EuropePMC",
-                        }
-                    )
+            response = europepmc_responses[pmid]
+            authors = get_authors(response)
+            year = None
+            publication_info = response["result"]
+            title = clean_title(publication_info["title"])
+            if "pubYear" in publication_info:
+                year = publication_info["pubYear"]
+
+            data.append(
+                {
+                    "pmid": int(pmid),
+                    "title": title,
+                    "authors": authors,
+                    "year": int(year),
+                    "source": "EuropePMC",
+                }
+            )
 
     # if any of the PMIDs is invalid raise error and display all invalid IDs
     if invalid_pmids:
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, NamedTuple
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+from gene2phenotype_app.models import DataVersion
+
+
+"""
+Cache of the reference data returned by the API (attribs, molecular mechanisms,
+variant types and meta).
+
+The reference data is only updated on deploy or by curators, the data is
+generated once and kept in memory until it is updated:
+    - the reference data version (see DataVersion) is incremented every time
+      the data is updated (see signals.py)
+    - the cache of the process that updated the data is cleared after the
+      transaction is committed
+    - the other processes check the version every
+      REFERENCE_DATA_CACHE_REFRESH_INTERVAL seconds
+
+If REFERENCE_DATA_SHARED_CACHE is defined, the data is also saved in the shared
+Django cache (ex: memcached), this way it is only generated by one process.
+
+The responses include a strong ETag; if the client sends the same ETag
+(If-None-Match) the data is not sent again (304 Not Modified).
+"""
+
+
+class CachedData(NamedTuple):
+    data: Any
+    etag: str
+
+
+def get_etag(data) -> str:
+    """
+    Returns the strong ETag of the data, generated from its JSON representation.
+    """
+    content = json.dumps(data, separators=(",", ":"), default=str)
+    return f'"{hashlib.sha256(content.encode()).hexdigest()[:32]}"'
+
+
+class ReferenceDataCache:
+    """
+    In-process cache of the reference data, with an optional shared cache.
+    The data is identified by a key (ex: "attrib_types").
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.data_version = None
+        self.last_check = 0.0
+
+    def clear(self):
+        """
+        Clears the data of this process.
+        The data version is checked again in the next request.
+        """
+        with self.lock:
+            self.entries = {}
+            self.data_version = None
+
+    def check_data_version(self) -> int:
+        """
+        Clears the data if it was updated by another process.
+        Returns the current data version.
+        """
+        interval = settings.REFERENCE_DATA_CACHE_REFRESH_INTERVAL
+
+        with self.lock:
+            now = time.monotonic()
+            if self.data_version is not None and now - self.last_check < interval:
+                return self.data_version
+
+            self.last_check = now
+            data_version = DataVersion.get_version(DataVersion.REFERENCE_DATA)
+            if data_version != self.data_version:
+                self.entries = {}
+                self.data_version = data_version
+
+            return data_version
+
+    def get(self, key: str, build: Callable[[], Any]) -> CachedData:
+        """
+        Returns the data of the key, the data is generated with build() if
+        it is not cached yet.
+        """
+        data_version = self.check_data_version()
+
+        with self.lock:
+            cached_data = self.entries.get(key)
+        if cached_data is not None:
+            return cached_data
+
+        shared_cache = None
+        shared_key = f"g2p_reference_data:{key}:{data_version}"
+        if settings.REFERENCE_DATA_SHARED_CACHE:
+            shared_cache = caches[settings.REFERENCE_DATA_SHARED_CACHE]
+            cached_data = shared_cache.get(shared_key)
+
+        if cached_data is None:
+            data = build()
+            cached_data = CachedData(data, get_etag(data))
+            if shared_cache is not None:
+                shared_cache.set(shared_key, cached_data, timeout=None)
+
+        with self.lock:
+            # The data could have been updated while it was being generated
+            if self.data_version == data_version:
+                self.entries[key] = cached_data
+
+        return cached_data
+
+
+reference_data_cache = ReferenceDataCache()
+
+
+def reference_data_response(request, cached_data: CachedData) -> Response:
+    """
+    Returns the response with the cached data and its ETag.
+    If the client already has the data (If-None-Match) the response is
+    304 Not Modified, without content.
+    """
+    headers = {"ETag": cached_data.etag}
+    if_none_match = request.headers.get("If-None-Match", "")
+    client_etags = [etag.strip() for etag in if_none_match.split(",")]
+
+    if cached_data.etag in client_etags or "*" in client_etags:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(cached_data.data, headers=headers)
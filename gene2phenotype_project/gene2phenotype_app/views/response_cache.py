@@ -0,0 +1,248 @@
+import hashlib
+import json
+import logging
+import uuid
+from functools import wraps
+from typing import Callable, Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from gene2phenotype_app.invalidation import ALL_TAG, RECORDS_TAG, get_tag
+from gene2phenotype_app.models import DataVersion
+
+
+"""
+Cache of the responses of the public read endpoints (record, gene summary,
+disease summary, panel summary, panels and search).
+
+The responses only change when the records data or the reference data is
+updated, the response data is saved in the cache 'response_cache' (see CACHES
+in settings.py) with a key that includes:
+    - the reference data version (see DataVersion)
+    - the generation of the tags of the response (see invalidation.py), ex: the
+      gene summary depends on the tag 'locus:<gene symbol>'
+    - the records data version, only if the cache is not shared by the processes
+      (local memory cache)
+    - the URL (host and path) and the sorted query parameters
+    - the type of user (anonymous or authenticated), as the records visibility
+      is different for authenticated users
+
+The generation of a tag is a random value saved in the cache, it is replaced
+after a transaction that updates data with the tag is committed (see
+invalidate_responses). Only the responses that use the tag get a new key, the
+old responses are never returned again and expire after RESPONSE_CACHE_TIMEOUT
+seconds. Responses cached while the transaction was running are also dropped.
+
+The generations are only replaced in the cache of the process that updated the
+data. With a shared cache (file or redis) all the processes, including the
+management commands, see the new generations. With a local memory cache the
+records data version (incremented after every update, see signals.py) is
+also included in the key: all the responses of the other processes are
+invalidated by any update.
+
+Only successful responses (200) are cached, the data is saved as JSON types.
+The drafts are not in the records data, the searches of drafts are not cached
+(see is_draft_search).
+The response header 'X-Cache' indicates if the response was read from the
+cache (HIT or MISS).
+The number of hits and misses is saved in the cache and returned by the
+endpoint ResponseCacheMetrics.
+"""
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ALIAS = "response_cache"
+
+# Counters saved in the cache
+METRICS_KEYS = ("hits", "misses")
+
+
+def get_response_cache():
+    """
+    Returns the cache used to save the responses.
+    Returns None if the response cache is disabled.
+    """
+    if RESPONSE_CACHE_ALIAS not in settings.CACHES:
+        return None
+
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def get_tag_key(tag: str) -> str:
+    return f"g2p_response_tag:{tag}"
+
+
+def get_tag_generations(cache, tags: list[str]) -> list[str]:
+    """
+    Returns the current generation of the tags.
+    Tags without a generation (new or evicted from the cache) get a new one.
+    """
+    keys = [get_tag_key(tag) for tag in tags]
+    generations = cache.get_many(keys)
+
+    for key in keys:
+        if key not in generations:
+            # Another process can set the generation at the same time
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            generations[key] = cache.get(key)
+
+    return [str(generations[key]) for key in keys]
+
+
+def invalidate_responses(tags: set[str]):
+    """
+    Replaces the generation of the tags, the responses that depend on the tags
+    are not returned anymore.
+    Called by the invalidation bus after the transaction is committed
+    (see invalidation.py)
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return
+
+    cache.set_many({get_tag_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+
+def is_shared_cache(cache) -> bool:
+    """
+    Returns True if the cache is shared by the processes (the tag generations
+    replaced by one process are seen by the other processes).
+    """
+    return not isinstance(cache, LocMemCache)
+
+
+def get_response_cache_key(request, tags: list[str]) -> str:
+    """
+    Returns the key of the response of the request.
+    The data versions are fetched with one query.
+    """
+    cache = get_response_cache()
+    generations = get_tag_generations(cache, [ALL_TAG, *tags])
+    user_type = "authenticated" if request.user.is_authenticated else "anonymous"
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+
+    version_keys = [DataVersion.REFERENCE_DATA]
+    if not is_shared_cache(cache):
+        version_keys.append(DataVersion.RECORDS)
+    versions = DataVersion.get_versions(version_keys)
+
+    key = "|".join(
+        [
+            *(str(versions[version_key]) for version_key in version_keys),
+            *generations,
+            user_type,
+            request.get_host(),
+            request.path,
+            query,
+        ]
+    )
+
+    return f"g2p_response:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def increment_metric(cache, name: str):
+    key = f"g2p_response_metrics:{name}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter does not exist yet
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_response_cache_metrics() -> dict:
+    """
+    Returns the number of hits and misses of the response cache.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+
+    metrics = cache.get_many([f"g2p_response_metrics:{name}" for name in METRICS_KEYS])
+    result = {
+        name: metrics.get(f"g2p_response_metrics:{name}", 0) for name in METRICS_KEYS
+    }
+    total = result["hits"] + result["misses"]
+    result["hit_ratio"] = round(result["hits"] / total, 4) if total else None
+    result["enabled"] = True
+
+    return result
+
+
+def cache_response(
+    kind: Optional[str] = None,
+    kwarg: Optional[str] = None,
+    skip: Optional[Callable] = None,
+):
+    """
+    Decorator for the GET method of a view (get or list): the response data is
+    read from the cache or saved in the cache after the method is called.
+
+    Args:
+        kind (str): kind of data returned by the view (record, locus, disease or panel)
+        kwarg (str): URL parameter with the name of the data (ex: stable_id)
+        skip (function): called with the request, returns True if the response
+                         of the request is not cached (ex: search of drafts)
+
+    Views without a kind (ex: search) depend on all the records, their responses
+    are invalidated by any update.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            return get_cached_response(
+                view_method, self, request, kind, kwarg, skip, *args, **kwargs
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def get_cached_response(
+    view_method, view, request, kind, kwarg, skip, *args, **kwargs
+):
+    """
+    Returns the cached response or calls the view method and saves its response.
+    Called by: cache_response()
+    """
+    cache = get_response_cache()
+    if cache is None or request.method != "GET":
+        return view_method(view, request, *args, **kwargs)
+
+    if skip is not None and skip(request):
+        response = view_method(view, request, *args, **kwargs)
+        response["X-Cache"] = "MISS"
+        return response
+
+    if kind:
+        tags = [get_tag(kind, kwargs[kwarg])]
+    else:
+        tags = [RECORDS_TAG]
+
+    key = get_response_cache_key(request, tags)
+    cached_data = cache.get(key)
+
+    if cached_data is not None:
+        increment_metric(cache, "hits")
+        response = Response(cached_data)
+        response["X-Cache"] = "HIT"
+        return response
+
+    response = view_method(view, request, *args, **kwargs)
+
+    increment_metric(cache, "misses")
+    if response.status_code == status.HTTP_200_OK:
+        # Save the data as JSON types (the data can include dates, querysets, etc.)
+        data = json.loads(json.dumps(response.data, cls=JSONEncoder))
+        cache.set(key, data)
+    response["X-Cache"] = "MISS"
+
+    return response
@@ -3,8 +3,11 @@ from operator import or_
 from django.conf import settings
 from rest_framework import status
 from rest_framework.response import Response
-from django.db.models import Q, F
+from django.db import transaction
+from django.db.models import Q, F, Exists, OuterRef, Prefetch, Count
+from django.utils.decorators import method_decorator
 import textwrap, re
+from typing import Optional
 from drf_spectacular.utils import (
     extend_schema,
     OpenApiResponse,
@@ -18,13 +21,26 @@ from gene2phenotype_app.serializers import (
 )
 
 from gene2phenotype_app.models import (
+    DataVersion,
     LGDPanel,
+    LGDPhenotype,
+    LGDSearchToken,
     LocusGenotypeDisease,
     CurationData,
+    CurationDataPanel,
     G2PStableID,
 )
 
-from .base import BaseView, CustomPagination
+from .base import BaseView, CustomPagination, compress_response
+from .response_cache import cache_response
+
+
+def is_draft_search(request) -> bool:
+    """
+    Returns True if the request searches the drafts.
+    The drafts change often and depend on the user, these searches are not cached.
+    """
+    return request.query_params.get("type") == "draft"
 
 
 @extend_schema(
@@ -181,6 +197,7 @@ from .base import BaseView, CustomPagination
         )
     },
 )
+@method_decorator(compress_response, name="dispatch")
 class SearchView(BaseView):
     pagination_class = CustomPagination
 
@@ -204,6 +221,15 @@ class SearchView(BaseView):
         if not search_query:
             return LocusGenotypeDisease.objects.none()
 
+        # Records that contain all the words of the query (see LGDSearchToken)
+        # The regex is only applied to these records
+        disease_candidates = Q()
+        phenotype_candidates = Q()
+        if search_type in (None, "disease", "phenotype"):
+            disease_candidates, phenotype_candidates = get_search_index_filters(
+                search_query, [LGDSearchToken.DISEASE, LGDSearchToken.PHENOTYPE]
+            )
+
         # Some disease names contain parenthesis
         # In mysql, parenthesis is a special character that has to be search with "\\("
         if search_query.find("(") or search_query.find(")"):
@@ -215,6 +241,13 @@ class SearchView(BaseView):
         # Base constraint - exclude deleted records
         base_deleted = Q(is_deleted=0)
 
+        # Only return records linked to panels the user can access
+        # If the user is not logged in, only show visible panels
+        lgd_panels = LGDPanel.objects.filter(is_deleted=0)
+        if user.is_authenticated is False:
+            lgd_panels = lgd_panels.filter(panel__is_visible=1)
+        base_deleted &= Q(Exists(lgd_panels.filter(lgd=OuterRef("pk"))))
+
         # Additional options constraints
         options_query = Q()
 
@@ -255,15 +288,19 @@ class SearchView(BaseView):
         )
 
         base_disease = or_q(
-            Q(disease__name__regex=rf"(?i)(?<![\w]){search_query}(?![\w])"),
-            Q(
-                disease__diseasesynonym__synonym__regex=rf"(?i)(?<![\w]){search_query}(?![\w])"
+            disease_candidates
+            & or_q(
+                Q(disease__name__regex=rf"(?i)(?<![\w]){search_query}(?![\w])"),
+                Q(
+                    disease__diseasesynonym__synonym__regex=rf"(?i)(?<![\w]){search_query}(?![\w])"
+                ),
             ),
             Q(disease__diseaseontologyterm__ontology_term__accession=search_query),
         )
 
         base_phenotype = or_q(
-            Q(
+            phenotype_candidates
+            & Q(
                 lgdphenotype__phenotype__term__regex=rf"(?i)(?<![\w]){search_query}(?![\w])",
                 lgdphenotype__isnull=False,
                 lgdphenotype__is_deleted=0,
@@ -302,9 +339,6 @@ class SearchView(BaseView):
                     .distinct()
                 )
 
-            if not queryset.exists():
-                self.handle_no_permission("results", search_query)
-
         elif search_type == "gene":
             queryset = (
                 LocusGenotypeDisease.objects.filter(
@@ -314,9 +348,6 @@ class SearchView(BaseView):
                 .distinct()
             )
 
-            if not queryset.exists():
-                self.handle_no_permission("Gene", search_query)
-
         elif search_type == "disease":
             queryset = (
                 LocusGenotypeDisease.objects.filter(
@@ -326,9 +357,6 @@ class SearchView(BaseView):
                 .distinct()
             )
 
-            if not queryset.exists():
-                self.handle_no_permission("Disease", search_query)
-
         elif search_type == "phenotype":
             queryset = (
                 LocusGenotypeDisease.objects.filter(
@@ -338,9 +366,6 @@ class SearchView(BaseView):
                 .distinct()
             )
 
-            if not queryset.exists():
-                self.handle_no_permission("Phenotype", search_query)
-
         elif search_type == "stable_id":
             queryset = (
                 LocusGenotypeDisease.objects.filter(
@@ -350,9 +375,6 @@ class SearchView(BaseView):
                 .distinct()
             )
 
-            if not queryset.exists():
-                self.handle_no_permission("stable_id", search_query)
-
         elif search_type == "draft" and user.is_authenticated:
             # to extend the queryset being annotated when it is draft,
             # we want to return username so curator can see who is curating
@@ -372,44 +394,39 @@ class SearchView(BaseView):
                 )
             )
 
-            for obj in queryset:
-                obj.json_data_info = (
-                    CurationDataSerializer.get_entry_info_from_json_data(
-                        self, obj.json_data
-                    )
-                )
-
             if not queryset.exists():
                 self.handle_no_permission("draft", search_query)
 
+            # The displayed fields are saved in the curation_data columns
+            return (
+                queryset.defer("json_data")
+                .select_related("stable_id")
+                .prefetch_related(
+                    Prefetch(
+                        "curation_panels",
+                        queryset=CurationDataPanel.objects.select_related(
+                            "panel"
+                        ).order_by("id"),
+                        to_attr="prefetched_panels",
+                    )
+                )
+            )
+
         else:
             self.handle_no_permission("Search type is not valid", None)
 
-        new_queryset = []
-        if queryset.exists():
-            if search_type != "draft":
-                for lgd in queryset:
-                    # If the user is not logged in, only show visible panels
-                    if user.is_authenticated is False:
-                        lgdpanel_select = LGDPanel.objects.filter(
-                            Q(lgd=lgd, panel__is_visible=1, is_deleted=0)
-                        )
-                    else:
-                        lgdpanel_select = LGDPanel.objects.filter(lgd=lgd, is_deleted=0)
-
-                    lgd_panels = []
-                    for lp in lgdpanel_select:
-                        lgd_panels.append(lp.panel.name)
-
-                    # Add new property to LGD object
-                    lgd.panels = lgd_panels
-                    if lgd_panels:
-                        new_queryset.append(lgd)
-            else:
-                return queryset
-
-        return new_queryset
+        # Fetch the data displayed in the results and the panels of each record
+        return queryset.select_related(
+            "stable_id", "locus", "genotype", "disease", "mechanism", "confidence"
+        ).prefetch_related(
+            Prefetch(
+                "lgdpanel_set",
+                queryset=lgd_panels.select_related("panel").order_by("panel__name"),
+                to_attr="prefetched_panels",
+            )
+        )
 
+    @cache_response(skip=is_draft_search)
     def list(self, request, *args, **kwargs):
         """
         Search G2P records. Supported search types are:
@@ -458,25 +475,30 @@ class SearchView(BaseView):
         elif search_type != "stable_id" and search_type != "draft":
             search_type = search_type.capitalize()
 
+        # The queryset is paginated before the results are formatted:
+        # only the records of the requested page are fetched
+        page = self.paginate_queryset(queryset)
+        paginated_queryset = page if page is not None else queryset
+
         # Check if queryset is empty, if so return appropriate message
-        if isinstance(queryset, list) and not queryset:
+        if search_query and not paginated_queryset:
             self.handle_no_permission(search_type, search_query)
 
         list_output = []
         if issubclass(serializer, LocusGenotypeDiseaseSerializer):
-            for lgd in queryset:
+            for lgd in paginated_queryset:
                 data = {
                     "stable_id": lgd.stable_id.stable_id,
                     "gene": lgd.locus.name,
                     "genotype": lgd.genotype.value,
                     "disease": lgd.disease.name,
                     "mechanism": lgd.mechanism.value,
-                    "panel": lgd.panels,
+                    "panel": [lp.panel.name for lp in lgd.prefetched_panels],
                     "confidence": lgd.confidence.value,
                 }
                 list_output.append(data)
         else:
-            for c_data in queryset:
+            for c_data in paginated_queryset:
                 data = {
                     "stable_id": c_data.stable_id.stable_id,
                     "gene": c_data.gene_symbol,
@@ -485,18 +507,16 @@ class SearchView(BaseView):
                     "date_last_updated": c_data.date_last_update,
                     "curator_first": c_data.first_name,
                     "curator_last_name": c_data.last_name,
-                    "genotype": c_data.json_data_info["genotype"],
-                    "disease_name": c_data.json_data_info["disease"],
-                    "panels": c_data.json_data_info["panel"],
-                    "confidence": c_data.json_data_info["confidence"],
+                    "genotype": c_data.genotype,
+                    "disease_name": c_data.disease_name,
+                    "panels": [cp.panel.description for cp in c_data.prefetched_panels],
+                    "confidence": c_data.confidence,
                     "curator_email": c_data.user_email,
                 }
                 list_output.append(data)
 
-        paginated_output = self.paginate_queryset(list_output)
-
-        if paginated_output is not None:
-            return self.get_paginated_response(paginated_output)
+        if page is not None:
+            return self.get_paginated_response(list_output)
 
         return Response({"results": list_output, "count": len(list_output)})
 
@@ -504,3 +524,95 @@ class SearchView(BaseView):
 def or_q(*qs: Q) -> Q:
     """Combine a list of Q objects using OR operator"""
     return reduce(or_, qs)
+
+
+def get_search_tokens(text: str) -> set[str]:
+    """
+    Returns the words (tokens) of the text used in the search index.
+    The tokens are lowercase.
+    """
+    max_length = LGDSearchToken._meta.get_field("token").max_length
+    return {token[:max_length] for token in re.findall(r"\w+", text.lower())}
+
+
+def get_search_index_filters(search_query: str, fields: list[str]) -> list[Q]:
+    """
+    Returns a filter for each field (disease or phenotype) to select the records
+    that contain all the words of the query in the field.
+    A word-boundary match of the query is only possible in these records.
+
+    If the query does not have words or the search index was not generated yet
+    the filters do not exclude any record.
+    """
+    tokens = get_search_tokens(search_query)
+
+    if not tokens or not DataVersion.get_version(DataVersion.SEARCH_INDEX):
+        return [Q() for field in fields]
+
+    # The records are selected in the database (subquery), common words can
+    # match most of the records
+    return [
+        Q(
+            id__in=LGDSearchToken.objects.filter(field=field, token__in=tokens)
+            .order_by()
+            .values("lgd_id")
+            .annotate(number_tokens=Count("token", distinct=True))
+            .filter(number_tokens=len(tokens))
+            .values("lgd_id")
+        )
+        for field in fields
+    ]
+
+
+def update_search_index(lgd_ids: Optional[list[int]] = None) -> int:
+    """
+    Generates the search index (LGDSearchToken) for the records.
+    If no records are specified then the index is generated for all records.
+
+    Returns the number of tokens saved
+    """
+    records = LocusGenotypeDisease.objects.all()
+    if lgd_ids is not None:
+        records = records.filter(id__in=lgd_ids)
+
+    texts = []
+    texts.extend(
+        (lgd_id, LGDSearchToken.DISEASE, name)
+        for lgd_id, name in records.values_list("id", "disease__name")
+    )
+    texts.extend(
+        (lgd_id, LGDSearchToken.DISEASE, synonym)
+        for lgd_id, synonym in records.filter(
+            disease__diseasesynonym__isnull=False
+        ).values_list("id", "disease__diseasesynonym__synonym")
+    )
+    texts.extend(
+        (lgd_id, LGDSearchToken.PHENOTYPE, term)
+        for lgd_id, term in LGDPhenotype.objects.filter(
+            lgd__in=records, is_deleted=0
+        ).values_list("lgd_id", "phenotype__term")
+    )
+
+    search_tokens = set()
+    for lgd_id, field, text in texts:
+        for token in get_search_tokens(text):
+            search_tokens.add((lgd_id, field, token))
+
+    with transaction.atomic():
+        if lgd_ids is None:
+            LGDSearchToken.objects.all().delete()
+        else:
+            LGDSearchToken.objects.filter(lgd_id__in=lgd_ids).delete()
+
+        LGDSearchToken.objects.bulk_create(
+            [
+                LGDSearchToken(lgd_id=lgd_id, field=field, token=token)
+                for lgd_id, field, token in search_tokens
+            ],
+            batch_size=1000,
+        )
+
+        if lgd_ids is None:
+            DataVersion.increment(DataVersion.SEARCH_INDEX)
+
+    return len(search_tokens)
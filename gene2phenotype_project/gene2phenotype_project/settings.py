@@ -40,6 +40,93 @@ MAX_DISEASE_NAME_LENGTH = config.getint(
     "settings", "MAX_DISEASE_NAME_LENGTH", fallback=255
 )
 
+# Number of records loaded at a time when streaming the panel download file
+PANEL_DOWNLOAD_CHUNK_SIZE = config.getint(
+    "settings", "PANEL_DOWNLOAD_CHUNK_SIZE", fallback=500
+)
+
+# Maximum number of records that can be fetched in one call to the batch endpoint
+LGD_BATCH_MAX_SIZE = config.getint("settings", "LGD_BATCH_MAX_SIZE", fallback=5000)
+
+# Interval (seconds) to check if the autocomplete index has to be generated again
+# because the data was updated by another process
+AUTOCOMPLETE_REFRESH_INTERVAL = config.getint(
+    "settings", "AUTOCOMPLETE_REFRESH_INTERVAL", fallback=60
+)
+
+# Interval (seconds) to check if the cached reference data (attribs, mechanisms,
+# variant types, meta) has to be generated again because the data was updated
+# by another process
+REFERENCE_DATA_CACHE_REFRESH_INTERVAL = config.getint(
+    "settings", "REFERENCE_DATA_CACHE_REFRESH_INTERVAL", fallback=60
+)
+
+# Name of the Django cache (CACHES) used to share the reference data between processes
+# If not defined, each process keeps its own copy of the reference data
+REFERENCE_DATA_SHARED_CACHE = config.get(
+    "settings", "REFERENCE_DATA_SHARED_CACHE", fallback=None
+)
+
+# Directory where the precomputed panel download files (snapshots) are saved
+# If not defined, the panel download files are always generated on request
+PANEL_DOWNLOAD_SNAPSHOT_DIR = config.get(
+    "settings", "PANEL_DOWNLOAD_SNAPSHOT_DIR", fallback=None
+)
+
+# Regenerate the panel download snapshots after the records are updated
+PANEL_DOWNLOAD_SNAPSHOT_AUTO_REFRESH = config.getboolean(
+    "settings", "PANEL_DOWNLOAD_SNAPSHOT_AUTO_REFRESH", fallback=False
+)
+
+# External APIs used to validate the publications, the phenotypes and the genes
+EUROPEPMC_URL = config.get(
+    "settings",
+    "EUROPEPMC_URL",
+    fallback="https://www.ebi.ac.uk/europepmc/webservices/rest",
+).rstrip("/")
+HPO_API_URL = config.get(
+    "settings", "HPO_API_URL", fallback="https://ontology.jax.org/api/hp"
+).rstrip("/")
+ENSEMBL_URL = config.get(
+    "settings", "ENSEMBL_URL", fallback="https://rest.ensembl.org"
+).rstrip("/")
+
+# Query the HPO API for the phenotypes not found in the local HPO terms
+# (table hpo_term, loaded by the command load_hpo_terms). The HPO API is always
+# queried while the table is empty.
+HPO_API_FALLBACK = config.getboolean("settings", "HPO_API_FALLBACK", fallback=False)
+
+# Query the Ensembl REST API for the genes not found in G2P or in the HGNC genes
+# (table hgnc_gene, loaded by the command load_gene_reference)
+GENE_REFERENCE_API_FALLBACK = config.getboolean(
+    "settings", "GENE_REFERENCE_API_FALLBACK", fallback=False
+)
+
+# Requests to the external APIs (see utils/external_utils.py)
+# Timeout (seconds) of each request
+EXTERNAL_LOOKUP_TIMEOUT = config.getfloat(
+    "settings", "EXTERNAL_LOOKUP_TIMEOUT", fallback=10
+)
+# Number of retries of a failed request, the wait doubles after each retry
+EXTERNAL_LOOKUP_RETRIES = config.getint(
+    "settings", "EXTERNAL_LOOKUP_RETRIES", fallback=2
+)
+EXTERNAL_LOOKUP_BACKOFF = config.getfloat(
+    "settings", "EXTERNAL_LOOKUP_BACKOFF", fallback=0.5
+)
+# Maximum number of concurrent requests of the process
+EXTERNAL_LOOKUP_MAX_WORKERS = config.getint(
+    "settings", "EXTERNAL_LOOKUP_MAX_WORKERS", fallback=8
+)
+# Time (seconds) the responses are kept in the table external_lookup_cache
+EXTERNAL_LOOKUP_CACHE_TTL = config.getint(
+    "settings", "EXTERNAL_LOOKUP_CACHE_TTL", fallback=30 * 24 * 3600
+)
+# Time (seconds) the "not found" responses are kept, the ID can be created later
+EXTERNAL_LOOKUP_NOT_FOUND_CACHE_TTL = config.getint(
+    "settings", "EXTERNAL_LOOKUP_NOT_FOUND_CACHE_TTL", fallback=3600
+)
+
 # Used in the email templates to generate the links to the app
 PUBLIC_APP_URL = config.get(
     "settings", "PUBLIC_APP_URL", fallback="http://localhost"
@@ -229,6 +316,43 @@ else:
         }
     }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+
+CACHES = {"default": {"BACKEND": CACHE_BACKENDS["locmem"]}}
+
+# Cache of the responses of the public read endpoints (see views/response_cache.py)
+# RESPONSE_CACHE_BACKEND: locmem (default), file, redis or none (no cache)
+# With locmem each process has its own cache, any update invalidates all the responses;
+# file and redis are shared, an update only invalidates the responses of the updated data
+# RESPONSE_CACHE_LOCATION: directory (file) or server URL (redis)
+RESPONSE_CACHE_BACKEND = config.get(
+    "settings", "RESPONSE_CACHE_BACKEND", fallback="locmem"
+)
+RESPONSE_CACHE_LOCATION = config.get(
+    "settings", "RESPONSE_CACHE_LOCATION", fallback=""
+)
+# Maximum time (seconds) a response is kept in the cache
+RESPONSE_CACHE_TIMEOUT = config.getint(
+    "settings", "RESPONSE_CACHE_TIMEOUT", fallback=86400
+)
+
+# The responses are not cached when running the tests
+if RESPONSE_CACHE_BACKEND != "none" and not (
+    "test" in sys.argv or "test_coverage" in sys.argv
+):
+    CACHES["response_cache"] = {
+        "BACKEND": CACHE_BACKENDS[RESPONSE_CACHE_BACKEND],
+        "LOCATION": RESPONSE_CACHE_LOCATION,
+        "TIMEOUT": RESPONSE_CACHE_TIMEOUT,
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 